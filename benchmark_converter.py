@@ -0,0 +1,435 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+변환 파이프라인 벤치마크 – 합성 3SHAPE / EXO 케이스
+----------------------------------------------------------------
+· 고정 시드로 합성 케이스 폴더를 생성 (재실행 시 같은 스펙이면 재사용)
+    - 3SHAPE: <ORDER>.3ox(utf-16) + <ORDER>_<n>.stl 크라운 + PreparationScan/AntagonistScan.stl
+    - EXO   : *.constructionInfo(크라운, 글로벌 행렬) + *.modelInfo(스캔별 행렬) + 상/하악 PLY 스캔 + 크라운 STL
+· 크기 프리셋: crowns(크라운 몇 개) → quadrant → full-arch(수백만 삼각형) → full-arch-xl
+· convert_stls_to_html 을 같은 프로세스에서 반복 실행, CaseMetrics 단계별 wall time/최고 RSS 중앙값 기록
+· 저장된 baseline(JSON)과 비교하여 허용치 초과 시 종료코드 1 (회귀)
+· 네트워크/GUI 없이 동작 (numpy + vtk + trimesh 만 필요)
+
+  python benchmark_converter.py --sizes crowns quadrant --repeat 3
+  python benchmark_converter.py --sizes full-arch --save-baseline
+  python benchmark_converter.py --sizes full-arch --tolerance 0.15
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import tempfile
+
+import numpy as np
+
+try:
+    from modules.conversion_metrics import STAGES, CaseMetrics
+except ImportError:
+    from conversion_metrics import STAGES, CaseMetrics
+
+try:
+    import modules.fast_html_viewer_converter as conv
+except ImportError:
+    import fast_html_viewer_converter as conv
+
+BENCH_VERSION = 1   # 케이스 생성 규칙이 바뀌면 올린다 (캐시/baseline 무효화)
+
+# 프리셋: 크라운 개수, 크라운당 삼각형, 스캔(상/하악 각각) 삼각형
+SIZE_PRESETS: dict[str, dict] = {
+    "crowns":       {"crowns": 2,  "crown_tris": 8_000,  "scan_tris": 60_000},
+    "quadrant":     {"crowns": 4,  "crown_tris": 20_000, "scan_tris": 400_000},
+    "full-arch":    {"crowns": 14, "crown_tris": 40_000, "scan_tris": 1_500_000},
+    "full-arch-xl": {"crowns": 14, "crown_tris": 80_000, "scan_tris": 4_000_000},
+}
+KINDS = ("3shape", "exo")
+
+DEFAULT_WORK_DIR = os.path.join(tempfile.gettempdir(), "dlas_bench_cases")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+ARCH_RADIUS = 25.0            # mm, 악궁 반경
+ARCH_SPAN   = 1.45            # rad, 중심선 ±각도
+UPPER_TEETH = [16, 15, 14, 13, 12, 11, 21, 22, 23, 24, 25, 26, 17, 27]
+LOWER_TEETH = [36, 35, 34, 33, 32, 31, 41, 42, 43, 44, 45, 46, 37, 47]
+
+# ----------------------------------------------------------------------
+# 합성 메시 (닫힌 표면, 결정적)
+# ----------------------------------------------------------------------
+def _arch_point(theta: np.ndarray) -> np.ndarray:
+    """말굽형 악궁 중심선 (xy 평면)"""
+    return np.stack([ARCH_RADIUS * np.sin(theta), ARCH_RADIUS * 0.85 * np.cos(theta), np.zeros_like(theta)], axis=-1)
+
+def arch_mesh(target_tris: int, z_center: float, cusp_up: bool, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    악궁을 따라 휘어진 타원 단면 튜브 (+양 끝 캡) – 스캔 대용
+    · 교합면 쪽에 치아 교두 형태의 굴곡, 표면에 스캔 노이즈 수준의 지터
+    · 삼각형 수 ≈ target_tris
+    """
+    n_v = max(16, int(round(np.sqrt(target_tris / 12))))
+    n_u = max(4, target_tris // (2 * n_v))
+    rng = np.random.default_rng(seed)
+
+    theta = np.linspace(-ARCH_SPAN, ARCH_SPAN, n_u)
+    center = _arch_point(theta)
+    tangent = np.stack([np.cos(theta), -0.85 * np.sin(theta), np.zeros_like(theta)], axis=-1)
+    tangent /= np.linalg.norm(tangent, axis=1, keepdims=True)
+    side = np.cross(tangent, [0.0, 0.0, 1.0])
+
+    phi = np.linspace(0.0, 2 * np.pi, n_v, endpoint=False)
+    occl = np.sin(phi) if cusp_up else -np.sin(phi)          # 교합면 방향 성분 (1 = 교합면)
+    cusps = 0.6 * np.clip(np.sin(theta * 9.0), 0, None) ** 2   # 치아 14개 정도의 교두 주기
+    r_side = 5.0 + 0.2 * rng.standard_normal(n_u).cumsum() / np.sqrt(n_u)
+    r_vert = 6.0 + np.outer(cusps, np.clip(occl, 0, None))      # (n_u, n_v)
+
+    x = center[:, None, :] + side[:, None, :] * (r_side[:, None] * np.cos(phi))[:, :, None]
+    x[:, :, 2] += z_center + r_vert * np.sin(phi)[None, :]
+    x += rng.normal(scale=0.01, size=x.shape)
+    verts = x.reshape(-1, 3)
+
+    i = np.arange(n_u - 1)[:, None]
+    j = np.arange(n_v)[None, :]
+    a = i * n_v + j
+    b = (i + 1) * n_v + j
+    c = (i + 1) * n_v + (j + 1) % n_v
+    d = i * n_v + (j + 1) % n_v
+    quads = np.stack([np.stack([a, b, c], -1), np.stack([a, c, d], -1)], axis=2).reshape(-1, 3)
+
+    # 양 끝 캡 (부채꼴)
+    start_c = len(verts); end_c = start_c + 1
+    verts = np.vstack([verts, x[0].mean(axis=0), x[-1].mean(axis=0)])
+    jj = np.arange(n_v)
+    cap0 = np.stack([np.full(n_v, start_c), (jj + 1) % n_v, jj], -1)
+    last = (n_u - 1) * n_v
+    cap1 = np.stack([np.full(n_v, end_c), last + jj, last + (jj + 1) % n_v], -1)
+    faces = np.vstack([quads, cap0, cap1])
+    return verts.astype(np.float32), faces.astype(np.int32)
+
+def crown_mesh(target_tris: int, center: np.ndarray, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """교두가 있는 찌그러진 UV 구 – 크라운 대용"""
+    n_lon = max(8, int(round(np.sqrt(target_tris))))
+    n_lat = max(4, target_tris // (2 * n_lon) + 1)
+    rng = np.random.default_rng(seed)
+
+    lat = np.linspace(0, np.pi, n_lat + 1)[1:-1]
+    lon = np.linspace(0, 2 * np.pi, n_lon, endpoint=False)
+    sl, cl = np.sin(lat)[:, None], np.cos(lat)[:, None]
+    bump = 1.0 + 0.12 * np.clip(np.cos(lon * 4)[None, :], 0, None) * np.clip(cl, 0, None)
+    x = np.stack([4.5 * sl * np.cos(lon) * bump, 5.0 * sl * np.sin(lon) * bump,
+                  4.0 * cl * bump * np.ones_like(lon)], -1)
+    x += rng.normal(scale=0.005, size=x.shape)
+    verts = np.vstack([x.reshape(-1, 3), [[0, 0, 4.0]], [[0, 0, -4.0]]]) + center
+    top, bot = len(verts) - 2, len(verts) - 1
+
+    rows = n_lat - 1
+    i = np.arange(rows - 1)[:, None]; j = np.arange(n_lon)[None, :]
+    a = i * n_lon + j; b = (i + 1) * n_lon + j
+    c = (i + 1) * n_lon + (j + 1) % n_lon; d = i * n_lon + (j + 1) % n_lon
+    body = np.stack([np.stack([a, c, b], -1), np.stack([a, d, c], -1)], axis=2).reshape(-1, 3)
+    jj = np.arange(n_lon)
+    cap_t = np.stack([np.full(n_lon, top), jj, (jj + 1) % n_lon], -1)
+    base = (rows - 1) * n_lon
+    cap_b = np.stack([np.full(n_lon, bot), base + (jj + 1) % n_lon, base + jj], -1)
+    return verts.astype(np.float32), np.vstack([body, cap_t, cap_b]).astype(np.int32)
+
+def write_stl(path: str, verts: np.ndarray, faces: np.ndarray) -> None:
+    """바이너리 STL"""
+    tri = verts[faces]
+    n = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    n /= np.maximum(np.linalg.norm(n, axis=1, keepdims=True), 1e-12)
+    rec = np.zeros(len(faces), dtype=[("n", "<f4", 3), ("v", "<f4", (3, 3)), ("attr", "<u2")])
+    rec["n"] = n; rec["v"] = tri
+    with open(path, "wb") as f:
+        f.write(b"DLAS synthetic benchmark mesh".ljust(80, b" "))
+        f.write(np.uint32(len(faces)).tobytes())
+        f.write(rec.tobytes())
+
+def write_ply(path: str, verts: np.ndarray, faces: np.ndarray) -> None:
+    """바이너리 little-endian PLY"""
+    header = ("ply\nformat binary_little_endian 1.0\ncomment DLAS synthetic benchmark mesh\n"
+              f"element vertex {len(verts)}\nproperty float x\nproperty float y\nproperty float z\n"
+              f"element face {len(faces)}\nproperty list uchar int vertex_indices\nend_header\n")
+    fr = np.zeros(len(faces), dtype=[("n", "u1"), ("idx", "<i4", 3)])
+    fr["n"] = 3; fr["idx"] = faces
+    with open(path, "wb") as f:
+        f.write(header.encode("ascii"))
+        f.write(verts.astype("<f4").tobytes())
+        f.write(fr.tobytes())
+
+def _tooth_center(k: int, n: int, upper: bool) -> np.ndarray:
+    theta = -ARCH_SPAN * 0.85 + (2 * ARCH_SPAN * 0.85) * (k + 0.5) / max(n, 1)
+    c = _arch_point(np.array([theta]))[0]
+    c[2] = 9.0 if upper else -9.0
+    return c
+
+# ----------------------------------------------------------------------
+# 합성 케이스 폴더
+# ----------------------------------------------------------------------
+def _matrix_xml(tag: str, M: np.ndarray, indent: str = "  ") -> str:
+    """열 우선(_ij = M.T[i][j]) 저장 – parse_matrix/convert_matrix_to_row_major 규칙과 동일"""
+    cells = "".join(f"<_{i}{j}>{M.T[i, j]:.6f}</_{i}{j}>" for i in range(4) for j in range(4))
+    return f"{indent}<{tag}>{cells}</{tag}>"
+
+def _translation(x: float, y: float, z: float) -> np.ndarray:
+    M = np.eye(4); M[:3, 3] = (x, y, z)
+    return M
+
+def make_3shape_case(folder: str, spec: dict, seed: int) -> None:
+    order = "BENCH0001"
+    n = spec["crowns"]
+    elements = []
+    for k in range(n):
+        tooth = UPPER_TEETH[k % len(UPPER_TEETH)]
+        v, f = crown_mesh(spec["crown_tris"], _tooth_center(k, n, upper=True), seed + 100 + k)
+        write_stl(os.path.join(folder, f"{order}_{k + 1}.stl"), v, f)
+        scans = ('<ScanFiles><ScanFile path="PreparationScan.stl"/><ScanFile path="AntagonistScan.stl"/></ScanFiles>'
+                 if k == 0 else "")
+        elements.append(f'  <ModelElement displayName="크라운 {tooth}"><ModelElementIndex>{k + 1}</ModelElementIndex>'
+                        f'{scans}</ModelElement>')
+    write_stl(os.path.join(folder, "PreparationScan.stl"), *arch_mesh(spec["scan_tris"], 5.5, False, seed + 1))
+    write_stl(os.path.join(folder, "AntagonistScan.stl"), *arch_mesh(spec["scan_tris"], -5.5, True, seed + 2))
+    xml = ('<?xml version="1.0" encoding="utf-16"?>\n'
+           '<Order xmlns="http://schemas.3shape.com/3OX/OrderInterface/2011/01">\n'
+           f' <ThreeShapeOrderNo>{order}</ThreeShapeOrderNo>\n' + "\n".join(elements) + "\n</Order>\n")
+    with open(os.path.join(folder, f"{order}.3ox"), "w", encoding="utf-16") as f:
+        f.write(xml)
+
+def make_exo_case(folder: str, spec: dict, seed: int) -> None:
+    # 날짜에 FDI 번호처럼 보이는 숫자(11–48)가 없도록 고정
+    upper_scan, lower_scan = "2025-01-09-upperjaw.ply", "2025-01-09-lowerjaw.ply"
+    g = _translation(1.5, -0.5, 0.25)         # 글로벌 MatrixToScanDataFiles
+    m_up, m_lo = _translation(0.0, 0.0, 0.5), _translation(0.0, 0.0, -0.5)
+
+    # 파일은 변환 전 좌표로 저장 (파이프라인이 역행렬을 적용)
+    for name, z, up, M, s in ((upper_scan, 5.0, False, m_up, 1), (lower_scan, -5.0, True, m_lo, 2)):
+        v, f = arch_mesh(spec["scan_tris"], z, up, seed + s)
+        v = (np.c_[v, np.ones(len(v))] @ M.T)[:, :3].astype(np.float32)
+        write_ply(os.path.join(folder, name), v, f)
+
+    n = spec["crowns"]
+    cfs = []
+    for k in range(n):
+        tooth = UPPER_TEETH[k % len(UPPER_TEETH)] if k % 2 == 0 else LOWER_TEETH[k % len(LOWER_TEETH)]
+        name = f"{tooth}-crown.stl"
+        v, f = crown_mesh(spec["crown_tris"], _tooth_center(k, n, upper=tooth < 30), seed + 100 + k)
+        v = (np.c_[v, np.ones(len(v))] @ g.T)[:, :3].astype(np.float32)
+        write_stl(os.path.join(folder, name), v, f)
+        cfs.append(f"  <ConstructionFile><Filename>{name}</Filename><Label>Crown {tooth}</Label></ConstructionFile>")
+
+    ci = ('<?xml version="1.0" encoding="utf-8"?>\n<ConstructionInfo>\n'
+          + _matrix_xml("MatrixToScanDataFiles", g, " ") + "\n"
+          + " <ConstructionFileList>\n" + "\n".join(cfs) + "\n </ConstructionFileList>\n"
+          + f" <ScanFiles><ScanFile><FileName>{upper_scan}</FileName></ScanFile>"
+            f"<ScanFile><FileName>{lower_scan}</FileName></ScanFile></ScanFiles>\n"
+          + "</ConstructionInfo>\n")
+    mi = ('<?xml version="1.0" encoding="utf-8"?>\n<ModelInfo>\n <Models>\n'
+          f"  <Model><Filename>{upper_scan}</Filename><Jaw>Upper</Jaw>\n" + _matrix_xml("TransformationMatrix", m_up, "   ")
+          + "\n  </Model>\n"
+          f"  <Model><Filename>{lower_scan}</Filename><Jaw>Lower</Jaw>\n" + _matrix_xml("TransformationMatrix", m_lo, "   ")
+          + "\n  </Model>\n </Models>\n</ModelInfo>\n")
+    with open(os.path.join(folder, "bench.constructionInfo"), "w", encoding="utf-8") as f:
+        f.write(ci)
+    with open(os.path.join(folder, "bench.modelInfo"), "w", encoding="utf-8") as f:
+        f.write(mi)
+
+_MAKERS = {"3shape": make_3shape_case, "exo": make_exo_case}
+
+def ensure_case(work_dir: str, kind: str, size: str, spec: dict, seed: int) -> str:
+    """케이스 폴더 생성 (manifest가 같으면 재사용)"""
+    folder = os.path.join(work_dir, f"{kind}-{size}")
+    manifest = {"version": BENCH_VERSION, "kind": kind, "spec": spec, "seed": seed}
+    mpath = os.path.join(folder, "bench_manifest.json")
+    try:
+        with open(mpath, "r", encoding="utf-8") as f:
+            if json.load(f) == manifest:
+                return folder
+    except (OSError, ValueError):
+        pass
+    shutil.rmtree(folder, ignore_errors=True)
+    os.makedirs(folder)
+    t = time.perf_counter()
+    _MAKERS[kind](folder, spec, seed)
+    with open(mpath, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    print(f"[BENCH] 케이스 생성: {folder} ({time.perf_counter() - t:.1f}s)", file=sys.stderr)
+    return folder
+
+# ----------------------------------------------------------------------
+# 실행 / 집계
+# ----------------------------------------------------------------------
+def run_case(folder: str, repeat: int, out_dir: str) -> dict:
+    """discovery + convert_stls_to_html 을 repeat 회 실행 → 단계별 중앙값"""
+    runs = []
+    html_path = os.path.join(out_dir, os.path.basename(folder) + ".html")
+    for _ in range(repeat):
+        metrics = CaseMetrics(folder)
+        with metrics.stage("discovery") as st:
+            mode = conv.detect_mode(folder)
+            stl_paths = conv.find_stl_files(folder)
+            st["files"] = len(stl_paths)
+        conv.convert_stls_to_html(stl_paths, html_path, folder, mode, metrics=metrics)
+        metrics.finish("success")
+        runs.append(metrics.to_dict())
+
+    stages = {}
+    for name in STAGES:
+        vals = [r["stages"][name] for r in runs if name in r["stages"]]
+        if not vals:
+            continue
+        stages[name] = {
+            "wall_s": round(statistics.median(v["wall_s"] for v in vals), 4),
+            "rss_peak_mb": max((v.get("rss_peak_mb") or 0.0) for v in vals),
+            **{k: vals[-1][k] for k in ("tri_in", "tri_out", "bytes") if k in vals[-1]},
+        }
+    last = runs[-1]
+    return {
+        "wall_s": round(statistics.median(r["wall_s"] for r in runs), 4),
+        "wall_s_min": round(min(r["wall_s"] for r in runs), 4),
+        "rss_peak_mb": max((r.get("rss_peak_mb") or 0.0) for r in runs),
+        "tri_in": last["tri_in"], "tri_out": last["tri_out"], "bytes_written": last["bytes_written"],
+        "repeat": repeat,
+        "stages": stages,
+    }
+
+def environment_info() -> dict:
+    info = {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.machine(), "cpus": os.cpu_count(), "numpy": np.__version__}
+    for mod in ("vtk", "trimesh"):
+        try:
+            info[mod] = getattr(sys.modules.get(mod) or __import__(mod), "__version__", "?")
+        except Exception:
+            info[mod] = None
+    return info
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta: float) -> list[dict]:
+    """
+    baseline 대비 회귀 목록.
+    · wall_s: (현재 - 기준) > max(기준 * tolerance, min_delta) 이면 회귀
+    · rss_peak_mb: 기준 * tolerance 와 32MB 중 큰 값 초과 증가 시 회귀
+    """
+    regressions = []
+    for case, cur in results.items():
+        base = baseline.get("cases", {}).get(case)
+        if not base:
+            continue
+        checks = [("total", "wall_s", cur["wall_s"], base.get("wall_s"))]
+        checks += [(st, "wall_s", v["wall_s"], base.get("stages", {}).get(st, {}).get("wall_s"))
+                   for st, v in cur["stages"].items()]
+        checks.append(("total", "rss_peak_mb", cur.get("rss_peak_mb"), base.get("rss_peak_mb")))
+        for stage, metric, now, ref in checks:
+            if now is None or ref is None:
+                continue
+            limit = max(ref * tolerance, min_delta if metric == "wall_s" else 32.0)
+            if now - ref > limit:
+                regressions.append({"case": case, "stage": stage, "metric": metric,
+                                    "baseline": ref, "current": now,
+                                    "ratio": round(now / ref, 3) if ref else None})
+    return regressions
+
+def format_results(results: dict, baseline: dict | None) -> str:
+    lines = []
+    for case, r in results.items():
+        base = (baseline or {}).get("cases", {}).get(case, {})
+        def vs(now, ref):
+            return f"{now:>8.3f}s" + (f" ({(now / ref - 1) * 100:+6.1f}%)" if ref else " " * 10)
+        lines.append(f"[BENCH] {case}: total {vs(r['wall_s'], base.get('wall_s'))}  "
+                     f"peak {r['rss_peak_mb']:.0f}MB  tri {r['tri_in']:,} → {r['tri_out']:,}  "
+                     f"html {r['bytes_written'] / 2**20:.1f}MB")
+        for st, v in r["stages"].items():
+            ref = base.get("stages", {}).get(st, {}).get("wall_s")
+            lines.append(f"[BENCH]   {st:<11} {vs(v['wall_s'], ref)}  peak {v.get('rss_peak_mb') or 0:.0f}MB")
+    return "\n".join(lines)
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="benchmark_converter",
+                                description="합성 치과 케이스로 HTML 변환 파이프라인 성능 측정 / baseline 비교")
+    p.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    p.add_argument("--sizes", nargs="+", choices=list(SIZE_PRESETS), default=["crowns", "quadrant"])
+    p.add_argument("--crowns", type=int, help="프리셋의 크라운 개수 덮어쓰기")
+    p.add_argument("--crown-tris", type=int, help="프리셋의 크라운당 삼각형 수 덮어쓰기")
+    p.add_argument("--scan-tris", type=int, help="프리셋의 스캔(상/하악 각각) 삼각형 수 덮어쓰기")
+    p.add_argument("--seed", type=int, default=1234)
+    p.add_argument("--repeat", type=int, default=3, help="케이스당 반복 횟수 (중앙값 사용)")
+    p.add_argument("--no-warmup", dest="warmup", action="store_false",
+                   help="측정 전 첫 케이스 1회 실행 생략 (기본: 실행하여 vtk/trimesh import 시간을 측정에서 제외)")
+    p.add_argument("--work", default=DEFAULT_WORK_DIR, help="합성 케이스 폴더 위치 (재사용)")
+    p.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON 경로")
+    p.add_argument("--save-baseline", action="store_true", help="이번 결과로 baseline 갱신 (같은 케이스만 덮어씀)")
+    p.add_argument("--tolerance", type=float, default=0.20, help="허용 증가율 (기본 20%%)")
+    p.add_argument("--min-delta", type=float, default=0.05, help="무시할 절대 시간 차이(초)")
+    p.add_argument("--json", dest="json_out", help="결과 JSON 저장 경로")
+    p.add_argument("--generate-only", action="store_true", help="케이스 생성만 하고 종료")
+    return p
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    os.makedirs(args.work, exist_ok=True)
+
+    cases: dict[str, str] = {}
+    for size in args.sizes:
+        spec = dict(SIZE_PRESETS[size])
+        for key in ("crowns", "crown_tris", "scan_tris"):
+            if getattr(args, key) is not None:
+                spec[key] = getattr(args, key)
+        for kind in args.kinds:
+            cases[f"{kind}-{size}"] = ensure_case(args.work, kind, size, spec, args.seed)
+    if args.generate_only:
+        print("\n".join(cases.values()))
+        return 0
+
+    baseline = None
+    if os.path.isfile(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("version") != BENCH_VERSION:
+            print(f"[WARN] baseline 버전 불일치({baseline.get('version')} ≠ {BENCH_VERSION}) – 비교 생략", file=sys.stderr)
+            baseline = None
+
+    out_dir = tempfile.mkdtemp(prefix="dlas_bench_out_")
+    try:
+        if args.warmup:
+            run_case(next(iter(cases.values())), 1, out_dir)
+        results = {}
+        for name, folder in cases.items():
+            print(f"[BENCH] {name} × {args.repeat}", file=sys.stderr)
+            results[name] = run_case(folder, args.repeat, out_dir)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    report = {"type": "benchmark", "started": round(time.time(), 3), "env": environment_info(),
+              "startup": conv.startup_report()["lazy_imports_ms"], "cases": results}
+    print(format_results(results, baseline))
+
+    status = 0
+    if baseline and not args.save_baseline:
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        report["regressions"] = regressions
+        for r in regressions:
+            print(f"[REGRESSION] {r['case']} {r['stage']} {r['metric']}: "
+                  f"{r['baseline']} → {r['current']} (x{r['ratio']})")
+        if baseline.get("env", {}).get("platform") != report["env"]["platform"]:
+            print("[WARN] baseline 이 다른 환경에서 측정됨 – 비교 결과는 참고용", file=sys.stderr)
+        status = 1 if regressions else 0
+
+    if args.save_baseline:
+        merged = baseline or {"cases": {}}
+        merged["version"] = BENCH_VERSION
+        merged["env"] = report["env"]
+        merged["cases"].update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(merged, f, ensure_ascii=False, indent=1)
+        print(f"[BENCH] baseline 저장: {args.baseline}", file=sys.stderr)
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
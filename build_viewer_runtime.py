@@ -0,0 +1,121 @@
+"""
+뷰어 런타임 번들 생성 – 생성 HTML이 쓰는 three.js 클래스만 묶은 최소 번들 (오프라인 열기 / PWA 공유 캐시용)
+----------------------------------------------------------------
+· fast_html_viewer_converter.py 의 뷰어 템플릿에서 `THREE.이름` 을 모아 엔트리를 만든다
+  (뷰어가 새 클래스를 쓰기 시작하면 다시 실행만 하면 된다 – 빠진 이름은 검증 단계에서 실패)
+· three@THREE_VERSION + esbuild 를 viewer_runtime/.build 에 설치 → IIFE 로 묶어 tree-shaking/압축
+  (three.js 라이선스 주석은 유지)
+· 출력: viewer_runtime/<RUNTIME_FILENAME> (+ .gz, brotli 가 있으면 .br – 내장 서버가 그대로 전송)
+        PWA 배포 폴더(runtime/, www/runtime/)에도 복사 – 서비스 워커가 RUNTIME_URL 로 미리 캐시
+· PWA 뷰어 런타임 페이지(viewer.html, www/viewer.html)도 다시 만든다 – .dlas 케이스 데이터를 렌더링
+  뷰어 템플릿만 바뀌었으면 --viewer-only 로 이것만 (Node 불필요)
+· 필요: Node.js/npm (빌드할 때만, 변환기 실행에는 필요 없음)
+· 배포 전 필수 단계 – 번들이 없는 배포본(PyInstaller)은 변환 시 오류를 낸다
+  --check: 빌드하지 않고 번들/복사본/viewer.html 이 모두 있는지만 확인 (없으면 종료 코드 1 – 릴리스 스크립트/CI 용)
+
+    python build_viewer_runtime.py [--viewer-only | --check]
+"""
+import os
+import re
+import sys
+import gzip
+import shutil
+import subprocess
+
+from fast_html_viewer_converter import THREE_VERSION, RUNTIME_DIR, RUNTIME_FILENAME, PWA_VIEWER_FILE, write_pwa_viewer
+
+ESBUILD_VERSION = "0.19.12"
+ADDONS = {   # three 코어 밖(examples/jsm)에서 가져오는 클래스
+    "GLTFLoader":        "three/examples/jsm/loaders/GLTFLoader.js",
+    "TrackballControls": "three/examples/jsm/controls/TrackballControls.js",
+}
+PWA_DIRS = ("runtime", os.path.join("www", "runtime"))
+PWA_ROOTS = (".", "www")
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def used_three_names(source_path: str) -> list[str]:
+    with open(source_path, "r", encoding="utf-8") as f:
+        return sorted(set(re.findall(r"\bTHREE\.([A-Za-z_]\w*)", f.read())))
+
+def entry_source(names: list[str]) -> str:
+    core = [n for n in names if n not in ADDONS]
+    lines = ["// build_viewer_runtime.py 가 생성 – 직접 고치지 말 것",
+             "import {" + ", ".join(core) + "} from \"three\";"]
+    lines += [f'import {{{n}}} from "{ADDONS[n]}";' for n in names if n in ADDONS]
+    lines.append("window.THREE = {" + ", ".join(names) + "};")
+    return "\n".join(lines) + "\n"
+
+def _run(cmd: list[str], cwd: str) -> None:
+    print("[RUN]", " ".join(cmd))
+    subprocess.run(cmd, cwd=cwd, check=True, shell=(os.name == "nt"))
+
+def build() -> str:
+    out_dir = os.path.join(HERE, RUNTIME_DIR)
+    work = os.path.join(out_dir, ".build")
+    os.makedirs(work, exist_ok=True)
+    if not shutil.which("npm"):
+        raise SystemExit("[ERROR] npm 이 필요합니다 (Node.js 설치)")
+
+    names = used_three_names(os.path.join(HERE, "fast_html_viewer_converter.py"))
+    print(f"[INFO] three.js {THREE_VERSION} – {len(names)}개: {', '.join(names)}")
+    with open(os.path.join(work, "entry.js"), "w", encoding="utf-8") as f:
+        f.write(entry_source(names))
+    if not os.path.isfile(os.path.join(work, "package.json")):
+        with open(os.path.join(work, "package.json"), "w", encoding="utf-8") as f:
+            f.write('{"private": true}\n')
+    _run(["npm", "install", "--no-audit", "--no-fund", f"three@{THREE_VERSION}", f"esbuild@{ESBUILD_VERSION}"], work)
+
+    out_path = os.path.join(out_dir, RUNTIME_FILENAME)
+    esbuild = os.path.join(work, "node_modules", ".bin", "esbuild" + (".cmd" if os.name == "nt" else ""))
+    _run([esbuild, "entry.js", "--bundle", "--minify", "--format=iife", "--target=es2017",
+          "--legal-comments=inline", f"--outfile={out_path}"], work)
+
+    # 검증: 번들을 실행해 뷰어가 쓰는 이름이 모두 전역 THREE 에 있는지
+    check = ("globalThis.window=globalThis;globalThis.self=globalThis;require(process.argv[1]);"
+             "const miss=process.argv.slice(2).filter(n=>!(n in THREE));"
+             "if(miss.length){console.error('missing: '+miss.join(', '));process.exit(1);}")
+    _run(["node", "-e", check, out_path, *names], work)
+
+    with open(out_path, "rb") as f:
+        raw = f.read()
+    with open(out_path + ".gz", "wb") as f:
+        f.write(gzip.compress(raw, compresslevel=9, mtime=0))
+    try:
+        import brotli
+        with open(out_path + ".br", "wb") as f:
+            f.write(brotli.compress(raw, quality=11))
+    except ImportError:
+        pass
+    print(f"[SAVE] {out_path} ({len(raw) / 1024:.0f} KB, gzip {os.path.getsize(out_path + '.gz') / 1024:.0f} KB)")
+    for d in PWA_DIRS:
+        os.makedirs(os.path.join(HERE, d), exist_ok=True)
+        shutil.copy2(out_path, os.path.join(HERE, d, RUNTIME_FILENAME))
+        print(f"[SAVE] {os.path.join(d, RUNTIME_FILENAME)}")
+    return out_path
+
+def missing_artifacts() -> list[str]:
+    """배포에 필요한 런타임 산출물 중 없는 것 (HERE 기준 상대 경로)"""
+    paths = [os.path.join(RUNTIME_DIR, RUNTIME_FILENAME), os.path.join(RUNTIME_DIR, RUNTIME_FILENAME + ".gz")]
+    paths += [os.path.join(d, RUNTIME_FILENAME) for d in PWA_DIRS]
+    paths += [os.path.normpath(os.path.join(d, PWA_VIEWER_FILE)) for d in PWA_ROOTS]
+    return [p for p in paths if not os.path.isfile(os.path.join(HERE, p))]
+
+def build_pwa_viewers() -> None:
+    for d in PWA_ROOTS:
+        write_pwa_viewer(os.path.normpath(os.path.join(HERE, d, PWA_VIEWER_FILE)), log_callback=print)
+
+if __name__ == "__main__":
+    if "--check" in sys.argv[1:]:
+        missing = missing_artifacts()
+        for p in missing:
+            print(f"[ERROR] 없음: {p}", file=sys.stderr)
+        if missing:
+            print("[ERROR] python build_viewer_runtime.py 를 실행한 뒤 산출물을 함께 커밋/배포하세요", file=sys.stderr)
+        sys.exit(1 if missing else 0)
+    try:
+        if "--viewer-only" not in sys.argv[1:]:
+            build()
+        build_pwa_viewers()
+    except subprocess.CalledProcessError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        sys.exit(1)
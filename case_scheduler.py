@@ -0,0 +1,185 @@
+"""
+메모리 예산 기반 케이스 스케줄러 – 병렬 변환(--jobs N)에서 큰 케이스가 겹쳐 메모리가 바닥나지 않도록
+----------------------------------------------------------------
+· 비용 추정: STL/PLY 헤더만 읽어 삼각형 수를 구한다 (바이너리 STL 84바이트, PLY 헤더 몇 줄 – 메시는 읽지 않음)
+    워커 ≈ 워커 기본 + 가장 큰 메시(읽기+감소) + [EXO] 변환 후 메모리에 올려 둔 전체 메시
+    BITE ≈ 별도 프로세스 기본 + 감소 후 메시 불리언 (워커가 결과를 기다리는 동안 함께 떠 있으므로 예약량에 더한다)
+    cpu ≈ 삼각형 수 비례 + BITE
+· 보정: metrics 로그(JSON-lines)의 워커 실측 최고 RSS / 보정 전 워커 추정치(est_worker_mb) 비율(p90)로
+  워커 계수만 맞춘다 – BITE 프로세스는 워커 RSS 에 잡히지 않으므로 보정에서 뺀다
+· CaseScheduler.take(free_mb, idle)
+    - 비용 큰 케이스부터 (LPT) – 남은 예산에 들어가지 않으면 그 뒤의 작은 케이스로 빈자리를 채운다
+    - 작은 케이스가 MAX_BYPASS 번 앞질러 가면 큰 케이스 차례가 올 때까지 새로 넣지 않는다 (기아 방지)
+    - 아무것도 돌고 있지 않으면 예산을 넘는 케이스도 혼자 실행한다
+· 예산: --mem-budget MB (기본: 시작 시 가용 메모리의 80%, 0이면 제한 없음)
+"""
+import os
+import re
+import sys
+import json
+import struct
+from typing import NamedTuple, Optional
+
+WORKER_BASE_MB     = 350.0    # 파이썬 + vtk/trimesh import + HTML 조립
+PEAK_B_PER_TRI     = 450.0    # 가장 큰 메시: reader 출력 + QuadricDecimation 작업 공간
+HELD_B_PER_TRI     = 100.0    # EXO: 좌표 변환된 메시를 케이스 내내 메모리에 보관
+BITE_B_PER_TRI     = 2000.0   # BITE 불리언 교차 (감소 후 메시 기준, 별도 프로세스)
+REDUCED_FRACTION   = 0.125    # reduce_stl_size 기본 감소율 0.875
+CPU_S_PER_MTRI     = 4.0
+BITE_CPU_S_PER_MTRI = 40.0
+ASCII_STL_B_PER_TRI = 260     # ASCII STL facet 한 개의 평균 바이트
+AUTO_BUDGET_FRACTION = 0.8
+MAX_BYPASS         = 8
+SCALE_LIMITS       = (0.5, 4.0)
+
+class CaseCost(NamedTuple):
+    mem_mb: float            # 예약량: 보정된 워커 + BITE 프로세스
+    cpu_s: float
+    tris: int
+    bytes: int
+    worker_mb: float = 0.0   # 보정 전 워커 추정치 (metrics 로그 → load_cost_scale)
+    bite_mb: float = 0.0     # BITE 프로세스 추정치 (BITE 입력이 없으면 0)
+
+# ----------------------------------------------------------------------
+# 헤더만 읽는 삼각형 수
+# ----------------------------------------------------------------------
+_PLY_FACE_RE = re.compile(rb"^element\s+face\s+(\d+)", re.M)
+
+def mesh_triangle_count(path: str) -> int:
+    """STL(바이너리/ASCII)/PLY 삼각형 수 – 바이너리는 헤더 값, ASCII 는 파일 크기로 추정, 실패 시 0"""
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            head = f.read(4096 if path.lower().endswith(".ply") else 84)
+    except OSError:
+        return 0
+    if path.lower().endswith(".ply"):
+        m = _PLY_FACE_RE.search(head.split(b"end_header", 1)[0])
+        return int(m.group(1)) if m else size // 50
+    if len(head) == 84:
+        n = struct.unpack_from("<I", head, 80)[0]
+        if 84 + 50 * n == size:
+            return n
+    # "solid" 로 시작하는 ASCII 이거나 크기가 맞지 않는 바이너리
+    return size // (ASCII_STL_B_PER_TRI if head[:5].lower() == b"solid" else 50)
+
+def estimate_cost(tri_counts: list[int], bite_tris: int = 0, held: bool = False,
+                  size_bytes: int = 0, scale: float = 1.0) -> CaseCost:
+    """
+    tri_counts: 메시별 삼각형 수 / bite_tris: BITE 입력이 될 메시의 원본 삼각형 합
+    held: EXO – 변환된 메시 전체를 감소 단계 내내 보관
+    """
+    total = sum(tri_counts)
+    biggest = max(tri_counts, default=0)
+    bite_in = bite_tris * REDUCED_FRACTION
+    mem = biggest * PEAK_B_PER_TRI + (total * HELD_B_PER_TRI if held else 0.0)
+    worker = WORKER_BASE_MB + mem / 2**20 * scale
+    bite = WORKER_BASE_MB + bite_in * BITE_B_PER_TRI / 2**20 if bite_in else 0.0
+    cpu = total / 1e6 * CPU_S_PER_MTRI + bite_in / 1e6 * BITE_CPU_S_PER_MTRI
+    return CaseCost(round(worker + bite, 1), round(cpu, 2), total, size_bytes,
+                    round(WORKER_BASE_MB + mem / 2**20, 1), round(bite, 1))
+
+# ----------------------------------------------------------------------
+# 예산 / 보정
+# ----------------------------------------------------------------------
+def available_memory_mb() -> Optional[float]:
+    """현재 가용 물리 메모리 (MB), 알 수 없으면 None"""
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/meminfo", "r") as f:
+                m = re.search(r"^MemAvailable:\s+(\d+)\s+kB", f.read(), re.M)
+            return round(int(m.group(1)) / 1024, 1) if m else None
+        if sys.platform == "win32":
+            import ctypes
+
+            class MEMORYSTATUSEX(ctypes.Structure):
+                _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                            ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                            ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                            ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                            ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+            st = MEMORYSTATUSEX()
+            st.dwLength = ctypes.sizeof(st)
+            if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(st)):
+                return None
+            return round(st.ullAvailPhys / 2**20, 1)
+        # macOS 등: 가용량 API가 없으므로 전체의 절반으로 본다
+        return round(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 2**20 / 2, 1)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def resolve_budget(budget_mb: Optional[float]) -> Optional[float]:
+    """None → 가용 메모리의 80% (알 수 없으면 제한 없음) / 0 이하 → 제한 없음(None)"""
+    if budget_mb is None:
+        avail = available_memory_mb()
+        return round(avail * AUTO_BUDGET_FRACTION, 1) if avail else None
+    return budget_mb if budget_mb > 0 else None
+
+def load_cost_scale(metrics_log: Optional[str], tail_bytes: int = 2 * 2**20) -> float:
+    """metrics 로그 끝부분의 성공 케이스들 → 워커 실측 최고 RSS / 보정 전 워커 추정치 의 p90 (기록이 적으면 1.0)
+
+    보정된 값(est_mb)으로 비율을 내면 다음 실행의 계수가 이전 계수로 나뉘어 오르내리므로 est_worker_mb 만 쓴다
+    (이 필드가 없는 예전 기록은 BITE 가 섞인 보정 후 값이라 건너뛴다)
+    """
+    if not metrics_log or not os.path.isfile(metrics_log):
+        return 1.0
+    ratios = []
+    try:
+        size = os.path.getsize(metrics_log)
+        with open(metrics_log, "rb") as f:
+            f.seek(max(0, size - tail_bytes))
+            lines = f.read().splitlines()
+    except OSError:
+        return 1.0
+    if size > tail_bytes:
+        lines = lines[1:]                  # 잘린 첫 줄
+    for line in lines:
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            continue
+        est, peak = rec.get("est_worker_mb"), rec.get("rss_peak_mb")
+        if rec.get("type") == "case" and rec.get("status") == "success" and est and peak and est > WORKER_BASE_MB:
+            ratios.append((peak - WORKER_BASE_MB) / (est - WORKER_BASE_MB))
+    if len(ratios) < 5:
+        return 1.0
+    ratios.sort()
+    lo, hi = SCALE_LIMITS
+    return round(min(hi, max(lo, ratios[int(0.9 * (len(ratios) - 1))])), 3)
+
+# ----------------------------------------------------------------------
+# 스케줄러
+# ----------------------------------------------------------------------
+class CaseScheduler:
+    """(항목, CaseCost) 대기 목록 → 남은 메모리 예산 안에서 다음에 시작할 항목을 고른다"""
+    def __init__(self, budget_mb: Optional[float], by_cost: bool = True, max_bypass: int = MAX_BYPASS):
+        self.budget_mb = budget_mb
+        self.by_cost = by_cost
+        self.max_bypass = max_bypass
+        self._pending: list[list] = []     # [item, cost, 앞질러 간 횟수]
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, item, cost: CaseCost) -> None:
+        self._pending.append([item, cost, 0])
+        if self.by_cost:
+            # 안정 정렬 – 비용이 같으면 발견 순서 유지
+            self._pending.sort(key=lambda p: (-p[1].cpu_s, -p[1].mem_mb))
+
+    def take(self, free_mb: float, idle: bool):
+        """다음 (항목, 비용) 또는 None (대기열이 비었거나 지금은 예산에 들어가는 항목이 없음)"""
+        if not self._pending:
+            return None
+        head = self._pending[0]
+        if idle or self.budget_mb is None or head[1].mem_mb <= free_mb:
+            self._pending.pop(0)
+            return head[0], head[1]
+        if head[2] >= self.max_bypass:
+            return None                    # 큰 케이스 차례 – 실행 중인 작업이 끝나기를 기다린다
+        for i, p in enumerate(self._pending[1:], 1):
+            if p[1].mem_mb <= free_mb:
+                head[2] += 1
+                self._pending.pop(i)
+                return p[0], p[1]
+        return None
@@ -0,0 +1,232 @@
+"""
+변환 작업 대기열 – SQLite 로 보존되는 우선순위 큐 (GUI Auto 모드 / 헤드리스 `queue run` 공용)
+----------------------------------------------------------------
+· enqueue(folder, priority) → 이미 대기/실행 중인 같은 폴더는 새로 넣지 않고 우선순위만 올린다
+· claim(worker) → 우선순위 높은 순, 같으면 먼저 넣은 순으로 하나를 원자적으로 가져간다 (BEGIN IMMEDIATE)
+· finish(id, status, message, duration) / release(id) – 중지(일시정지)된 작업은 다시 대기로
+· 실행 중 작업은 heartbeat(job_ids) 로 주기적으로 표시 (작업마다 HEARTBEAT_S 간격) → 앱이 닫혀 STALE_S 동안 소식이 없으면 recover() 가 대기로 되돌림
+· stats() → 상태별 개수, 최근 window 처리량(건/시간), 소요 시간 평균/p50/p95
+· 상태: queued, running, success, skipped, error, timeout, crash, cancelled
+"""
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+from typing import Iterable, Optional
+
+JOBS_DB_PATH     = os.path.join(os.path.expanduser("~"), ".dlas_html_converter_jobs.sqlite")
+URGENT_PRIORITY  = 100
+STALE_S          = 120.0     # 실행 중 표시가 이보다 오래 갱신되지 않으면 버려진 작업으로 본다
+HEARTBEAT_S      = 10.0
+FINAL_STATUSES   = ("success", "skipped", "error", "timeout", "crash", "cancelled")
+FAILED_STATUSES  = ("error", "timeout", "crash")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    folder       TEXT    NOT NULL,
+    priority     INTEGER NOT NULL DEFAULT 0,
+    status       TEXT    NOT NULL DEFAULT 'queued',
+    options      TEXT    NOT NULL DEFAULT '{}',
+    enqueued_at  REAL    NOT NULL,
+    started_at   REAL,
+    finished_at  REAL,
+    heartbeat_at REAL,
+    duration_s   REAL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    worker       TEXT,
+    message      TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_pick   ON jobs(status, priority DESC, id);
+CREATE INDEX IF NOT EXISTS jobs_folder ON jobs(folder, status);
+"""
+
+def worker_name(label: str = "") -> str:
+    return f"{socket.gethostname()}:{os.getpid()}" + (f":{label}" if label else "")
+
+def _row(r: Optional[sqlite3.Row]) -> Optional[dict]:
+    if r is None:
+        return None
+    d = dict(r)
+    try:
+        d["options"] = json.loads(d.get("options") or "{}")
+    except ValueError:
+        d["options"] = {}
+    return d
+
+def _percentile(sorted_vals: list[float], q: float) -> Optional[float]:
+    if not sorted_vals:
+        return None
+    i = min(len(sorted_vals) - 1, max(0, round(q * (len(sorted_vals) - 1))))
+    return sorted_vals[i]
+
+class JobQueue:
+    """스레드/프로세스 간 공유 가능한 작업 대기열 (연결 하나 + 락, 여러 프로세스는 SQLite 잠금으로 조정)"""
+    def __init__(self, path: str = JOBS_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        try:
+            self._db.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.DatabaseError:
+            pass
+        self._db.executescript(_SCHEMA)
+        self._last_beat: dict[int, float] = {}     # job_id → 마지막 생존 표시 (작업별 간격 제한)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _tx(self, fn):
+        """BEGIN IMMEDIATE … COMMIT (쓰기 잠금을 먼저 잡아 claim 경쟁을 없앤다)"""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._db)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return result
+
+    # ------------------------------------------------------------------
+    def enqueue(self, folder: str, priority: int = 0, options: dict | None = None) -> int:
+        folder = os.path.abspath(folder)
+
+        def tx(db):
+            cur = db.execute("SELECT id, status, priority FROM jobs WHERE folder = ? AND status IN ('queued','running') "
+                             "ORDER BY id DESC LIMIT 1", (folder,)).fetchone()
+            if cur is not None:
+                if cur["status"] == "queued" and priority > cur["priority"]:
+                    db.execute("UPDATE jobs SET priority = ? WHERE id = ?", (priority, cur["id"]))
+                return cur["id"]
+            return db.execute("INSERT INTO jobs (folder, priority, options, enqueued_at) VALUES (?, ?, ?, ?)",
+                              (folder, priority, json.dumps(options or {}, ensure_ascii=False), time.time())).lastrowid
+        return self._tx(tx)
+
+    def claim(self, worker: str) -> Optional[dict]:
+        """다음 작업을 running 으로 바꿔 돌려준다 (없으면 None)"""
+        def tx(db):
+            r = db.execute("SELECT * FROM jobs WHERE status = 'queued' ORDER BY priority DESC, id LIMIT 1").fetchone()
+            if r is None:
+                return None
+            now = time.time()
+            db.execute("UPDATE jobs SET status = 'running', started_at = ?, heartbeat_at = ?, finished_at = NULL, "
+                       "duration_s = NULL, message = NULL, worker = ?, attempts = attempts + 1 WHERE id = ?",
+                       (now, now, worker, r["id"]))
+            self._last_beat[r["id"]] = now
+            return _row(db.execute("SELECT * FROM jobs WHERE id = ?", (r["id"],)).fetchone())
+        return self._tx(tx)
+
+    def finish(self, job_id: int, status: str, message: str = "", duration_s: float | None = None) -> None:
+        if status not in FINAL_STATUSES:
+            status = "error"
+        now = time.time()
+        self._last_beat.pop(job_id, None)
+        self._tx(lambda db: db.execute(
+            "UPDATE jobs SET status = ?, message = ?, finished_at = ?, "
+            "duration_s = COALESCE(?, ? - started_at) WHERE id = ?",
+            (status, message, now, duration_s, now, job_id)))
+
+    def release(self, job_id: int, message: str = "") -> None:
+        """실행 중이던 작업을 다시 대기로 (러너 중지 = 일시정지)"""
+        self._last_beat.pop(job_id, None)
+        self._tx(lambda db: db.execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL, message = ? WHERE id = ? AND status = 'running'",
+            (message, job_id)))
+
+    def heartbeat(self, job_ids: int | Iterable[int], force: bool = False) -> int:
+        """
+        실행 중인 작업의 생존 표시 → 기록한 작업 수
+        간격 제한은 작업별이다 – 한 연결을 여러 러너/작업이 같이 쓸 때 한 작업의 표시가 다른 작업의 표시를 막지 않는다.
+        """
+        now = time.time()
+        ids = [job_ids] if isinstance(job_ids, int) else list(job_ids)
+        due = [i for i in ids if force or now - self._last_beat.get(i, 0.0) >= HEARTBEAT_S]
+        if not due:
+            return 0
+        for i in due:
+            self._last_beat[i] = now
+        marks = ",".join("?" * len(due))
+        return self._tx(lambda db: db.execute(
+            f"UPDATE jobs SET heartbeat_at = ? WHERE status = 'running' AND id IN ({marks})", (now, *due)).rowcount)
+
+    def recover(self, stale_s: float = STALE_S) -> int:
+        """생존 표시가 끊긴 running 작업 → queued (앱 종료/크래시 후 재시작 시)"""
+        cutoff = time.time() - stale_s
+        return self._tx(lambda db: db.execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL, message = 'recovered' "
+            "WHERE status = 'running' AND COALESCE(heartbeat_at, started_at, 0) < ?", (cutoff,)).rowcount)
+
+    def retry(self, job_ids: list[int] | None = None, statuses: tuple[str, ...] = FAILED_STATUSES) -> int:
+        """지정한 작업(없으면 실패한 작업 전부)을 다시 대기로"""
+        def tx(db):
+            if job_ids:
+                q = ",".join("?" * len(job_ids))
+                return db.execute(f"UPDATE jobs SET status = 'queued', worker = NULL WHERE id IN ({q}) "
+                                  f"AND status NOT IN ('queued','running')", job_ids).rowcount
+            q = ",".join("?" * len(statuses))
+            return db.execute(f"UPDATE jobs SET status = 'queued', worker = NULL WHERE status IN ({q})",
+                              statuses).rowcount
+        return self._tx(tx)
+
+    def cancel(self, job_ids: list[int]) -> int:
+        """대기 중인 작업 취소 (실행 중인 작업은 러너를 중지해서 멈춘다)"""
+        if not job_ids:
+            return 0
+        q = ",".join("?" * len(job_ids))
+        now = time.time()
+        return self._tx(lambda db: db.execute(
+            f"UPDATE jobs SET status = 'cancelled', finished_at = ?, message = 'cancelled' "
+            f"WHERE id IN ({q}) AND status = 'queued'", [now, *job_ids]).rowcount)
+
+    # ------------------------------------------------------------------
+    def pending(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def list_jobs(self, status: str | None = None, limit: int = 100) -> list[dict]:
+        """대기 중은 꺼낼 순서대로, 나머지는 최근 것부터"""
+        sql = ("SELECT * FROM jobs" + (" WHERE status = ?" if status else "") +
+               " ORDER BY CASE status WHEN 'running' THEN 0 WHEN 'queued' THEN 1 ELSE 2 END, "
+               "CASE WHEN status = 'queued' THEN -priority ELSE 0 END, "
+               "CASE WHEN status = 'queued' THEN id ELSE -id END LIMIT ?")
+        with self._lock:
+            rows = self._db.execute(sql, ((status,) if status else ()) + (limit,)).fetchall()
+        return [_row(r) for r in rows]
+
+    def stats(self, window_s: float = 3600.0) -> dict:
+        now = time.time()
+        with self._lock:
+            counts = {r[0]: r[1] for r in self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")}
+            recent = [r[0] for r in self._db.execute(
+                "SELECT duration_s FROM jobs WHERE finished_at >= ? AND status IN ('success','skipped','error',"
+                "'timeout','crash') ORDER BY duration_s", (now - window_s,))]
+            durations = [r[0] for r in self._db.execute(
+                "SELECT duration_s FROM jobs WHERE status = 'success' AND duration_s IS NOT NULL "
+                "ORDER BY duration_s")]
+            oldest = self._db.execute("SELECT MIN(enqueued_at) FROM jobs WHERE status = 'queued'").fetchone()[0]
+        avg = sum(durations) / len(durations) if durations else None
+        return {
+            "counts": {s: counts.get(s, 0) for s in ("queued", "running") + FINAL_STATUSES},
+            "window_s": window_s,
+            "finished_in_window": len(recent),
+            "throughput_per_h": round(len(recent) * 3600.0 / window_s, 2) if window_s else None,
+            "avg_s": round(avg, 2) if avg is not None else None,
+            "p50_s": _percentile(durations, 0.50),
+            "p95_s": _percentile(durations, 0.95),
+            "oldest_queued_age_s": round(now - oldest, 1) if oldest else None,
+        }
+
+def format_stats(stats: dict) -> str:
+    c = stats["counts"]
+    fmt = lambda v: "-" if v is None else f"{v:.1f}s"
+    return "\n".join([
+        "[QUEUE] " + "  ".join(f"{k} {v}" for k, v in c.items()),
+        f"[QUEUE] 최근 {stats['window_s'] / 3600:g}시간 처리 {stats['finished_in_window']}건 "
+        f"(시간당 {stats['throughput_per_h']}건) · 성공 소요 평균 {fmt(stats['avg_s'])} "
+        f"p50 {fmt(stats['p50_s'])} p95 {fmt(stats['p95_s'])}",
+    ])
@@ -0,0 +1,140 @@
+"""
+변환 로그 파이프라인 – append_debug / log_callback 의 백엔드
+----------------------------------------------------------------
+· 호출측은 큐에 넣기만 한다 (logging.QueueHandler) → 리스너 스레드가 실제 기록
+    - RingBufferHandler : 최근 N줄 (UI 로그 창용, 메모리 상한 고정)
+    - RotatingFileHandler: ~/.dlas_html_converter.log (5MB × 3개 회전)
+· 워커 프로세스 로그: LogPipeline.worker_queue() 를 넘기고, 워커에서 worker_log_callback(q) 로 기록
+  → 같은 리스너(링 버퍼/파일)로 합류, processName 으로 케이스 구분
+· 레벨은 메시지 접두어로 결정 ([WARN] → WARNING, [ERR]/[ERROR]/[CRASH]/[TIMEOUT] → ERROR,
+  [PROGRESS]/[DEBUG] → DEBUG). 기본 INFO 레벨에서는 DEBUG 메시지를 레코드 생성 전에 버린다.
+"""
+import os
+import queue
+import logging
+import logging.handlers
+import multiprocessing
+from collections import deque
+from typing import Callable, Optional
+
+LOG_PATH      = os.path.join(os.path.expanduser("~"), ".dlas_html_converter.log")
+LOGGER_NAME   = "dlas.converter"
+RING_CAPACITY = 5000
+LOG_MAX_BYTES = 5 * 2**20
+LOG_BACKUPS   = 3
+LOG_FORMAT    = "%(asctime)s %(levelname)-7s %(processName)s  %(message)s"
+
+_PREFIX_LEVELS = {
+    "[DEBUG]": logging.DEBUG, "[PROGRESS]": logging.DEBUG,
+    "[WARN]": logging.WARNING, "[WARNING]": logging.WARNING,
+    "[ERR]": logging.ERROR, "[ERROR]": logging.ERROR, "[CRASH]": logging.ERROR, "[TIMEOUT]": logging.ERROR,
+}
+
+def level_for(msg: str) -> int:
+    """'[WARN] …' 같은 접두어 → logging 레벨 (없거나 모르는 접두어는 INFO)"""
+    s = msg.lstrip()
+    if s.startswith("["):
+        end = s.find("]", 1, 16)
+        if end > 0:
+            return _PREFIX_LEVELS.get(s[:end + 1].upper(), logging.INFO)
+    return logging.INFO
+
+class RingBufferHandler(logging.Handler):
+    """최근 capacity 줄 보관. 각 줄에 증가하는 seq를 붙여 UI가 새 줄만 가져갈 수 있게 한다."""
+    def __init__(self, capacity: int = RING_CAPACITY):
+        super().__init__()
+        self._buf: deque = deque(maxlen=capacity)
+        self._seq = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        self._seq += 1                       # handle()이 self.lock 을 잡은 상태
+        self._buf.append((self._seq, record.levelno, line))
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def since(self, seq: int) -> list[tuple[int, int, str]]:
+        """seq 이후의 (seq, levelno, line) 목록 (버퍼에서 밀려난 줄은 제외)"""
+        with self.lock:
+            newer = self._seq - seq
+            if newer <= 0:
+                return []
+            items = list(self._buf)
+        return items[-newer:] if newer < len(items) else items
+
+    def lines(self) -> list[str]:
+        return [line for _, _, line in self.since(0)]
+
+class LogPipeline:
+    """프로세스당 하나 – 링 버퍼 + 회전 파일, 워커 프로세스용 큐 리스너"""
+    def __init__(self, log_path: Optional[str] = LOG_PATH, capacity: int = RING_CAPACITY,
+                 level: int = logging.INFO):
+        formatter = logging.Formatter(LOG_FORMAT)
+        self.ring = RingBufferHandler(capacity)
+        self.ring.setFormatter(formatter)
+        self.log_path = None
+        handlers: list[logging.Handler] = [self.ring]
+        if log_path:
+            try:
+                fh = logging.handlers.RotatingFileHandler(log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                                                          encoding="utf-8", delay=True)
+                fh.setFormatter(formatter)
+                handlers.append(fh)
+                self.log_path = log_path
+            except OSError as e:
+                print(f"[WARN] 로그 파일을 열 수 없습니다({log_path}): {e}")
+        self._handlers = handlers
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.logger.setLevel(level)
+        self.logger.propagate = False
+        self.logger.handlers[:] = [logging.handlers.QueueHandler(self._queue)]
+        self._listener = logging.handlers.QueueListener(self._queue, *handlers, respect_handler_level=True)
+        self._listener.start()
+        self._mp_queue = None
+        self._mp_listener = None
+
+    def log(self, msg: str) -> None:
+        level = level_for(msg)
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, msg)
+
+    def worker_queue(self):
+        """워커 프로세스에 넘길 multiprocessing.Queue (첫 호출 시 리스너 시작)"""
+        if self._mp_queue is None:
+            self._mp_queue = multiprocessing.Queue()
+            self._mp_listener = logging.handlers.QueueListener(self._mp_queue, *self._handlers,
+                                                               respect_handler_level=True)
+            self._mp_listener.start()
+        return self._mp_queue
+
+    def stop(self) -> None:
+        """남은 레코드를 모두 기록하고 리스너 종료"""
+        for listener in (self._listener, self._mp_listener):
+            if listener is not None:
+                try:
+                    listener.stop()
+                except Exception:
+                    pass
+        for h in self._handlers:
+            h.close()
+
+def worker_log_callback(log_queue, level: int = logging.INFO) -> Callable[[str], None]:
+    """워커 프로세스에서 호출: 부모 LogPipeline 으로 보내는 log_callback 반환"""
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.handlers[:] = [logging.handlers.QueueHandler(log_queue)]   # fork로 물려받은 부모 핸들러 교체
+    logger.setLevel(level)
+    logger.propagate = False
+
+    def log(msg: str) -> None:
+        lvl = level_for(msg)
+        if logger.isEnabledFor(lvl):
+            logger.log(lvl, msg)
+    return log
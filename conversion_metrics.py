@@ -0,0 +1,207 @@
+"""
+케이스별 변환 계측 – 단계별 wall time / 최고 RSS / 삼각형 수 / 출력 바이트
+----------------------------------------------------------------
+· CaseMetrics.stage("decimation") 컨텍스트로 단계별 값을 누적한다 (같은 단계 여러 번 호출 시 합산)
+· 단계: discovery, xml_parse, transform, decimation, glb_encode, bite, html_write, compress
+· 결과는 JSON-lines 로그에 한 줄씩 기록, 배치 종료 시 요약 표 출력
+· on_stage(name, "start"|"end") 콜백으로 단계 전환을 외부(부모 프로세스 watchdog)에 알릴 수 있다
+· 최고 RSS는 Linux에서는 단계 시작 시 high-water mark를 리셋하여 단계별 값을,
+  그 외 OS에서는 프로세스 high-water mark(단계 종료 시점까지의 최대값)를 기록한다.
+"""
+import os
+import re
+import sys
+import json
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+STAGES = ("discovery", "xml_parse", "transform", "decimation", "glb_encode", "bite", "html_write", "compress")
+
+_LINUX_STATUS = "/proc/self/status"
+_LINUX_CLEAR_REFS = "/proc/self/clear_refs"
+
+# ----------------------------------------------------------------------
+# 메모리 측정 (MB)
+# ----------------------------------------------------------------------
+def _linux_status_kb(field: str) -> Optional[int]:
+    try:
+        with open(_LINUX_STATUS, "r") as f:
+            m = re.search(rf"^{field}:\s+(\d+)\s+kB", f.read(), re.M)
+        return int(m.group(1)) if m else None
+    except OSError:
+        return None
+
+def _windows_memory_counters():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    handle = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+        return None
+    return counters
+
+def peak_rss_mb() -> Optional[float]:
+    """프로세스 최고 RSS (Linux는 마지막 reset_peak_rss() 이후 값)"""
+    try:
+        if sys.platform.startswith("linux"):
+            kb = _linux_status_kb("VmHWM")
+            return round(kb / 1024, 1) if kb is not None else None
+        if sys.platform == "win32":
+            c = _windows_memory_counters()
+            return round(c.PeakWorkingSetSize / 2**20, 1) if c else None
+        import resource
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**20, 1)  # macOS: bytes
+    except Exception:
+        return None
+
+def current_rss_mb() -> Optional[float]:
+    try:
+        if sys.platform.startswith("linux"):
+            kb = _linux_status_kb("VmRSS")
+            return round(kb / 1024, 1) if kb is not None else None
+        if sys.platform == "win32":
+            c = _windows_memory_counters()
+            return round(c.WorkingSetSize / 2**20, 1) if c else None
+    except Exception:
+        pass
+    return None
+
+def reset_peak_rss() -> bool:
+    """Linux: VmHWM을 현재 RSS로 리셋 (clear_refs '5'). 지원하지 않으면 False"""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        with open(_LINUX_CLEAR_REFS, "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+# ----------------------------------------------------------------------
+# 케이스 계측
+# ----------------------------------------------------------------------
+class CaseMetrics:
+    def __init__(self, case: str, on_stage: Optional[Callable[[str, str], None]] = None):
+        self.case = case
+        self.on_stage = on_stage
+        self.started = time.time()
+        self.stages: dict[str, dict] = {}
+        self.status: Optional[str] = None
+        self._t0 = time.perf_counter()
+        self._wall_s: Optional[float] = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[dict]:
+        """
+        with metrics.stage("decimation") as st:
+            st["tri_in"] = ...; st["tri_out"] = ...; st["bytes"] = ...
+        yield 된 dict의 숫자 값은 단계 누적값에 더해진다.
+        """
+        counters: dict = {}
+        reset_peak_rss()
+        self.on_stage and self.on_stage(name, "start")
+        t = time.perf_counter()
+        try:
+            yield counters
+        finally:
+            self.on_stage and self.on_stage(name, "end")
+            wall = time.perf_counter() - t
+            rec = self.stages.setdefault(name, {"calls": 0, "wall_s": 0.0, "rss_peak_mb": None})
+            rec["calls"] += 1
+            rec["wall_s"] += wall
+            for k, v in counters.items():
+                if isinstance(v, (int, float)):
+                    rec[k] = rec.get(k, 0) + v
+            peak = peak_rss_mb()
+            if peak is not None:
+                rec["rss_peak_mb"] = max(rec["rss_peak_mb"] or 0.0, peak)
+
+    def finish(self, status: str) -> None:
+        self.status = status
+        self._wall_s = time.perf_counter() - self._t0
+
+    def to_dict(self) -> dict:
+        wall = self._wall_s if self._wall_s is not None else time.perf_counter() - self._t0
+        stages = {k: {**v, "wall_s": round(v["wall_s"], 4)} for k, v in self.stages.items()}
+        peaks = [v["rss_peak_mb"] for v in self.stages.values() if v.get("rss_peak_mb") is not None]
+        dec = self.stages.get("decimation", {})
+        return {
+            "type": "case",
+            "case": self.case,
+            "status": self.status,
+            "started": round(self.started, 3),
+            "wall_s": round(wall, 4),
+            "rss_peak_mb": max(peaks) if peaks else None,
+            "tri_in": dec.get("tri_in", 0),
+            "tri_out": dec.get("tri_out", 0),
+            "bytes_written": self.stages.get("html_write", {}).get("bytes", 0),
+            "pid": os.getpid(),
+            "stages": stages,
+        }
+
+def case_record(case: str, status: str, wall_s: float) -> dict:
+    """워커가 계측값을 보내지 못한 경우(타임아웃/크래시)의 최소 레코드"""
+    return {"type": "case", "case": case, "status": status, "started": None, "wall_s": round(wall_s, 4),
+            "rss_peak_mb": None, "tri_in": 0, "tri_out": 0, "bytes_written": 0, "pid": None, "stages": {}}
+
+# ----------------------------------------------------------------------
+# JSON-lines 로그 / 배치 요약
+# ----------------------------------------------------------------------
+def append_jsonl(path: str, record: dict, max_bytes: int = 20 * 2**20) -> None:
+    """한 줄 추가. max_bytes를 넘으면 path.1 로 한 번 돌려쓴다."""
+    try:
+        if max_bytes and os.path.exists(path) and os.path.getsize(path) > max_bytes:
+            os.replace(path, path + ".1")
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"[WARN] metrics 로그 기록 실패({path}): {e}")
+
+def summarize(records: list[dict]) -> dict:
+    """케이스 레코드들 → 단계별 합계/평균/최대 + 가장 느린 케이스"""
+    stages: dict[str, dict] = {}
+    for r in records:
+        for name, st in (r.get("stages") or {}).items():
+            agg = stages.setdefault(name, {"cases": 0, "wall_s": 0.0, "max_wall_s": 0.0, "max_case": "",
+                                           "rss_peak_mb": 0.0, "tri_in": 0, "tri_out": 0, "bytes": 0})
+            agg["cases"] += 1
+            agg["wall_s"] += st.get("wall_s", 0.0)
+            if st.get("wall_s", 0.0) >= agg["max_wall_s"]:
+                agg["max_wall_s"] = st.get("wall_s", 0.0); agg["max_case"] = r.get("case", "")
+            agg["rss_peak_mb"] = max(agg["rss_peak_mb"], st.get("rss_peak_mb") or 0.0)
+            for k in ("tri_in", "tri_out", "bytes"):
+                agg[k] += st.get(k, 0)
+    slowest = sorted(records, key=lambda r: r.get("wall_s", 0.0), reverse=True)[:5]
+    return {
+        "type": "batch_summary",
+        "cases": len(records),
+        "wall_s": round(sum(r.get("wall_s", 0.0) for r in records), 3),
+        "stages": {k: {**v, "wall_s": round(v["wall_s"], 3), "max_wall_s": round(v["max_wall_s"], 3)}
+                   for k, v in stages.items()},
+        "slowest": [{"case": r.get("case"), "wall_s": r.get("wall_s"), "rss_peak_mb": r.get("rss_peak_mb")}
+                    for r in slowest],
+    }
+
+def format_summary_table(summary: dict) -> str:
+    order = [s for s in STAGES if s in summary["stages"]] + \
+            [s for s in summary["stages"] if s not in STAGES]
+    lines = [f"[METRICS] {summary['cases']} cases, total {summary['wall_s']:.2f}s",
+             f"[METRICS] {'stage':<11} {'cases':>5} {'total s':>9} {'avg s':>8} {'max s':>8} "
+             f"{'peakMB':>8} {'tri in':>11} {'tri out':>10} {'bytes':>12}"]
+    for name in order:
+        st = summary["stages"][name]
+        avg = st["wall_s"] / st["cases"] if st["cases"] else 0.0
+        lines.append(f"[METRICS] {name:<11} {st['cases']:>5} {st['wall_s']:>9.2f} {avg:>8.3f} {st['max_wall_s']:>8.3f} "
+                     f"{st['rss_peak_mb']:>8.1f} {st['tri_in']:>11} {st['tri_out']:>10} {st['bytes']:>12}")
+    for r in summary["slowest"]:
+        lines.append(f"[METRICS] slow: {r['wall_s']:.2f}s  {r['rss_peak_mb'] or '-'}MB  {r['case']}")
+    return "\n".join(lines)
@@ -34,41 +34,114 @@ import sys
 import time
 import json
 import base64
-import threading
+import gzip
+import queue
+import hashlib
+import argparse
+import importlib
+import importlib.util
 import multiprocessing
 import shutil
 import tempfile
 import zipfile
-import subprocess
 from string import Template
+from functools import lru_cache
 from pathlib import Path
 import xml.etree.ElementTree as ET
 from typing import List, Dict, Tuple, Optional
 
+_T_IMPORT_START = time.perf_counter()
+
 # ----------------------------------------------------------------------
-# 외부 라이브러리
+# 외부 라이브러리 (지연 import)
+#   pandas  → Excel 보고서(analyze/export)에서만
+#   vtk     → 메시 감소 / BITE 생성에서만
+#   trimesh → GLB 변환에서만 (EXO 좌표 변환은 vtk 메시 배열에 numpy 로 직접)
+#   PySide6 → fast_html_viewer_gui 에서만 (헤드리스 CLI는 Qt 없이 동작)
 # ----------------------------------------------------------------------
-import pandas as pd
-import vtk
-import trimesh
-from PySide6.QtCore import Qt, QTimer, QMetaObject, Q_ARG, QSettings, Signal, QSize
-from PySide6.QtGui  import QFont, QPixmap, QIcon, QCursor, QMovie
-from PySide6.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QLineEdit, QPushButton, QFileDialog, QComboBox, QMessageBox,
-    QCheckBox, QProgressBar, QTextEdit, QDialog, QTableWidget,
-    QTableWidgetItem, QFrame, QScrollArea
-)
+_IMPORT_TIMES: dict[str, float] = {}   # 모듈명 → 실제 import 소요 시간(초)
+
+class _LazyModule:
+    """첫 속성 접근 시점에 import 하는 모듈 프록시 (기존 `vtk.vtkSTLReader()` 형태 그대로 사용)"""
+    def __init__(self, name: str):
+        self._name = name
+        self._mod = None
+
+    def _load(self):
+        if self._mod is None:
+            t = time.perf_counter()
+            self._mod = importlib.import_module(self._name)
+            _IMPORT_TIMES[self._name] = time.perf_counter() - t
+        return self._mod
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._mod is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+pd      = _LazyModule("pandas")
+vtk     = _LazyModule("vtk")
+trimesh = _LazyModule("trimesh")
+
+# ----------------------------------------------------------------------
+# 시작 시간 리포트 (환경변수 DLAS_STARTUP_REPORT=1 이면 GUI/CLI가 출력)
+# ----------------------------------------------------------------------
+_STARTUP_MARKS: list[tuple[str, float]] = []
+
+def mark_startup(label: str) -> None:
+    _STARTUP_MARKS.append((label, time.perf_counter()))
+
+def startup_report_enabled() -> bool:
+    return os.environ.get("DLAS_STARTUP_REPORT", "") not in ("", "0")
+
+def startup_report() -> dict:
+    """모듈 import 시작 기준 각 단계 시각(ms) + 지연 import 된 외부 모듈별 소요 시간(ms)"""
+    return {
+        "marks_ms": {label: round((t - _T_IMPORT_START) * 1000, 1) for label, t in _STARTUP_MARKS},
+        "lazy_imports_ms": {name: round(sec * 1000, 1) for name, sec in _IMPORT_TIMES.items()},
+        "heavy_loaded": sorted(m for m in ("pandas", "vtk", "trimesh", "PySide6") if m in sys.modules),
+    }
+
+def format_startup_report() -> str:
+    rep = startup_report()
+    lines = ["[STARTUP] 단계                     누적(ms)"]
+    lines += [f"[STARTUP] {label:<24} {ms:>9.1f}" for label, ms in rep["marks_ms"].items()]
+    lines += [f"[STARTUP] import {name:<17} {ms:>9.1f}" for name, ms in rep["lazy_imports_ms"].items()]
+    lines.append(f"[STARTUP] 로드된 외부 모듈: {', '.join(rep['heavy_loaded']) or '-'}")
+    return "\n".join(lines)
 
+def _print_startup_report() -> None:
+    if startup_report_enabled():
+        print(format_startup_report(), file=sys.stderr)
+
+try:
+    from modules.conversion_metrics import CaseMetrics, case_record, append_jsonl, summarize, format_summary_table
+except ImportError:
+    from conversion_metrics import CaseMetrics, case_record, append_jsonl, summarize, format_summary_table
+try:
+    from modules.conversion_log import worker_log_callback
+except ImportError:
+    from conversion_log import worker_log_callback
+try:
+    from modules.conversion_jobs import (JobQueue, JOBS_DB_PATH, URGENT_PRIORITY, worker_name,
+                                         FINAL_STATUSES as JOB_FINAL_STATUSES, format_stats as format_queue_stats)
+except ImportError:
+    from conversion_jobs import (JobQueue, JOBS_DB_PATH, URGENT_PRIORITY, worker_name,
+                                 FINAL_STATUSES as JOB_FINAL_STATUSES, format_stats as format_queue_stats)
 try:
-    from modules.common_styles import Style
+    from modules.case_scheduler import (CaseCost, CaseScheduler, mesh_triangle_count, estimate_cost,
+                                        resolve_budget, load_cost_scale)
 except ImportError:
-    from common_styles import Style
+    from case_scheduler import (CaseCost, CaseScheduler, mesh_triangle_count, estimate_cost,
+                                resolve_budget, load_cost_scale)
 
 # ==============================================================================
 # utils – resource_path
 # ==============================================================================
 CONFIG_PATH = os.path.join(os.path.expanduser("~"), ".dlas_html_converter.json")
+METRICS_LOG_PATH = os.path.join(os.path.expanduser("~"), ".dlas_html_converter_metrics.jsonl")
 
 def resource_path(relative_path: str) -> str:
     script_dir = Path(__file__).resolve().parent
@@ -90,25 +163,31 @@ def encode_image_b64(path: str) -> str:
 # ----------------------------------------------------------------------
 # 공통: STL 감소 / 병합 / 교차(BITE) / glb 변환
 # ----------------------------------------------------------------------
-def reduce_stl_size(file_path: str, out_folder: str, reduction_ratio: float = 0.875) -> str:
-    """STL/PLY 파일 감소"""
-    # 파일 확장자에 따라 적절한 reader 선택
+def read_mesh(file_path: str) -> 'vtk.vtkPolyData':
+    """STL/PLY 파일 → vtkPolyData (확장자에 따라 reader 선택)"""
     ext = os.path.splitext(file_path)[1].lower()
+    reader = vtk.vtkPLYReader() if ext == ".ply" else vtk.vtkSTLReader()
+    reader.SetFileName(file_path)
+    reader.Update()
+    return reader.GetOutput()
 
-    if ext == ".ply":
-        reader = vtk.vtkPLYReader()
-        reader.SetFileName(file_path)
-        reader.Update()
-    else:  # .stl
-        reader = vtk.vtkSTLReader()
-        reader.SetFileName(file_path)
-        reader.Update()
+def reduce_stl_size(file_path: str, out_folder: str, reduction_ratio: float = 0.875,
+                    stats: dict | None = None, polydata: Optional['vtk.vtkPolyData'] = None) -> str:
+    """
+    STL/PLY 파일 감소 (stats가 주어지면 tri_in/tri_out 기록)
+    polydata: 이미 메모리에 있는 메시(EXO 좌표 변환 결과 등) – 주어지면 file_path는 출력 이름/형식에만 쓴다
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    source = polydata if polydata is not None else read_mesh(file_path)
 
     # 메시 감소
     deci = vtk.vtkQuadricDecimation()
-    deci.SetInputData(reader.GetOutput())
+    deci.SetInputData(source)
     deci.SetTargetReduction(reduction_ratio)
     deci.Update()
+    if stats is not None:
+        stats["tri_in"]  = stats.get("tri_in", 0)  + source.GetNumberOfPolys()
+        stats["tri_out"] = stats.get("tri_out", 0) + deci.GetOutput().GetNumberOfPolys()
 
     # 출력 파일명 생성 (확장자는 원본 유지)
     basename = os.path.basename(file_path)
@@ -129,20 +208,13 @@ def reduce_stl_size(file_path: str, out_folder: str, reduction_ratio: float = 0.
 
     return out_path
 
-def _merge_polydata(paths: list[str]) -> Optional[vtk.vtkPolyData]:
+def _merge_polydata(paths: list[str]) -> Optional['vtk.vtkPolyData']:
     """STL/PLY 파일들을 병합"""
     if not paths:
         return None
     append = vtk.vtkAppendPolyData()
     for p in paths:
-        ext = os.path.splitext(p)[1].lower()
-        if ext == ".ply":
-            r = vtk.vtkPLYReader()
-        else:  # .stl
-            r = vtk.vtkSTLReader()
-        r.SetFileName(p)
-        r.Update()
-        append.AddInputData(r.GetOutput())
+        append.AddInputData(read_mesh(p))
     append.Update()
     clean = vtk.vtkCleanPolyData()
     clean.SetInputData(append.GetOutput())
@@ -150,7 +222,8 @@ def _merge_polydata(paths: list[str]) -> Optional[vtk.vtkPolyData]:
     return clean.GetOutput()
 
 def generate_bite_stl(paths_a: list[str], paths_b: list[str],
-                      out_folder: str, tolerance: float = 0.01) -> Optional[str]:
+                      out_folder: str, tolerance: float = 0.01,
+                      stats: dict | None = None) -> Optional[str]:
     if not paths_a or not paths_b:
         return None
     pd1 = _merge_polydata(paths_a); pd2 = _merge_polydata(paths_b)
@@ -160,6 +233,9 @@ def generate_bite_stl(paths_a: list[str], paths_b: list[str],
     bf.SetInputData(0, pd1); bf.SetInputData(1, pd2)
     if hasattr(bf, "SetTolerance"): bf.SetTolerance(tolerance)
     bf.Update()
+    if stats is not None:
+        stats["tri_in"]  = pd1.GetNumberOfPolys() + pd2.GetNumberOfPolys()
+        stats["tri_out"] = bf.GetOutput().GetNumberOfPolys()
     if bf.GetOutput().GetNumberOfPoints() == 0:  # 교차 없음
         return None
     bite_path = os.path.join(out_folder, "BITE_reduced.stl")
@@ -170,6 +246,96 @@ def convert_stl_to_gltf(file_path: str) -> str:
     mesh = trimesh.load_mesh(file_path)
     return base64.b64encode(mesh.export(file_type='glb')).decode().strip()
 
+def pack_models_glb(entries: list[dict]) -> str:
+    """
+    모델 여러 개 → GLB 하나 (base64). 모델당 노드 하나, 노드 extras = {name, group, displayName}
+    entries: {"name", "path", "group", "displayName", "geometry"} – 같은 geometry 해시는 메시 하나를 공유
+    """
+    import numpy as np
+    scene = trimesh.Scene()
+    for e in entries:
+        extras = {"name": e["name"], "group": e["group"], "displayName": e.get("displayName") or e["name"]}
+        node = trimesh.util.unique_name(e["name"], scene.graph.transforms.node_data.keys())
+        geom = e.get("geometry") or e["path"]
+        if geom in scene.geometry:
+            scene.graph.update(frame_to=node, frame_from=scene.graph.base_frame, matrix=np.eye(4),
+                               geometry=geom, metadata=extras)
+        else:
+            mesh = trimesh.load_mesh(e["path"])
+            mesh.metadata = {}   # 원본 경로 등은 싣지 않는다
+            scene.add_geometry(mesh, node_name=node, geom_name=geom, metadata=extras)
+    return base64.b64encode(scene.export(file_type='glb')).decode().strip()
+
+def geometry_digest(file_path: str) -> str:
+    """
+    메시 파일의 형상 해시 (같은 케이스 안의 중복 모델 → GLB 페이로드 공유용)
+    바이너리 STL은 80바이트 헤더(도구/이름 문자열)를 제외한 삼각형 데이터만 해시한다.
+    """
+    h = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        head = f.read(84)
+        if file_path.lower().endswith(".stl") and len(head) == 84 and \
+                os.path.getsize(file_path) == 84 + 50 * int.from_bytes(head[80:84], "little"):
+            h.update(head[80:])
+        else:
+            h.update(head)
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+PRECOMPRESS_VARIANTS = (".gz", ".br")
+# brotli q11/lgwin 24 는 수십 MB HTML 에서 케이스 하나에 수십 초가 걸려 워커를 붙잡는다.
+# q9/lgwin 22(4MB 창)는 base64 GLB 가 대부분인 HTML 에서 크기 차이가 1% 안쪽이면서 수십 배 빠르다.
+BROTLI_QUALITY = 9
+BROTLI_LGWIN   = 22
+
+def _compress_variant(path: str, ext: str, data: bytes) -> int:
+    """data → path+ext. 임시 파일에 쓴 뒤 교체하고 원본과 같은 mtime 을 붙인다 (서버의 최신 판정용)"""
+    if ext == ".gz":
+        blob = gzip.compress(data, compresslevel=9, mtime=0)
+    else:
+        import brotli
+        blob = brotli.compress(data, quality=BROTLI_QUALITY, lgwin=BROTLI_LGWIN)
+    tmp = f"{path}{ext}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(blob)
+    st = os.stat(path)
+    os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(tmp, path + ext)
+    return len(blob)
+
+def write_precompressed(path: str, log_callback=None) -> dict[str, int]:
+    """
+    저장된 HTML 옆에 .gz / .br 사전 압축본을 만든다 (인코딩마다 스레드 하나, 동시에) → {확장자: 바이트}
+    brotli 패키지가 없으면 .br 은 건너뛴다 (이전 실행이 남긴 .br 은 지운다).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    exts = list(PRECOMPRESS_VARIANTS)
+    if importlib.util.find_spec("brotli") is None:
+        exts.remove(".br")
+        remove_precompressed(path, (".br",))
+        log_callback and log_callback("[WARN] brotli 패키지가 없어 .br 사전 압축본은 생략합니다 (pip install brotli)")
+    with open(path, "rb") as f:
+        data = f.read()
+    sizes: dict[str, int] = {}
+    with ThreadPoolExecutor(max_workers=len(exts), thread_name_prefix="precompress") as pool:
+        futures = {ext: pool.submit(_compress_variant, path, ext, data) for ext in exts}
+        for ext, fut in futures.items():
+            try:
+                sizes[ext] = fut.result()
+            except Exception as e:
+                remove_precompressed(path, (ext,))
+                log_callback and log_callback(f"[WARN] 사전 압축 실패({os.path.basename(path)}{ext}): {e}")
+    return sizes
+
+def remove_precompressed(path: str, exts: tuple[str, ...] = PRECOMPRESS_VARIANTS) -> None:
+    """HTML을 다시 쓸 때 남아 있는 예전 압축본 제거 (정적 호스팅이 오래된 내용을 내보내지 않게)"""
+    for ext in exts:
+        try:
+            os.remove(path + ext)
+        except OSError:
+            pass
+
 # ==============================================================================
 # 공통: 그룹/표시/치아번호 유틸 (치식 정규식 강화)
 # ==============================================================================
@@ -191,37 +357,128 @@ def _expand_range(a: int, b: int) -> List[int]:
     except ValueError:
         return [a, b]
 
+# ---- 분류 엔진: 치식 + 키워드를 (키워드 trie로 컴파일한) 정규식 하나로 한 번에 훑고, 문자열별로 memoize ----
+# EXO 파일명 카테고리 규칙 (번호가 작을수록 우선 = 기존 decide_cat 의 if 순서). 'ant' 는 문자열 맨 앞에서만.
+EXO_CAT_RULES = ("etc", "scan", "scan", "scan", "abutment", "crownbridge", "scan", "scan")
+_EXO_CAT_KEYWORDS = {
+    "occlusion": 0,
+    "upperjaw": 1, "lowerjaw": 1,
+    "modelgingiva": 2, "modelbase": 2, "gingiva": 2, "model": 2, "base": 2,
+    "marker": 3,
+    "abut": 4, "scanbody": 4, "tibase": 4, "ti-base": 4,
+    "crown": 5, "bridge": 5, "pontic": 5, "coping": 5, "framework": 5, "veneer": 5,
+    "preparation": 6, "prep": 6,
+    "antagonist": 7, "oppos": 7, "ant": 7,
+}
+# 상/하악 단서 (상악 키워드가 하나라도 있으면 상악 > 하악 키워드 > 치식)
+_JAW_KEYWORDS = {
+    **dict.fromkeys(("상악", "upper", "maxilla", "upperjaw", "u_jaw", "u-jaw", "jaw_u", "_u", " uj "), "upper"),
+    **dict.fromkeys(("하악", "lower", "mandible", "lowerjaw", "l_jaw", "l-jaw", "jaw_l", "_l", " lj "), "lower"),
+}
+_FDI_TOKEN = r"(?:1[1-8]|2[1-8]|3[1-8]|4[1-8])"
+_MEMO_MAX_LEN = 512   # 이보다 긴 문자열(modelInfo 요소 텍스트 묶음)은 캐시에 넣지 않는다
+
+def _keyword_trie_pattern(words) -> str:
+    """키워드 목록 → 접두어 trie 형태의 정규식 (위치마다 한 갈래만 따라가며, 같은 갈래에선 가장 긴 키워드)"""
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        alts = [re.escape(ch) + emit(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+    return emit(trie)
+
+# 키워드는 소비하지 않는 lookahead 로 잡아 겹쳐 있어도 모두 찾는다 (서로 다른 규칙/턱의 키워드는 같은 위치에서 시작하지 않음)
+CLASSIFY_RE = re.compile(
+    rf"\b(?P<a>{_FDI_TOKEN})\s*-\s*(?P<b>{_FDI_TOKEN})\b|\b(?P<t>{_FDI_TOKEN})\b"
+    rf"|(?=(?P<kw>{_keyword_trie_pattern(k for k in _EXO_CAT_KEYWORDS if k != 'ant')}|\Aant))"
+)
+JAW_CLUE_RE = re.compile(rf"\b(?P<t>{_FDI_TOKEN})\b|(?=(?P<kw>{_keyword_trie_pattern(_JAW_KEYWORDS)}))")
+
+@lru_cache(maxsize=8192)
+def _scan_classify(s: str) -> Tuple[Tuple[int, ...], Optional[int]]:
+    """문자열 1회 스캔 → (치식: 범위 확장분 먼저·단일 치식 다음·중복 제거, 최우선 EXO 카테고리 규칙 번호)"""
+    ranged: list[int] = []
+    single: list[int] = []
+    rule: Optional[int] = None
+    for m in CLASSIFY_RE.finditer(s):
+        kw = m.group("kw")
+        if kw is not None:
+            r = _EXO_CAT_KEYWORDS[kw]
+            if rule is None or r < rule:
+                rule = r
+        elif m.group("t"):
+            single.append(int(m.group("t")))
+        else:
+            a, b = int(m.group("a")), int(m.group("b"))
+            ranged.extend(_expand_range(a, b))
+            single += (a, b)
+    return tuple(dict.fromkeys(ranged + single)), rule
+
+# 턱 단서 비트: 상악 키워드 / 하악 키워드 / 상악 치식 / 하악 치식 (OR 로 합칠 수 있어 XML 하위 트리 집계에 쓴다)
+JAW_UPPER_KW, JAW_LOWER_KW, JAW_UPPER_T, JAW_LOWER_T = 1, 2, 4, 8
+
+def _jaw_flags(s: str) -> int:
+    """
+    소문자 문자열 → 턱 단서 비트. 상악 키워드를 만나면 바로 끝낸다.
+    치식 범위는 확장하지 않는다 – 범위 양 끝이 같은 턱이면 사이 치식도 같은 턱이고, 다르면 어차피 mixed.
+    """
+    flags = 0
+    for m in JAW_CLUE_RE.finditer(s):
+        kw = m.group("kw")
+        if kw is None:
+            flags |= JAW_UPPER_T if int(m.group("t")) in UPPER_SET else JAW_LOWER_T
+        elif _JAW_KEYWORDS[kw] == "upper":
+            return flags | JAW_UPPER_KW
+        else:
+            flags |= JAW_LOWER_KW
+    return flags
+
+_jaw_flags_cached = lru_cache(maxsize=8192)(_jaw_flags)
+
+def jaw_from_flags(flags: int) -> Optional[str]:
+    """턱 단서 비트 → 'upper'/'lower'/None (상악 키워드 > 하악 키워드 > 한쪽 턱 치식만 있을 때)"""
+    if flags & JAW_UPPER_KW:
+        return "upper"
+    if flags & JAW_LOWER_KW:
+        return "lower"
+    t = flags & (JAW_UPPER_T | JAW_LOWER_T)
+    if t == JAW_UPPER_T:
+        return "upper"
+    if t == JAW_LOWER_T:
+        return "lower"
+    return None
+
 def extract_fdi_teeth(text: str) -> List[int]:
     """
     문자열에서 FDI 치식(11–48)만 추출한다.
     - 'YYYY‑MM‑DD' 같은 날짜는 제외
     - '11-17' 형태의 범위는 FDI 범위일 때만 확장
-    - 중복 제거(순서는 크게 중요치 않으므로 set 기반으로 단순화)
+    - 중복 제거(범위 확장분 먼저, 그다음 단일 치식 순서)
     """
     if not text:
         return []
     s = str(text)
+    return list((_scan_classify(s) if len(s) <= _MEMO_MAX_LEN else _scan_classify.__wrapped__(s))[0])
 
-    # 1) 범위를 먼저 처리 (날짜는 정규식에 안 걸림)
-    teeth: list[int] = []
-    used_pairs: set[Tuple[int, int]] = set()
-    for m in FDI_RANGE_RE.finditer(s):
-        a, b = int(m.group(1)), int(m.group(2))
-        used_pairs.add((a, b))
-        teeth.extend(_expand_range(a, b))
-
-    # 2) 단일 치식 수집
-    for m in FDI_SINGLE_RE.finditer(s):
-        t = int(m.group(1))
-        teeth.append(t)
-
-    # 3) 중복 제거
-    uniq = []
-    seen = set()
-    for t in teeth:
-        if t not in seen:
-            seen.add(t); uniq.append(t)
-    return uniq
+DISPLAY_CAT_RE = re.compile(r"(?P<abutment>어버트먼트|abutment)|(?P<crownbridge>브릿지|bridge|크라운|crown)")
+
+@lru_cache(maxsize=4096)
+def display_category(display: str) -> str:
+    """3Shape displayName → abutment / crownbridge / etc (어버트먼트가 어디든 있으면 abutment 우선)"""
+    cat = "etc"
+    for m in DISPLAY_CAT_RE.finditer(display.lower()):
+        if m.lastgroup == "abutment":
+            return "abutment"
+        cat = "crownbridge"
+    return cat
 
 def determine_jaw(tooth_numbers: List[int]) -> str:
     if not tooth_numbers: return "mixed"
@@ -234,7 +491,11 @@ def determine_jaw(tooth_numbers: List[int]) -> str:
 # ==============================================================================
 XML_NS_3OX = {"ns": "http://schemas.3shape.com/3OX/OrderInterface/2011/01"}
 
-def analyze_folder_3shape(folder: Path) -> pd.DataFrame:
+def analyze_folder_3shape(folder: Path) -> 'pd.DataFrame':
+    return pd.DataFrame(_analyze_3shape_rows(folder))
+
+def _analyze_3shape_rows(folder: Path) -> list[dict]:
+    """analyze_folder_3shape 의 행 데이터 (pandas 없이 변환 파이프라인에서 직접 사용)"""
     ox_files = list(folder.glob("*.3ox"))
     if not ox_files:
         raise FileNotFoundError(".3ox 파일이 없습니다.")
@@ -285,11 +546,10 @@ def analyze_folder_3shape(folder: Path) -> pd.DataFrame:
             stl_guess = f"{order_no}_{idx_val}.stl"
             stl_file = stl_guess if stl_guess in stl_names else ""
             rows.append({"Display Name":disp, "Category":cat, "Jaw":jaw_ko, "STL Filename":stl_file, "Matched Abutment XMLs":", ".join(matched_xmls)})
-    df = pd.DataFrame(rows)
-    if df.empty: raise ValueError("분석 결과가 비어있습니다.")
-    return df
+    if not rows: raise ValueError("분석 결과가 비어있습니다.")
+    return rows
 
-def export_to_excel(df: pd.DataFrame, out_path: Path) -> None:
+def export_to_excel(df: 'pd.DataFrame', out_path: Path) -> None:
     out_path = out_path.with_suffix(".xlsx")
     with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
         df.to_excel(writer, index=False, sheet_name="All")
@@ -305,22 +565,26 @@ def _read_3ox(folder: str) -> Optional[str]:
         except Exception: pass
     return None
 
-def parse_3ox_for_groups(folder: str) -> dict:
+def parse_3ox_for_groups(folder: str, analysis_rows: list[dict] | None = None) -> dict:
+    """
+    analysis_rows: _analyze_3shape_rows 결과. 없으면 폴더의 parsed_3shape*.xlsx 를 읽는다(pandas 로드).
+    """
     excel_mapping: dict[str,str] = {}
     try:
-        xls_path = next((p for p in Path(folder).glob("*.xlsx") if "parsed_3shape" in p.name.lower()), None)
-        if xls_path:
-            df = pd.read_excel(xls_path, sheet_name="All")
-            for _, row in df.iterrows():
-                stl = str(row.get("STL Filename", "")).strip()
-                if not stl: continue
-                cat = str(row.get("Category","")).lower(); jaw_ko = str(row.get("Jaw","")).strip()
-                jaw = "upper" if jaw_ko.startswith("상") else "lower" if jaw_ko.startswith("하") else "mixed"
-                if cat.startswith("abut"): g = f"{jaw}_abutment" if jaw in ("upper","lower") else "etc"
-                elif cat in ("crown","bridge"): g = f"{jaw}_crownbridge" if jaw in ("upper","lower") else "etc"
-                else: g = "etc"
-                excel_mapping[stl] = g
-                if stl.lower().endswith(".stl"): excel_mapping[stl[:-4]+"_reduced.stl"] = g
+        if analysis_rows is None:
+            xls_path = next((p for p in Path(folder).glob("*.xlsx") if "parsed_3shape" in p.name.lower()), None)
+            if xls_path:
+                analysis_rows = pd.read_excel(xls_path, sheet_name="All").to_dict("records")
+        for row in analysis_rows or []:
+            stl = str(row.get("STL Filename", "")).strip()
+            if not stl: continue
+            cat = str(row.get("Category","")).lower(); jaw_ko = str(row.get("Jaw","")).strip()
+            jaw = "upper" if jaw_ko.startswith("상") else "lower" if jaw_ko.startswith("하") else "mixed"
+            if cat.startswith("abut"): g = f"{jaw}_abutment" if jaw in ("upper","lower") else "etc"
+            elif cat in ("crown","bridge"): g = f"{jaw}_crownbridge" if jaw in ("upper","lower") else "etc"
+            else: g = "etc"
+            excel_mapping[stl] = g
+            if stl.lower().endswith(".stl"): excel_mapping[stl[:-4]+"_reduced.stl"] = g
     except Exception as e:
         print(f"[WARN] Excel 매핑 건너뜀: {e}")
 
@@ -337,17 +601,11 @@ def parse_3ox_for_groups(folder: str) -> dict:
         idx = el.findtext("ns:ModelElementIndex", default="", namespaces=ns).strip()
         return f"{order_no}_{idx}.stl" if idx else ""
 
-    def _classify_category(display: str) -> str:
-        dl = display.lower()
-        if "어버트먼트" in display or "abutment" in dl: return "abutment"
-        if ("브릿지" in display or "bridge" in dl) or ("크라운" in display or "crown" in dl): return "crownbridge"
-        return "etc"
-
     for el in root.findall(".//ns:ModelElement", ns):
         disp = el.attrib.get("displayName","")
         stl  = _get_stl(el)
         if not stl or stl in base_map: continue
-        cat = _classify_category(disp)
+        cat = display_category(disp)
         jaw = determine_jaw(extract_fdi_teeth(disp))
         grp = f"{jaw}_{cat}" if jaw in ("upper","lower") and cat in ("abutment","crownbridge") else "etc"
         base_map[stl] = grp
@@ -421,18 +679,44 @@ def parse_3ox_for_display(folder: str) -> dict:
 
 # ------------------------- modelInfo 기반 Jaw 추정 유틸 + 문자열 판정 ------------------
 def _infer_jaw_from_string(s: str) -> Optional[str]:
-    """문자열에서 상/하악 단서를 찾아 'upper'/'lower' 반환 (없으면 None)"""
+    """문자열에서 상/하악 단서를 찾아 'upper'/'lower' 반환 (없으면 None) – 상악 키워드 > 하악 키워드 > 치식"""
     if not s:
         return None
     s = s.lower()
-    if "상악" in s or any(k in s for k in ["upper", "maxilla", "upperjaw", "u_jaw", "u-jaw", "jaw_u", "_u", " uj "]):
-        return "upper"
-    if "하악" in s or any(k in s for k in ["lower", "mandible", "lowerjaw", "l_jaw", "l-jaw", "jaw_l", "_l", " lj "]):
-        return "lower"
-    jaw = determine_jaw(extract_fdi_teeth(s))
-    if jaw in ("upper","lower"):
-        return jaw
-    return None
+    return jaw_from_flags(_jaw_flags_cached(s) if len(s) <= _MEMO_MAX_LEN else _jaw_flags(s))
+
+def exo_name_category(name: str) -> str:
+    """EXO 파일명 → scan / abutment / crownbridge / etc (occlusion > jaw > model·base > marker > abut > crown > prep > ant)"""
+    rule = _scan_classify(name.lower())[1]
+    return EXO_CAT_RULES[rule] if rule is not None else "etc"
+
+def classify_exo_names(names: list[str], mi_jaw_map: Dict[str, str]) -> dict:
+    """
+    폴더의 STL/PLY 이름 목록 → 그룹 맵 (원래 이름 + *_reduced 키)
+    [우선순위] 파일명 치식 > modelInfo 추정(scan/gingiva/base 계열) > 이름 키워드 > upper
+    """
+    group_map: dict[str,str] = {}
+    for s in names:
+        s_key = s.lower()
+        cat = exo_name_category(s)
+
+        # 1) 파일명에서 치식 우선
+        jaw_by_teeth = determine_jaw(extract_fdi_teeth(s))
+        if jaw_by_teeth in ("upper","lower"):
+            jaw = jaw_by_teeth
+        # 2) modelInfo의 Jaw 추정(모델/베이스/gingiva/scan 계열 우선 적용)
+        elif (cat == "scan" or any(k in s_key for k in ("modelgingiva","gingiva","modelbase","base"))) and s_key in mi_jaw_map:
+            jaw = mi_jaw_map[s_key]
+        # 3) 이름 휴리스틱 (모호하면 upper)
+        else:
+            jaw = _infer_jaw_from_string(s) or "upper"
+
+        grp = f"{jaw}_{cat}" if jaw in ("upper","lower") and cat in ("abutment","crownbridge","scan") else "etc"
+        group_map[s] = grp
+        # 확장자 유지하면서 _reduced 추가
+        base, ext = os.path.splitext(s)
+        group_map[base + "_reduced" + ext] = grp
+    return group_map
 
 def build_mi_jaw_map(mi_root: Optional[ET.Element]) -> Dict[str, str]:
     """
@@ -445,24 +729,33 @@ def build_mi_jaw_map(mi_root: Optional[ET.Element]) -> Dict[str, str]:
     if mi_root is None:
         return mp
 
-    for elem in mi_root.iter():
+    # 요소마다 하위 트리 텍스트를 다시 이어 붙이는 대신, 노드별 단서 비트를 한 번만 구해 아래→위로 OR 집계한다.
+    # (Jaw/Label 등 키 자식 텍스트도 하위 트리에 포함되므로 따로 볼 필요가 없다)
+    def piece(v: Optional[str]) -> int:
+        if not v:
+            return 0
+        v = f" {v.lower()} "   # 원래 ' '.join 경계처럼 양옆을 띄워 ' uj ' 같은 키워드가 그대로 걸리게
+        return _jaw_flags_cached(v) if len(v) <= _MEMO_MAX_LEN else _jaw_flags(v)
+
+    subtree: Dict[int, int] = {}
+    stack: list = [(mi_root, False)]
+    while stack:
+        elem, done = stack.pop()
+        if not done:
+            stack.append((elem, True))
+            stack.extend((c, False) for c in elem)
+            continue
+        flags = piece(elem.text) | piece(elem.tag if isinstance(elem.tag, str) else None)
+        for c in elem:
+            flags |= subtree[id(c)]
+        subtree[id(elem)] = flags
+
+    for elem in mi_root.iter():   # 원래 순회 순서(전위)대로 기록해 같은 파일명이면 뒤의 요소가 이기게
         fn = elem.find("Filename")
         if fn is None or not (fn.text and fn.text.strip()):
             continue
-
         name = os.path.basename(fn.text.strip()).lower()
-        texts: List[str] = []
-        for key in ("Jaw","JawType","UpperLower","JawPosition","Type","Category",
-                    "ComponentType","Label","Name","DisplayName","ModelType",
-                    "BaseType","GingivaType"):
-            v = elem.findtext(key)
-            if v: texts.append(v)
-
-        for sub in elem.iter():
-            if sub.text: texts.append(sub.text)
-            if sub.tag:  texts.append(sub.tag)
-
-        jaw = _infer_jaw_from_string(" ".join(texts)) or _infer_jaw_from_string(name)
+        jaw = jaw_from_flags(subtree[id(elem)]) or _infer_jaw_from_string(name)
         if not jaw:
             continue
         mp[name] = jaw
@@ -564,43 +857,22 @@ def compute_inverse(M):
     import numpy as np
     return np.linalg.inv(M)
 
-# ---- constructionInfo 기반 파일별/글로벌 행렬 ----
-def find_exo_transform_matrix_ci(xml_root, stl_name: str):
-    if xml_root is None:
-        import numpy as np
-        return np.identity(4)
+def _first_parsed(parse, *elems):
+    """parse(elem) 결과 중 처음으로 None 이 아닌 것 (ndarray 는 `or` 로 고를 수 없다)"""
+    for e in elems:
+        v = parse(e)
+        if v is not None:
+            return v
+    return None
 
-    global_T_inv = None
-    global_elem = xml_root.find("MatrixToScanDataFiles")
-    if global_elem is not None:
-        M_col = parse_matrix(global_elem)
-        if M_col is not None:
-            M = convert_matrix_to_row_major(M_col)
-            global_T_inv = compute_inverse(M)
-
-    file_T_inv = None
-    cf_list = xml_root.find("ConstructionFileList")
-    if cf_list is not None:
-        for cf in cf_list.findall("ConstructionFile"):
-            fname_elem = cf.find("Filename")
-            if fname_elem is not None and fname_elem.text and os.path.basename(stl_name).lower() in os.path.basename(fname_elem.text).lower():
-                cand = cf.find("ZRotationMatrix")
-                if cand is not None:
-                    M_col = parse_matrix(cand)
-                    if M_col is not None:
-                        M = convert_matrix_to_row_major(M_col)
-                        file_T_inv = compute_inverse(M)
-                        break
-                R = parse_matrix3(cf.find("RotationMatrix"))
-                t = parse_vec3(cf.find("Translation")) or parse_vec3(cf.find("Offset"))
-                if R is not None or t is not None:
-                    import numpy as np
-                    M = np.eye(4)
-                    if R is not None: M[:3,:3] = R
-                    if t is not None: M[:3, 3] = t
-                    file_T_inv = compute_inverse(convert_matrix_to_row_major(M))
-                    break
+def _rt_inverse(R, t) -> 'np.ndarray':
+    import numpy as np
+    M = np.eye(4)
+    if R is not None: M[:3,:3] = R
+    if t is not None: M[:3, 3] = t
+    return compute_inverse(convert_matrix_to_row_major(M))
 
+def _compose_exo(global_T_inv, file_T_inv) -> 'np.ndarray':
     import numpy as np
     if global_T_inv is None and file_T_inv is None:
         return np.identity(4)
@@ -608,59 +880,90 @@ def find_exo_transform_matrix_ci(xml_root, stl_name: str):
     if file_T_inv  is None: return global_T_inv
     return global_T_inv @ file_T_inv
 
+# ---- constructionInfo 기반 파일별/글로벌 행렬 ----
+def _ci_global_inv(xml_root):
+    global_elem = xml_root.find("MatrixToScanDataFiles") if xml_root is not None else None
+    if global_elem is not None:
+        M_col = parse_matrix(global_elem)
+        if M_col is not None:
+            return compute_inverse(convert_matrix_to_row_major(M_col))
+    return None
+
+def _ci_file_entries(xml_root) -> list[tuple[str, ET.Element]]:
+    """ConstructionFile 목록 → [(소문자 basename, 요소)] (파일마다 XML을 다시 훑지 않도록 케이스당 한 번)"""
+    cf_list = xml_root.find("ConstructionFileList") if xml_root is not None else None
+    if cf_list is None:
+        return []
+    out = []
+    for cf in cf_list.findall("ConstructionFile"):
+        fname_elem = cf.find("Filename")
+        if fname_elem is not None and fname_elem.text:
+            out.append((os.path.basename(fname_elem.text).lower(), cf))
+    return out
+
+def _ci_file_inv(entries: list[tuple[str, ET.Element]], stl_name: str):
+    target = os.path.basename(stl_name).lower()
+    for fname, cf in entries:
+        if target not in fname:
+            continue
+        cand = cf.find("ZRotationMatrix")
+        if cand is not None:
+            M_col = parse_matrix(cand)
+            if M_col is not None:
+                return compute_inverse(convert_matrix_to_row_major(M_col))
+        R = parse_matrix3(cf.find("RotationMatrix"))
+        t = _first_parsed(parse_vec3, cf.find("Translation"), cf.find("Offset"))
+        if R is not None or t is not None:
+            return _rt_inverse(R, t)
+    return None
+
+def find_exo_transform_matrix_ci(xml_root, stl_name: str):
+    return _compose_exo(_ci_global_inv(xml_root), _ci_file_inv(_ci_file_entries(xml_root), stl_name))
+
 # ---- modelInfo 기반 파일별/글로벌 행렬 ----
-def find_exo_transform_matrix_mi(xml_root, stl_name: str):
+def _mi_global_inv(xml_root):
     if xml_root is None:
-        import numpy as np
-        return np.identity(4)
-
-    global_T_inv = None
+        return None
     for tag in ("MatrixToScanDataFiles", "GlobalMatrix", "MainMatrix", "ModelMatrix", "WorldMatrix"):
         ge = xml_root.find(tag)
         if ge is None: continue
         M_col = parse_matrix(ge)
         if M_col is not None:
-            M = convert_matrix_to_row_major(M_col)
-            global_T_inv = compute_inverse(M)
-            break
+            return compute_inverse(convert_matrix_to_row_major(M_col))
+    return None
 
-    file_T_inv = None
-    stl_name_only = os.path.basename(stl_name).lower()
+def _mi_file_entries(xml_root) -> list[tuple[str, ET.Element]]:
+    """Filename 자식을 가진 modelInfo 요소 → [(소문자 basename, 요소)] (문서 순서)"""
+    if xml_root is None:
+        return []
+    out = []
     for elem in xml_root.iter():
         fn = elem.find("Filename")
-        if fn is None or not (fn.text and stl_name_only in os.path.basename(fn.text).lower()):
-            continue
+        if fn is not None and fn.text:
+            out.append((os.path.basename(fn.text).lower(), elem))
+    return out
 
+def _mi_file_inv(entries: list[tuple[str, ET.Element]], stl_name: str):
+    target = os.path.basename(stl_name).lower()
+    for fname, elem in entries:
+        if target not in fname:
+            continue
         for cand_name in ("TransformationMatrix","ZRotationMatrix","Matrix","ModelMatrix","MeshMatrix","LocalMatrix"):
             m_elem = elem.find(cand_name)
             if m_elem is None: continue
             M_col = parse_matrix(m_elem)
             if M_col is not None:
-                M = convert_matrix_to_row_major(M_col)
-                file_T_inv = compute_inverse(M)
-                break
-        if file_T_inv is not None:
-            break
+                return compute_inverse(convert_matrix_to_row_major(M_col))
 
-        R = parse_matrix3(elem.find("RotationMatrix")) or parse_matrix3(elem.find("Rotation"))
-        t = (parse_vec3(elem.find("Translation")) or
-             parse_vec3(elem.find("TranslationVector")) or
-             parse_vec3(elem.find("Offset")) or
-             parse_vec3(elem.find("T")))
+        R = _first_parsed(parse_matrix3, elem.find("RotationMatrix"), elem.find("Rotation"))
+        t = _first_parsed(parse_vec3, elem.find("Translation"), elem.find("TranslationVector"),
+                          elem.find("Offset"), elem.find("T"))
         if R is not None or t is not None:
-            import numpy as np
-            M = np.eye(4)
-            if R is not None: M[:3,:3] = R
-            if t is not None: M[:3, 3] = t
-            file_T_inv = compute_inverse(convert_matrix_to_row_major(M))
-            break
+            return _rt_inverse(R, t)
+    return None
 
-    import numpy as np
-    if global_T_inv is None and file_T_inv is None:
-        return np.identity(4)
-    if global_T_inv is None: return file_T_inv
-    if file_T_inv  is None: return global_T_inv
-    return global_T_inv @ file_T_inv
+def find_exo_transform_matrix_mi(xml_root, stl_name: str):
+    return _compose_exo(_mi_global_inv(xml_root), _mi_file_inv(_mi_file_entries(xml_root), stl_name))
 
 def _find_exo_files(folder: str) -> Tuple[Optional[str], Optional[str]]:
     ci = None; mi = None
@@ -712,8 +1015,6 @@ def parse_exo_for_groups(folder: str) -> dict:
        · *abut*, *scanbody*, *ti-base*, *tibase* → *_abutment
     - [우선순위] 파일명 치식 > modelInfo 추정 > 이름 휴리스틱
     """
-    group_map: dict[str,str] = {}
-
     # ---- CI/MI 루트 둘 다 파싱 ----
     ci, mi = _find_exo_files(folder)
     ci_root = None
@@ -731,50 +1032,7 @@ def parse_exo_for_groups(folder: str) -> dict:
     # 1-1) modelInfo 기반 Jaw 맵(파일명→upper/lower)
     mi_jaw_map = build_mi_jaw_map(mi_root)  # 키는 '소문자 basename' + *_reduced.stl 포함
 
-    def decide_cat(name: str) -> str:
-        l = name.lower()
-        if "occlusion" in l: return "etc"
-        if "upperjaw" in l or "lowerjaw" in l: return "scan"
-        if any(k in l for k in ("modelgingiva","modelbase","gingiva","model","base")): return "scan"
-        if "marker" in l: return "scan"
-        if any(k in l for k in ("abut","scanbody","tibase","ti-base")): return "abutment"
-        if any(k in l for k in ("crown","bridge","pontic","coping","framework","veneer")): return "crownbridge"
-        if "prep" in l or "preparation" in l: return "scan"
-        if "antagonist" in l or "oppos" in l or l.startswith("ant"): return "scan"
-        return "etc"
-
-    def decide_jaw_fallback(name: str) -> str:
-        # 문자열 키워드 기반(상/하악 한글/영문) → 치식 추정
-        jaw = _infer_jaw_from_string(name)
-        if jaw: return jaw
-        # 최종 모호하면 upper
-        return "upper"
-
-    for s in stls:
-        s_key = s.lower()
-        cat = decide_cat(s)
-
-        # 1) 파일명에서 치식 우선
-        teeth = extract_fdi_teeth(s)
-        jaw_by_teeth = determine_jaw(teeth)
-
-        if jaw_by_teeth in ("upper","lower"):
-            jaw = jaw_by_teeth
-        # 2) modelInfo의 Jaw 추정(모델/베이스/gingiva/scan 계열 우선 적용)
-        elif (cat == "scan" or any(k in s_key for k in ("modelgingiva","gingiva","modelbase","base"))) and s_key in mi_jaw_map:
-            jaw = mi_jaw_map[s_key]
-        # 3) 이름 휴리스틱
-        else:
-            jaw = decide_jaw_fallback(s)
-
-        grp = f"{jaw}_{cat}" if jaw in ("upper","lower") and cat in ("abutment","crownbridge","scan") else "etc"
-        group_map[s] = grp
-        # 확장자 유지하면서 _reduced 추가
-        base = os.path.splitext(s)[0]
-        ext = os.path.splitext(s)[1]
-        group_map[base + "_reduced" + ext] = grp
-
-    return group_map
+    return classify_exo_names(stls, mi_jaw_map)
 
 def parse_exo_for_display(folder: str) -> dict:
     disp: dict[str,str] = {}
@@ -805,32 +1063,7 @@ def parse_exo_for_display(folder: str) -> dict:
     return disp
 
 
-# ==== EXO 파일 소유 판정 및 단일 변환 선택 유틸 =============================
-def _ci_has_file_for_stl(ci_root: Optional[ET.Element], stl_name: str) -> bool:
-    if ci_root is None:
-        return False
-    cfl = ci_root.find("ConstructionFileList")
-    if cfl is None:
-        return False
-    target = os.path.basename(stl_name).lower()
-    for cf in cfl.findall("ConstructionFile"):
-        fn = cf.find("Filename")
-        if fn is not None and fn.text:
-            if target in os.path.basename(fn.text).lower():
-                return True
-    return False
-
-def _mi_has_file_for_stl(mi_root: Optional[ET.Element], stl_name: str) -> bool:
-    if mi_root is None:
-        return False
-    target = os.path.basename(stl_name).lower()
-    for elem in mi_root.iter():
-        fn = elem.find("Filename")
-        if fn is not None and fn.text:
-            if target in os.path.basename(fn.text).lower():
-                return True
-    return False
-
+# ==== EXO 파일 소유 판정 및 케이스 단위 변환행렬 ===============================
 def _looks_model_component(stl_name: str) -> bool:
     l = stl_name.lower()
     return any(k in l for k in (
@@ -838,9 +1071,11 @@ def _looks_model_component(stl_name: str) -> bool:
         "upperjaw", "lowerjaw", "_jaw", "jaw_"
     ))
 
-def _decide_owner(ci_root: Optional[ET.Element], mi_root: Optional[ET.Element], stl_name: str) -> str | None:
-    ci_has = _ci_has_file_for_stl(ci_root, stl_name)
-    mi_has = _mi_has_file_for_stl(mi_root, stl_name)
+def _decide_owner(ci_entries: list[tuple[str, ET.Element]],
+                  mi_entries: list[tuple[str, ET.Element]], stl_name: str) -> str | None:
+    target = os.path.basename(stl_name).lower()
+    ci_has = any(target in fname for fname, _ in ci_entries)
+    mi_has = any(target in fname for fname, _ in mi_entries)
     if ci_has and not mi_has:
         return "ci"
     if mi_has and not ci_has:
@@ -849,40 +1084,330 @@ def _decide_owner(ci_root: Optional[ET.Element], mi_root: Optional[ET.Element],
         return "both"
     return None
 
+def resolve_exo_transforms(ci_root: Optional[ET.Element],
+                           mi_root: Optional[ET.Element],
+                           names: list[str]) -> tuple['np.ndarray', dict[str, int]]:
+    """
+    케이스의 EXO 변환행렬을 한꺼번에 구한다 (XML 색인과 전역 역행렬은 케이스당 한 번만 계산)
+    → (고유 행렬 스택 (k,4,4), 파일명 → 스택 인덱스). 단위행렬인 파일은 맵에서 빠진다.
+    """
+    import numpy as np
+    ci_entries, mi_entries = _ci_file_entries(ci_root), _mi_file_entries(mi_root)
+    ci_global = mi_global = None
+    mats: list = []
+    index: dict[str, int] = {}
+    for name in names:
+        owner = _decide_owner(ci_entries, mi_entries, name)
+        if owner is None:
+            continue
+        if owner == "mi" or (owner == "both" and _looks_model_component(name)):
+            mi_global = _mi_global_inv(mi_root) if mi_global is None else mi_global
+            T = _compose_exo(mi_global, _mi_file_inv(mi_entries, name))
+        else:
+            ci_global = _ci_global_inv(ci_root) if ci_global is None else ci_global
+            T = _compose_exo(ci_global, _ci_file_inv(ci_entries, name))
+        if np.allclose(T, np.eye(4)):
+            continue
+        k = next((i for i, M in enumerate(mats) if np.array_equal(M, T)), None)
+        if k is None:
+            k = len(mats)
+            mats.append(T)
+        index[name] = k
+    return (np.stack(mats) if mats else np.empty((0, 4, 4))), index
+
 def get_exo_transform_matrix(ci_root: Optional[ET.Element],
                              mi_root: Optional[ET.Element],
                              stl_name: str):
     import numpy as np
-    owner = _decide_owner(ci_root, mi_root, stl_name)
-    if owner == "ci":
-        return find_exo_transform_matrix_ci(ci_root, stl_name)
-    if owner == "mi":
-        return find_exo_transform_matrix_mi(mi_root, stl_name)
-    if owner == "both":
-        if _looks_model_component(stl_name):
-            return find_exo_transform_matrix_mi(mi_root, stl_name)
-        return find_exo_transform_matrix_ci(ci_root, stl_name)
-    return np.identity(4)
-
-def exo_transform_if_possible(stl_path: str,
-                              ci_root: Optional[ET.Element],
-                              mi_root: Optional[ET.Element],
-                              xfm_out_dir: str) -> str:
+    stack, index = resolve_exo_transforms(ci_root, mi_root, [stl_name])
+    return stack[index[stl_name]] if stl_name in index else np.identity(4)
+
+def _scatter_rows(src: 'np.ndarray', targets: list['np.ndarray']) -> None:
+    o = 0
+    for a in targets:
+        a[...] = src[o:o + len(a)]
+        o += len(a)
+
+def apply_transform_stack(points: list['np.ndarray'], normals: list[list['np.ndarray']],
+                          matrix_ids: list[int], stack: 'np.ndarray') -> None:
+    """
+    (N,3) 정점 배열들에 4×4 행렬 스택을 제자리 적용한다. 같은 행렬을 쓰는 메시는 이어 붙여 행렬곱 한 번으로 처리.
+    normals[i]: i번째 메시의 (N,3) 법선 배열들 – 역전치 행렬로 변환한 뒤 다시 단위 길이로
+    """
+    import numpy as np
+    groups: dict[int, list[int]] = {}
+    for i, k in enumerate(matrix_ids):
+        groups.setdefault(k, []).append(i)
+    for k, members in groups.items():
+        R, t = stack[k][:3, :3], stack[k][:3, 3]
+        pts = [points[i] for i in members]
+        _scatter_rows(np.concatenate(pts) @ R.T + t, pts)
+
+        nrm = [n for i in members for n in normals[i]]
+        if nrm:
+            out = np.concatenate(nrm) @ np.linalg.inv(R)   # 행벡터 기준 (R⁻¹)ᵀ 적용
+            lens = np.linalg.norm(out, axis=1, keepdims=True)
+            np.divide(out, lens, out=out, where=lens > 0)
+            _scatter_rows(out, nrm)
+
+def load_transformed_meshes(paths: list[str], matrix_ids: list[int], stack: 'np.ndarray',
+                            log_callback=None) -> dict[str, 'vtk.vtkPolyData']:
+    """
+    메시 파일들을 읽어 메모리의 정점/법선 배열에 EXO 행렬을 바로 적용한다 (중간 파일 없음)
+    → 경로 → 변환된 vtkPolyData. 읽기에 실패한 파일은 빠진다(원본 그대로 감소).
+    """
+    import numpy as np
+    from vtkmodules.util.numpy_support import vtk_to_numpy
+    polys: dict[str, 'vtk.vtkPolyData'] = {}
+    pts, nrms, ids = [], [], []
+    for path, k in zip(paths, matrix_ids):
+        try:
+            poly = read_mesh(path)
+        except Exception as e:
+            log_callback and log_callback(f"[WARN] 변환행렬 적용 실패({os.path.basename(path)}): {e}")
+            continue
+        if poly.GetNumberOfPoints() == 0:
+            continue
+        polys[path] = poly
+        pts.append(vtk_to_numpy(poly.GetPoints().GetData()))   # vtk 메모리를 공유하는 뷰
+        nrms.append([vtk_to_numpy(a) for a in (poly.GetPointData().GetNormals(), poly.GetCellData().GetNormals())
+                     if a is not None])
+        ids.append(k)
+
+    apply_transform_stack(pts, nrms, ids, stack)
+
+    for (path, poly), k in zip(list(polys.items()), ids):
+        poly.GetPoints().Modified()
+        if np.linalg.det(stack[k][:3, :3]) < 0:   # 거울 변환이면 면 방향을 뒤집어 바깥쪽 유지
+            rev = vtk.vtkReverseSense()
+            rev.SetInputData(poly)
+            rev.ReverseCellsOn()
+            rev.ReverseNormalsOff()
+            rev.Update()
+            polys[path] = rev.GetOutput()
+    return polys
+
+
+# ==============================================================================
+# 뷰어 사이드카 (<케이스>.dlas.json) – 주석/저장한 뷰/모델 표시 상태만 담은 작은 JSON
+#   {"format": "dlas-sidecar", "version": 1,
+#    "models": {이름: {group, displayName, visible, opacity} 중 바뀐 것만 | {"deleted": true}},
+#    "annotations": [{id, text, pos:[x,y,z]}], "views": [{pos:[x,y,z], tgt:[x,y,z]}]}
+#   뷰어에서 내보내기/가져오기, HTML 옆에 있으면 자동 적용, 재변환 시 HTML에 구워 넣는다
+# ==============================================================================
+SIDECAR_FORMAT = "dlas-sidecar"
+SIDECAR_SUFFIX = ".dlas.json"
+
+def _script_json(obj) -> str:
+    """<script> 안에 그대로 넣을 JSON (</script> 조기 종료 방지)"""
+    return json.dumps(obj, ensure_ascii=False).replace("<", "\\u003C").replace(">", "\\u003E")
+
+def sidecar_path(html_path: str) -> str:
+    return os.path.splitext(html_path)[0] + SIDECAR_SUFFIX
+
+def load_sidecar(path: str, log_callback=None) -> Optional[dict]:
+    """사이드카 읽기 – 없거나 형식이 다르면 None"""
+    if not os.path.isfile(path):
+        return None
     try:
-        name = os.path.basename(stl_path)
-        import numpy as np
-        T = get_exo_transform_matrix(ci_root, mi_root, name)
-        if np.allclose(T, np.eye(4)):
-            return stl_path
-        mesh = trimesh.load_mesh(stl_path)
-        mesh.apply_transform(T)
-        out_path = os.path.join(xfm_out_dir, name)  # 이름 보존
-        mesh.export(out_path)
-        return out_path
-    except Exception as e:
-        print(f"[WARN] 변환행렬 적용 실패({os.path.basename(stl_path)}): {e}")
-        return stl_path
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        log_callback and log_callback(f"[WARN] 사이드카 읽기 실패({os.path.basename(path)}): {e}")
+        return None
+    if not isinstance(data, dict) or data.get("format") != SIDECAR_FORMAT:
+        log_callback and log_callback(f"[WARN] DLAS 사이드카 형식이 아님: {os.path.basename(path)}")
+        return None
+    return data
 
+def _vec3(v) -> Optional[list[float]]:
+    try:
+        return [float(x) for x in v[:3]] if len(v) >= 3 else None
+    except (TypeError, ValueError):
+        return None
+
+def apply_sidecar(model_infos: list[dict], sidecar: dict) -> tuple[list[dict], list[dict]]:
+    """사이드카의 모델 변경을 model_infos 에 반영(삭제 포함, 제자리 수정) → (주석 목록, 뷰 목록)"""
+    changes = sidecar.get("models") or {}
+    kept = []
+    for m in model_infos:
+        d = changes.get(m["name"])
+        if not isinstance(d, dict):
+            kept.append(m)
+            continue
+        if d.get("deleted"):
+            continue
+        for k in ("group", "displayName"):
+            if isinstance(d.get(k), str):
+                m[k] = d[k]
+        if isinstance(d.get("visible"), bool):
+            m["visible"] = d["visible"]
+        if isinstance(d.get("opacity"), (int, float)):
+            m["opacity"] = min(1.0, max(0.0, float(d["opacity"])))
+        kept.append(m)
+    model_infos[:] = kept
+    annotations = [{"id": str(a.get("id")), "text": str(a.get("text", "")), "pos": _vec3(a.get("pos"))}
+                   for a in sidecar.get("annotations") or [] if isinstance(a, dict) and _vec3(a.get("pos"))]
+    views = [{"pos": _vec3(v.get("pos")), "tgt": _vec3(v.get("tgt"))}
+             for v in sidecar.get("views") or [] if isinstance(v, dict) and _vec3(v.get("pos")) and _vec3(v.get("tgt"))]
+    return annotations, views
+
+# ==============================================================================
+# 뷰어 런타임 (three.js) – 뷰어가 쓰는 클래스만 묶은 최소 번들 (build_viewer_runtime.py 로 생성)
+#   embed : HTML 안에 한 번 싣는다 (오프라인/파일로 열기 – 네트워크 불필요)
+#   shared: /runtime/<버전 파일> 참조 – PWA 서비스 워커/내장 서버가 케이스 간 공유 캐시로 제공, 없으면 CDN
+#   cdn   : jsdelivr (기존 방식)
+#   auto  : 번들로 embed – 번들이 없으면 오류 (조용히 CDN 으로 바꾸면 오프라인에서 열리지 않는 케이스가 나간다)
+# 기본값(DEFAULT_RUNTIME)은 번들이 저장소에 커밋되기 전까지 cdn – 빌드 산출물을 커밋하면 "auto" 로 바꾼다
+# ==============================================================================
+THREE_VERSION    = "0.137.0"
+RUNTIME_VERSION  = f"{THREE_VERSION}-1"          # 번들 구성(클래스 목록)이 바뀌면 뒤 번호를 올린다
+RUNTIME_FILENAME = f"dlas-viewer-runtime-{RUNTIME_VERSION}.min.js"
+RUNTIME_DIR      = "viewer_runtime"
+RUNTIME_URL      = f"/runtime/{RUNTIME_FILENAME}"
+RUNTIME_MODES    = ("auto", "embed", "shared", "cdn")
+DEFAULT_RUNTIME  = "cdn"
+_CDN_SCRIPTS = (
+    f"https://cdn.jsdelivr.net/npm/three@{THREE_VERSION}/build/three.min.js",
+    f"https://cdn.jsdelivr.net/npm/three@{THREE_VERSION}/examples/js/loaders/GLTFLoader.js",
+    f"https://cdn.jsdelivr.net/npm/three@{THREE_VERSION}/examples/js/controls/TrackballControls.js",
+)
+
+@lru_cache(maxsize=1)
+def load_viewer_runtime() -> Optional[str]:
+    """빌드된 런타임 번들 내용 (없으면 None)"""
+    path = resource_path(os.path.join(RUNTIME_DIR, RUNTIME_FILENAME))
+    if not os.path.isfile(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def runtime_script_tags(mode: str = DEFAULT_RUNTIME, log_callback=None) -> str:
+    """mode 에 맞는 three.js <script> 태그들"""
+    cdn = "\n".join(f'<script src="{u}"></script>' for u in _CDN_SCRIPTS)
+    if mode == "cdn":
+        return cdn
+    if mode == "shared":
+        # document.write 폴백: 파일로 열었거나 서버에 런타임이 없으면 파싱 중에 CDN 스크립트를 이어서 읽는다
+        # (저장 시 _SHELL_HTML 이 data-rt-fallback 태그를 지워 다시 연 파일에서 두 번 읽지 않게 한다)
+        fallback = "".join(f'<script data-rt-fallback src="{u}"><\\/script>' for u in _CDN_SCRIPTS)
+        return (f'<script src="{RUNTIME_URL}"></script>\n'
+                f"<script>window.THREE||document.write('{fallback}');</script>")
+    runtime = load_viewer_runtime()
+    if runtime is None:
+        raise FileNotFoundError(f"뷰어 런타임 번들이 없습니다: {RUNTIME_DIR}/{RUNTIME_FILENAME} "
+                                f"(build_viewer_runtime.py 로 생성하거나 --runtime cdn)")
+    return f'<script id="dlasRuntime" data-version="{RUNTIME_VERSION}">\n' + \
+           re.sub(r"</(script)", r"<\\/\1", runtime, flags=re.I) + "\n</script>"
+
+# ==============================================================================
+# 케이스 데이터 파일 (<케이스>.dlas) – 뷰어 코드 없이 데이터만 담은 JSON, PWA의 viewer.html(런타임)이 렌더링
+#   {"format": "dlas-case", "version": 1, "runtime": RUNTIME_VERSION, "glbPacked": bool,
+#    "models": [{name, glb, group, displayName, visible?, opacity?}], "annotations": [...], "views": [...],
+#    "password_hash"?: sha256, "payload_crypto"?: {...}, "user_logo"?: base64, "payloads": [GLB base64 ...]}
+#   payloads 를 맨 뒤에 두어 메타데이터를 먼저 읽을 수 있게 한다
+# ==============================================================================
+CASE_FORMAT     = "dlas-case"
+CASE_SUFFIX     = ".dlas"
+OUTPUT_FORMATS  = ("html", "case", "both")
+PWA_VIEWER_FILE = "viewer.html"
+
+def case_output_path(html_path: str) -> str:
+    return os.path.splitext(html_path)[0] + CASE_SUFFIX
+
+def _password_hash(password: str | None, password_enabled: bool) -> str:
+    return hashlib.sha256(password.encode()).hexdigest() if (password_enabled and password) else ""
+
+# 암호화된 페이로드 (--encrypt-models): 비밀번호 → PBKDF2-SHA256 키 → 페이로드(GLB 바이트)별 AES-GCM
+#   payload_crypto = {"cipher", "kdf", "iter", "salt": base64, "check": base64}
+#   페이로드: base64(IV 12바이트 + 암호문 + 태그) / check: 알려진 평문을 같은 키로 봉한 것 – 뷰어는 이것으로 비밀번호를 확인
+#   이 모드에서는 비밀번호 SHA-256 해시와 형상 캐시 키(hash)를 싣지 않는다 (파일만으로 비밀번호를 빠르게 대입해 볼 수 없게,
+#   복호화된 형상이 브라우저 저장소에 평문으로 남지 않게)
+PBKDF2_ITERATIONS = 310_000
+_PAYLOAD_CHECK    = b"dlas-payload-check"
+
+def _encrypt_payloads(payloads: list[str], password: str) -> tuple[list[str], dict]:
+    """GLB base64 목록 → (암호화된 base64 목록, payload_crypto) – cryptography 패키지 필요"""
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    salt = os.urandom(16)
+    aes = AESGCM(hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, PBKDF2_ITERATIONS, 32))
+
+    def seal(data: bytes) -> str:
+        iv = os.urandom(12)
+        return base64.b64encode(iv + aes.encrypt(iv, data, None)).decode("ascii")
+
+    info = {"cipher": "AES-GCM", "kdf": "PBKDF2-SHA256", "iter": PBKDF2_ITERATIONS,
+            "salt": base64.b64encode(salt).decode("ascii"), "check": seal(_PAYLOAD_CHECK)}
+    return [seal(base64.b64decode(p)) for p in payloads], info
+
+def _dedupe_payloads(model_infos: list[dict], packed_glb: str | None) -> tuple[list[str], list[int]]:
+    """같은 형상(geometry 해시, 없으면 base64 자체)은 페이로드를 한 번만 싣고 모델들이 인덱스로 참조"""
+    payload_index: dict[str, int] = {}
+    payloads: list[str] = [packed_glb] if packed_glb else []
+    model_refs: list[int] = []
+    for m in model_infos:
+        if packed_glb:
+            model_refs.append(0)
+            continue
+        key = m.get("geometry") or m["b64"]
+        if key not in payload_index:
+            payload_index[key] = len(payloads)
+            payloads.append(m["b64"])
+        model_refs.append(payload_index[key])
+    return payloads, model_refs
+
+def _model_hashes(model_infos: list[dict], payloads: list[str], model_refs: list[int], packed: bool) -> list[str]:
+    """
+    뷰어 형상 캐시(IndexedDB) 키 – 모델이 디코드되는 내용의 해시 (같은 내용이면 케이스가 달라도 같은 키)
+    모델별 GLB: 페이로드 자체의 해시 / 단일 GLB: 모델 형상 해시(geometry, 없으면 페이로드+이름)
+    """
+    payload_hash = [hashlib.sha1(p.encode("ascii")).hexdigest() for p in payloads]
+    out = []
+    for m, i in zip(model_infos, model_refs):
+        key = ("packed:" + (m.get("geometry") or payload_hash[i] + ":" + m["name"])) if packed else payload_hash[i]
+        out.append(hashlib.sha1(key.encode("utf-8")).hexdigest()[:24])
+    return out
+
+def _model_entry(m: dict, glb: int, content_hash: str = "") -> dict:
+    """modelData 항목 – 사이드카로 바뀐 표시 상태만 싣는다 (기본값: 보임, 불투명)"""
+    d = {"name": m["name"], "glb": glb, "group": m["group"], "displayName": m.get("displayName") or m["name"]}
+    if content_hash:
+        d["hash"] = content_hash
+    if not m.get("visible", True):
+        d["visible"] = False
+    if m.get("opacity", 1.0) < 1.0:
+        d["opacity"] = round(m["opacity"], 2)
+    return d
+
+def generate_case_data(model_infos: list[dict], annotations: list[dict], views: list[dict],
+                       user_logo_b64: str | None = None, password: str | None = None,
+                       password_enabled: bool = False, packed_glb: str | None = None,
+                       encrypt_models: bool = False) -> str:
+    payloads, model_refs = _dedupe_payloads(model_infos, packed_glb)
+    encrypt = bool(encrypt_models and _password_hash(password, password_enabled))
+    hashes = [""] * len(model_infos) if encrypt else _model_hashes(model_infos, payloads, model_refs, bool(packed_glb))
+    data = {"format": CASE_FORMAT, "version": 1, "runtime": RUNTIME_VERSION, "glbPacked": bool(packed_glb),
+            "models": [_model_entry(m, i, h) for m, i, h in zip(model_infos, model_refs, hashes)],
+            "annotations": annotations, "views": views}
+    if encrypt:
+        payloads, data["payload_crypto"] = _encrypt_payloads(payloads, password)
+    elif _password_hash(password, password_enabled):
+        data["password_hash"] = _password_hash(password, password_enabled)
+    if user_logo_b64:
+        data["user_logo"] = user_logo_b64
+    data["payloads"] = payloads
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+def write_pwa_viewer(path: str, log_callback=None) -> str:
+    """PWA용 뷰어 런타임 페이지 – 같은 템플릿에서 데이터 자리만 부모 창이 넘긴 케이스를 읽도록 바꾼 것"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(generate_html([], "[]", runtime="shared", pwa_runtime=True, log_callback=log_callback))
+    log_callback and log_callback(f"[SAVE] {path}")
+    if not os.path.isfile(os.path.join(os.path.dirname(path), RUNTIME_URL.lstrip("/"))):
+        # viewer.html 은 RUNTIME_URL 을 읽는다 – 옆에 없으면 서비스 워커가 캐시한 CDN 폴백으로만 열린다
+        log_callback and log_callback(f"[WARN] {os.path.dirname(path) or '.'}{RUNTIME_URL} 없음 – "
+                                      f"build_viewer_runtime.py 로 번들을 만들어 함께 배포하세요")
+    return path
 
 # ==============================================================================
 # HTML 템플릿
@@ -891,7 +1416,20 @@ def generate_html(model_infos: list[dict[str, str]],
                   annos_json: str,
                   user_logo_b64: str | None = None,
                   password: str | None = None,
-                  password_enabled: bool = False) -> str:
+                  password_enabled: bool = False,
+                  packed_glb: str | None = None,
+                  views_json: str = "[]",
+                  runtime: str = DEFAULT_RUNTIME,
+                  log_callback=None,
+                  pwa_runtime: bool = False,
+                  encrypt_models: bool = False) -> str:
+    """
+    packed_glb: pack_models_glb() 결과 – 주어지면 모든 모델이 이 GLB 하나의 노드(extras.name)를 참조
+    views_json: 저장된 카메라 뷰 [{pos, tgt}] (사이드카에서 구워 넣은 값)
+    runtime: three.js 싣는 방식 (RUNTIME_MODES)
+    pwa_runtime: 케이스 데이터 대신 부모 창의 window.__dlasCase(.dlas 내용)를 읽는 PWA 런타임 페이지 (write_pwa_viewer)
+    encrypt_models: 비밀번호가 있으면 페이로드를 AES-GCM 으로 암호화 – 뷰어는 비밀번호 입력 후 워커에서 모델별로 복호화
+    """
     group_color_map = {
         "upper_crownbridge": 0xFFFFF0,
         "upper_abutment":    0xC0C0C0,
@@ -929,11 +1467,25 @@ def generate_html(model_infos: list[dict[str, str]],
                  .replace("</", "<\\/")
                  .replace("\n", "").replace("\r", ""))
 
+    payloads, model_refs = _dedupe_payloads(model_infos, packed_glb)
+    payload_crypto = None
+    if encrypt_models and _password_hash(password, password_enabled) and not pwa_runtime:
+        payloads, payload_crypto = _encrypt_payloads(payloads, password)
+        hashes = [""] * len(model_infos)
+    else:
+        hashes = _model_hashes(model_infos, payloads, model_refs, bool(packed_glb))
+    js_payloads = ",\n      ".join(f"'{esc(b)}'" for b in payloads)
+    def state(m: dict) -> str:
+        # 사이드카로 바뀐 표시 상태만 싣는다 (기본값: 보임, 불투명)
+        return ("" if m.get("visible", True) else ",visible:false") + \
+               (f",opacity:{m['opacity']:g}" if m.get("opacity", 1.0) < 1.0 else "")
+
     js_models = ",\n      ".join(
-        "{{name:'{n}',b64:'{b}',group:'{g}',displayName:{d}}}".format(
-            n=esc(m["name"]), b=esc(m["b64"]), g=m["group"],
-            d=json.dumps(m.get("displayName") or m["name"])
-        ) for m in model_infos
+        "{{name:'{n}',glb:{i},group:'{g}',displayName:{d}{h}{s}}}".format(
+            n=esc(m["name"]), i=idx, g=esc(m["group"]),
+            d=json.dumps(m.get("displayName") or m["name"]).replace("</", "<\\/"),
+            h=f",hash:'{h}'" if h else "", s=state(m)
+        ) for m, idx, h in zip(model_infos, model_refs, hashes)
     )
 
     html_tpl = Template(r"""<!DOCTYPE html>
@@ -948,18 +1500,14 @@ def generate_html(model_infos: list[dict[str, str]],
   https://github.com/mrdoob/three.js/blob/master/LICENSE
 -->
 <script>
-const _BASE_HTML = document.documentElement.cloneNode(true).outerHTML;
 const isMobile = /Android|webOS|iPhone|iPad|iPod|BlackBerry|IEMobile|Opera Mini/i.test(navigator.userAgent) || window.innerWidth <= 768;
-const PASSWORD_HASH = "$password_hash";
-const PASSWORD_ENABLED = $password_enabled;
+$password_js
 </script>
-<script src="https://cdn.jsdelivr.net/npm/three@0.137.0/build/three.min.js"></script>
-<script src="https://cdn.jsdelivr.net/npm/three@0.137.0/examples/js/loaders/GLTFLoader.js"></script>
-<script src="https://cdn.jsdelivr.net/npm/three@0.137.0/examples/js/controls/OrbitControls.js"></script>
-<script src="https://cdn.jsdelivr.net/npm/three@0.137.0/examples/js/controls/TrackballControls.js"></script>
+$runtime_scripts
 <style>
   body{margin:0;overflow:hidden;font-family:Arial,Helvetica,sans-serif;background:#F5F5F5;}
   #viewer{width:100vw;height:100vh;}
+  #pickMarker{position:absolute;width:10px;height:10px;margin:-7px 0 0 -7px;border:2px solid #ff9800;border-radius:50%;pointer-events:none;z-index:98;display:none;}
 
   /* ========== PC 스타일 (기본) ========== */
   #groupPanel{position:absolute;top:90px;left:10px;background:rgba(255,255,255,.97);padding:14px;border-radius:8px;
@@ -1161,8 +1709,8 @@ const PASSWORD_ENABLED = $password_enabled;
     #topButtons button{font-size:14px;padding:8px 14px;min-height:44px;}
     #addAnnoBtn{top:10px;right:10px;font-size:15px;padding:10px 16px;min-height:44px;}
 
-    /* 모바일에서는 Save, View 버튼 숨김 (Annotation은 표시) */
-    #topButtons{display:none;}
+    /* 모바일에서는 Save, View 버튼 숨김 (Annotation, 화질 프로필은 표시) */
+    #topButtons button:not(#qualityBtn){display:none;}
     #viewSavePanel{display:none;}
 
     /* 홈 버튼: 우측 하단으로 이동 */
@@ -1323,6 +1871,11 @@ $user_logo
 
 <div id="topButtons">
   <button id="saveGroupsBtn">Save</button>
+  <button id="exportNotesBtn" title="주석/뷰/표시 상태만 작은 파일로 내보내기">Export Notes</button>
+  <button id="importNotesBtn" title="받은 노트 파일(.dlas.json) 적용">Import Notes</button>
+  <button id="lightingBtn" title="Phong(정밀) / Fast(matcap – 저사양 기기용) 조명 전환">Light: Phong</button>
+  <button id="qualityBtn" title="화질: Auto(프레임 속도에 맞춰 해상도 자동 조절) / High(최대 화질 고정) / Battery(절전)">Quality: Auto</button>
+  <input type="file" id="importNotesInput" accept=".json,application/json" style="display:none">
 </div>
 
 <button id="addAnnoBtn">Add&nbsp;Annotation</button>
@@ -1335,14 +1888,26 @@ $user_logo
 <div id="groupSelectModal"><div id="groupSelectBox"></div></div>
 
 <div id="viewer"></div>
+<div id="pickMarker"></div>
 
 <button id="mobileToggleBtn">☰</button>
 
 <button id="dlasHomeBtn" onclick="window.open('https://dlas.io/','_blank')">dlas.io</button>
 
+<script id="dlasData">
+$case_data_js
+</script>
 <script>
-let modelData=[ $js_models ];
-let annotationList = $annos_json;
+// 저장용 틀: 데이터 스크립트를 비운 뒤 아직 손대지 않은 문서를 한 번 직렬화 (페이로드는 포함되지 않음)
+// → 문서 전체 복제본을 들고 있지 않고, 저장할 때만 틀 + 현재 modelData/annotationList 로 파일을 다시 만든다
+const _SHELL_HTML=(()=>{
+  const d=document.getElementById("dlasData");d.textContent="";   // 실행이 끝난 데이터 스크립트의 원문(base64)도 DOM에서 해제
+  // PWA 앱이 Blob URL 로 열 때 끼운 <base data-dlas-injected> 도 지운다 (다른 곳에서 열면 상대 경로가 앱 주소로 풀리지 않게)
+  // PWA 런타임에서 저장하면 부모 창 대신 현재 케이스의 비밀번호 해시/암호화 정보를 구워 넣는다 (따로 열어도 보호 유지)
+  const html=("<!DOCTYPE html>\n"+document.documentElement.outerHTML).replace(/<script data-rt-fallback[^>]*><\/script>/g,"").replace(/<base data-dlas-injected[^>]*>/g,"")
+    .replace(/\/\*dlas-case\*\/[\s\S]*?\/\*\/dlas-case\*\//,()=>"const DLAS_CASE=null;const PASSWORD_HASH="+JSON.stringify(PASSWORD_HASH)+";const PAYLOAD_CRYPTO="+JSON.stringify(PAYLOAD_CRYPTO)+";const PASSWORD_ENABLED="+PASSWORD_ENABLED+";"),mark='<script id="dlasData">',i=html.indexOf(mark)+mark.length;
+  return[html.slice(0,i),html.slice(i)];
+})();
 let scene,camera,renderer,controls,stlModels=[];
 const groupColorMap=$js_colormap;
 let fileHandle=null;
@@ -1356,10 +1921,14 @@ function groupKey(g){switch(g){
   case"bite":return["bite",""]; case"annotation":return["annotation",""]; default:return["etc",""];}
 }
 const gColor=g=>groupColorMap[g]||groupColorMap["etc"];
-const fileName=location.pathname.split("/").pop()||"DLAS_STL_Viewer.html";
+// PWA 앱이 Blob URL 로 열면 경로에 파일 이름이 없다 – 앱이 iframe name 으로 넘겨준다
+const fileName=(location.protocol==="blob:"&&window.name)||location.pathname.split("/").pop()||"DLAS_STL_Viewer.html";
 const safeStringify=obj=>JSON.stringify(obj).replace(/</g,"\\u003C").replace(/>/g,"\\u003E");
 
-let savedViews=[];
+const viewFromPlain=v=>({pos:new THREE.Vector3().fromArray(v.pos),tgt:new THREE.Vector3().fromArray(v.tgt)});
+const viewPlainList=()=>savedViews.map(v=>({pos:v.pos.toArray(),tgt:v.tgt.toArray()}));
+const annPlainList=()=>annotationList.map(o=>({id:o.id,text:o.text,pos:Array.isArray(o.pos)?o.pos:[o.pos.x,o.pos.y,o.pos.z]}));
+let savedViews=viewList.map(viewFromPlain);
 function saveCurrentView(){const v={pos:camera.position.clone(),tgt:controls.target.clone()};savedViews.push(v);if(savedViews.length>5)savedViews.shift();updateViewButtons();}
 function applyView(idx){if(idx<0||idx>=savedViews.length)return;const v=savedViews[idx];camera.position.copy(v.pos);controls.target.copy(v.tgt);controls.update();updateAnnotationPositions();}
 function updateViewButtons(){const cont=document.getElementById("viewButtons");cont.innerHTML="";savedViews.forEach((_,i)=>{const b=document.createElement("button");b.className="viewBtn";b.textContent="V"+(i+1);b.onclick=()=>applyView(i);cont.appendChild(b);});}
@@ -1368,8 +1937,8 @@ function initThree(){
   const c=document.getElementById("viewer");
   scene=new THREE.Scene();scene.background=new THREE.Color(0xF5F5F5);
   camera=new THREE.PerspectiveCamera(5,window.innerWidth/window.innerHeight,10,20000);camera.position.set(0,0,1000);scene.add(camera);
-  renderer=new THREE.WebGLRenderer({antialias:true});renderer.setSize(window.innerWidth,window.innerHeight);c.appendChild(renderer.domElement);
-  controls=new THREE.TrackballControls(camera,renderer.domElement);
+  setQualityProfile(qualityProfile);   // 프로필에 맞는 MSAA/픽셀 비율로 렌더러 생성
+  controls=new THREE.TrackballControls(camera,c);   // 렌더러를 다시 만들어도 유지되도록 캔버스가 아닌 #viewer 에 연결
   controls.rotateSpeed=3.0;
   controls.zoomSpeed=1.2;
   controls.panSpeed=0.1;
@@ -1378,25 +1947,534 @@ function initThree(){
   controls.noPan=false;
   controls.staticMoving=true;
   controls.dynamicDampingFactor=0.2;
-  renderer.domElement.addEventListener('contextmenu',e=>e.preventDefault());
-  scene.add(new THREE.AmbientLight(0xffffff,.2));
+  controls.addEventListener('start',onControlsStart);controls.addEventListener('end',onControlsEnd);controls.addEventListener('change',requestRender);
+  c.addEventListener('contextmenu',e=>e.preventDefault());
+  sceneLights=[new THREE.AmbientLight(0xffffff,.2)];
   [new THREE.Vector3(1,0,0),new THREE.Vector3(-1,0,0),new THREE.Vector3(0,1,0),new THREE.Vector3(0,-1,0),new THREE.Vector3(0,0,1),new THREE.Vector3(0,0,-1)]
-   .forEach(d=>{const l=new THREE.DirectionalLight(0xffffff,.4);l.position.copy(d);scene.add(l);});
+   .forEach(d=>{const l=new THREE.DirectionalLight(0xffffff,.4);l.position.copy(d);sceneLights.push(l);});
+  sceneLights.forEach(l=>{l.visible=lightingMode!=="matcap";scene.add(l);});
+  ray.layers.enableAll();   // 배치에 합쳐진 원본 메시(레이어 1)도 피킹 대상
+}
+function animate(now){requestAnimationFrame(animate);controls.update();syncBatches();if(!qualityFrame(now||performance.now()))return;renderer.render(scene,camera);updateAnnotationPositions();}
+
+// ----- 재질/조명: (그룹, 투명도)마다 재질 하나를 공유 – 저사양(모바일 기본)은 matcap: 조명 계산 없이 텍스처 한 번 조회 -----
+let lightingMode=new URLSearchParams(location.search).get("lighting")||(isMobile?"matcap":"phong");
+let sceneLights=[],matcapTex=null;
+const materialCache=new Map();
+function makeMatcap(){
+  // 기본 조명(주변광 0.2 + 축 방향 평행광 6개 × 0.4)을 월드 공간 법선 (x, y) 기준으로 구운 matcap
+  // 밝기가 |nx|+|ny|+|nz| 에만 달려 있어 (x, y) 로 조회해도 Phong 확산광과 같고, 카메라를 돌려도 음영이 모델에 붙어 있다
+  const S=128,cv=document.createElement("canvas");cv.width=cv.height=S;
+  const ctx=cv.getContext("2d"),img=ctx.createImageData(S,S);
+  for(let y=0;y<S;y++)for(let x=0;x<S;x++){
+    const nx=(x+0.5)/S*2-1,ny=1-(y+0.5)/S*2,nz=Math.sqrt(Math.max(0,1-nx*nx-ny*ny));
+    const v=Math.round(255*Math.min(1,0.2+0.4*(Math.abs(nx)+Math.abs(ny)+nz))),k=(y*S+x)*4;
+    img.data[k]=img.data[k+1]=img.data[k+2]=v;img.data[k+3]=255;
+  }
+  ctx.putImageData(img,0,0);
+  return new THREE.CanvasTexture(cv);
+}
+function groupMaterial(group,opacity){
+  const op=Math.round((opacity==null?1:opacity)*100)/100,key=lightingMode+"|"+group+"|"+op;
+  let m=materialCache.get(key);
+  if(!m){
+    const o={color:gColor(group),side:THREE.DoubleSide,opacity:op,transparent:op<1};
+    if(lightingMode==="matcap"){
+      m=new THREE.MeshMatcapMaterial(Object.assign(o,{matcap:matcapTex||(matcapTex=makeMatcap())}));
+      m.onBeforeCompile=matcapWorldSpace;
+    }else m=new THREE.MeshPhongMaterial(Object.assign(o,{shininess:30,specular:0x111111}));
+    materialCache.set(key,m);
+  }
+  return m;
+}
+function matcapWorldSpace(sh){
+  // 기본 matcap 은 시선 공간 법선으로 조회 (광원이 카메라를 따라 돈다) → 월드 공간 법선으로 바꿔 Phong 모드와 같은 고정 조명
+  // (matcap 재질에는 viewMatrix 가 넘어오지 않으므로 정점 셰이더에서 modelMatrix 로 월드 법선을 만든다. 양면 뒷면의 부호는 |n| 이라 무관)
+  sh.vertexShader=sh.vertexShader.replace("void main() {","varying vec3 vWorldNormal;\nvoid main() {")
+    .replace("#include <defaultnormal_vertex>","#include <defaultnormal_vertex>\n\tvWorldNormal = mat3( modelMatrix ) * objectNormal;");
+  sh.fragmentShader=sh.fragmentShader.replace("void main() {","varying vec3 vWorldNormal;\nvoid main() {")
+    .replace("vec2 uv = vec2( dot( x, normal ), dot( y, normal ) )","vec2 uv = normalize( vWorldNormal ).xy");
+}
+function applyMaterial(it){const m=groupMaterial(it.group,it.opacity);it.object.traverse(ch=>{if(ch.isMesh)ch.material=m;});}
+function setModelOpacity(it,op){it.opacity=Math.round(op*100)/100;applyMaterial(it);}
+function setLighting(mode){
+  lightingMode=mode;
+  materialCache.forEach(m=>m.dispose());materialCache.clear();
+  sceneLights.forEach(l=>l.visible=mode!=="matcap");   // matcap 은 광원을 쓰지 않으므로 광원 목록에서도 뺀다
+  stlModels.forEach(applyMaterial);batches.forEach(b=>b.mesh.material=groupMaterial(b.group,1));
+  const btn=document.getElementById("lightingBtn");if(btn)btn.textContent=mode==="matcap"?"Light: Fast":"Light: Phong";
+}
+
+// ----- 화질 관리: rAF 간격(EMA)으로 픽셀 비율을 단계별로 올리고 내린다 – 회전/이동 중에는 더 낮은 비율, 멈추면 0.25초 뒤 복원 -----
+// 프로필: auto(기본 – 자동 조절) / quality(최대 화질 고정) / battery(절전: 30fps 상한, 정지 화면은 카메라가 움직일 때만 다시 그림)
+// MSAA 는 WebGL 컨텍스트를 만들 때만 정할 수 있어 켜고 끌 때 렌더러(캔버스)를 새로 만든다 – 입력 이벤트는 #viewer 에 걸려 있어 그대로 유지
+const DPR=window.devicePixelRatio||1;
+const QUALITY_PROFILES={
+  auto:   {label:"Auto",   maxPR:Math.min(DPR,isMobile?1.5:2),minPR:0.5,msaa:!isMobile,adapt:true,fpsCap:0},
+  quality:{label:"High",   maxPR:Math.min(DPR,2),minPR:1,msaa:true,adapt:false,fpsCap:0},
+  battery:{label:"Battery",maxPR:Math.min(DPR,1),minPR:0.5,msaa:false,adapt:true,fpsCap:30},
+};
+const QUALITY_ORDER=["auto","quality","battery"];
+const INTERACT_SCALE=0.6,IDLE_RESTORE_MS=250,IDLE_REDRAW_MS=500,WARMUP_FRAMES=20;
+let qualityProfile=(()=>{let q=new URLSearchParams(location.search).get("quality");try{q=q||localStorage.getItem("dlas_quality");}catch(e){}return QUALITY_PROFILES[q]?q:"auto";})();
+const qm={pr:1,prMove:1,msaa:null,lowPower:null,msaaLocked:false,cpuBound:false,interacting:false,idleTimer:0,
+          ema:0,frames:0,fastSince:0,upDelay:2000,raisedAt:0,lastDown:null,lastDraw:0,camKey:"",dirty:true};
+function requestRender(){qm.dirty=true;}
+function applyPixelRatio(){
+  const pr=qm.interacting?qm.prMove:qm.pr;
+  if(renderer&&renderer.getPixelRatio()!==pr){renderer.setPixelRatio(pr);requestRender();}
+}
+function rebuildRenderer(msaa){
+  const c=document.getElementById("viewer"),old=renderer,lowPower=qualityProfile==="battery";
+  renderer=new THREE.WebGLRenderer({antialias:msaa,powerPreference:lowPower?"low-power":"default"});
+  renderer.setPixelRatio(qm.interacting?qm.prMove:qm.pr);renderer.setSize(window.innerWidth,window.innerHeight);
+  if(old){
+    // 새 렌더러가 지오메트리/재질을 다시 올린다 – 배치는 CPU 배열이 없으므로 풀었다가 잠시 뒤 원본에서 다시 합친다
+    batches.forEach(dissolveBatch);batchDirtyAt=performance.now();
+    c.replaceChild(renderer.domElement,old.domElement);old.dispose();old.forceContextLoss();
+  }
+  else c.appendChild(renderer.domElement);
+  qm.msaa=msaa;qm.lowPower=lowPower;qm.frames=0;qm.ema=0;requestRender();
+}
+function setQualityLevel(key,v){
+  qm[key]=Math.round(v*100)/100;
+  if(key==="pr")qm.prMove=Math.min(qm.prMove,qm.pr);
+  qm.frames=0;qm.ema=0;applyPixelRatio();
+}
+function setQualityProfile(name){
+  const p=QUALITY_PROFILES[name];if(!p)return;
+  qualityProfile=name;
+  try{localStorage.setItem("dlas_quality",name);}catch(e){}
+  qm.pr=p.maxPR;qm.prMove=p.adapt?Math.max(p.minPR,Math.round(p.maxPR*INTERACT_SCALE*100)/100):p.maxPR;
+  qm.msaaLocked=false;qm.cpuBound=false;qm.upDelay=2000;qm.lastDown=null;qm.fastSince=0;
+  if(!renderer||p.msaa!==qm.msaa||(name==="battery")!==qm.lowPower)rebuildRenderer(p.msaa);else applyPixelRatio();
+  qm.frames=0;qm.ema=0;requestRender();
+  const btn=document.getElementById("qualityBtn");if(btn)btn.textContent="Quality: "+p.label;
+}
+function onControlsStart(){
+  clearTimeout(qm.idleTimer);
+  if(!qm.interacting){qm.interacting=true;qm.frames=0;qm.ema=0;applyPixelRatio();}
+}
+function onControlsEnd(){
+  clearTimeout(qm.idleTimer);
+  qm.idleTimer=setTimeout(()=>{qm.interacting=false;qm.frames=0;qm.ema=0;applyPixelRatio();},IDLE_RESTORE_MS);
+}
+function adaptQuality(dt,now){
+  // 회전 중이면 prMove, 아니면 pr 을 조절 (battery 는 정지 화면을 연속으로 그리지 않으므로 사실상 prMove 만)
+  const p=QUALITY_PROFILES[qualityProfile],key=qm.interacting?"prMove":"pr";
+  qm.ema=qm.ema?qm.ema*0.9+dt*0.1:dt;
+  if(++qm.frames<WARMUP_FRAMES)return;                 // 단계 변경/렌더러 교체 직후 프레임(셰이더 컴파일 등)은 보지 않는다
+  const budget=1000/(p.fpsCap||60);
+  if(qm.ema>budget*1.35){
+    qm.fastSince=0;
+    const d=qm.lastDown;
+    if(d&&d.key===key&&qm.ema>d.ema*0.92){
+      // 해상도를 낮춰도 빨라지지 않음 → 픽셀 처리량이 병목이 아니다 (CPU, 저전력 모드의 30Hz 제한 등): 되돌리고 더 내리지 않는다
+      qm.lastDown=null;qm.cpuBound=true;setQualityLevel(key,d.level);return;
+    }
+    if(qm.cpuBound)return;
+    if(qm[key]>p.minPR+1e-3){
+      if(now-qm.raisedAt<1500)qm.upDelay=Math.min(qm.upDelay*2,16000);   // 올리자마자 느려지면 다음 올림을 늦춘다
+      qm.lastDown={key:key,level:qm[key],ema:qm.ema};
+      setQualityLevel(key,Math.max(p.minPR,qm[key]*0.8));
+    }else if(qm.msaa&&qualityProfile==="auto"){qm.msaaLocked=true;rebuildRenderer(false);}
+  }else if(qm.ema<budget*1.1){
+    qm.lastDown=null;
+    if(!qm.fastSince){qm.fastSince=now;return;}
+    if(now-qm.fastSince<qm.upDelay)return;
+    qm.fastSince=0;
+    const top=key==="pr"?p.maxPR:qm.pr;
+    if(qm[key]<top-1e-3){setQualityLevel(key,Math.min(top,qm[key]*1.25));qm.raisedAt=now;}
+    else if(key==="pr"&&!qm.msaa&&!qm.msaaLocked&&qualityProfile==="auto"&&DPR<2){rebuildRenderer(true);qm.raisedAt=now;}
+  }else qm.fastSince=0;
+}
+function qualityFrame(now){
+  // 이번 rAF 에서 그릴지 결정하고 프레임 간격을 기록한다
+  const p=QUALITY_PROFILES[qualityProfile];
+  if(p.fpsCap&&now-qm.lastDraw<1000/p.fpsCap-2)return false;
+  if(qualityProfile==="battery"&&!qm.interacting){
+    const c=camera.position,q=camera.quaternion,key=[c.x,c.y,c.z,q.x,q.y,q.z,q.w,camera.zoom].join();
+    if(!qm.dirty&&key===qm.camKey&&now-qm.lastDraw<IDLE_REDRAW_MS)return false;   // 비동기 변경(로드, 노트 적용)도 0.5초 안에 반영
+    qm.camKey=key;
+  }
+  qm.dirty=false;
+  const dt=now-qm.lastDraw;qm.lastDraw=now;
+  if(p.adapt&&dt<250)adaptQuality(dt,now);else{qm.ema=0;qm.frames=0;}   // 멈췄다 다시 그리는 간격은 프레임 시간이 아니다
+  return true;
+}
+
+// ----- 정적 배치: 그룹 안에서 보이고 불투명한 메시들을 합친 메시 하나로 그린다 (그리기 호출 수 감소) -----
+// 원본 메시는 레이어 1(피킹 전용)로 옮겨 화면에는 그리지 않고, 구성원 하나라도 따로 바뀌면 배치를 풀었다가 1초 뒤 다시 합친다
+const batches=new Map();   // group → {group, mesh, members, meshes}
+let batchDirtyAt=0,geoPackPending=false;
+function mergeMeshes(meshes){
+  let nv=0,ni=0;
+  meshes.forEach(m=>{const g=m.geometry,n=g.attributes.position.count;nv+=n;ni+=g.index?g.index.count:n;});
+  const pos=new Float32Array(nv*3),nor=new Float32Array(nv*3),idx=new Uint32Array(ni),v=new THREE.Vector3(),nm=new THREE.Matrix3();
+  let vo=0,io=0;
+  meshes.forEach(m=>{
+    m.updateWorldMatrix(true,false);nm.getNormalMatrix(m.matrixWorld);
+    const g=m.geometry;restoreNormals(g);
+    const pa=g.attributes.position,na=g.attributes.normal,n=pa.count;
+    for(let i=0;i<n;i++){
+      const k=(vo+i)*3;
+      v.fromBufferAttribute(pa,i).applyMatrix4(m.matrixWorld);pos[k]=v.x;pos[k+1]=v.y;pos[k+2]=v.z;
+      if(na){v.fromBufferAttribute(na,i).applyMatrix3(nm).normalize();nor[k]=v.x;nor[k+1]=v.y;nor[k+2]=v.z;}
+    }
+    if(g.index){const ia=g.index.array;for(let i=0;i<ia.length;i++)idx[io+i]=ia[i]+vo;io+=ia.length;}
+    else{for(let i=0;i<n;i++)idx[io+i]=vo+i;io+=n;}
+    vo+=n;
+  });
+  const out=new THREE.BufferGeometry();
+  out.setAttribute("position",new THREE.BufferAttribute(pos,3));out.setAttribute("normal",new THREE.BufferAttribute(nor,3));
+  out.setIndex(new THREE.BufferAttribute(idx,1));out.computeBoundingSphere();
+  // 배치는 피킹하지 않으므로 GPU 에 올린 뒤 CPU 배열은 버린다 (다시 올려야 하면 원본에서 새로 합친다)
+  [out.attributes.position,out.attributes.normal,out.index].forEach(a=>a.onUpload(dropArray));
+  return out;
+}
+function dropArray(){this.array=null;}
+function restoreNormals(g){if(!g.attributes.normal)g.computeVertexNormals();}
+function releaseSourceNormals(){
+  // 사용하는 메시가 모두 배치에 합쳐진(레이어 1 만) geometry 의 법선 배열 – 배치를 풀 때 다시 계산한다
+  // 위치/인덱스 배열은 BVH 피킹이 같은 배열을 참조하므로 남긴다. 형상 캐시 저장(geoPack)이 끝나기 전에는 두지 않는다
+  if(geoPackPending)return;
+  const allBatched=new Map();
+  stlModels.forEach(it=>it.object.traverse(ch=>{
+    if(ch.isMesh)allBatched.set(ch.geometry,allBatched.get(ch.geometry)!==false&&ch.layers.mask===2);
+  }));
+  allBatched.forEach((all,g)=>{if(all&&g.attributes.normal)g.deleteAttribute("normal");});
+}
+function buildBatches(){
+  const byGroup=new Map();
+  stlModels.forEach(it=>{
+    if(batches.has(it.group)||!it.object.visible||it.opacity<1)return;
+    if(!byGroup.has(it.group))byGroup.set(it.group,[]);
+    byGroup.get(it.group).push(it);
+  });
+  byGroup.forEach((members,g)=>{
+    const meshes=[];members.forEach(it=>it.object.traverse(ch=>{if(ch.isMesh)meshes.push(ch);}));
+    if(meshes.length<2)return;
+    const mesh=new THREE.Mesh(mergeMeshes(meshes),groupMaterial(g,1));
+    mesh.raycast=()=>{};mesh.matrixAutoUpdate=false;scene.add(mesh);
+    meshes.forEach(m=>{m.layers.set(1);m.geometry.dispose();});   // GPU 버퍼는 배치 것만
+    batches.set(g,{group:g,mesh,members,meshes});
+  });
+  releaseSourceNormals();
+}
+function dissolveBatch(b){
+  scene.remove(b.mesh);b.mesh.geometry.dispose();
+  b.meshes.forEach(m=>{restoreNormals(m.geometry);m.layers.set(0);});batches.delete(b.group);
+}
+function syncBatches(){
+  // 매 프레임: 그룹 단위 켜기/끄기는 배치째 반영, 개별 변경(표시/투명도/그룹/삭제)이면 배치 해제
+  batches.forEach((b,g)=>{
+    const vis=b.members[0].object.visible;
+    if(b.members.every(it=>it.group===g&&it.object.visible===vis&&!(it.opacity<1)&&stlModels.includes(it))){b.mesh.visible=vis;return;}
+    dissolveBatch(b);batchDirtyAt=performance.now();
+  });
+  if(batchDirtyAt&&performance.now()-batchDirtyAt>1000){batchDirtyAt=0;buildBatches();}
+}
+
+// ----- 암호화된 페이로드 (PAYLOAD_CRYPTO): 비밀번호 → PBKDF2 키 → 페이로드별 AES-GCM 복호화 -----
+// 키 유도와 복호화는 워커에서 – 키는 워커 밖으로 나오지 않고, 복호화된 GLB 는 하나씩 넘어오는 대로 파싱된다
+// (다음 페이로드 복호화와 앞 모델의 파싱/렌더링이 겹친다). 워커를 못 쓰면 메인 스레드에서 같은 함수를 쓴다
+function b64Bytes(s){return Uint8Array.from(atob(s),c=>c.charCodeAt(0));}
+function payloadKey(password,info){
+  // 비밀번호가 틀리면 check 복호화(GCM 태그 검증)가 실패해 reject
+  return crypto.subtle.importKey("raw",new TextEncoder().encode(password),"PBKDF2",false,["deriveKey"])
+    .then(base=>crypto.subtle.deriveKey({name:"PBKDF2",hash:"SHA-256",salt:b64Bytes(info.salt),iterations:info.iter},base,{name:"AES-GCM",length:256},false,["decrypt"]))
+    .then(key=>payloadOpen(key,info.check).then(()=>key));
+}
+function payloadOpen(key,s){
+  const b=b64Bytes(s);   // IV 12바이트 + 암호문 + 태그
+  return crypto.subtle.decrypt({name:"AES-GCM",iv:b.subarray(0,12)},key,b.subarray(12));
+}
+let cryptoWorker=null,cryptoSeq=0,cryptoKeyMain=null,unlockPayloads=null;
+const cryptoJobs=new Map(),payloadsUnlocked=new Promise(res=>{unlockPayloads=res;});
+function startCryptoWorker(){
+  try{
+    const src=b64Bytes.toString()+payloadKey.toString()+payloadOpen.toString()+";let key=null;onmessage=e=>{const d=e.data;"+
+      "if(d.password!==undefined){payloadKey(d.password,d.info).then(k=>{key=k;postMessage({id:d.id,ok:true});},()=>postMessage({id:d.id,ok:false}));return;}"+
+      "payloadOpen(key,d.payload).then(buf=>postMessage({id:d.id,buf},[buf]),err=>postMessage({id:d.id,error:String(err)}));};";
+    cryptoWorker=new Worker(URL.createObjectURL(new Blob([src],{type:"text/javascript"})));
+    cryptoWorker.onmessage=e=>{const job=cryptoJobs.get(e.data.id);cryptoJobs.delete(e.data.id);if(job)job(e.data);};
+    cryptoWorker.onerror=()=>{cryptoWorker=null;cryptoJobs.forEach(job=>job({ok:false,error:"worker error"}));cryptoJobs.clear();};
+  }catch(e){cryptoWorker=null;}
+}
+function cryptoCall(msg){
+  return new Promise(res=>{const id=++cryptoSeq;cryptoJobs.set(id,res);cryptoWorker.postMessage(Object.assign({id},msg));});
+}
+function unlockWithPassword(password){
+  // → Promise<boolean> (맞으면 대기 중인 모델 복호화가 시작된다)
+  if(!cryptoWorker)startCryptoWorker();
+  const ok=cryptoWorker?cryptoCall({password,info:PAYLOAD_CRYPTO}).then(d=>d.ok)
+    :payloadKey(password,PAYLOAD_CRYPTO).then(k=>{cryptoKeyMain=k;return true;},()=>false);
+  return ok.then(v=>{if(v)unlockPayloads();return v;});
+}
+function payloadBytes(g){
+  // 페이로드 g → GLB ArrayBuffer (암호화돼 있으면 비밀번호 확인 뒤 복호화)
+  if(!PAYLOAD_CRYPTO)return Promise.resolve(b64Bytes(glbPayloads[g]).buffer);
+  return payloadsUnlocked.then(()=>cryptoKeyMain?payloadOpen(cryptoKeyMain,glbPayloads[g])
+    :cryptoCall({payload:glbPayloads[g]}).then(d=>{if(d.error)throw new Error(d.error);return d.buf;}));
+}
+
+// ----- 형상 캐시 (IndexedDB): 모델 hash(변환기가 넣는 내용 해시) → 디코드·법선 계산이 끝난 메시 배열 -----
+// 같은 케이스(또는 같은 모델)를 다시 열면 base64 디코드와 GLB 파싱을 건너뛴다
+// 전체 크기가 예산(저장소 할당량의 20%, 최대 256MB)을 넘으면 가장 오래 안 쓴 것부터 지운다 (LRU: 작은 lru 저장소만 훑는다)
+const GEO_DB="dlas-geometry",GEO_BUDGET_MAX=256*2**20,GEO_BUDGET_SHARE=0.2,GEO_GET_TIMEOUT_MS=400,GEO_PUT_DELAY_MS=1500;
+let geoDBPromise=null;
+function geoDB(){
+  if(!geoDBPromise)geoDBPromise=new Promise(res=>{
+    let req;
+    try{req=indexedDB.open(GEO_DB,1);}catch(e){res(null);return;}   // file:// 등에서 막히면 캐시 없이
+    req.onupgradeneeded=()=>{const db=req.result;db.createObjectStore("geo",{keyPath:"hash"});db.createObjectStore("lru",{keyPath:"hash"});};
+    req.onsuccess=()=>res(req.result);req.onerror=()=>res(null);req.onblocked=()=>res(null);
+  });
+  return geoDBPromise;
+}
+function geoCacheGet(hashes){
+  // hash → 항목 Map (읽은 항목은 사용 시각 갱신). 저장소가 느려도 로딩이 기다리지 않도록 제한 시간 뒤에는 빈 Map
+  if(!hashes.length||typeof indexedDB==="undefined")return Promise.resolve(new Map());
+  const work=geoDB().then(db=>new Promise(res=>{
+    const found=new Map();
+    if(!db){res(found);return;}
+    const tx=db.transaction(["geo","lru"],"readwrite"),geo=tx.objectStore("geo"),lru=tx.objectStore("lru"),now=Date.now();
+    hashes.forEach(h=>{const r=geo.get(h);r.onsuccess=()=>{const v=r.result;if(v){found.set(h,v);lru.put({hash:h,t:now,bytes:v.bytes});}};});
+    tx.oncomplete=()=>res(found);tx.onerror=tx.onabort=()=>res(found);
+  })).catch(()=>new Map());
+  return Promise.race([work,new Promise(res=>setTimeout(()=>res(new Map()),GEO_GET_TIMEOUT_MS))]);
+}
+function geoCachePut(entries){
+  if(!entries.length||typeof indexedDB==="undefined")return;
+  geoDB().then(db=>{
+    if(!db)return;
+    const tx=db.transaction(["geo","lru"],"readwrite"),geo=tx.objectStore("geo"),lru=tx.objectStore("lru"),now=Date.now();
+    entries.forEach(e=>{geo.put(e);lru.put({hash:e.hash,t:now,bytes:e.bytes});});
+    tx.oncomplete=()=>geoCacheEvict(db,1);
+    tx.onabort=()=>geoCacheEvict(db,0.5);   // 할당량 초과 등 – 다음에 들어갈 자리를 넉넉히 비운다
+  }).catch(()=>{});
+}
+function geoCacheEvict(db,share){
+  const est=navigator.storage&&navigator.storage.estimate?navigator.storage.estimate().catch(()=>({})):Promise.resolve({});
+  est.then(e=>{
+    const budget=(e.quota?Math.min(GEO_BUDGET_MAX,e.quota*GEO_BUDGET_SHARE):GEO_BUDGET_MAX/4)*share;
+    const tx=db.transaction(["geo","lru"],"readwrite"),geo=tx.objectStore("geo"),lru=tx.objectStore("lru"),r=lru.getAll();
+    r.onsuccess=()=>{
+      const all=r.result.sort((a,b)=>a.t-b.t);let total=all.reduce((s,x)=>s+x.bytes,0);
+      for(const x of all){if(total<=budget)break;geo.delete(x.hash);lru.delete(x.hash);total-=x.bytes;}
+    };
+  }).catch(()=>{});
+}
+function attrCopy(a){
+  if(!a.isInterleavedBufferAttribute)return a.array.slice();
+  const n=a.count,s=a.itemSize,d=a.data,out=new Float32Array(n*s);
+  for(let i=0;i<n;i++)for(let k=0;k<s;k++)out[i*s+k]=d.array[i*d.stride+a.offset+k];
+  return out;
+}
+function geoPack(hash,root){
+  // 모델 루트의 자체 행렬 + 루트 기준 메시 행렬/배열 (법선은 계산된 것을 그대로 저장)
+  root.updateWorldMatrix(true,true);
+  const inv=root.matrixWorld.clone().invert(),meshes=[];let bytes=0;
+  root.traverse(ch=>{
+    if(!ch.isMesh)return;
+    const g=ch.geometry,x={m:new THREE.Matrix4().multiplyMatrices(inv,ch.matrixWorld).toArray(),pos:attrCopy(g.attributes.position),
+      nrm:g.attributes.normal?attrCopy(g.attributes.normal):null,idx:g.index?g.index.array.slice():null};
+    bytes+=x.pos.byteLength+(x.nrm?x.nrm.byteLength:0)+(x.idx?x.idx.byteLength:0);meshes.push(x);
+  });
+  return{hash,root:root.matrix.toArray(),meshes,bytes};
+}
+function geoUnpack(e){
+  const root=new THREE.Group();root.applyMatrix4(new THREE.Matrix4().fromArray(e.root));
+  e.meshes.forEach(x=>{
+    const g=new THREE.BufferGeometry();g.setAttribute("position",new THREE.BufferAttribute(x.pos,3));
+    if(x.nrm)g.setAttribute("normal",new THREE.BufferAttribute(x.nrm,3));
+    if(x.idx)g.setIndex(new THREE.BufferAttribute(x.idx,1));
+    const m=new THREE.Mesh(g);m.applyMatrix4(new THREE.Matrix4().fromArray(x.m));root.add(m);
+  });
+  return root;
 }
-function animate(){requestAnimationFrame(animate);controls.update();renderer.render(scene,camera);updateAnnotationPositions();}
 
 function loadAllModels(){
+  geoCacheGet([...new Set(modelData.map(md=>md.hash).filter(Boolean))]).then(loadModelsFrom);
+}
+function loadModelsFrom(cached){
+  // 페이로드당 한 번만 디코드/파싱, 같은 페이로드를 쓰는 모델은 geometry를 공유하는 clone
+  // glbPacked: 페이로드 하나에 모델별 노드 – extras.name(userData.name)으로 찾아 장면에 옮긴다
+  // 캐시에 있는 모델은 페이로드를 건드리지 않는다 (같은 hash 는 한 번만 복원해 clone)
+  const parsed={},taken=new Set(),normals=new Set(),restored=new Map(),toPack=new Map(),loads=[];
   modelData.forEach(md=>{
-    const bin=Uint8Array.from(atob(md.b64),c=>c.charCodeAt(0));
-    new THREE.GLTFLoader().parse(bin.buffer,"",gltf=>{
-      const m=gltf.scene;const col=gColor(md.group);
-      m.traverse(ch=>{if(ch.isMesh){ch.geometry.computeVertexNormals();ch.material=new THREE.MeshPhongMaterial({color:col,side:THREE.DoubleSide,shininess:30,specular:0x111111,opacity:1,transparent:false});}});scene.add(m);
-      stlModels.push({name:md.name,object:m,group:md.group});
-    });
+    let p;
+    if(md.hash&&cached.has(md.hash)){
+      let r=restored.get(md.hash);
+      if(r)r=r.clone();else{r=geoUnpack(cached.get(md.hash));restored.set(md.hash,r);}
+      p=Promise.resolve(r);
+    }else{
+      if(!parsed[md.glb])parsed[md.glb]=payloadBytes(md.glb).then(buf=>new Promise(res=>{
+        new THREE.GLTFLoader().parse(buf,"",gltf=>{gltf.scene.traverse(ch=>{if(ch.isMesh&&!normals.has(ch.geometry)){normals.add(ch.geometry);ch.geometry.computeVertexNormals();}});res(gltf.scene);});
+      })).catch(e=>{console.error("모델 데이터를 읽을 수 없습니다:",e);return null;});
+      p=parsed[md.glb].then(src=>{
+        let m=null;
+        if(!src)return null;
+        if(glbPacked){src.traverse(o=>{if(!m&&o.userData.name===md.name)m=o;});}
+        else{m=taken.has(md.glb)?src.clone():src;taken.add(md.glb);}
+        if(m&&md.hash&&!toPack.has(md.hash))toPack.set(md.hash,m);
+        return m;
+      });
+    }
+    loads.push(p.then(m=>{
+      if(!m||!modelData.includes(md))return;   // 로딩 중에 삭제됨 (사이드카 등)
+      scene.add(m);
+      const it={name:md.name,object:m,group:md.group,opacity:1};stlModels.push(it);applyModelState(it,md);
+      m.traverse(ch=>{if(ch.isMesh)queueBVH(ch);});
+    }));
+  });
+  Promise.all(loads).then(()=>{
+    setTimeout(buildBatches,0);
+    // 새로 디코드한 모델은 첫 화면이 뜬 뒤에 캐시에 저장 (배열 복사가 로딩과 겹치지 않게)
+    if(toPack.size){
+      geoPackPending=true;
+      setTimeout(()=>{geoCachePut([...toPack].map(([h,m])=>geoPack(h,m)));geoPackPending=false;releaseSourceNormals();},GEO_PUT_DELAY_MS);
+    }
   });
 }
 
 const ray=new THREE.Raycaster();const mouse=new THREE.Vector2();let annoMenuDiv=null;
+
+// ----- 피킹 가속: 메시(geometry)별 BVH – 로드 직후 워커에서 한 번 만들고 주석/회전 중심/호버 피킹에 모두 사용 -----
+// 노드: nodes[6n..] = 경계 상자(min xyz, max xyz), links[4n..] = 왼쪽, 오른쪽, 시작, 개수 (개수>0 이면 잎 – tris[시작..])
+const BVH_LEAF=8,SNAP_PX=10;
+const bvhByGeometry=new WeakMap(),bvhPending=new WeakSet(),bvhJobs=new Map();
+let bvhWorker=null,bvhSeq=0;
+function buildBVH(pos,idx,triCount,leaf){
+  const cen=new Float32Array(triCount*3),box=new Float32Array(triCount*6),tris=new Uint32Array(triCount);
+  for(let t=0;t<triCount;t++){
+    tris[t]=t;
+    for(let a=0;a<3;a++){
+      let mn=Infinity,mx=-Infinity;
+      for(let k=0;k<3;k++){const v=pos[(idx?idx[t*3+k]:t*3+k)*3+a];if(v<mn)mn=v;if(v>mx)mx=v;}
+      box[t*6+a]=mn;box[t*6+3+a]=mx;cen[t*3+a]=(mn+mx)/2;
+    }
+  }
+  const maxNodes=Math.max(1,2*triCount-1),nodes=new Float32Array(maxNodes*6),links=new Uint32Array(maxNodes*4);
+  let count=1;const stack=[0,0,triCount];
+  while(stack.length){
+    const end=stack.pop(),start=stack.pop(),n=stack.pop();
+    const bmin=[Infinity,Infinity,Infinity],bmax=[-Infinity,-Infinity,-Infinity],cmin=[Infinity,Infinity,Infinity],cmax=[-Infinity,-Infinity,-Infinity];
+    for(let i=start;i<end;i++){
+      const t=tris[i];
+      for(let a=0;a<3;a++){
+        if(box[t*6+a]<bmin[a])bmin[a]=box[t*6+a];if(box[t*6+3+a]>bmax[a])bmax[a]=box[t*6+3+a];
+        const c=cen[t*3+a];if(c<cmin[a])cmin[a]=c;if(c>cmax[a])cmax[a]=c;
+      }
+    }
+    nodes.set(bmin,n*6);nodes.set(bmax,n*6+3);
+    if(end-start<=leaf){links[n*4+2]=start;links[n*4+3]=end-start;continue;}
+    // 무게중심 범위가 가장 긴 축의 중간에서 나눈다 (한쪽이 비면 개수 절반)
+    const ext=[cmax[0]-cmin[0],cmax[1]-cmin[1],cmax[2]-cmin[2]],axis=ext[0]>=ext[1]&&ext[0]>=ext[2]?0:ext[1]>=ext[2]?1:2,split=(cmin[axis]+cmax[axis])/2;
+    let i=start,j=end-1;
+    while(i<=j){if(cen[tris[i]*3+axis]<split)i++;else{const tmp=tris[i];tris[i]=tris[j];tris[j]=tmp;j--;}}
+    const mid=(i===start||i===end)?(start+end)>>1:i,l=count++,rt=count++;
+    links[n*4]=l;links[n*4+1]=rt;links[n*4+3]=0;
+    stack.push(l,start,mid,rt,mid,end);
+  }
+  return{nodes:nodes.slice(0,count*6),links:links.slice(0,count*4),tris};
+}
+function bvhIntersect(bvh,ox,oy,oz,dx,dy,dz,side){
+  // 가장 가까운 교차 {t, tri, a, b, c} 또는 null (Möller–Trumbore, side: 0 앞면 / 1 뒷면 / 2 양면)
+  const{nodes,links,tris,pos,idx}=bvh,ix=1/dx,iy=1/dy,iz=1/dz,stack=[0];
+  let best=Infinity,hit=null;
+  while(stack.length){
+    const n=stack.pop(),o=n*6;
+    let t0=((ix>=0?nodes[o]:nodes[o+3])-ox)*ix,t1=((ix>=0?nodes[o+3]:nodes[o])-ox)*ix;
+    const ty0=((iy>=0?nodes[o+1]:nodes[o+4])-oy)*iy,ty1=((iy>=0?nodes[o+4]:nodes[o+1])-oy)*iy;
+    if(ty0>t0)t0=ty0;if(ty1<t1)t1=ty1;
+    const tz0=((iz>=0?nodes[o+2]:nodes[o+5])-oz)*iz,tz1=((iz>=0?nodes[o+5]:nodes[o+2])-oz)*iz;
+    if(tz0>t0)t0=tz0;if(tz1<t1)t1=tz1;
+    if(t1<0||t0>t1||t0>best)continue;
+    const cnt=links[n*4+3];
+    if(!cnt){stack.push(links[n*4],links[n*4+1]);continue;}
+    for(let k=links[n*4+2],e=k+cnt;k<e;k++){
+      const t=tris[k],a=(idx?idx[t*3]:t*3)*3,b=(idx?idx[t*3+1]:t*3+1)*3,c=(idx?idx[t*3+2]:t*3+2)*3;
+      const e1x=pos[b]-pos[a],e1y=pos[b+1]-pos[a+1],e1z=pos[b+2]-pos[a+2],e2x=pos[c]-pos[a],e2y=pos[c+1]-pos[a+1],e2z=pos[c+2]-pos[a+2];
+      const px=dy*e2z-dz*e2y,py=dz*e2x-dx*e2z,pz=dx*e2y-dy*e2x,det=e1x*px+e1y*py+e1z*pz;
+      if(side===0?det<1e-12:side===1?det>-1e-12:Math.abs(det)<1e-12)continue;
+      const inv=1/det,sx=ox-pos[a],sy=oy-pos[a+1],sz=oz-pos[a+2],u=(sx*px+sy*py+sz*pz)*inv;
+      if(u<0||u>1)continue;
+      const qx=sy*e1z-sz*e1y,qy=sz*e1x-sx*e1z,qz=sx*e1y-sy*e1x,v=(dx*qx+dy*qy+dz*qz)*inv;
+      if(v<0||u+v>1)continue;
+      const tt=(e2x*qx+e2y*qy+e2z*qz)*inv;
+      if(tt>1e-9&&tt<best){best=tt;hit={t:tt,tri:t,a:a/3,b:b/3,c:c/3};}
+    }
+  }
+  return hit;
+}
+const _bvhInv=new THREE.Matrix4(),_bvhRay=new THREE.Ray();
+function bvhRaycast(raycaster,intersects){
+  // Mesh.raycast 대체 – BVH가 아직 없으면 기본 구현, 숨겨진 모델(상위 포함)은 건너뛴다
+  for(let o=this;o;o=o.parent)if(!o.visible)return;
+  const bvh=bvhByGeometry.get(this.geometry);
+  if(!bvh)return THREE.Mesh.prototype.raycast.call(this,raycaster,intersects);
+  _bvhInv.copy(this.matrixWorld).invert();_bvhRay.copy(raycaster.ray).applyMatrix4(_bvhInv);
+  const lo=_bvhRay.origin,ld=_bvhRay.direction,h=bvhIntersect(bvh,lo.x,lo.y,lo.z,ld.x,ld.y,ld.z,this.material.side);
+  if(!h)return;
+  const point=_bvhRay.at(h.t,new THREE.Vector3()).applyMatrix4(this.matrixWorld),distance=raycaster.ray.origin.distanceTo(point);
+  if(distance<raycaster.near||distance>raycaster.far)return;
+  intersects.push({distance,point,object:this,faceIndex:h.tri,face:{a:h.a,b:h.b,c:h.c}});
+}
+function startBVHWorker(){
+  try{
+    const src=buildBVH.toString()+";onmessage=e=>{const d=e.data,b=buildBVH(d.pos,d.idx,d.count,d.leaf);postMessage({id:d.id,nodes:b.nodes,links:b.links,tris:b.tris},[b.nodes.buffer,b.links.buffer,b.tris.buffer]);};";
+    bvhWorker=new Worker(URL.createObjectURL(new Blob([src],{type:"text/javascript"})));
+    bvhWorker.onmessage=e=>{const job=bvhJobs.get(e.data.id);bvhJobs.delete(e.data.id);if(job)job.done(e.data);};
+    bvhWorker.onerror=()=>{bvhWorker=null;bvhJobs.forEach(job=>buildBVHLater(job));bvhJobs.clear();};   // 워커를 못 쓰면 메인 스레드에서
+  }catch(e){bvhWorker=null;}
+}
+function buildBVHLater(job){setTimeout(()=>job.done(buildBVH(job.pos,job.idx,job.count,BVH_LEAF)),0);}
+function queueBVH(mesh){
+  const g=mesh.geometry,pa=g.attributes.position;
+  mesh.raycast=bvhRaycast;
+  if(!pa||bvhByGeometry.has(g)||bvhPending.has(g))return;
+  bvhPending.add(g);
+  let pos=pa.array;
+  if(pa.isInterleavedBufferAttribute||pa.itemSize!==3||!(pos instanceof Float32Array)){
+    pos=new Float32Array(pa.count*3);for(let i=0;i<pa.count;i++){pos[i*3]=pa.getX(i);pos[i*3+1]=pa.getY(i);pos[i*3+2]=pa.getZ(i);}
+  }
+  const idx=g.index?g.index.array:null,count=Math.floor((idx?idx.length:pa.count)/3);
+  const job={pos,idx,count,done:b=>{bvhPending.delete(g);bvhByGeometry.set(g,{nodes:b.nodes,links:b.links,tris:b.tris,pos,idx});}};
+  if(!bvhWorker){buildBVHLater(job);return;}
+  const id=++bvhSeq,pc=pos.slice(),ic=idx?idx.slice():null;
+  bvhJobs.set(id,job);
+  bvhWorker.postMessage({id,pos:pc,idx:ic,count,leaf:BVH_LEAF},ic?[pc.buffer,ic.buffer]:[pc.buffer]);
+}
+function pickAt(cx,cy,snap){
+  // 화면 좌표 → 모델 표면 점 (snap: 맞은 삼각형의 꼭짓점이 SNAP_PX 안이면 그 꼭짓점으로)
+  const r=renderer.domElement.getBoundingClientRect();
+  mouse.x=((cx-r.left)/r.width)*2-1;mouse.y=-((cy-r.top)/r.height)*2+1;
+  ray.setFromCamera(mouse,camera);
+  const hit=ray.intersectObjects(stlModels.map(it=>it.object),true)[0];
+  if(!hit)return null;
+  if(!snap||!hit.face)return hit.point.clone();
+  const pa=hit.object.geometry.attributes.position;let best=hit.point.clone(),bd=SNAP_PX*SNAP_PX;
+  [hit.face.a,hit.face.b,hit.face.c].forEach(i=>{
+    const w=new THREE.Vector3().fromBufferAttribute(pa,i).applyMatrix4(hit.object.matrixWorld),sp=w.clone().project(camera);
+    const ddx=(sp.x*0.5+0.5)*r.width-(cx-r.left),ddy=(-sp.y*0.5+0.5)*r.height-(cy-r.top),d=ddx*ddx+ddy*ddy;
+    if(d<bd){bd=d;best=w;}
+  });
+  return best;
+}
+let hoverReq=0,hoverXY=null;
+function hidePickMarker(){document.getElementById("pickMarker").style.display="none";}
+function onHoverViewer(e){
+  // 주석 추가 모드에서만 – 프레임당 한 번 피킹해 놓일 위치(스냅 포함)를 미리 보여준다
+  if(!document.getElementById("addAnnoBtn").classList.contains("active")){hidePickMarker();return;}
+  hoverXY=[e.clientX,e.clientY];
+  if(hoverReq)return;
+  hoverReq=requestAnimationFrame(()=>{
+    hoverReq=0;const p=pickAt(hoverXY[0],hoverXY[1],true),mk=document.getElementById("pickMarker");
+    if(!p){mk.style.display="none";return;}
+    const v=p.project(camera);mk.style.left=((v.x*0.5+0.5)*window.innerWidth)+"px";mk.style.top=((-v.y*0.5+0.5)*window.innerHeight)+"px";mk.style.display="block";
+  });
+}
 let annotationID=annotationList.length?Math.max(...annotationList.map(a=>parseInt((a.id||"").split("_")[1]||0))):0;
 function restoreAnnotations(){
   annotationList.forEach(a=>{
@@ -1426,74 +2504,20 @@ function bindTreeEvents(){
   document.querySelectorAll(".collapseBtn").forEach(btn=>{btn.onclick=()=>{const tgt=document.getElementById(btn.dataset.target);if(!tgt)return;const hidden=tgt.style.display==="none";tgt.style.display=hidden?"":"none";btn.textContent=hidden?"▼":"▶";collapseState[btn.dataset.target]=hidden;};});
   document.querySelectorAll(".groupToggle").forEach(btn=>{let state=true;btn.onclick=()=>{state=!state;btn.classList.toggle("off",!state);const grp=btn.dataset.group;if(grp==="all"){stlModels.forEach(it=>it.object.visible=state);annotationList.forEach(a=>a.div&&(a.div.style.display=state?"":"none"));document.querySelectorAll(".groupToggle,.subgroupToggle,.modelToggle").forEach(b=>{if(b!==btn)b.classList.toggle("off",!state);});return;}if(grp==="annotation"){annotationList.forEach(a=>a.div&&(a.div.style.display=state?"":"none"));return;}stlModels.forEach(it=>{const[k1]=groupKey(it.group);if(grp==="bite"&&k1==="bite")it.object.visible=state;else if(grp==="etc"&&k1==="etc")it.object.visible=state;else if(k1===grp)it.object.visible=state;});};});
   document.querySelectorAll(".subgroupToggle").forEach(btn=>{let state=true;btn.onclick=()=>{state=!state;btn.classList.toggle("off",!state);const grp=btn.dataset.group,sub=btn.dataset.sub;stlModels.forEach(it=>{const[k1,k2]=groupKey(it.group);if(k1===grp&&k2===sub)it.object.visible=state;});};});
-  document.querySelectorAll(".modelToggle").forEach(btn=>{let state=true;btn.onclick=()=>{state=!state;btn.classList.toggle("off",!state);const nm=btn.dataset.name;stlModels.forEach(it=>{if(it.name===nm)it.object.visible=state;});};});
+  document.querySelectorAll(".modelToggle").forEach(btn=>{const cur=stlModels.find(it=>it.name===btn.dataset.name);let state=!cur||cur.object.visible;btn.classList.toggle("off",!state);btn.onclick=()=>{state=!state;btn.classList.toggle("off",!state);const nm=btn.dataset.name;stlModels.forEach(it=>{if(it.name===nm)it.object.visible=state;});};});
   document.querySelectorAll(".modelEdit").forEach(btn=>btn.onclick=()=>openGroupSelectModal(btn.dataset.name))
   document.querySelectorAll(".modelDelete").forEach(btn=>btn.onclick=()=>deleteModel(btn.dataset.name))
   document.querySelectorAll(".annotationItem").forEach(btn=>btn.onclick=e=>{const ann=annotationList.find(a=>a.id===btn.dataset.id);if(ann)showAnnoMenu(ann,e.pageX,e.pageY);});
 
-  // 투명도 슬라이더 이벤트 (모델, 그룹, 서브그룹)
+  // 투명도 슬라이더 이벤트 (모델, 그룹, 서브그룹) – 재질 값을 바꾸지 않고 (그룹, 투명도) 공유 재질로 교체
   document.querySelectorAll(".opacity-slider").forEach(slider=>{
     slider.oninput=e=>{
-      const opacity=parseInt(e.target.value)/100;
-
-      // 모델 아이템 슬라이더
-      if(e.target.dataset.name){
-        const name=e.target.dataset.name;
-        stlModels.forEach(it=>{
-          if(it.name===name){
-            it.object.traverse(ch=>{
-              if(ch.isMesh){
-                ch.material.opacity=opacity;
-                ch.material.transparent=opacity<1;
-              }
-            });
-          }
-        });
-      }
-
-      // 그룹 슬라이더
-      else if(e.target.classList.contains('group-opacity')){
-        const grp=e.target.dataset.group;
-        if(grp==="all"){
-          stlModels.forEach(it=>{
-            it.object.traverse(ch=>{
-              if(ch.isMesh){
-                ch.material.opacity=opacity;
-                ch.material.transparent=opacity<1;
-              }
-            });
-          });
-        }else{
-          stlModels.forEach(it=>{
-            const[k1]=groupKey(it.group);
-            if((grp==="bite"&&k1==="bite")||(grp==="etc"&&k1==="etc")||(k1===grp)){
-              it.object.traverse(ch=>{
-                if(ch.isMesh){
-                  ch.material.opacity=opacity;
-                  ch.material.transparent=opacity<1;
-                }
-              });
-            }
-          });
-        }
-      }
-
-      // 서브그룹 슬라이더
-      else if(e.target.classList.contains('subgroup-opacity')){
-        const grp=e.target.dataset.group;
-        const sub=e.target.dataset.sub;
-        stlModels.forEach(it=>{
-          const[k1,k2]=groupKey(it.group);
-          if(k1===grp&&k2===sub){
-            it.object.traverse(ch=>{
-              if(ch.isMesh){
-                ch.material.opacity=opacity;
-                ch.material.transparent=opacity<1;
-              }
-            });
-          }
-        });
-      }
+      const opacity=parseInt(e.target.value)/100,ds=e.target.dataset;
+      let pick=null;
+      if(ds.name)pick=it=>it.name===ds.name;
+      else if(e.target.classList.contains('group-opacity'))pick=ds.group==="all"?()=>true:it=>groupKey(it.group)[0]===ds.group;
+      else if(e.target.classList.contains('subgroup-opacity'))pick=it=>{const[k1,k2]=groupKey(it.group);return k1===ds.group&&k2===ds.sub;};
+      if(pick)stlModels.forEach(it=>{if(pick(it))setModelOpacity(it,opacity);});
     };
   });
 }
@@ -1503,7 +2527,7 @@ function setupOpacityDrag(span,getTargets){
     function move(ev){
       let ratio=Math.min(Math.max((ev.clientX-startX)/max,0),1);
       let op=0.2+0.8*ratio;
-      stlModels.forEach(it=>{if(getTargets(it)){it.object.traverse(ch=>{if(ch.isMesh){ch.material.opacity=op;ch.material.transparent=op<1;}});}});
+      stlModels.forEach(it=>{if(getTargets(it))setModelOpacity(it,op);});
     }
     function up(){document.removeEventListener("mousemove",move);document.removeEventListener("mouseup",up);}
     document.addEventListener("mousemove",move);document.addEventListener("mouseup",up);
@@ -1515,7 +2539,7 @@ function setupOpacityDrag(span,getTargets){
       function move(ev){
         let ratio=Math.min(Math.max((ev.touches[0].clientX-startX)/max,0),1);
         let op=0.2+0.8*ratio;
-        stlModels.forEach(it=>{if(getTargets(it)){it.object.traverse(ch=>{if(ch.isMesh){ch.material.opacity=op;ch.material.transparent=op<1;}});}});
+        stlModels.forEach(it=>{if(getTargets(it))setModelOpacity(it,op);});
       }
       function up(){document.removeEventListener("touchmove",move);document.removeEventListener("touchend",up);}
       document.addEventListener("touchmove",move);document.addEventListener("touchend",up);
@@ -1534,16 +2558,85 @@ function openGroupSelectModal(name){
   box.innerHTML="<h3 style='margin-top:0'>Select Group</h3>";
   [["upper_crownbridge","Upper Crown/Bridge"],["upper_abutment","Upper Abutment"],["upper_scan","Upper Scan"],["lower_crownbridge","Lower Crown/Bridge"],["lower_abutment","Lower Abutment"],["lower_scan","Lower Scan"],["bite","Bite"],["etc","Etc"],["annotation","Annotation"]].forEach(([gid,label])=>{const b=document.createElement("button");b.textContent=label;b.onclick=()=>{if(md.group!==gid){md.group=gid;recolor(gid);updateGroupPanel();}modal.style.display="none";};box.appendChild(b);});
   const cancel=document.createElement("button");cancel.textContent="Cancel";cancel.className="cancelBtn";cancel.onclick=()=>modal.style.display="none";box.appendChild(cancel);modal.style.display="flex";
-  function recolor(g){stlModels.forEach(it=>{if(it.name===md.name){it.group=g;it.object.traverse(ch=>{if(ch.isMesh)ch.material.color.setHex(gColor(g));});}});}
+  function recolor(g){stlModels.forEach(it=>{if(it.name===md.name){it.group=g;applyMaterial(it);}});}
+}
+function removeModel(name){const idx=modelData.findIndex(m=>m.name===name);if(idx===-1)return;modelData.splice(idx,1);const sidx=stlModels.findIndex(m=>m.name===name);if(sidx>=0){scene.remove(stlModels[sidx].object);stlModels.splice(sidx,1);}updateGroupPanel();}
+function deleteModel(name){if(!confirm("Delete this model?"))return;removeModel(name);}
+
+// ----- 사이드카 (<파일명>.dlas.json): 주석/뷰/표시 상태만 주고받는다 – 모델이 든 HTML 전체를 다시 보낼 필요 없음 -----
+const sidecarName=fileName.replace(/\.html?$$/i,"")+".dlas.json";
+const bakedModels=new Map(modelData.map(m=>[m.name,{group:m.group,displayName:m.displayName,visible:m.visible!==false,opacity:m.opacity==null?1:m.opacity}]));
+function applyModelState(it,md){
+  it.group=md.group;it.object.visible=md.visible!==false;setModelOpacity(it,md.opacity==null?1:md.opacity);
+}
+function currentModelState(md){
+  const it=stlModels.find(s=>s.name===md.name);
+  if(!it)return{visible:md.visible!==false,opacity:md.opacity==null?1:md.opacity};
+  return{visible:it.object.visible,opacity:it.opacity==null?1:it.opacity};
+}
+function buildSidecar(){
+  const models={};
+  modelData.forEach(md=>{
+    const b=bakedModels.get(md.name)||{},st=currentModelState(md),d={};
+    if(md.group!==b.group)d.group=md.group;
+    if(md.displayName!==b.displayName)d.displayName=md.displayName;
+    if(st.visible!==b.visible)d.visible=st.visible;
+    if(st.opacity!==b.opacity)d.opacity=st.opacity;
+    if(Object.keys(d).length)models[md.name]=d;
+  });
+  bakedModels.forEach((_,n)=>{if(!modelData.some(m=>m.name===n))models[n]={deleted:true};});
+  return{format:"dlas-sidecar",version:1,source:decodeURIComponent(fileName),models,annotations:annPlainList(),views:viewPlainList()};
+}
+function applySidecar(sc){
+  if(!sc||sc.format!=="dlas-sidecar")throw new Error("DLAS 노트 파일이 아닙니다.");
+  Object.entries(sc.models||{}).forEach(([name,d])=>{
+    const md=modelData.find(m=>m.name===name);if(!md||!d)return;
+    if(d.deleted){removeModel(name);return;}
+    ["group","displayName","visible","opacity"].forEach(k=>{if(k in d)md[k]=d[k];});
+    stlModels.forEach(it=>{if(it.name===name)applyModelState(it,md);});
+  });
+  if(Array.isArray(sc.annotations)){
+    annotationList.forEach(a=>a.div&&a.div.remove());
+    annotationList=sc.annotations.filter(a=>a&&Array.isArray(a.pos)).map(a=>({id:String(a.id),text:String(a.text),pos:a.pos}));
+    annotationID=annotationList.reduce((mx,a)=>Math.max(mx,parseInt(a.id.split("_")[1])||0),0);
+    restoreAnnotations();
+  }
+  if(Array.isArray(sc.views)){savedViews=sc.views.filter(v=>v&&Array.isArray(v.pos)&&Array.isArray(v.tgt)).map(viewFromPlain);updateViewButtons();}
+  updateGroupPanel();updateAnnotationPositions();
+}
+async function exportSidecar(){
+  const blob=new Blob([JSON.stringify(buildSidecar(),null,1)],{type:"application/json"});
+  if(window.showSaveFilePicker){
+    try{
+      const h=await window.showSaveFilePicker({suggestedName:decodeURIComponent(sidecarName),types:[{description:'DLAS Notes',accept:{'application/json':['.json']}}]});
+      const w=await h.createWritable();await w.write(blob);await w.close();return;
+    }catch(e){if(e.name==="AbortError")return;console.warn('Export failed:',e);}
+  }
+  downloadBlob(blob,decodeURIComponent(sidecarName));
 }
-function deleteModel(name){if(!confirm("Delete this model?"))return;const idx=modelData.findIndex(m=>m.name===name);if(idx===-1)return;modelData.splice(idx,1);const sidx=stlModels.findIndex(m=>m.name===name);if(sidx>=0){scene.remove(stlModels[sidx].object);stlModels.splice(sidx,1);}updateGroupPanel();}
+function importSidecar(){
+  const input=document.getElementById("importNotesInput");
+  input.onchange=async()=>{
+    const f=input.files[0];input.value="";if(!f)return;
+    try{applySidecar(JSON.parse(await f.text()));}catch(e){alert("노트를 불러오지 못했습니다: "+e.message);}
+  };
+  input.click();
+}
+function loadSidecarNextToFile(){
+  // 서버(viewer_server)·일부 브라우저의 file:// 에서만 가능 – 안 되면 조용히 넘어간다
+  if(!/^(https?|file|capacitor):$$/.test(location.protocol))return;
+  fetch(sidecarName,{cache:"no-cache"}).then(r=>r.ok?r.json():null).then(sc=>{if(sc&&sc.format==="dlas-sidecar")applySidecar(sc);}).catch(()=>{});
+}
+function downloadBlob(blob,n){const a=document.createElement("a");a.href=URL.createObjectURL(blob);a.download=n;a.style.display="none";document.body.appendChild(a);a.click();URL.revokeObjectURL(a.href);document.body.removeChild(a);}
 
 async function saveHTML(){
-  document.querySelectorAll('.annotation').forEach(el=>el.remove());
-  const mdlPlain=modelData.map(({name,b64,group,displayName})=>({name,b64,group,displayName}));
-  const annPlain=annotationList.map(o=>({id:o.id,text:o.text,pos:[o.pos.x,o.pos.y,o.pos.z]}));
-  let html=_BASE_HTML.replace(/let\\s+modelData\\s*=\\s*\\[[\\s\\S]*?\\];/,'let modelData = '+safeStringify(mdlPlain)+';').replace(/let\\s+annotationList\\s*=\\s*[\\s\\S]*?;/,'let annotationList = '+safeStringify(annPlain)+';');
-  const blob=new Blob([html],{type:'text/html'});
+  const used=[...new Set(modelData.map(m=>m.glb))],remap=new Map(used.map((g,i)=>[g,i]));   // 삭제된 모델만 쓰던 페이로드는 버린다
+  const mdlPlain=modelData.map(md=>{const{name,glb,group,displayName}=md,st=currentModelState(md),o={name,glb:remap.get(glb),group,displayName};if(md.hash)o.hash=md.hash;if(!st.visible)o.visible=false;if(st.opacity<1)o.opacity=st.opacity;return o;});
+  // 페이로드 문자열은 이어 붙이지 않고 Blob 조각으로 넘긴다 (저장 순간에도 문서 크기의 문자열을 새로 만들지 않음)
+  const parts=[_SHELL_HTML[0],"\nconst glbPayloads=["];
+  used.forEach((g,i)=>parts.push(i?",\n'":"'",glbPayloads[g],"'"));
+  parts.push("];\nconst glbPacked="+glbPacked+";\nlet modelData="+safeStringify(mdlPlain)+";\nlet annotationList = "+safeStringify(annPlainList())+";\nlet viewList = "+safeStringify(viewPlainList())+";\n",_SHELL_HTML[1]);
+  const blob=new Blob(parts,{type:'text/html'});
   if(window.showSaveFilePicker){
     try{
       if(!fileHandle){
@@ -1554,11 +2647,11 @@ async function saveHTML(){
     }catch(e){console.warn('Save failed / cancelled:',e);}
   }
   let n=prompt("Save as file name:",fileName)||fileName;if(!n.toLowerCase().endsWith(".html"))n+=".html";
-  const a=document.createElement("a");a.href=URL.createObjectURL(blob);a.download=n;a.style.display="none";document.body.appendChild(a);a.click();URL.revokeObjectURL(a.href);document.body.removeChild(a);
+  downloadBlob(blob,n);
 }
 
 function toggleAddAnno(){document.getElementById("addAnnoBtn").onclick=e=>e.target.classList.toggle("active");}
-function onClickViewer(e){const btn=document.getElementById("addAnnoBtn");if(!btn.classList.contains("active"))return;const r=renderer.domElement.getBoundingClientRect();mouse.x=((e.clientX-r.left)/r.width)*2-1;mouse.y=-((e.clientY-r.top)/r.height)*2+1;ray.setFromCamera(mouse,camera);const hits=ray.intersectObjects(scene.children,true);if(!hits.length)return;const pos=hits[0].point.clone();const txt=prompt("Annotation text:");if(!txt)return;const div=document.createElement("div");div.className="annotation";div.textContent=txt;document.body.appendChild(div);const id="anno_"+(++annotationID);const obj={id:id,text:txt,pos:pos,div:div};annotationList.push(obj);div.onclick=ev=>showAnnoMenu(obj,ev.pageX,ev.pageY);updateGroupPanel();btn.classList.remove("active");updateAnnotationPositions();}
+function onClickViewer(e){const btn=document.getElementById("addAnnoBtn");if(!btn.classList.contains("active"))return;const pos=pickAt(e.clientX,e.clientY,true);if(!pos)return;hidePickMarker();const txt=prompt("Annotation text:");if(!txt)return;const div=document.createElement("div");div.className="annotation";div.textContent=txt;document.body.appendChild(div);const id="anno_"+(++annotationID);const obj={id:id,text:txt,pos:pos,div:div};annotationList.push(obj);div.onclick=ev=>showAnnoMenu(obj,ev.pageX,ev.pageY);updateGroupPanel();btn.classList.remove("active");updateAnnotationPositions();}
 function removeAnnoById(id){const idx=annotationList.findIndex(a=>a.id===id);if(idx===-1)return;const ann=annotationList.splice(idx,1)[0];ann.div.remove();updateGroupPanel();}
 function showAnnoMenu(ann,x,y){closeAnnoMenu();annoMenuDiv=document.createElement("div");annoMenuDiv.className="annoMenu";annoMenuDiv.style.left=x+"px";annoMenuDiv.style.top=y+"px";const bEdit=document.createElement("button");bEdit.textContent="Edit";const bDel=document.createElement("button");bDel.textContent="Delete";bEdit.onclick=()=>{const nv=prompt("Edit annotation:",ann.text);if(!nv)return;ann.text=nv;ann.div.textContent=nv;updateGroupPanel();closeAnnoMenu();};bDel.onclick=()=>{removeAnnoById(ann.id);closeAnnoMenu();};annoMenuDiv.appendChild(bEdit);annoMenuDiv.appendChild(bDel);document.body.appendChild(annoMenuDiv);}
 function closeAnnoMenu(){if(annoMenuDiv){annoMenuDiv.remove();annoMenuDiv=null;}}
@@ -1566,14 +2659,9 @@ document.addEventListener("click",e=>{if(annoMenuDiv&&!annoMenuDiv.contains(e.ta
 function updateAnnotationPositions(){annotationList.forEach(a=>{if(!a.pos||!a.div)return;const v=a.pos.clone().project(camera);a.div.style.left=((v.x*0.5+0.5)*window.innerWidth)+"px";a.div.style.top=((-v.y*0.5+0.5)*window.innerHeight)+"px";});}
 
 function focusToPoint(cx,cy){
-  const r=renderer.domElement.getBoundingClientRect();
-  mouse.x=((cx-r.left)/r.width)*2-1;
-  mouse.y=-((cy-r.top)/r.height)*2+1;
-  ray.setFromCamera(mouse,camera);
-  const hits=ray.intersectObjects(scene.children,true);
-  if(!hits.length)return;
+  const targetPoint=pickAt(cx,cy,false);
+  if(!targetPoint)return;
 
-  const targetPoint=hits[0].point.clone();
   const offset=new THREE.Vector3().subVectors(camera.position,controls.target);
 
   // 부드러운 애니메이션을 위한 시작/목표 위치
@@ -1608,7 +2696,7 @@ function focusToPoint(cx,cy){
   animate();
 }
 function enableFocusEvents(){
-  const dom=renderer.domElement;
+  const dom=document.getElementById("viewer");
 
   // 마우스 중간 버튼으로 회전 중심 설정
   dom.addEventListener("mousedown",e=>{
@@ -1782,8 +2870,8 @@ function initMobileUI(){
     return hashArray.map(b => b.toString(16).padStart(2, '0')).join('');
   }
 
-  // 세션 스토리지에서 인증 상태 확인
-  const isAuthenticated = sessionStorage.getItem('dlas_authenticated') === 'true';
+  // 세션 스토리지에서 인증 상태 확인 (암호화된 케이스는 복호화 키가 필요하므로 매번 입력)
+  const isAuthenticated = !PAYLOAD_CRYPTO && sessionStorage.getItem('dlas_authenticated') === 'true';
 
   if(!isAuthenticated){
     // 모달 표시
@@ -1793,11 +2881,15 @@ function initMobileUI(){
     // 확인 버튼 클릭
     async function checkPassword(){
       const inputValue = input.value;
-      const hash = await sha256(inputValue);
+      if(submitBtn.disabled) return;
+      // 암호화된 케이스: 키 유도(PBKDF2)에 잠깐 걸리므로 버튼을 잠근다
+      submitBtn.disabled = true;
+      const ok = PAYLOAD_CRYPTO ? await unlockWithPassword(inputValue) : (await sha256(inputValue)) === PASSWORD_HASH;
+      submitBtn.disabled = false;
 
-      if(hash === PASSWORD_HASH){
+      if(ok){
         // 인증 성공
-        sessionStorage.setItem('dlas_authenticated', 'true');
+        if(!PAYLOAD_CRYPTO) sessionStorage.setItem('dlas_authenticated', 'true');
         modal.style.display = 'none';
         document.body.style.overflow = '';
         errorMsg.style.display = 'none';
@@ -1820,26 +2912,45 @@ function initMobileUI(){
   }
 })();
 
-window.onload=()=>{initThree();loadAllModels();restoreAnnotations();updateGroupPanel();toggleAddAnno();animate();document.getElementById("saveGroupsBtn").onclick=saveHTML;document.getElementById("saveViewBtn").onclick=saveCurrentView;renderer.domElement.addEventListener("click",onClickViewer,false);enableFocusEvents();updateViewButtons();initMobileUI();};
-window.onresize=()=>{camera.aspect=window.innerWidth/window.innerHeight;camera.updateProjectionMatrix();renderer.setSize(window.innerWidth,window.innerHeight);};
+window.onload=()=>{initThree();startBVHWorker();loadAllModels();restoreAnnotations();updateGroupPanel();toggleAddAnno();animate();document.getElementById("saveGroupsBtn").onclick=saveHTML;document.getElementById("exportNotesBtn").onclick=exportSidecar;document.getElementById("importNotesBtn").onclick=importSidecar;document.getElementById("lightingBtn").onclick=()=>setLighting(lightingMode==="matcap"?"phong":"matcap");setLighting(lightingMode);document.getElementById("qualityBtn").onclick=()=>setQualityProfile(QUALITY_ORDER[(QUALITY_ORDER.indexOf(qualityProfile)+1)%QUALITY_ORDER.length]);["pointerup","keydown","input","wheel"].forEach(t=>document.addEventListener(t,requestRender,true));document.getElementById("saveViewBtn").onclick=saveCurrentView;const vw=document.getElementById("viewer");vw.addEventListener("click",onClickViewer,false);vw.addEventListener("mousemove",onHoverViewer,false);vw.addEventListener("mouseleave",hidePickMarker,false);enableFocusEvents();updateViewButtons();initMobileUI();loadSidecarNextToFile();};
+window.onresize=()=>{camera.aspect=window.innerWidth/window.innerHeight;camera.updateProjectionMatrix();renderer.setSize(window.innerWidth,window.innerHeight);requestRender();};
 </script>
 </body>
 </html>""")
 
-    # 비밀번호 해시 계산
-    import hashlib
-    password_hash = ""
-    if password_enabled and password:
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
+    if pwa_runtime:
+        # 같은 출처 iframe 이므로 부모 창의 케이스 객체를 동기적으로 읽는다 – 이후 코드는 일반 HTML과 똑같이 동작
+        password_js = ("/*dlas-case*/const DLAS_CASE=(()=>{try{return window.parent!==window&&window.parent.__dlasCase||null;}"
+                       "catch(e){return null;}})();\n"
+                       "const PASSWORD_HASH = DLAS_CASE&&DLAS_CASE.password_hash||\"\";\n"
+                       "const PAYLOAD_CRYPTO = DLAS_CASE&&DLAS_CASE.payload_crypto||null;\n"
+                       "const PASSWORD_ENABLED = !!(PASSWORD_HASH||PAYLOAD_CRYPTO);/*/dlas-case*/")
+        case_data_js = ("const glbPayloads=DLAS_CASE?DLAS_CASE.payloads:[];\n"
+                        "const glbPacked=!!(DLAS_CASE&&DLAS_CASE.glbPacked);\n"
+                        "let modelData=DLAS_CASE?DLAS_CASE.models:[];\n"
+                        "let annotationList = DLAS_CASE&&DLAS_CASE.annotations||[];\n"
+                        "let viewList = DLAS_CASE&&DLAS_CASE.views||[];\n"
+                        "if(DLAS_CASE&&DLAS_CASE.user_logo){const im=document.createElement(\"img\");im.id=\"userLogo\";im.alt=\"User Logo\";"
+                        "im.src=\"data:image;base64,\"+DLAS_CASE.user_logo;im.style.cssText=\"position:absolute;bottom:10px;left:10px;"
+                        "max-width:160px;max-height:70px;z-index:99;user-select:none;\";document.body.appendChild(im);}")
+    else:
+        password_hash = "" if payload_crypto else _password_hash(password, password_enabled)
+        password_js = (f'const PASSWORD_HASH = "{password_hash}";\n'
+                       f'const PAYLOAD_CRYPTO = {json.dumps(payload_crypto)};\n'
+                       f'const PASSWORD_ENABLED = {"true" if password_hash or payload_crypto else "false"};')
+        case_data_js = (f"const glbPayloads=[ {js_payloads} ];\n"
+                        f"const glbPacked={'true' if packed_glb else 'false'};\n"
+                        f"let modelData=[ {js_models} ];\n"
+                        f"let annotationList = {annos_json};\n"
+                        f"let viewList = {views_json};")
 
     return html_tpl.safe_substitute(
-        js_models=js_models,
-        annos_json=annos_json,
+        case_data_js=case_data_js,
         js_colormap=js_colormap,
         top_logo=top_logo_html,
         user_logo=user_logo_html,
-        password_hash=password_hash,
-        password_enabled="true" if password_enabled else "false"
+        password_js=password_js,
+        runtime_scripts=runtime_script_tags(runtime, log_callback)   # 치환 값은 다시 해석되지 않으므로 번들의 $ 는 안전
     )
 
 # ==============================================================================
@@ -1853,45 +2964,373 @@ def _is_ant_scan(fname: str) -> bool:
     l = fname.lower()
     return "antagonist" in l or (l.startswith("ant") and "scan" in l) or "opposing" in l
 
+# ==============================================================================
+# 협조적 취소 / 단계별 제한 시간 / 부분 결과 보존
+#   - 취소: cancel_event(multiprocessing.Event 또는 threading.Event)를 파일·단계 경계에서 확인
+#   - 제한 시간: 워커가 단계 전환을 result_queue로 알리고, 부모(StageWatchdog)가 단계별 예산으로 판정
+#     → 크지만 진행 중인 케이스는 죽이지 않고, 멈춘 단계만 잡아낸다
+#   - BITE: 별도 프로세스 + 자체 예산, 초과/크래시 시 BITE 없이 HTML 저장
+#   - 부분 결과: 감소 메시/GLB/BITE를 케이스별 폴더에 보존 → 재실행 시 실패한 단계부터
+# ==============================================================================
+STAGE_TIMEOUTS = {            # 단계 1회(파일 1개) 기준 무진행 허용 시간(초)
+    "discovery": 60, "xml_parse": 60, "transform": 120, "decimation": 180,
+    "glb_encode": 120, "html_write": 60, "compress": 600,
+}
+IDLE_TIMEOUT    = 60          # 단계 사이 (그룹 매핑 등) 허용 시간
+BITE_TIMEOUT    = 45          # BITE 예산 – 초과 시 BITE 없이 진행
+CANCEL_GRACE_S  = 10          # 취소 요청 후 현재 단계 마무리를 기다리는 시간
+PARTIAL_ROOT    = os.path.join(tempfile.gettempdir(), "dlas_html_partial")
+PARTIAL_MAX_AGE_S = 3 * 24 * 3600
+
+class ConversionCancelled(Exception):
+    """사용자 중지 요청으로 변환을 멈춤"""
+
+def _check_cancel(cancel_event) -> None:
+    if cancel_event is not None and cancel_event.is_set():
+        raise ConversionCancelled("사용자 중지")
+
+class StageWatchdog:
+    """
+    워커가 보내는 ("stage", name, "start"|"end", time.time()) 메시지로 현재 단계를 추적하고
+    단계별 예산 초과 여부를 판정한다. 최종 결과 (status, data, metrics)는 .result 에 보관.
+    """
+    def __init__(self, stage_timeouts: dict | None = None, bite_timeout: float | None = BITE_TIMEOUT,
+                 case_timeout: float = 0.0):
+        self.budgets = {**STAGE_TIMEOUTS, **(stage_timeouts or {})}
+        # BITE는 워커 안에서 자체 예산으로 끊으므로 부모 쪽은 여유를 둔 안전망
+        self.budgets["bite"] = (bite_timeout + CANCEL_GRACE_S) if bite_timeout else 0
+        self.case_timeout = case_timeout
+        self.started = self.since = time.time()
+        self.stage: str | None = None
+        self.result: tuple | None = None
+
+    def drain(self, result_queue, on_event=None) -> None:
+        """on_event: ("stage", …) / ("progress", pct, message) 메시지를 그대로 넘겨받는 콜백 (진행률 표시용)"""
+        while True:
+            try:
+                msg = result_queue.get_nowait()
+            except (queue.Empty, EOFError, OSError):
+                return
+            if msg and msg[0] in ("stage", "progress"):
+                if msg[0] == "stage":
+                    self.stage = msg[1] if msg[2] == "start" else None
+                    self.since = msg[3] if len(msg) > 3 else time.time()
+                on_event and on_event(msg)
+            else:
+                self.result = msg
+
+    def wait_result(self, result_queue, timeout: float = 1.0) -> tuple | None:
+        """프로세스 종료 후 파이프에 남은 최종 결과까지 수거"""
+        deadline = time.time() + timeout
+        while self.result is None and time.time() < deadline:
+            self.drain(result_queue)
+            if self.result is None:
+                time.sleep(0.05)
+        return self.result
+
+    def expired(self) -> str | None:
+        now = time.time()
+        if self.case_timeout and now - self.started > self.case_timeout:
+            return f"케이스 전체 {self.case_timeout:g}초 초과"
+        budget = self.budgets.get(self.stage, IDLE_TIMEOUT) if self.stage else IDLE_TIMEOUT
+        if budget and now - self.since > budget:
+            return f"{self.stage or '단계 사이'} 단계 {budget:g}초 초과"
+        return None
+
+class BatchProgress:
+    """
+    배치 진행률 집계 (Qt 무관 – GUI/CLI 공용)
+    · 동시에 실행 중인 케이스별 진행(0~1)을 합산해 전체 진행률 계산
+    · 케이스 진행: 파일 단위 진행률(0~90%) → BITE(90%) → HTML 저장(97%) → 사전 압축(98%)
+    · ETA = 경과 시간 × (남은 비율 / 완료 비율), 스킵된 케이스는 작업량에서 제외
+    """
+    FILES_SHARE = 0.90
+    STAGE_FLOOR = {"bite": 0.90, "html_write": 0.97, "compress": 0.98}
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.skipped = 0
+        self.started = time.time()
+        self.active: dict[str, dict] = {}
+
+    def start(self, case: str) -> None:
+        self.active[case] = {"fraction": 0.0, "stage": None, "detail": "", "started": time.time()}
+
+    def apply(self, case: str, msg: tuple) -> None:
+        """워커 메시지 반영: ("stage", name, "start"|"end", t) / ("progress", pct, message)"""
+        st = self.active.get(case)
+        if st is None:
+            return
+        if msg[0] == "stage":
+            if msg[2] == "start":
+                st["stage"] = msg[1]
+                st["fraction"] = max(st["fraction"], self.STAGE_FLOOR.get(msg[1], 0.0))
+        elif msg[0] == "progress":
+            st["fraction"] = max(st["fraction"], self.FILES_SHARE * min(float(msg[1]), 100.0) / 100.0)
+            st["detail"] = msg[2] or ""
+
+    def finish(self, case: str, skipped: bool = False) -> None:
+        self.active.pop(case, None)
+        if skipped:
+            self.skipped += 1
+        else:
+            self.done += 1
+
+    @property
+    def finished(self) -> int:
+        return self.done + self.skipped
+
+    @property
+    def fraction(self) -> float:
+        work = self.total - self.skipped
+        if work <= 0:
+            return 1.0 if self.total else 0.0
+        return min(1.0, (self.done + sum(a["fraction"] for a in self.active.values())) / work)
+
+    def eta_s(self) -> Optional[float]:
+        f = self.fraction
+        elapsed = time.time() - self.started
+        if f <= 0.01 or elapsed < 1.0:
+            return None
+        return max(0.0, elapsed * (1.0 - f) / f)
+
+    def snapshot(self) -> dict:
+        eta = self.eta_s()
+        return {"percent": round(self.fraction * 100, 1), "done": self.finished, "total": self.total,
+                "eta_s": round(eta, 1) if eta is not None else None,
+                "active": [{"folder": k, "stage": v["stage"], "percent": round(v["fraction"] * 100, 1)}
+                           for k, v in self.active.items()]}
+
+def format_eta(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "계산 중"
+    seconds = int(round(seconds))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+def stop_worker_process(proc, cancel_event=None, grace: float = 0.0) -> None:
+    """cancel_event로 협조적 종료를 먼저 요청하고, grace 후에도 살아 있으면 terminate → kill"""
+    if cancel_event is not None:
+        cancel_event.set()
+    if grace:
+        proc.join(timeout=grace)
+    if proc.is_alive():
+        proc.terminate(); proc.join(timeout=2)
+    if proc.is_alive():
+        proc.kill(); proc.join()
+
+def _run_bite_process(result_queue, paths_a, paths_b, out_folder, tolerance):
+    stats: dict = {}
+    try:
+        result_queue.put(("ok", generate_bite_stl(paths_a, paths_b, out_folder, tolerance, stats=stats), stats))
+    except BaseException as e:
+        result_queue.put(("error", str(e), stats))
+
+def generate_bite_stl_bounded(paths_a: list[str], paths_b: list[str], out_folder: str,
+                              timeout: float, cancel_event=None, tolerance: float = 0.01,
+                              stats: dict | None = None, log_callback=None) -> Optional[str]:
+    """
+    generate_bite_stl 을 별도 프로세스에서 timeout 초 안에 실행.
+    초과/크래시/오류 시 None (stats["timed_out"|"crashed"] = 1) → 호출측은 BITE 없이 진행.
+    """
+    if not paths_a or not paths_b:
+        return None
+    result_queue = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=_run_bite_process,
+                                   args=(result_queue, paths_a, paths_b, out_folder, tolerance), daemon=True)
+    proc.start()
+    deadline = time.time() + timeout
+    try:
+        while proc.is_alive() and time.time() < deadline:
+            proc.join(timeout=0.2)
+            _check_cancel(cancel_event)
+        if proc.is_alive():
+            stop_worker_process(proc)
+            if stats is not None: stats["timed_out"] = 1
+            log_callback and log_callback(f"[WARN] BITE {timeout:g}초 초과 – BITE 없이 저장")
+            return None
+        try:
+            status, data, bite_stats = result_queue.get(timeout=1)
+        except (queue.Empty, EOFError, OSError):
+            if stats is not None: stats["crashed"] = 1
+            log_callback and log_callback(f"[WARN] BITE 프로세스 비정상 종료(exitcode={proc.exitcode}) – BITE 없이 저장")
+            return None
+        if stats is not None: stats.update(bite_stats)
+        if status != "ok":
+            log_callback and log_callback(f"[WARN] BITE 실패: {data} – BITE 없이 저장")
+            return None
+        return data
+    finally:
+        if proc.is_alive():
+            stop_worker_process(proc)
+
+def _file_signature(path: str | None) -> str:
+    try:
+        st = os.stat(path)
+        return f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+    except (OSError, TypeError):
+        return ""
+
+class PartialResults:
+    """
+    케이스별 중간 산출물 보존소 (PARTIAL_ROOT/<케이스 해시>/)
+      <key>/<원본명>        감소된 메시 (파일명 유지 → 그룹/표시 맵 조회 그대로)
+      <key>/glb.b64         GLB base64
+      bite-<key>/…          BITE 결과 (교차 없음은 bite-<key>.none)
+    key = 원본 파일 + 변환 모드 + constructionInfo/modelInfo 서명 → 입력이 바뀌면 자동 무효.
+    HTML 저장에 성공하면 discard() 로 지운다.
+    """
+    def __init__(self, case_folder: str, work_mode: str):
+        self.root = os.path.join(PARTIAL_ROOT, hashlib.sha1(os.path.abspath(case_folder).encode("utf-8")).hexdigest()[:16])
+        ci, mi = _find_exo_files(case_folder) if os.path.isdir(case_folder) else (None, None)
+        self._salt = f"{work_mode}|{_file_signature(ci)}|{_file_signature(mi)}"
+        self._prune()
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def _prune() -> None:
+        try:
+            now = time.time()
+            for d in os.listdir(PARTIAL_ROOT):
+                p = os.path.join(PARTIAL_ROOT, d)
+                if now - os.path.getmtime(p) > PARTIAL_MAX_AGE_S:
+                    shutil.rmtree(p, ignore_errors=True)
+        except OSError:
+            pass
+
+    def key(self, *parts: str) -> str:
+        return hashlib.sha1("|".join((self._salt,) + parts).encode("utf-8")).hexdigest()[:20]
+
+    def file_key(self, src_path: str) -> str:
+        return self.key(_file_signature(src_path))
+
+    def _dir(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def reduced(self, key: str) -> Optional[str]:
+        d = self._dir(key)
+        try:
+            names = [n for n in os.listdir(d) if n.lower().endswith((".stl", ".ply"))]
+        except OSError:
+            return None
+        return os.path.join(d, names[0]) if len(names) == 1 else None
+
+    def store_dir(self, key: str, produce) -> Optional[str]:
+        """produce(tmp_dir) → tmp_dir 안의 결과 경로. 완성된 폴더만 원자적으로 <key>/ 로 옮긴다."""
+        tmp = tempfile.mkdtemp(prefix=f"{key}.", dir=self.root)
+        try:
+            produced = produce(tmp)
+            if produced is None:
+                return None
+            final = self._dir(key)
+            try:
+                os.replace(tmp, final)
+            except OSError:          # 동시에 다른 프로세스가 먼저 완성한 경우
+                shutil.rmtree(tmp, ignore_errors=True)
+            return os.path.join(final, os.path.basename(produced))
+        finally:
+            if os.path.isdir(tmp):
+                shutil.rmtree(tmp, ignore_errors=True)
+
+    def glb(self, key: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self._dir(key), "glb.b64"), "r", encoding="ascii") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store_glb(self, key: str, b64: str) -> None:
+        d = self._dir(key)
+        if not os.path.isdir(d):
+            return
+        tmp = os.path.join(d, f"glb.b64.{os.getpid()}")
+        with open(tmp, "w", encoding="ascii") as f:
+            f.write(b64)
+        os.replace(tmp, os.path.join(d, "glb.b64"))
+
+    def bite(self, key: str) -> tuple[bool, Optional[str]]:
+        """(캐시 있음, BITE 경로 또는 None=교차 없음)"""
+        if os.path.exists(os.path.join(self.root, f"bite-{key}.none")):
+            return True, None
+        path = self.reduced(f"bite-{key}")
+        return (path is not None), path
+
+    def store_bite_none(self, key: str) -> None:
+        open(os.path.join(self.root, f"bite-{key}.none"), "w").close()
+
+    def discard(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
 # ==============================================================================
 # Worker Process for HTML Conversion (C++ crash protection)
 # ==============================================================================
 def _run_html_worker_process(result_queue, work_folder_str, stl_paths_list, html_path_str,
-                              mode_str, user_logo_path_str, skip_processed, password_str="", password_enabled_bool=False):
+                              mode_str, user_logo_path_str, skip_processed, password_str="", password_enabled_bool=False,
+                              cancel_event=None, bite_timeout=BITE_TIMEOUT, log_queue=None, single_glb=False,
+                              precompress=False, runtime=DEFAULT_RUNTIME, output_format="html", encrypt_models=False):
     """
     별도 프로세스에서 HTML 변환 작업 실행
     C++ 크래시가 발생해도 메인 프로세스는 영향받지 않음
+    진행: ("stage", name, "start"|"end", 시각) – 부모의 StageWatchdog 용
+          ("progress", 파일 진행률 0~100, 메시지) – 진행률 표시용 (BatchProgress.apply)
+    로그: log_queue(LogPipeline.worker_queue())가 있으면 파이프라인 로그를 부모의 링 버퍼/파일로 전달
+    결과: (status, data, metrics_dict) – status: success/skipped/error/cancelled, metrics_dict는 CaseMetrics.to_dict()
     """
+    metrics = CaseMetrics(work_folder_str, on_stage=lambda name, ev: result_queue.put(("stage", name, ev, time.time())))
+    log = worker_log_callback(log_queue) if log_queue is not None else None
+
+    def put(status: str, data: str) -> None:
+        metrics.finish(status)
+        result_queue.put((status, data, metrics.to_dict()))
+
     try:
         # skip_processed 체크
         if skip_processed and is_folder_processed(work_folder_str):
-            result_queue.put(("skipped", "already processed"))
+            put("skipped", "already processed")
             return
 
-        # mode 감지
-        mode = detect_mode(work_folder_str)
-        stl_paths = find_stl_files(work_folder_str, log_callback=None)
+        # mode 감지 + 파일 수집
+        with metrics.stage("discovery") as st:
+            mode = detect_mode(work_folder_str)
+            stl_paths = find_stl_files(work_folder_str, log_callback=log)
+            st["files"] = len(stl_paths)
 
         if not stl_paths:
-            result_queue.put(("skipped", "no STL files"))
+            put("skipped", "no STL files")
             return
 
         # HTML 변환 실행
         convert_stls_to_html(
             stl_paths, html_path_str, work_folder_str, mode,
-            log_callback=None,
+            log_callback=log,
             user_logo_path=user_logo_path_str,
-            progress_callback=None,
+            progress_callback=lambda pct, msg: result_queue.put(("progress", pct, msg)),
             password=password_str,
-            password_enabled=password_enabled_bool
+            password_enabled=password_enabled_bool,
+            metrics=metrics,
+            cancel_event=cancel_event,
+            bite_timeout=bite_timeout,
+            keep_partial=True,
+            single_glb=single_glb,
+            precompress=precompress,
+            runtime=runtime,
+            output_format=output_format,
+            encrypt_models=encrypt_models
         )
 
         # 마커 파일 생성
         create_folder_marker(work_folder_str)
-        result_queue.put(("success", os.path.basename(html_path_str)))
+        bite = metrics.stages.get("bite", {})
+        note = " (BITE 생략: 제한 시간 초과)" if bite.get("timed_out") else \
+               " (BITE 생략: 프로세스 비정상 종료)" if bite.get("crashed") else ""
+        put("success", os.path.basename(html_path_str) + note)
 
+    except ConversionCancelled as e:
+        put("cancelled", str(e))
     except BaseException as e:
-        result_queue.put(("error", str(e)))
+        put("error", str(e))
 
 # ==============================================================================
 # 변환 파이프라인 (모드별 공통)
@@ -1902,57 +3341,100 @@ def convert_stls_to_html(stl_paths: list[str], save_html_path: str, folder_for_m
                          group_override: dict[str, str] | None = None,
                          progress_callback=None,
                          password: str | None = None,
-                         password_enabled: bool = False) -> None:
+                         password_enabled: bool = False,
+                         metrics: CaseMetrics | None = None,
+                         cancel_event=None,
+                         bite_timeout: float | None = None,
+                         keep_partial: bool = False,
+                         single_glb: bool = False,
+                         precompress: bool = False,
+                         sidecar: dict | None = None,
+                         runtime: str = DEFAULT_RUNTIME,
+                         output_format: str = "html",
+                         encrypt_models: bool = False) -> None:
     """
     work_mode: '3shape' | 'exo'
     folder_for_mapping: 그룹/표시 파싱 기준 폴더
+    metrics: 단계별 계측 누적 대상 (없으면 내부에서 만들고 버린다)
+    cancel_event: set 되면 다음 파일/단계 경계에서 ConversionCancelled
+    bite_timeout: 주어지면 BITE를 별도 프로세스에서 이 시간 안에 실행, 초과 시 BITE 없이 저장
+    keep_partial: 감소 메시/GLB/BITE를 PartialResults 에 남겨 실패 후 재실행 시 재사용 (성공하면 삭제)
+    single_glb: 모델별 GLB 대신 케이스 전체를 노드별 GLB 하나로 묶는다 (부품이 많은 케이스의 로딩 시간 단축)
+    precompress: HTML 옆에 .html.gz(레벨 9) / .html.br(q9) 을 함께 저장 (정적 호스팅/PWA가 그대로 전송)
+    sidecar: 구워 넣을 주석/뷰/표시 상태 – 없으면 HTML 옆(또는 케이스 폴더)의 <이름>.dlas.json 을 찾아 쓴다
+    runtime: three.js 싣는 방식 – auto·embed(번들을 HTML에 포함, 없으면 오류) / shared / cdn
+    output_format: html / case(<이름>.dlas 데이터 파일만 – PWA 런타임용) / both
+    encrypt_models: 비밀번호 보호 시 모델 페이로드를 AES-GCM(PBKDF2 키)으로 암호화 (cryptography 패키지 필요)
     """
+    metrics = metrics or CaseMetrics(folder_for_mapping)
     if not stl_paths:
         log_callback and log_callback("[WARN] STL 파일이 없습니다.")
         return
 
     temp_reduce_dir = tempfile.mkdtemp(prefix="dlas_reduce_")
-    temp_xfm_dir    = tempfile.mkdtemp(prefix="dlas_xfm_")
     model_infos: list[dict[str, str]] = []
-    parsed_excel_path = None
+    partial = PartialResults(folder_for_mapping, work_mode) if keep_partial else None
 
     try:
-        # ----- 그룹/표시 맵 준비 -----
-        if group_override:
-            group_map = group_override
-            display_map = {}
-        else:
-            if work_mode == "3shape":
-                try:
-                    df_an = analyze_folder_3shape(Path(folder_for_mapping))
-                    parsed_excel_path = str(Path(folder_for_mapping) / "parsed_3shape.xlsx")
-                    export_to_excel(df_an, Path(folder_for_mapping) / "parsed_3shape")
-                    log_callback and log_callback("[INFO] parsed_3shape.xlsx 생성 완료.")
-                except Exception as e:
-                    log_callback and log_callback(f"[WARN] Excel 생성 스킵: {e}")
-                group_map = parse_3ox_for_groups(folder_for_mapping)
-                display_map = parse_3ox_for_display(folder_for_mapping)
-            else:  # EXO
-                group_map = parse_exo_for_groups(folder_for_mapping)
-                display_map = parse_exo_for_display(folder_for_mapping)
-
-        # constructionInfo / modelInfo root (EXO 변환행렬용)
-        ci_file, mi_file = _find_exo_files(folder_for_mapping)
-        exo_ci_root = None
-        exo_mi_root = None
-        if work_mode == "exo":
-            if ci_file:
-                try:
-                    exo_ci_root = ET.parse(ci_file).getroot()
-                except Exception as e:
-                    log_callback and log_callback(f"[WARN] EXO constructionInfo 파싱 실패: {e}")
-            if mi_file:
+        _check_cancel(cancel_event)
+        with metrics.stage("xml_parse"):
+            # ----- 그룹/표시 맵 준비 -----
+            if group_override:
+                group_map = group_override
+                display_map = {}
+            else:
+                if work_mode == "3shape":
+                    # 분석 행을 바로 넘긴다 (임시 parsed_3shape.xlsx 쓰기/읽기 왕복 제거 → pandas 미로드)
+                    analysis_rows = None
+                    try:
+                        analysis_rows = _analyze_3shape_rows(Path(folder_for_mapping))
+                    except Exception as e:
+                        log_callback and log_callback(f"[WARN] 3SHAPE 분석 스킵: {e}")
+                    group_map = parse_3ox_for_groups(folder_for_mapping, analysis_rows=analysis_rows)
+                    display_map = parse_3ox_for_display(folder_for_mapping)
+                else:  # EXO
+                    group_map = parse_exo_for_groups(folder_for_mapping)
+                    display_map = parse_exo_for_display(folder_for_mapping)
+
+            # constructionInfo / modelInfo root (EXO 변환행렬용)
+            ci_file, mi_file = _find_exo_files(folder_for_mapping)
+            exo_ci_root = None
+            exo_mi_root = None
+            if work_mode == "exo":
+                if ci_file:
+                    try:
+                        exo_ci_root = ET.parse(ci_file).getroot()
+                    except Exception as e:
+                        log_callback and log_callback(f"[WARN] EXO constructionInfo 파싱 실패: {e}")
+                if mi_file:
+                    try:
+                        exo_mi_root = ET.parse(mi_file).getroot()
+                    except Exception as e:
+                        log_callback and log_callback(f"[WARN] EXO modelInfo 파싱 실패: {e}")
+
+        mesh_paths = [p for p in stl_paths if os.path.isfile(p) and p.lower().endswith((".stl", ".ply"))]
+
+        # ----- EXO 좌표 변환: 케이스 전체 행렬을 먼저 구하고, 같은 행렬끼리 메모리에서 한 번에 적용 -----
+        xfm_meshes: dict[str, 'vtk.vtkPolyData'] = {}
+        if work_mode == "exo" and (exo_ci_root is not None or exo_mi_root is not None):
+            _check_cancel(cancel_event)
+            with metrics.stage("transform") as st:
                 try:
-                    exo_mi_root = ET.parse(mi_file).getroot()
+                    stack, xfm_index = resolve_exo_transforms(exo_ci_root, exo_mi_root,
+                                                              [os.path.basename(p) for p in mesh_paths])
+                    # 이전 부분 결과(감소 메시)가 있는 파일은 다시 읽지 않는다
+                    todo = [p for p in mesh_paths if os.path.basename(p) in xfm_index
+                            and not (partial and partial.reduced(partial.file_key(p)))]
+                    xfm_meshes = load_transformed_meshes(todo, [xfm_index[os.path.basename(p)] for p in todo],
+                                                         stack, log_callback=log_callback)
+                    st["files"] = len(xfm_meshes)
+                    st["matrices"] = len(stack)
                 except Exception as e:
-                    log_callback and log_callback(f"[WARN] EXO modelInfo 파싱 실패: {e}")
+                    log_callback and log_callback(f"[WARN] 변환행렬 적용 실패: {e}")
 
         # ----- STL 별 처리 (감소 → glb) -----
+        # 감소된 형상이 같은 모델(로컬+전역 검색으로 두 번 잡힌 스캔, ZIP 사본 등)은 GLB를 한 번만 만든다
+        glb_by_geometry: dict[str, tuple[str, str]] = {}   # 형상 해시 → (처음 모델 이름, base64)
         u_crown, l_crown = [], []
         u_prep,  l_prep  = [], []
         u_ant,   l_ant   = [], []
@@ -1964,14 +3446,21 @@ def convert_stls_to_html(stl_paths: list[str], save_html_path: str, folder_for_m
         for fp in stl_paths:
             if not (os.path.isfile(fp) and fp.lower().endswith((".stl", ".ply"))):
                 continue
+            _check_cancel(cancel_event)
             try:
-                src_for_reduce = fp
-                # EXO 모드에서 행렬 있으면 좌표 정렬 (원본 이름 유지, 별도 temp 폴더 사용)
-                if work_mode == "exo" and (exo_ci_root is not None or exo_mi_root is not None):
-                    src_for_reduce = exo_transform_if_possible(fp, exo_ci_root, exo_mi_root, temp_xfm_dir)
-
-                log_callback and log_callback(f"[INFO] Reducing: {os.path.basename(src_for_reduce)}")
-                reduced_fp = reduce_stl_size(src_for_reduce, temp_reduce_dir)
+                pkey = partial.file_key(fp) if partial else None
+                reduced_fp = partial.reduced(pkey) if partial else None
+                if reduced_fp:
+                    log_callback and log_callback(f"[INFO] 이전 부분 결과 사용: {os.path.basename(reduced_fp)}")
+                else:
+                    # EXO 좌표 정렬된 메시가 있으면 그대로 감소 (원본 이름 유지), 쓰고 나면 바로 놓아준다
+                    xfm_mesh = xfm_meshes.pop(fp, None)
+                    log_callback and log_callback(f"[INFO] Reducing: {os.path.basename(fp)}")
+                    with metrics.stage("decimation") as st:
+                        if partial:
+                            reduced_fp = partial.store_dir(pkey, lambda d: reduce_stl_size(fp, d, stats=st, polydata=xfm_mesh))
+                        else:
+                            reduced_fp = reduce_stl_size(fp, temp_reduce_dir, stats=st, polydata=xfm_mesh)
                 name = os.path.basename(reduced_fp)
                 grp = group_map.get(name, "etc")
                 disp = display_map.get(name, os.path.splitext(name)[0])
@@ -1990,13 +3479,32 @@ def convert_stls_to_html(stl_paths: list[str], save_html_path: str, folder_for_m
                     elif _is_ant_scan(name): l_ant.append(reduced_fp)
                     elif work_mode == "exo": l_scan.append(reduced_fp)
 
+                geometry = geometry_digest(reduced_fp)
+                shared = glb_by_geometry.get(geometry)
+                if single_glb:
+                    b64 = None          # 저장 직전에 pack_models_glb 로 한 번에 인코딩
+                elif shared:
+                    b64 = shared[1]
+                    log_callback and log_callback(f"[INFO] 동일 형상 – GLB 공유: {name} = {shared[0]}")
+                else:
+                    b64 = partial.glb(pkey) if partial else None
+                    if b64 is None:
+                        with metrics.stage("glb_encode") as st:
+                            b64 = convert_stl_to_gltf(reduced_fp)
+                            st["bytes"] = len(b64)
+                        partial and partial.store_glb(pkey, b64)
+                    glb_by_geometry[geometry] = (name, b64)
                 model_infos.append({
                     "name": name,
-                    "b64": convert_stl_to_gltf(reduced_fp),
+                    "b64": b64,
                     "group": grp,
-                    "displayName": disp
+                    "displayName": disp,
+                    "geometry": geometry,
+                    "path": reduced_fp
                 })
                 log_callback and log_callback(f"[OK] {name} → {grp}")
+            except ConversionCancelled:
+                raise
             except Exception as e:
                 log_callback and log_callback(f"[ERR] {fp}: {e}")
             finally:
@@ -2012,43 +3520,107 @@ def convert_stls_to_html(stl_paths: list[str], save_html_path: str, folder_for_m
         upper_candidates = u_crown + u_prep + (u_scan if work_mode == "exo" else [])
         lower_candidates = l_crown + l_prep + (l_scan if work_mode == "exo" else [])
 
+        bite_a, bite_b, bite_label = [], [], ""
         if upper_candidates and lower_candidates:
-            log_callback and log_callback("[INFO] Generating BITE (both‑side)…")
-            bite_fp = generate_bite_stl(upper_candidates, lower_candidates, temp_reduce_dir)
+            bite_a, bite_b, bite_label = upper_candidates, lower_candidates, "both‑side"
         elif upper_candidates:
-            log_callback and log_callback("[INFO] Generating BITE (upper‑only)…")
-            bite_fp = generate_bite_stl(upper_candidates, l_ant, temp_reduce_dir)
+            bite_a, bite_b, bite_label = upper_candidates, l_ant, "upper‑only"
         elif lower_candidates:
-            log_callback and log_callback("[INFO] Generating BITE (lower‑only)…")
-            bite_fp = generate_bite_stl(lower_candidates, u_ant, temp_reduce_dir)
+            bite_a, bite_b, bite_label = lower_candidates, u_ant, "lower‑only"
+
+        def _make_bite(out_dir: str, st: dict) -> Optional[str]:
+            if bite_timeout:
+                return generate_bite_stl_bounded(bite_a, bite_b, out_dir, bite_timeout, cancel_event,
+                                                 stats=st, log_callback=log_callback)
+            return generate_bite_stl(bite_a, bite_b, out_dir, stats=st)
+
+        _check_cancel(cancel_event)
+        bite_key = partial.key("bite", *sorted(bite_a), "|", *sorted(bite_b)) if (partial and bite_a and bite_b) else None
+        bite_cached, bite_fp = partial.bite(bite_key) if bite_key else (False, None)
+        if bite_cached:
+            log_callback and log_callback("[INFO] 이전 부분 결과 사용: BITE")
+        elif bite_label:
+            with metrics.stage("bite") as st:
+                log_callback and log_callback(f"[INFO] Generating BITE ({bite_label})…")
+                if bite_key:
+                    bite_fp = partial.store_dir(f"bite-{bite_key}", lambda d: _make_bite(d, st))
+                    # 교차 없음은 기억, 시간 초과/크래시는 다음 실행에서 다시 시도
+                    if bite_fp is None and not (st.get("timed_out") or st.get("crashed")):
+                        partial.store_bite_none(bite_key)
+                else:
+                    bite_fp = _make_bite(temp_reduce_dir, st)
 
         if bite_fp:
+            b64 = partial.glb(f"bite-{bite_key}") if (bite_key and not single_glb) else None
+            if b64 is None and not single_glb:
+                with metrics.stage("glb_encode") as st:
+                    b64 = convert_stl_to_gltf(bite_fp)
+                    st["bytes"] = len(b64)
+                bite_key and partial.store_glb(f"bite-{bite_key}", b64)
             model_infos.append({
                 "name": os.path.basename(bite_fp),
-                "b64": convert_stl_to_gltf(bite_fp),
+                "b64": b64,
                 "group": "bite",
-                "displayName": "BITE"
+                "displayName": "BITE",
+                "path": bite_fp
             })
             log_callback and log_callback(f"[OK] BITE STL saved: {os.path.basename(bite_fp)}")
         else:
             log_callback and log_callback("[INFO] No BITE generated (insufficient data or no intersection).")
 
-        # ----- HTML 저장 -----
-        user_logo_b64 = encode_image_b64(user_logo_path) if user_logo_path else None
-        ann_plain = []
-        with open(save_html_path, "w", encoding="utf-8") as f:
-            f.write(generate_html(model_infos, json.dumps(ann_plain), user_logo_b64, password, password_enabled))
-        log_callback and log_callback(f"[SAVE] {save_html_path}")
+        # ----- 사이드카 (주석/뷰/표시 상태) 굽기 – 삭제된 모델은 GLB 묶기 전에 뺀다 -----
+        if sidecar is None:
+            for sc_path in dict.fromkeys((sidecar_path(save_html_path),
+                                          os.path.join(folder_for_mapping,
+                                                       os.path.basename(sidecar_path(save_html_path))))):
+                sidecar = load_sidecar(sc_path, log_callback)
+                if sidecar is not None:
+                    log_callback and log_callback(f"[INFO] 사이드카 적용: {sc_path}")
+                    break
+        ann_plain, views = apply_sidecar(model_infos, sidecar) if sidecar else ([], [])
+
+        packed_glb = None
+        if single_glb and model_infos:
+            _check_cancel(cancel_event)
+            with metrics.stage("glb_encode") as st:
+                packed_glb = pack_models_glb(model_infos)
+                st["bytes"] = len(packed_glb)
+            log_callback and log_callback(f"[INFO] 단일 GLB: 모델 {len(model_infos)}개")
+
+        # ----- HTML / 케이스 데이터 저장 -----
+        _check_cancel(cancel_event)
+        outputs = []
+        with metrics.stage("html_write") as st:
+            user_logo_b64 = encode_image_b64(user_logo_path) if user_logo_path else None
+            if output_format in ("html", "both"):
+                with open(save_html_path, "w", encoding="utf-8") as f:
+                    f.write(generate_html(model_infos, _script_json(ann_plain), user_logo_b64, password, password_enabled,
+                                          packed_glb=packed_glb, views_json=_script_json(views),
+                                          runtime=runtime, log_callback=log_callback, encrypt_models=encrypt_models))
+                outputs.append(save_html_path)
+            if output_format in ("case", "both"):
+                case_path = case_output_path(save_html_path)
+                with open(case_path, "w", encoding="utf-8") as f:
+                    f.write(generate_case_data(model_infos, ann_plain, views, user_logo_b64, password, password_enabled,
+                                               packed_glb=packed_glb, encrypt_models=encrypt_models))
+                outputs.append(case_path)
+            st["bytes"] = sum(os.path.getsize(o) for o in outputs)
+        for o in outputs:
+            log_callback and log_callback(f"[SAVE] {o}")
+        for o in outputs:
+            if precompress:
+                _check_cancel(cancel_event)
+                with metrics.stage("compress") as st:
+                    sizes = write_precompressed(o, log_callback=log_callback)
+                    st["bytes"] = sum(sizes.values())   # 단계 누적값에 더해진다
+                for ext, size in sizes.items():
+                    log_callback and log_callback(f"[SAVE] {os.path.basename(o)}{ext} ({size / 2**20:.1f} MB)")
+            else:
+                remove_precompressed(o)
+        partial and partial.discard()
 
     finally:
-        if parsed_excel_path and os.path.exists(parsed_excel_path):
-            try:
-                os.remove(parsed_excel_path)
-                log_callback and log_callback(f"[INFO] parsed_3shape.xlsx 삭제 완료")
-            except Exception as e:
-                log_callback and log_callback(f"[WARN] parsed_3shape.xlsx 삭제 실패: {e}")
         shutil.rmtree(temp_reduce_dir, ignore_errors=True)
-        shutil.rmtree(temp_xfm_dir,    ignore_errors=True)
         log_callback and log_callback(f"[INFO] Removed temp dirs.")
 
 # ==============================================================================
@@ -2064,7 +3636,7 @@ def create_folder_marker(folder_path: str) -> None:
         print(f"[WARN] Cannot create marker in {folder_path}: {e}")
 
 def find_matching_folders(base_path: str,
-                          time_limit_hours: int | None = None,
+                          time_limit_hours: float | None = None,
                           keyword: str | None = None) -> list[str]:
     matching: list[str] = []
     now = time.time()
@@ -2247,880 +3819,477 @@ def find_stl_files(folder: str, log_callback=None) -> list[str]:
     return stls
 
 # ==============================================================================
-# Manual 그룹 선택 대화상자
-# ==============================================================================
-_GROUP_LIST = [
-    "upper_crownbridge", "upper_abutment", "upper_scan",
-    "lower_crownbridge", "lower_abutment", "lower_scan",
-    "bite", "etc"
-]
-class ManualGroupDialog(QDialog):
-    def __init__(self, stl_files: list[str], default_map: dict[str, str], parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("STL Group Mapping")
-        self.resize(560, 480)
-
-        vbox = QVBoxLayout(self)
-        tbl = QTableWidget(len(stl_files), 2, self)
-        tbl.setHorizontalHeaderLabels(["STL Filename", "Group"])
-        tbl.horizontalHeader().setStretchLastSection(True)
-        tbl.verticalHeader().setVisible(False)
-
-        for row, fn in enumerate(stl_files):
-            tbl.setItem(row, 0, QTableWidgetItem(fn))
-            cb = QComboBox()
-            cb.addItems(_GROUP_LIST)
-            cb.setCurrentText(default_map.get(fn, "etc"))
-            tbl.setCellWidget(row, 1, cb)
-
-        vbox.addWidget(tbl)
-        self.tbl = tbl
-
-        btn_box = QHBoxLayout()
-        btn_ok = QPushButton("OK");     btn_cancel = QPushButton("Cancel")
-        btn_ok.clicked.connect(self.accept); btn_cancel.clicked.connect(self.reject)
-        btn_box.addStretch(); btn_box.addWidget(btn_ok); btn_box.addWidget(btn_cancel)
-        vbox.addLayout(btn_box)
-
-    def mapping(self) -> dict[str, str]:
-        mp: dict[str, str] = {}
-        for row in range(self.tbl.rowCount()):
-            fn = self.tbl.item(row, 0).text()
-            grp = self.tbl.cellWidget(row, 1).currentText()
-            mp[fn] = grp
-        return mp
-
-# ==============================================================================
-# Heartbeat (옵션) – 동일 세션 보호
+# 헤드리스 CLI (Qt 없이 배치 변환 – 서버/예약 작업용)
+#   python -m fast_html_viewer_converter convert <root> --since 24h --keyword K --jobs 4 --out DIR
+#   stdout: JSON-lines 진행 이벤트, stderr: 파이프라인 로그
 # ==============================================================================
-heartbeat_token = None
-heartbeat_session_id = None
-heartbeat_timer = None
-def parse_token_and_sid() -> None:
-    global heartbeat_token, heartbeat_session_id
-    for arg in sys.argv:
-        if arg.startswith("--token="):
-            heartbeat_token = arg.split("=", 1)[1]
-        elif arg.startswith("--sid="):
-            heartbeat_session_id = arg.split("=", 1)[1]
-def send_heartbeat() -> None:
+EXIT_OK          = 0    # 전체 성공 (스킵 포함)
+EXIT_FAILED      = 1    # 일부 케이스 실패/타임아웃/크래시
+EXIT_USAGE       = 2    # 인자 오류 (argparse 기본 종료코드와 동일)
+EXIT_NO_CASES    = 3    # 조건에 맞는 폴더 없음
+EXIT_INTERRUPTED = 130  # Ctrl+C
+
+def _parse_since(text: str) -> float:
+    """'24h' / '90m' / '2d' / '1.5'(시간) → 시간 단위 float"""
+    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*", text or "", re.I)
+    if not m:
+        raise argparse.ArgumentTypeError(f"잘못된 기간 형식: {text!r} (예: 24h, 90m, 2d)")
+    unit = (m.group(2) or "h").lower()
+    return float(m.group(1)) * {"s": 1 / 3600, "m": 1 / 60, "h": 1, "d": 24}[unit]
+
+def _positive_int(text: str) -> int:
     try:
-        import urllib.request
-        url = "https://license-server-697p.onrender.com/auth/heartbeat"
-        hdr = {"Authorization": f"Bearer {heartbeat_token}", "Content-Type": "application/json"}
-        req = urllib.request.Request(url, headers=hdr, method="POST")
-        with urllib.request.urlopen(req, timeout=10) as res:
-            if json.loads(res.read() or "{}").get("status") != "OK":
-                raise RuntimeError("Heartbeat rejected")
-    except Exception as e:
-        print("[Heartbeat] Failed:", e)
-        force_logout()
-def force_logout() -> None:
-    QMessageBox.critical(None, "Logged out", "다른 PC에서 동일 계정으로 로그인되어 세션이 종료되었습니다.")
-    sys.exit(0)
-def start_heartbeat() -> None:
-    global heartbeat_timer
-    heartbeat_timer = QTimer(); heartbeat_timer.timeout.connect(send_heartbeat); heartbeat_timer.start(2 * 60 * 1000)
-
-# ==============================================================================
-# GUI
-# ==============================================================================
-GUI_LEFTBOTTOM_LOGO = resource_path("logo.png")
-WINDOW_ICON         = resource_path("logo.ico")
-TITLE_IMAGE         = resource_path("fast_html_viewer_converter.png")
-
-class NoWheelComboBox(QComboBox):
-    """휠 스크롤로 값이 변경되지 않는 ComboBox"""
-    def wheelEvent(self, event):
-        event.ignore()
-
-class STLViewerGUI(QMainWindow):
-    update_progress_signal = Signal(int, str)
-
-    def __init__(self):
-        super().__init__()
-        self.folder_path: str | None = None
-        self.output_folder: str | None = None
-        self.user_logo_path: str | None = None
-        self.worker_thread: threading.Thread | None = None
-        self.stop_requested = False
-        self.settings = QSettings("DLAS", "fast_html_viewer_converter")
-        self.update_progress_signal.connect(self.on_progress_update_slot)
-
-        # 깜빡임 효과를 위한 타이머
-        self.blink_timer = QTimer()
-        self.blink_timer.timeout.connect(self._blink_status_label)
-        self.blink_state = False
-
-        self.load_config()
-        self.init_ui()
-
-    def load_config(self) -> None:
-        if os.path.exists(CONFIG_PATH):
-            try:
-                cfg = json.load(open(CONFIG_PATH, "r", encoding="utf-8"))
-                self.user_logo_path = cfg.get("user_logo_path")
-            except Exception:
-                self.user_logo_path = None
-
-    def save_config(self) -> None:
-        try:
-            json.dump({"user_logo_path": self.user_logo_path or ""}, open(CONFIG_PATH, "w", encoding="utf-8"))
-        except Exception:
-            pass
-
-    def create_card(self):
-        """Create card-style frame"""
-        card = QFrame()
-        card.setStyleSheet(Style.card_style())
-        return card
-
-    def init_ui(self) -> None:
-        self.setWindowTitle("DLAS HTML 뷰어 변환기")
-        self.setGeometry(100, 100, 620, 800)
-        if os.path.exists(WINDOW_ICON):
-            self.setWindowIcon(QIcon(WINDOW_ICON))
-
-        self.setStyleSheet(f"""
-            QMainWindow, QWidget {{
-                background: {Style.BG_MAIN};
-                font-family: 'Malgun Gothic', '맑은 고딕', sans-serif;
-            }}
-        """)
-
-        # Scroll area
-        scroll_area = QScrollArea(self)
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setFrameShape(QFrame.NoFrame)
-        scroll_area.setStyleSheet(Style.scrollbar())
-        self.setCentralWidget(scroll_area)
-
-        main_widget = QWidget()
-        scroll_area.setWidget(main_widget)
-
-        main_layout = QVBoxLayout(main_widget)
-        main_layout.setContentsMargins(12, 12, 12, 12)
-        main_layout.setSpacing(8)
-
-        # Header (back button)
-        header_layout = QHBoxLayout()
-        header_layout.setContentsMargins(0, 0, 0, 10)
-        header_layout.addStretch()
-
-        back_btn = QPushButton("← 모듈 선택")
-        back_btn.setFixedSize(120, 36)
-        back_btn.setStyleSheet(Style.secondary_button())
-        back_btn.setCursor(QCursor(Qt.PointingHandCursor))
-        back_btn.clicked.connect(self.return_to_module_selection)
-        header_layout.addWidget(back_btn)
-
-        main_layout.addLayout(header_layout)
-
-        # Title (module image)
-        title_layout = QHBoxLayout()
-        title_layout.setContentsMargins(0, 0, 0, 0)
-
-        if os.path.exists(TITLE_IMAGE):
-            title_layout.addStretch()
-            icon_label = QLabel()
-            pixmap = QPixmap(TITLE_IMAGE)
-            scaled = pixmap.scaledToHeight(45, Qt.SmoothTransformation)
-            icon_label.setPixmap(scaled)
-            title_layout.addWidget(icon_label)
-            title_layout.addStretch()
-        else:
-            title_layout.addStretch()
-
-        main_layout.addLayout(title_layout)
-
-        # Description
-        desc_label = QLabel("HTML변환 모듈")
-        desc_label.setStyleSheet(f"font-size: 13px; color: {Style.TEXT_SECONDARY};")
-        desc_label.setAlignment(Qt.AlignCenter)
-        main_layout.addWidget(desc_label)
-
-        # Mode selection card
-        mode_card = self.create_card()
-        mode_layout = QVBoxLayout(mode_card)
-        mode_layout.setSpacing(8)
-
-        mode_label = QLabel("모드 선택")
-        mode_label.setStyleSheet(f"font-size: 13px; font-weight: bold; color: {Style.TEXT_PRIMARY};")
-        mode_layout.addWidget(mode_label)
-
-        self.mode_combo = NoWheelComboBox()
-        self.mode_combo.addItems(["자동", "수동"])
-        self.mode_combo.setStyleSheet(Style.combobox())
-        mode_layout.addWidget(self.mode_combo)
-
-        main_layout.addWidget(mode_card)
-
-        # Folder selection card
-        folder_card = self.create_card()
-        folder_layout = QVBoxLayout(folder_card)
-        folder_layout.setSpacing(8)
-
-        folder_label = QLabel("작업 폴더")
-        folder_label.setStyleSheet(f"font-size: 13px; font-weight: bold; color: {Style.TEXT_PRIMARY};")
-        folder_layout.addWidget(folder_label)
-
-        folder_row = QHBoxLayout()
-        self.folder_display = QLabel("폴더를 선택하세요")
-        self.folder_display.setMinimumHeight(40)
-        self.folder_display.setStyleSheet(f"""
-            QLabel {{
-                background-color: {Style.BG_CARD};
-                padding: 8px;
-                border-radius: 6px;
-                color: {Style.TEXT_SECONDARY};
-                font-size: 11px;
-            }}
-        """)
-        self.folder_display.setWordWrap(True)
-        folder_row.addWidget(self.folder_display, 1)
-
-        folder_btn = QPushButton("폴더 선택")
-        folder_btn.setFixedSize(100, 32)
-        folder_btn.setStyleSheet(Style.small_button())
-        folder_btn.setCursor(QCursor(Qt.PointingHandCursor))
-        folder_btn.clicked.connect(self.select_folder)
-        folder_row.addWidget(folder_btn)
-
-        folder_layout.addLayout(folder_row)
-
-        main_layout.addWidget(folder_card)
-
-        # Time/Keyword filter card
-        filter_card = self.create_card()
-        filter_layout = QVBoxLayout(filter_card)
-        filter_layout.setSpacing(8)
-
-        filter_label = QLabel("검색 필터")
-        filter_label.setStyleSheet(f"font-size: 13px; font-weight: bold; color: {Style.TEXT_PRIMARY};")
-        filter_layout.addWidget(filter_label)
-
-        # Time Range
-        time_row = QHBoxLayout()
-        time_lbl = QLabel("시간 범위:")
-        time_lbl.setMinimumWidth(100)
-        time_row.addWidget(time_lbl)
-
-        self.time_combo = NoWheelComboBox()
-        self.time_combo.addItems(["제한없음"]+[f"{i}시간 이내" for i in range(1,49)])
-        self.time_combo.setStyleSheet(Style.combobox())
-        time_row.addWidget(self.time_combo, 1)
-
-        filter_layout.addLayout(time_row)
-
-        # Keyword
-        keyword_row = QHBoxLayout()
-        keyword_lbl = QLabel("키워드:")
-        keyword_lbl.setMinimumWidth(100)
-        keyword_row.addWidget(keyword_lbl)
-
-        self.keyword_input = QLineEdit()
-        self.keyword_input.setPlaceholderText("검색 키워드 (선택사항)")
-        self.keyword_input.setStyleSheet(Style.lineedit())
-        keyword_row.addWidget(self.keyword_input, 1)
-
-        filter_layout.addLayout(keyword_row)
-
-        # Skip processed checkbox
-        self.skip_processed_checkbox = QCheckBox("이미 처리된 폴더 건너뛰기")
-        self.skip_processed_checkbox.setStyleSheet(Style.checkbox())
-        self.skip_processed_checkbox.setCursor(QCursor(Qt.PointingHandCursor))
-        filter_layout.addWidget(self.skip_processed_checkbox)
-
-        main_layout.addWidget(filter_card)
-
-        # Output card
-        output_card = self.create_card()
-        output_layout = QVBoxLayout(output_card)
-        output_layout.setSpacing(8)
-
-        output_label = QLabel("저장 위치")
-        output_label.setStyleSheet(f"font-size: 13px; font-weight: bold; color: {Style.TEXT_PRIMARY};")
-        output_layout.addWidget(output_label)
-
-        output_combo_row = QHBoxLayout()
-        self.output_combo = NoWheelComboBox()
-        self.output_combo.addItems(["각 폴더에 저장", "하나의 폴더에 저장"])
-        self.output_combo.setStyleSheet(Style.combobox())
-        self.output_combo.currentTextChanged.connect(self.toggle_output_button)
-        output_combo_row.addWidget(self.output_combo)
-
-        output_layout.addLayout(output_combo_row)
-
-        output_row = QHBoxLayout()
-        self.output_display = QLabel("저장 폴더 선택")
-        self.output_display.setMinimumHeight(40)
-        self.output_display.setStyleSheet(f"""
-            QLabel {{
-                background-color: {Style.BG_CARD};
-                padding: 8px;
-                border-radius: 6px;
-                color: {Style.TEXT_SECONDARY};
-                font-size: 11px;
-            }}
-        """)
-        output_row.addWidget(self.output_display, 1)
-
-        self.output_button = QPushButton("폴더 선택")
-        self.output_button.setFixedSize(100, 32)
-        self.output_button.setStyleSheet(Style.small_button())
-        self.output_button.setCursor(QCursor(Qt.PointingHandCursor))
-        self.output_button.clicked.connect(self.select_output_folder)
-        self.output_button.setEnabled(False)
-        output_row.addWidget(self.output_button)
-
-        output_layout.addLayout(output_row)
-
-        main_layout.addWidget(output_card)
-
-        # Logo card
-        logo_card = self.create_card()
-        logo_layout = QVBoxLayout(logo_card)
-        logo_layout.setSpacing(8)
-
-        logo_header = QLabel("로고 추가")
-        logo_header.setStyleSheet(f"font-size: 13px; font-weight: bold; color: {Style.TEXT_PRIMARY};")
-        logo_layout.addWidget(logo_header)
-
-        logo_row = QHBoxLayout()
-        logo_name = os.path.basename(self.user_logo_path) if self.user_logo_path else "선택안함"
-        self.logo_display = QLabel(logo_name)
-        self.logo_display.setMinimumHeight(40)
-        self.logo_display.setStyleSheet(f"""
-            QLabel {{
-                background-color: {Style.BG_CARD};
-                padding: 8px;
-                border-radius: 6px;
-                color: {Style.TEXT_SECONDARY};
-                font-size: 11px;
-            }}
-        """)
-        logo_row.addWidget(self.logo_display, 1)
-
-        logo_btn = QPushButton("로고 선택")
-        logo_btn.setFixedSize(100, 32)
-        logo_btn.setStyleSheet(Style.small_button())
-        logo_btn.setCursor(QCursor(Qt.PointingHandCursor))
-        logo_btn.clicked.connect(self.select_user_logo)
-        logo_row.addWidget(logo_btn)
-
-        logo_layout.addLayout(logo_row)
-
-        main_layout.addWidget(logo_card)
-
-        # Password card
-        password_card = self.create_card()
-        password_layout = QVBoxLayout(password_card)
-        password_layout.setSpacing(8)
-
-        password_header = QLabel("비밀번호 보호")
-        password_header.setStyleSheet(f"font-size: 13px; font-weight: bold; color: {Style.TEXT_PRIMARY};")
-        password_layout.addWidget(password_header)
-
-        # Password checkbox
-        self.password_checkbox = QCheckBox("HTML 파일을 비밀번호로 보호")
-        self.password_checkbox.setStyleSheet(Style.checkbox())
-        self.password_checkbox.setCursor(QCursor(Qt.PointingHandCursor))
-        self.password_checkbox.stateChanged.connect(self.toggle_password_input)
-        password_layout.addWidget(self.password_checkbox)
-
-        # Password input
-        password_input_row = QHBoxLayout()
-        password_label = QLabel("비밀번호:")
-        password_label.setMinimumWidth(100)
-        password_input_row.addWidget(password_label)
-
-        self.password_input = QLineEdit()
-        self.password_input.setPlaceholderText("비밀번호 입력")
-        self.password_input.setEchoMode(QLineEdit.Password)
-        self.password_input.setStyleSheet(Style.lineedit())
-        self.password_input.setEnabled(False)
-        password_input_row.addWidget(self.password_input, 1)
-
-        password_layout.addLayout(password_input_row)
-
-        # Password hint
-        password_hint = QLabel("💡 파일을 열 때마다 비밀번호 입력이 필요합니다")
-        password_hint.setStyleSheet(f"font-size: 11px; color: {Style.TEXT_SECONDARY}; padding: 5px;")
-        password_hint.setWordWrap(True)
-        password_layout.addWidget(password_hint)
-
-        main_layout.addWidget(password_card)
-
-        # Progress card
-        progress_card = self.create_card()
-        progress_layout = QVBoxLayout(progress_card)
-        progress_layout.setSpacing(8)
-
-        progress_header = QLabel("진행 상황")
-        progress_header.setStyleSheet(f"font-size: 13px; font-weight: bold; color: {Style.TEXT_PRIMARY};")
-        progress_layout.addWidget(progress_header)
-
-        # Spinner + status
-        spinner_layout = QHBoxLayout()
-        self.spinner_label = QLabel()
-        spinner_path = resource_path("spinner.gif")
-        if os.path.exists(spinner_path):
-            self.spinner_movie = QMovie(spinner_path)
-            self.spinner_movie.setScaledSize(QSize(24, 24))
-            self.spinner_label.setMovie(self.spinner_movie)
-        self.spinner_label.setVisible(False)
-        spinner_layout.addWidget(self.spinner_label)
-
-        self.status_label = QLabel("대기 중")
-        self.status_label.setStyleSheet(f"font-size: 13px; color: {Style.TEXT_PRIMARY};")
-        spinner_layout.addWidget(self.status_label, 1)
-
-        self.percent_label = QLabel("0%")
-        self.percent_label.setStyleSheet(f"font-size: 14px; font-weight: bold; color: {Style.ACCENT};")
-        spinner_layout.addWidget(self.percent_label)
-
-        progress_layout.addLayout(spinner_layout)
-
-        # Progress bar
-        self.progress_bar = QProgressBar()
-        self.progress_bar.setMaximum(100)
-        self.progress_bar.setValue(0)
-        self.progress_bar.setTextVisible(False)
-        self.progress_bar.setFixedHeight(8)
-        self.progress_bar.setStyleSheet(Style.progress_bar())
-        progress_layout.addWidget(self.progress_bar)
-
-        main_layout.addWidget(progress_card)
-
-        main_layout.addStretch()
-
-        # Button area
-        button_layout = QHBoxLayout()
-
-        self.html_button = QPushButton("▶  변환 시작")
-        self.html_button.setFixedHeight(40)
-        self.html_button.setStyleSheet(Style.success_button())
-        self.html_button.setCursor(QCursor(Qt.PointingHandCursor))
-        self.html_button.clicked.connect(self.start_html_conversion)
-        button_layout.addWidget(self.html_button)
-
-        self.stop_button = QPushButton("■  중지")
-        self.stop_button.setFixedHeight(40)
-        self.stop_button.setStyleSheet(Style.error_button())
-        self.stop_button.setEnabled(False)
-        self.stop_button.setCursor(QCursor(Qt.PointingHandCursor))
-        self.stop_button.clicked.connect(self.stop_processing)
-        button_layout.addWidget(self.stop_button)
-
-        main_layout.addLayout(button_layout)
-
-        # 작업완료 폴더 열기 버튼 (처리 완료 후 표시)
-        self.open_folder_button = QPushButton("📁  작업완료 폴더 열기")
-        self.open_folder_button.setFixedHeight(40)
-        self.open_folder_button.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {Style.SUCCESS};
-                color: white;
-                font-size: 13px;
-                font-weight: bold;
-                border: none;
-                border-radius: 8px;
-            }}
-            QPushButton:hover {{
-                background-color: #27ae60;
-            }}
-        """)
-        self.open_folder_button.setCursor(QCursor(Qt.PointingHandCursor))
-        self.open_folder_button.clicked.connect(self.open_output_folder)
-        self.open_folder_button.setVisible(False)  # 초기에는 숨김
-        self.completed_folder_path = None  # 완료된 폴더 경로 저장
-        main_layout.addWidget(self.open_folder_button)
-
-        # Footer (로고 왼쪽, 버전 정보 오른쪽)
-        footer_layout = QHBoxLayout()
-        footer_layout.setContentsMargins(0, 10, 0, 0)
-
-        # Left: DLAS logo
-        logo_path = resource_path("logo.png")
-        if os.path.exists(logo_path):
-            logo_label = QLabel()
-            logo_pixmap = QPixmap(logo_path)
-            scaled_logo = logo_pixmap.scaledToHeight(25, Qt.SmoothTransformation)
-            logo_label.setPixmap(scaled_logo)
-            footer_layout.addWidget(logo_label, alignment=Qt.AlignLeft | Qt.AlignBottom)
-
-        footer_layout.addStretch()
-
-        # Right: Version info
-        version_label = QLabel("DLAS v2.3.2 © 2025 Dental Lab Automation Solution - All rights reserved.")
-        version_label.setStyleSheet("color: #999999; font-size: 10px;")
-        footer_layout.addWidget(version_label, alignment=Qt.AlignRight | Qt.AlignBottom)
-        main_layout.addLayout(footer_layout)
-
-    def append_debug(self, msg: str) -> None:
-        pass  # 로그 출력 비활성화
-
-    def _blink_status_label(self) -> None:
-        """상태 라벨 깜빡임 효과"""
-        if self.blink_state:
-            self.status_label.setStyleSheet(f"font-size: 13px; color: {Style.ACCENT}; font-weight: bold;")
-        else:
-            self.status_label.setStyleSheet(f"font-size: 13px; color: {Style.TEXT_PRIMARY};")
-        self.blink_state = not self.blink_state
-
-    def _start_blinking(self) -> None:
-        """깜빡임 시작"""
-        self.blink_timer.start(500)  # 500ms마다 깜빡임
-
-    def _stop_blinking(self) -> None:
-        """깜빡임 중지"""
-        self.blink_timer.stop()
-        self.status_label.setStyleSheet(f"font-size: 13px; color: {Style.TEXT_PRIMARY};")
-
-    def on_progress_update_slot(self, percent: int, message: str) -> None:
-        """Progress update slot for signal"""
-        self.progress_bar.setValue(percent)
-        self.percent_label.setText(f"{percent}%")
-        self.status_label.setText(message)
-        QApplication.processEvents()
-
-    def update_progress(self, val: float, message: str = None) -> None:
-        """
-        진행률 업데이트
-        Args:
-            val: 진행률 (0-100)
-            message: 상태 메시지 (None이면 기존 메시지 유지)
-        """
-        percent = int(val)
-        if message:
-            self.update_progress_signal.emit(percent, message)
-        else:
-            self.update_progress_signal.emit(percent, self.status_label.text())
-        QApplication.processEvents()
-
-    def select_folder(self) -> None:
-        if heartbeat_token:
-            send_heartbeat()
-        last_folder = self.settings.value("last_folder", "")
-        path = QFileDialog.getExistingDirectory(self, "작업 폴더 선택", last_folder)
-        if path:
-            self.folder_path = path
-            self.settings.setValue("last_folder", path)
-            self.folder_display.setText(path)
-            self.folder_display.setStyleSheet(f"""
-                QLabel {{
-                    background-color: {Style.BG_CARD};
-                    padding: 8px;
-                    border-radius: 6px;
-                    color: {Style.TEXT_PRIMARY};
-                    font-size: 11px;
-                }}
-            """)
-
-    def select_output_folder(self) -> None:
-        last_output = self.settings.value("last_output_folder", "")
-        path = QFileDialog.getExistingDirectory(self, "출력 폴더 선택", last_output)
-        if path:
-            self.output_folder = path
-            self.settings.setValue("last_output_folder", path)
-            self.output_display.setText(path)
-            self.output_display.setStyleSheet(f"""
-                QLabel {{
-                    background-color: {Style.BG_CARD};
-                    padding: 8px;
-                    border-radius: 6px;
-                    color: {Style.TEXT_PRIMARY};
-                    font-size: 11px;
-                }}
-            """)
-
-    def select_user_logo(self) -> None:
-        file_filter = "이미지 (*.png *.jpg *.jpeg *.bmp *.gif)"
-        path, _ = QFileDialog.getOpenFileName(self, "로고 선택", filter=file_filter)
-        if path:
-            self.user_logo_path = path
-            self.logo_display.setText(os.path.basename(path))
-            self.logo_display.setStyleSheet(f"""
-                QLabel {{
-                    background-color: {Style.BG_CARD};
-                    padding: 8px;
-                    border-radius: 6px;
-                    color: {Style.TEXT_PRIMARY};
-                    font-size: 11px;
-                }}
-            """)
-        else:
-            self.user_logo_path = None
-            self.logo_display.setText("선택안함")
-        self.save_config()
-
-    def toggle_password_input(self, state: int) -> None:
-        """비밀번호 입력 필드 활성화/비활성화"""
-        self.password_input.setEnabled(state == Qt.Checked)
-        if state != Qt.Checked:
-            self.password_input.clear()
-
-    def open_output_folder(self) -> None:
-        """작업완료 폴더 열기"""
-        if self.completed_folder_path and os.path.exists(self.completed_folder_path):
+        n = int(text)
+    except ValueError:
+        n = 0
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"1 이상의 정수가 필요합니다: {text!r}")
+    return n
+
+def _emit_jsonl(stream, event: str, **fields) -> None:
+    stream.write(json.dumps({"event": event, "ts": round(time.time(), 3), **fields}, ensure_ascii=False) + "\n")
+    stream.flush()
+
+def estimate_case_cost(folder: str, scale: float = 1.0) -> CaseCost:
+    """케이스 폴더 → 예상 최고 메모리/CPU (메시는 읽지 않고 STL/PLY 헤더만 – 병렬 배치 스케줄링용)"""
+    tris, size, jaw_tris = [], 0, 0
+    for root, _, files in os.walk(folder):
+        for f in files:
+            if not f.lower().endswith((".stl", ".ply")):
+                continue
+            fp = os.path.join(root, f)
+            n = mesh_triangle_count(fp)
+            tris.append(n)
             try:
-                if sys.platform == "win32":
-                    os.startfile(self.completed_folder_path)
-                elif sys.platform == "darwin":  # macOS
-                    subprocess.Popen(["open", self.completed_folder_path])
-                else:  # Linux
-                    subprocess.Popen(["xdg-open", self.completed_folder_path])
-            except Exception as e:
-                QMessageBox.warning(self, "오류", f"폴더를 열 수 없습니다: {str(e)}")
-
-    def toggle_output_button(self, text: str) -> None:
-        self.output_button.setEnabled(text == "하나의 폴더에 저장")
-        if text != "하나의 폴더에 저장":
-            self.output_display.setText("저장 폴더 선택")
-            self.output_display.setStyleSheet(f"""
-                QLabel {{
-                    background-color: {Style.BG_CARD};
-                    padding: 8px;
-                    border-radius: 6px;
-                    color: {Style.TEXT_SECONDARY};
-                    font-size: 11px;
-                }}
-            """)
-            self.output_folder = None
-
-    def stop_processing(self) -> None:
-        if self.worker_thread and self.worker_thread.is_alive():
-            self.stop_requested = True
-            self.status_label.setText("중지 중...")
-            self.stop_button.setEnabled(False)
-            # Stop spinner
-            if hasattr(self, 'spinner_movie') and self.spinner_movie:
-                self.spinner_movie.stop()
-                self.spinner_label.setVisible(False)
-
-    def return_to_module_selection(self) -> None:
-        """모듈 셀렉션으로 돌아가기"""
-        try:
-            if getattr(sys, "frozen", False):
-                cmd = [sys.executable]
-            else:
-                main_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "main.py")
-                cmd = [sys.executable, main_path]
-
-            # 토큰과 세션 ID가 있으면 전달
-            if heartbeat_token:
-                cmd.append(f"--token={heartbeat_token}")
-            if heartbeat_session_id:
-                cmd.append(f"--sid={heartbeat_session_id}")
-
-            subprocess.Popen(cmd)
-            self.close()
-        except Exception as e:
-            QMessageBox.warning(self, "오류", f"모듈 선택으로 돌아가는 중 오류가 발생했습니다: {e}")
-
-    def start_html_conversion(self) -> None:
-        if heartbeat_token:
-            send_heartbeat()
-        if not self.folder_path:
-            QMessageBox.warning(self, "경고", "먼저 작업 폴더를 선택해주세요!")
-            return
-
-        manual_mode = self.mode_combo.currentText() == "수동"
-        save_single = self.output_combo.currentText() == "하나의 폴더에 저장"
-
-        if save_single and not self.output_folder:
-            QMessageBox.information(self, "알림", "출력 폴더를 선택해주세요.")
-            self.select_output_folder()
-            if not self.output_folder:
-                return
+                size += os.path.getsize(fp)
+            except OSError:
+                pass
+            if _infer_jaw_from_string(f):      # 상/하악 단서가 있는 메시 = BITE 입력 후보
+                jaw_tris += n
+    return estimate_cost(tris, jaw_tris, held=detect_mode(folder) == "exo", size_bytes=size, scale=scale)
+
+def html_output_path(work_folder: str, output_folder: str | None = None) -> str:
+    """케이스 폴더 → 저장할 HTML 경로 (output_folder가 없으면 케이스 폴더 안에 저장)"""
+    name = f"{os.path.basename(os.path.normpath(work_folder))}.html"
+    return os.path.join(output_folder or work_folder, name)
+
+def _run_cli_worker_process(result_queue, work_folder_str, html_path_str, user_logo_path_str,
+                            skip_processed, password_str="", password_enabled_bool=False,
+                            cancel_event=None, bite_timeout=BITE_TIMEOUT, single_glb=False, precompress=False,
+                            runtime=DEFAULT_RUNTIME, output_format="html", encrypt_models=False):
+    """
+    CLI용 워커 진입점
+    자식 프로세스의 print()/vtk 출력이 stdout(JSON-lines)을 오염시키지 않도록 stderr로 돌린다.
+    Ctrl+C는 부모가 cancel_event로 전달하므로 자식은 SIGINT를 무시한다 (단계 중간에 끊기지 않게).
+    """
+    import signal
+    try:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    except (ValueError, OSError):
+        pass
+    try:
+        sys.stdout.flush()
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    except (AttributeError, OSError, ValueError):
+        pass
+    _run_html_worker_process(result_queue, work_folder_str, None, html_path_str, None,
+                             user_logo_path_str, skip_processed, password_str, password_enabled_bool,
+                             cancel_event, bite_timeout, None, single_glb, precompress, runtime, output_format,
+                             encrypt_models)
+
+def _add_conversion_options(p: argparse.ArgumentParser) -> None:
+    """convert / queue run 공통 옵션"""
+    p.add_argument("--jobs", type=_positive_int, default=1, metavar="N", help="동시 변환 프로세스 수 (기본 1)")
+    p.add_argument("--out", default=None, metavar="DIR", help="하나의 폴더에 저장 (기본: 각 케이스 폴더에 저장)")
+    p.add_argument("--skip-processed", action="store_true", help="이미 처리된 폴더 건너뛰기")
+    p.add_argument("--logo", default=None, metavar="PATH", help="사용자 로고 이미지")
+    p.add_argument("--password", default=None, help="HTML 비밀번호 보호")
+    p.add_argument("--encrypt-models", action="store_true",
+                   help="--password 와 함께: 모델을 AES-GCM(PBKDF2 키)으로 암호화 – 비밀번호 없이는 형상을 꺼낼 수 없음 "
+                        "(cryptography 패키지 필요)")
+    p.add_argument("--timeout", type=float, default=0.0, metavar="SEC",
+                   help="케이스 전체 제한 시간(초), 0이면 제한 없음 (기본 0 – 단계별 제한만 적용)")
+    p.add_argument("--stage-timeout", type=float, default=None, metavar="SEC",
+                   help="BITE 외 단계의 무진행 제한 시간(초) 일괄 지정 (기본: 단계별 기본값)")
+    p.add_argument("--bite-timeout", type=float, default=BITE_TIMEOUT, metavar="SEC",
+                   help=f"BITE 생성 제한 시간(초), 초과 시 BITE 없이 저장 / 0이면 제한 없음 (기본 {BITE_TIMEOUT})")
+    p.add_argument("--single-glb", action="store_true",
+                   help="케이스 전체를 모델별 노드를 가진 GLB 하나로 저장 (부품이 많은 케이스의 로딩 단축)")
+    p.add_argument("--precompress", action="store_true",
+                   help="HTML 옆에 .html.gz / .html.br 사전 압축본도 저장 (.br 은 brotli 패키지 필요)")
+    p.add_argument("--runtime", choices=RUNTIME_MODES, default=DEFAULT_RUNTIME,
+                   help="three.js 싣는 방식: auto·embed(번들을 HTML에 포함, 오프라인 – 번들이 없으면 오류) / "
+                        f"shared(PWA·내장 서버의 {RUNTIME_URL} 공유) / cdn (기본 {DEFAULT_RUNTIME})")
+    p.add_argument("--output-format", choices=OUTPUT_FORMATS, default="html",
+                   help=f"html / case(뷰어 코드 없는 <이름>{CASE_SUFFIX} 데이터 파일 – PWA 뷰어로 열기) / both (기본 html)")
+    p.add_argument("--mem-budget", type=float, default=None, metavar="MB",
+                   help="동시 실행 케이스의 예상 최고 메모리 합 상한 (기본: 가용 메모리의 80%%, 0이면 제한 없음)")
+    p.add_argument("--metrics-log", default=METRICS_LOG_PATH, metavar="PATH",
+                   help=f"케이스별 단계 계측 JSON-lines 로그 (기본 {METRICS_LOG_PATH}, 빈 값이면 기록 안 함)")
+
+def build_cli_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="fast_html_viewer_converter",
+                                 description="DLAS HTML 변환기 – 헤드리스 배치 모드 (PySide6 불필요)")
+    sub = ap.add_subparsers(dest="command", required=True)
+    cv = sub.add_parser("convert", help="루트 폴더 아래 케이스를 찾아 HTML로 일괄 변환")
+    cv.add_argument("root", help="검색 루트 폴더")
+    cv.add_argument("--since", type=_parse_since, default=None, metavar="DUR",
+                    help="최근 수정된 폴더만 (예: 24h, 90m, 2d / 단위 생략 시 시간)")
+    cv.add_argument("--keyword", default=None, help="폴더명 키워드 필터")
+    _add_conversion_options(cv)
+    qp = sub.add_parser("queue", help="작업 대기열(SQLite) – 우선순위/재시작 후 이어서 처리")
+    qp.add_argument("--db", default=JOBS_DB_PATH, metavar="PATH", help=f"대기열 DB (기본 {JOBS_DB_PATH})")
+    qsub = qp.add_subparsers(dest="queue_command", required=True)
+    qa = qsub.add_parser("add", help="케이스 폴더를 대기열에 추가")
+    qa.add_argument("folders", nargs="+", help="케이스 폴더 (--search 면 검색 루트)")
+    qa.add_argument("--priority", type=int, default=0, help=f"우선순위 – 클수록 먼저 (긴급 {URGENT_PRIORITY})")
+    qa.add_argument("--urgent", dest="priority", action="store_const", const=URGENT_PRIORITY, help="긴급 (맨 앞으로)")
+    qa.add_argument("--search", action="store_true", help="각 경로를 루트로 보고 convert 처럼 케이스를 찾아 추가")
+    qa.add_argument("--since", type=_parse_since, default=None, metavar="DUR", help="--search: 최근 수정된 폴더만")
+    qa.add_argument("--keyword", default=None, help="--search: 폴더명 키워드 필터")
+    qa.add_argument("--out", default=None, metavar="DIR", help="이 작업들의 저장 폴더 (기본: 러너의 --out)")
+    qr = qsub.add_parser("run", help="대기열의 작업을 우선순위 순으로 변환")
+    _add_conversion_options(qr)
+    qr.add_argument("--watch", action="store_true", help="대기열이 비어도 끝내지 않고 새 작업을 기다림")
+    qr.add_argument("--poll", type=float, default=5.0, metavar="SEC", help="--watch 확인 간격 (기본 5초)")
+    ql = qsub.add_parser("list", help="작업 목록 (JSON-lines)")
+    ql.add_argument("--status", default=None, choices=("queued", "running") + JOB_FINAL_STATUSES)
+    ql.add_argument("--limit", type=int, default=100)
+    qs = qsub.add_parser("stats", help="상태별 개수 / 처리량 / 소요 시간")
+    qs.add_argument("--window", type=float, default=1.0, metavar="HOURS", help="처리량 계산 구간 (기본 1시간)")
+    qt = qsub.add_parser("retry", help="실패한 작업(또는 지정한 ID)을 다시 대기로")
+    qt.add_argument("ids", nargs="*", type=int)
+    qc = qsub.add_parser("cancel", help="대기 중인 작업 취소")
+    qc.add_argument("ids", nargs="+", type=int)
+
+    sv = sub.add_parser("serve", help="변환 결과 폴더를 원격 뷰어용으로 서빙 (압축/캐시 검증/Range 지원)")
+    sv.add_argument("root", help="서빙할 폴더 (생성된 HTML이 있는 폴더)")
+    sv.add_argument("--host", default="0.0.0.0", help="바인드 주소 (기본 0.0.0.0 – 같은 Wi-Fi의 기기에서 접속)")
+    sv.add_argument("--port", type=int, default=8000, help="포트 (기본 8000)")
+    return ap
+
+def run_batch_cli(args: argparse.Namespace, out=None) -> int:
+    """
+    find_matching_folders → (ZIP 확장) → 케이스별 워커 프로세스(convert_stls_to_html)
+    GUI Auto 모드와 동일한 파이프라인을 --jobs 개 프로세스로 병렬 실행한다.
+    """
+    out = out or sys.stdout
+    root = os.path.abspath(args.root)
+    if not os.path.isdir(root):
+        _emit_jsonl(out, "error", message=f"폴더가 없습니다: {root}")
+        return EXIT_USAGE
+    if not _check_conversion_args(args, out):
+        return EXIT_USAGE
+
+    t0 = time.time()
+    folders = find_matching_folders(root, args.since, args.keyword)
+    cases = [c for f in folders for c in expand_candidates_with_zips(f)]
+    total = len(cases)
+    budget = resolve_budget(args.mem_budget)
+    _emit_jsonl(out, "start", root=root, total=total, jobs=args.jobs, mem_budget_mb=budget)
+    if startup_report_enabled():
+        _emit_jsonl(out, "startup", **startup_report())
+    if not cases:
+        _emit_jsonl(out, "done", total=0, success=0, skipped=0, failed=0, elapsed=0.0)
+        return EXIT_NO_CASES
+
+    # 병렬일 때만 비용 큰 케이스부터 (1개씩이면 발견 순서 유지)
+    scale = load_cost_scale(args.metrics_log)
+    scheduler = CaseScheduler(budget, by_cost=args.jobs > 1)
+    for work_folder in cases:
+        scheduler.add(work_folder, estimate_case_cost(work_folder, scale))
+
+    def take(free_mb: float, idle: bool):
+        nxt = scheduler.take(free_mb, idle)
+        if nxt is None:
+            return None
+        work_folder, cost = nxt
+        return work_folder, html_output_path(work_folder, args.out), cost
+    return _drive_workers(args, out, take, total, t0, budget_mb=budget)
+
+def _check_conversion_args(args: argparse.Namespace, out) -> bool:
+    if args.logo and not os.path.isfile(args.logo):
+        _emit_jsonl(out, "error", message=f"로고 파일이 없습니다: {args.logo}")
+        return False
+    if args.encrypt_models and not args.password:
+        _emit_jsonl(out, "error", message="--encrypt-models 는 --password 와 함께 써야 합니다")
+        return False
+    if args.encrypt_models and importlib.util.find_spec("cryptography") is None:
+        _emit_jsonl(out, "error", message="--encrypt-models 에는 cryptography 패키지가 필요합니다 (pip install cryptography)")
+        return False
+    if args.runtime in ("embed", "auto") and load_viewer_runtime() is None:
+        _emit_jsonl(out, "error", message=f"뷰어 런타임 번들이 없습니다: {RUNTIME_DIR}/{RUNTIME_FILENAME} "
+                                          f"(python build_viewer_runtime.py 로 생성)")
+        return False
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+    return True
 
-        time_opt       = self.time_combo.currentText()
-        time_limit_hr  = None if time_opt == "제한없음" else int(time_opt.replace("시간 이내", "").strip())
-        keyword        = self.keyword_input.text().strip() or None
-        skip_processed = self.skip_processed_checkbox.isChecked()
+def _drive_workers(args: argparse.Namespace, out, take, total: int, t0: float,
+                   on_finish=None, poll_s: float | None = None, on_tick=None, budget_mb: float | None = None) -> int:
+    """
+    케이스별 워커 프로세스를 --jobs 개까지 돌리는 공용 루프 (convert / queue run)
+    take(free_mb, idle) → 다음 (케이스 폴더, HTML 경로, CaseCost) 또는 None
+                 free_mb = 메모리 예산 - 실행 중 케이스의 예상치 합, idle = 실행 중인 케이스 없음
+                 (None 이어도 실행 중인 케이스가 있으면 끝난 뒤 다시 묻는다)
+    on_finish(work_folder, status, message, elapsed) – 케이스 하나가 끝날 때마다 (중단 시 "cancelled")
+    poll_s     – 주어지면 할 일이 없어도 끝내지 않고 이 간격으로 take() 를 다시 시도 (대기열 감시)
+    on_tick()  – 루프마다 호출 (대기열 생존 표시 등)
+    """
+    from multiprocessing.connection import wait as mp_wait
+
+    counts = {"success": 0, "skipped": 0, "error": 0, "timeout": 0, "crash": 0, "cancelled": 0}
+    running: list[tuple] = []
+    records: list[dict] = []
+    done = 0
+    started_cnt = 0
+    stage_timeouts = {k: args.stage_timeout for k in STAGE_TIMEOUTS} if args.stage_timeout is not None else None
+    bite_timeout = args.bite_timeout or None
+    progress = BatchProgress(total)
+    last_progress_emit = 0.0
+
+    def finish(item: tuple, status: str, message: str, case_metrics: dict | None = None) -> None:
+        nonlocal done
+        _, _, work_folder, html_path, started, watchdog, cost, _ = item
+        done += 1
+        counts[status] += 1
+        elapsed = time.time() - started
+        progress.finish(work_folder, skipped=(status == "skipped"))
+        rec = case_metrics or case_record(work_folder, status, elapsed)
+        rec["status"] = status
+        rec["est_mb"] = cost.mem_mb
+        rec["est_worker_mb"] = cost.worker_mb       # 보정 전 워커 추정치 – 다음 실행의 계수 보정용
+        if status == "timeout":
+            rec["timeout_stage"] = watchdog.stage
+        records.append(rec)
+        if args.metrics_log:
+            append_jsonl(args.metrics_log, rec)
+        on_finish and on_finish(work_folder, status, message, elapsed)
+        _emit_jsonl(out, "case", folder=work_folder, status=status,
+                    html=html_path if status == "success" else None, message=message,
+                    elapsed=round(elapsed, 3), rss_peak_mb=rec.get("rss_peak_mb"),
+                    done=done, total=progress.total, eta_s=progress.snapshot()["eta_s"])
 
-        folders = find_matching_folders(self.folder_path, time_limit_hr, keyword)
-        if not folders:
-            self.status_label.setText("조건에 맞는 폴더가 없습니다.")
-            return
+    try:
+        while True:
+            while len(running) < args.jobs:
+                free_mb = budget_mb - sum(r[6].mem_mb for r in running) if budget_mb else float("inf")
+                nxt = take(free_mb, not running)
+                if nxt is None:
+                    break
+                work_folder, html_path, cost = nxt
+                started_cnt += 1
+                progress.total = max(progress.total, started_cnt)   # 대기열에 새로 들어온 작업
+                result_queue = multiprocessing.Queue()
+                cancel_event = multiprocessing.Event()
+                proc = multiprocessing.Process(
+                    target=_run_cli_worker_process,
+                    args=(result_queue, work_folder, html_path, args.logo, args.skip_processed,
+                          args.password or "", bool(args.password), cancel_event, bite_timeout, args.single_glb,
+                          args.precompress, args.runtime, args.output_format, args.encrypt_models)
+                )
+                proc.start()
+                watchdog = StageWatchdog(stage_timeouts, bite_timeout, args.timeout)
+                running.append((proc, result_queue, work_folder, html_path, time.time(), watchdog, cost, cancel_event))
+                progress.start(work_folder)
+                _emit_jsonl(out, "case_start", folder=work_folder, pid=proc.pid, est_mb=cost.mem_mb,
+                            tris=cost.tris, running=len(running))
+
+            on_tick and on_tick()
+            if not running:
+                if poll_s is None:
+                    break
+                time.sleep(poll_s)
+                continue
 
-        # Start spinner
-        if hasattr(self, 'spinner_movie') and self.spinner_movie:
-            self.spinner_label.setVisible(True)
-            self.spinner_movie.start()
-
-        # 작업완료 폴더 열기 버튼 숨기기
-        self.open_folder_button.setVisible(False)
-
-        self.status_label.setText("HTML 변환 중...")
-        self._start_blinking()  # 깜빡임 시작
-        self.update_progress(0, f"HTML 변환 중... (0/{0})")
-        total = 0
-        processed = 0
-
-        fold_to_cands: list[Tuple[str, list[str]]] = []
-        for folder in folders:
-            cands = expand_candidates_with_zips(folder)
-            fold_to_cands.append((folder, cands))
-            total += len(cands)
-
-        if manual_mode:
-            for orig_folder, candidates in fold_to_cands:
-                for work_folder in candidates:
-                    QApplication.processEvents()
-                    if skip_processed and is_folder_processed(work_folder):
-                        self.append_debug(f"[Skip] {work_folder} – already processed")
-                        processed += 1; self.update_progress(processed/total*100, f"HTML 변환 중... ({processed}/{total})"); continue
-
-                    mode = detect_mode(work_folder)
-                    stl_paths = find_stl_files(work_folder, log_callback=self.append_debug)
-                    if not stl_paths:
-                        self.append_debug(f"[Skip] {work_folder} – no STL"); processed += 1; self.update_progress(processed/total*100, f"HTML 변환 중... ({processed}/{total})"); continue
-
-                    default_map = parse_3ox_for_groups(work_folder) if mode=="3shape" else parse_exo_for_groups(work_folder)
-                    dlg = ManualGroupDialog([os.path.basename(p) for p in stl_paths], default_map, self)
-                    if dlg.exec() != QDialog.Accepted:
-                        self.append_debug(f"[Cancel] {work_folder} – user skipped")
-                        processed += 1; self.update_progress(processed/total*100, f"HTML 변환 중... ({processed}/{total})"); continue
-                    group_map = dlg.mapping()
-
-                    if self.output_folder:
-                        html_path = os.path.join(self.output_folder, f"{os.path.basename(work_folder)}.html")
+            mp_wait([r[0].sentinel for r in running], timeout=0.5)
+
+            still_running = []
+            for item in running:
+                proc, result_queue, work_folder, html_path, started, watchdog, _, cancel_event = item
+                watchdog.drain(result_queue, on_event=lambda msg, case=work_folder: progress.apply(case, msg))
+                if proc.is_alive():
+                    expired = watchdog.expired()
+                    if expired:
+                        stop_worker_process(proc)
+                        finish(item, "timeout", f"{expired} – 부분 결과 보존, 재실행 시 이어서 처리")
                     else:
-                        html_path = os.path.join(work_folder, f"{os.path.basename(work_folder)}.html")
-
-                    try:
-                        convert_stls_to_html(
-                            stl_paths, html_path, work_folder, mode,
-                            log_callback=self.append_debug,
-                            user_logo_path=self.user_logo_path,
-                            group_override=group_map,
-                            progress_callback=self.update_progress
-                        )
-                        self.append_debug(f"[OK] Saved: {os.path.basename(html_path)}")
-                        create_folder_marker(work_folder)
-                    except Exception as e:
-                        self.append_debug(f"[ERROR] {work_folder}: {e}")
-
-                    processed += 1
-                    self.update_progress(processed/total*100, f"HTML 변환 중... ({processed}/{total})")
-
-            self._stop_blinking()  # 깜빡임 중지
-            self.status_label.setText("HTML 변환 완료!")
-            self.update_progress(100)
-            # Stop spinner
-            if hasattr(self, 'spinner_movie') and self.spinner_movie:
-                self.spinner_movie.stop()
-                self.spinner_label.setVisible(False)
-
-            # 작업완료 폴더 경로 설정 및 버튼 표시 (수동 모드)
-            if self.output_folder:
-                self.completed_folder_path = self.output_folder
+                        still_running.append(item)
+                    continue
+                proc.join()
+                result = watchdog.wait_result(result_queue)
+                if result is None:
+                    finish(item, "crash", f"exitcode={proc.exitcode}")
+                else:
+                    status = result[0] if result[0] in counts else "error"
+                    finish(item, status, result[1], result[2] if len(result) > 2 else None)
+            running = still_running
+            # 동시 실행 워커 합산 진행률 (최대 1초에 한 번)
+            if running and time.time() - last_progress_emit >= 1.0:
+                last_progress_emit = time.time()
+                _emit_jsonl(out, "progress", **progress.snapshot())
+    except KeyboardInterrupt:
+        # 실행 중 워커에 취소 전파 → 현재 단계를 마무리할 시간을 준 뒤 강제 종료
+        for proc, *_, cancel_event in running:
+            cancel_event.set()
+        deadline = time.time() + CANCEL_GRACE_S
+        for item in running:
+            proc = item[0]
+            try:
+                stop_worker_process(proc, grace=max(0.0, deadline - time.time()))
+            except KeyboardInterrupt:
+                proc.kill()
+            result = item[5].wait_result(item[1], timeout=0.2)
+            if result is not None and result[0] in counts:
+                finish(item, result[0], result[1], result[2] if len(result) > 2 else None)
             else:
-                self.completed_folder_path = self.folder_path
-            self.open_folder_button.setVisible(True)
-            return
-
-        # ----- Auto 모드 -----
-        self.stop_requested = False
-        self.html_button.setEnabled(False); self.stop_button.setEnabled(True)
+                finish(item, "cancelled", "중단됨")
+        _emit_jsonl(out, "done", total=progress.total, interrupted=True, elapsed=round(time.time() - t0, 3),
+                    success=counts["success"], skipped=counts["skipped"], cancelled=counts["cancelled"],
+                    failed=counts["error"] + counts["timeout"] + counts["crash"])
+        return EXIT_INTERRUPTED
+
+    failed = counts["error"] + counts["timeout"] + counts["crash"]
+    if records:
+        summary = summarize(records)
+        if args.metrics_log:
+            append_jsonl(args.metrics_log, summary)
+        print(format_summary_table(summary), file=sys.stderr)
+    _emit_jsonl(out, "done", total=progress.total, success=counts["success"], skipped=counts["skipped"],
+                cancelled=counts["cancelled"], failed=failed, errors=counts["error"], timeouts=counts["timeout"], crashes=counts["crash"],
+                elapsed=round(time.time() - t0, 3))
+    return EXIT_FAILED if failed else EXIT_OK
+
+def run_queue_cli(args: argparse.Namespace, out=None) -> int:
+    """queue add / run / list / stats / retry / cancel – 작업 대기열(SQLite)을 헤드리스로 다룬다"""
+    out = out or sys.stdout
+    jobs = JobQueue(args.db)
+    try:
+        if args.queue_command == "add":
+            folders = []
+            for path in args.folders:
+                if not os.path.isdir(path):
+                    _emit_jsonl(out, "error", message=f"폴더가 없습니다: {path}")
+                    return EXIT_USAGE
+                found = find_matching_folders(path, args.since, args.keyword) if args.search else [path]
+                folders += [c for f in found for c in expand_candidates_with_zips(f)]
+            options = {"out": os.path.abspath(args.out)} if args.out else {}
+            for folder in folders:
+                job_id = jobs.enqueue(folder, args.priority, options)
+                _emit_jsonl(out, "queued", id=job_id, folder=folder, priority=args.priority)
+            return EXIT_OK if folders else EXIT_NO_CASES
+
+        if args.queue_command == "run":
+            if not _check_conversion_args(args, out):
+                return EXIT_USAGE
+            me = worker_name("cli")
+            recovered = jobs.recover()
+            t0 = time.time()
+            budget = resolve_budget(args.mem_budget)
+            _emit_jsonl(out, "start", db=args.db, total=jobs.pending(), jobs=args.jobs, recovered=recovered,
+                        mem_budget_mb=budget)
+            claimed: dict[str, int] = {}
+            scale = load_cost_scale(args.metrics_log)
+            # 대기열은 우선순위를 지켜야 하므로 재정렬 없이 한 건만 잡아 두고 예산이 빌 때까지 기다린다
+            scheduler = CaseScheduler(budget, by_cost=False)
+
+            def take(free_mb: float, idle: bool):
+                if not len(scheduler):
+                    job = jobs.claim(me)
+                    if job is None:
+                        return None
+                    claimed[job["folder"]] = job["id"]
+                    scheduler.add(job, estimate_case_cost(job["folder"], scale))
+                nxt = scheduler.take(free_mb, idle)
+                if nxt is None:
+                    return None
+                job, cost = nxt
+                return job["folder"], html_output_path(job["folder"], job["options"].get("out") or args.out), cost
+
+            def on_finish(work_folder: str, status: str, message: str, elapsed: float) -> None:
+                job_id = claimed.pop(work_folder)
+                if status == "cancelled":
+                    jobs.release(job_id, "러너 중지 – 다음 실행에서 이어서")
+                else:
+                    jobs.finish(job_id, status, message, elapsed)
 
-        def worker():
-            nonlocal processed
             try:
-                for orig_folder, candidates in fold_to_cands:
-                    for work_folder in candidates:
-                        if self.stop_requested:
-                            self.append_debug("[Stop] user interrupted")
-                            break
-                        self.append_debug(f"----------\n[Folder] {work_folder}")
-
-                        if skip_processed and is_folder_processed(work_folder):
-                            self.append_debug("  [Skip] already processed")
-                            processed += 1; self.update_progress(processed/total*100, f"HTML 변환 중... ({processed}/{total})"); continue
-
-                        mode = detect_mode(work_folder)
-                        stl_paths = find_stl_files(work_folder, log_callback=self.append_debug)
-                        if not stl_paths:
-                            self.append_debug("  [Skip] no STL files")
-                            processed += 1; self.update_progress(processed/total*100, f"HTML 변환 중... ({processed}/{total})"); continue
-
-                        if self.output_folder:
-                            html_path = os.path.join(self.output_folder, f"{os.path.basename(work_folder)}.html")
-                        else:
-                            html_path = os.path.join(work_folder, f"{os.path.basename(work_folder)}.html")
-
-                        # multiprocessing.Process로 각 폴더 처리
-                        result_queue = multiprocessing.Queue()
-                        password_val = self.password_input.text() if self.password_checkbox.isChecked() else ""
-                        password_enabled_val = self.password_checkbox.isChecked()
-                        worker_process = multiprocessing.Process(
-                            target=_run_html_worker_process,
-                            args=(result_queue, work_folder, stl_paths, html_path,
-                                  mode, self.user_logo_path, skip_processed, password_val, password_enabled_val)
-                        )
-                        worker_process.start()
-                        worker_process.join(timeout=60)  # 60초 타임아웃
-
-                        if worker_process.is_alive():
-                            # 타임아웃 발생 - 프로세스 강제 종료
-                            worker_process.terminate()
-                            worker_process.join(timeout=2)
-                            if worker_process.is_alive():
-                                worker_process.kill()
-                            self.append_debug(f"  [TIMEOUT] 60초 초과 - 다음 케이스로 이동")
-                        else:
-                            # 프로세스 종료됨 - 결과 확인
-                            try:
-                                result_type, result_data = result_queue.get_nowait()
-                                if result_type == "success":
-                                    self.append_debug(f"  [OK] Saved: {result_data}")
-                                elif result_type == "skipped":
-                                    self.append_debug(f"  [Skip] {result_data}")
-                                elif result_type == "error":
-                                    self.append_debug(f"  [ERROR] {result_data}")
-                            except:
-                                if worker_process.exitcode != 0:
-                                    self.append_debug(f"  [CRASH] Process crashed - 다음 케이스로 이동")
-
-                        processed += 1
-                        self.update_progress(processed/total*100, f"HTML 변환 중... ({processed}/{total})")
+                rc = _drive_workers(args, out, take, jobs.pending(), t0, on_finish=on_finish,
+                                    poll_s=args.poll if args.watch else None,
+                                    on_tick=lambda: jobs.heartbeat(claimed.values()), budget_mb=budget)
             finally:
-                self._stop_blinking()  # 깜빡임 중지
-                if self.stop_requested:
-                    self.status_label.setText("HTML 변환 중지됨")
-                else:
-                    self.status_label.setText("HTML 변환 완료!")
-                    self.update_progress(100)
-
-                    # 작업완료 폴더 경로 설정 및 버튼 표시
-                    if save_single and self.output_folder:
-                        self.completed_folder_path = self.output_folder
-                    else:
-                        # 각 폴더에 저장했을 때는 첫 번째 폴더 표시
-                        self.completed_folder_path = self.folder_path
-                    self.open_folder_button.setVisible(True)
-
-                self.html_button.setEnabled(True); self.stop_button.setEnabled(False)
-                # Stop spinner
-                if hasattr(self, 'spinner_movie') and self.spinner_movie:
-                    self.spinner_movie.stop()
-                    self.spinner_label.setVisible(False)
+                # 잡아 두었지만 예산을 기다리느라 시작하지 못한 작업 – 중단 시 running 으로 남지 않게 바로 대기로 돌린다
+                for job_id in claimed.values():
+                    jobs.release(job_id, "러너 중지")
+            _emit_jsonl(out, "queue_stats", **jobs.stats())
+            return rc
+
+        if args.queue_command == "list":
+            for job in jobs.list_jobs(args.status, args.limit):
+                _emit_jsonl(out, "job", **job)
+            return EXIT_OK
+
+        if args.queue_command == "stats":
+            stats = jobs.stats(args.window * 3600)
+            print(format_queue_stats(stats), file=sys.stderr)
+            _emit_jsonl(out, "queue_stats", **stats)
+            return EXIT_OK
+
+        if args.queue_command == "retry":
+            _emit_jsonl(out, "retried", count=jobs.retry(args.ids or None))
+            return EXIT_OK
+
+        if args.queue_command == "cancel":
+            _emit_jsonl(out, "cancelled", count=jobs.cancel(args.ids))
+            return EXIT_OK
+        return EXIT_USAGE
+    finally:
+        jobs.close()
 
-        self.worker_thread = threading.Thread(target=worker, daemon=True)
-        self.worker_thread.start()
+def run_serve_cli(args: argparse.Namespace) -> int:
+    try:
+        from modules.viewer_server import serve
+    except ImportError:
+        from viewer_server import serve
+    root = os.path.abspath(args.root)
+    if not os.path.isdir(root):
+        print(f"[ERR] 폴더가 없습니다: {root}", file=sys.stderr)
+        return EXIT_USAGE
+    serve(root, args.host, args.port, log=lambda msg: print(msg, file=sys.stderr))
+    return 0
+
+def run_cli(argv: list[str]) -> int:
+    args = build_cli_parser().parse_args(argv)
+    if args.command == "serve":
+        return run_serve_cli(args)
+    if args.command == "queue":
+        out, sys.stdout = sys.stdout, sys.stderr
+        try:
+            return run_queue_cli(args, out)
+        finally:
+            sys.stdout = out
+    # 파이프라인 내부 print()는 stderr로 → stdout은 JSON-lines 전용
+    out, sys.stdout = sys.stdout, sys.stderr
+    try:
+        return run_batch_cli(args, out)
+    finally:
+        sys.stdout = out
 
 # ==============================================================================
 # main
 # ==============================================================================
-def main() -> None:
-    parse_token_and_sid()
-    app = QApplication(sys.argv)
-    if heartbeat_token and heartbeat_session_id:
-        start_heartbeat()
-    gui = STLViewerGUI()
-    gui.show()
-    sys.exit(app.exec())
+mark_startup("module_imported")
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in ("convert", "queue", "serve"):
+        sys.exit(run_cli(argv))
+    try:
+        from modules.fast_html_viewer_gui import run_gui
+    except ImportError:
+        from fast_html_viewer_gui import run_gui
+    mark_startup("gui_module_imported")
+    run_gui(startup_mark=mark_startup, on_shown=_print_startup_report)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,1277 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+DLAS Fast HTML Converter – GUI (PySide6)
+----------------------------------------------------------------
+변환 파이프라인은 fast_html_viewer_converter 에 있으며 Qt 의존성이 없다.
+이 모듈은 GUI 실행 시에만 import 된다 (헤드리스 CLI는 Qt를 로드하지 않음).
+----------------------------------------------------------------
+"""
+
+# ----------------------------------------------------------------------
+# 표준 라이브러리
+# ----------------------------------------------------------------------
+import os
+import sys
+import time
+import json
+import queue
+import threading
+import importlib.util
+import multiprocessing
+import subprocess
+from typing import Tuple
+
+# ----------------------------------------------------------------------
+# 외부 라이브러리
+# ----------------------------------------------------------------------
+from PySide6.QtCore import Qt, QTimer, QSettings, QSize
+from PySide6.QtGui  import QPixmap, QIcon, QCursor, QMovie
+from PySide6.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+    QLabel, QLineEdit, QPushButton, QFileDialog, QComboBox, QMessageBox,
+    QCheckBox, QProgressBar, QDialog, QTableWidget,
+    QTableWidgetItem, QFrame, QScrollArea, QPlainTextEdit
+)
+
+try:
+    from modules.common_styles import Style
+except ImportError:
+    from common_styles import Style
+
+try:
+    from modules.conversion_metrics import CaseMetrics, case_record, append_jsonl, summarize, format_summary_table
+except ImportError:
+    from conversion_metrics import CaseMetrics, case_record, append_jsonl, summarize, format_summary_table
+
+try:
+    from modules.conversion_log import LogPipeline, RING_CAPACITY
+except ImportError:
+    from conversion_log import LogPipeline, RING_CAPACITY
+
+try:
+    from modules.conversion_jobs import JobQueue, URGENT_PRIORITY, worker_name, format_stats as format_queue_stats
+except ImportError:
+    from conversion_jobs import JobQueue, URGENT_PRIORITY, worker_name, format_stats as format_queue_stats
+
+try:
+    from modules.fast_html_viewer_converter import (
+        CONFIG_PATH, resource_path, detect_mode, find_stl_files, find_matching_folders,
+        expand_candidates_with_zips, is_folder_processed, create_folder_marker,
+        parse_3ox_for_groups, parse_exo_for_groups, convert_stls_to_html,
+        _run_html_worker_process, METRICS_LOG_PATH, DEFAULT_RUNTIME,
+        StageWatchdog, stop_worker_process, ConversionCancelled, BITE_TIMEOUT, CANCEL_GRACE_S,
+        BatchProgress, format_eta,
+    )
+except ImportError:
+    from fast_html_viewer_converter import (
+        CONFIG_PATH, resource_path, detect_mode, find_stl_files, find_matching_folders,
+        expand_candidates_with_zips, is_folder_processed, create_folder_marker,
+        parse_3ox_for_groups, parse_exo_for_groups, convert_stls_to_html,
+        _run_html_worker_process, METRICS_LOG_PATH, DEFAULT_RUNTIME,
+        StageWatchdog, stop_worker_process, ConversionCancelled, BITE_TIMEOUT, CANCEL_GRACE_S,
+        BatchProgress, format_eta,
+    )
+
+# ==============================================================================
+# Manual 그룹 선택 대화상자
+# ==============================================================================
+_GROUP_LIST = [
+    "upper_crownbridge", "upper_abutment", "upper_scan",
+    "lower_crownbridge", "lower_abutment", "lower_scan",
+    "bite", "etc"
+]
+class ManualGroupDialog(QDialog):
+    def __init__(self, stl_files: list[str], default_map: dict[str, str], parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("STL Group Mapping")
+        self.resize(560, 480)
+
+        vbox = QVBoxLayout(self)
+        tbl = QTableWidget(len(stl_files), 2, self)
+        tbl.setHorizontalHeaderLabels(["STL Filename", "Group"])
+        tbl.horizontalHeader().setStretchLastSection(True)
+        tbl.verticalHeader().setVisible(False)
+
+        for row, fn in enumerate(stl_files):
+            tbl.setItem(row, 0, QTableWidgetItem(fn))
+            cb = QComboBox()
+            cb.addItems(_GROUP_LIST)
+            cb.setCurrentText(default_map.get(fn, "etc"))
+            tbl.setCellWidget(row, 1, cb)
+
+        vbox.addWidget(tbl)
+        self.tbl = tbl
+
+        btn_box = QHBoxLayout()
+        btn_ok = QPushButton("OK");     btn_cancel = QPushButton("Cancel")
+        btn_ok.clicked.connect(self.accept); btn_cancel.clicked.connect(self.reject)
+        btn_box.addStretch(); btn_box.addWidget(btn_ok); btn_box.addWidget(btn_cancel)
+        vbox.addLayout(btn_box)
+
+    def mapping(self) -> dict[str, str]:
+        mp: dict[str, str] = {}
+        for row in range(self.tbl.rowCount()):
+            fn = self.tbl.item(row, 0).text()
+            grp = self.tbl.cellWidget(row, 1).currentText()
+            mp[fn] = grp
+        return mp
+
+# ==============================================================================
+# Heartbeat (옵션) – 동일 세션 보호
+# ==============================================================================
+heartbeat_token = None
+heartbeat_session_id = None
+heartbeat_timer = None
+def parse_token_and_sid() -> None:
+    global heartbeat_token, heartbeat_session_id
+    for arg in sys.argv:
+        if arg.startswith("--token="):
+            heartbeat_token = arg.split("=", 1)[1]
+        elif arg.startswith("--sid="):
+            heartbeat_session_id = arg.split("=", 1)[1]
+def send_heartbeat() -> None:
+    try:
+        import urllib.request
+        url = "https://license-server-697p.onrender.com/auth/heartbeat"
+        hdr = {"Authorization": f"Bearer {heartbeat_token}", "Content-Type": "application/json"}
+        req = urllib.request.Request(url, headers=hdr, method="POST")
+        with urllib.request.urlopen(req, timeout=10) as res:
+            if json.loads(res.read() or "{}").get("status") != "OK":
+                raise RuntimeError("Heartbeat rejected")
+    except Exception as e:
+        print("[Heartbeat] Failed:", e)
+        force_logout()
+def force_logout() -> None:
+    QMessageBox.critical(None, "Logged out", "다른 PC에서 동일 계정으로 로그인되어 세션이 종료되었습니다.")
+    sys.exit(0)
+def start_heartbeat() -> None:
+    global heartbeat_timer
+    heartbeat_timer = QTimer(); heartbeat_timer.timeout.connect(send_heartbeat); heartbeat_timer.start(2 * 60 * 1000)
+
+# ==============================================================================
+# GUI
+# ==============================================================================
+GUI_LEFTBOTTOM_LOGO = resource_path("logo.png")
+WINDOW_ICON         = resource_path("logo.ico")
+TITLE_IMAGE         = resource_path("fast_html_viewer_converter.png")
+
+PROGRESS_INTERVAL_MS = 100   # 진행률 큐를 GUI 스레드에서 비우는 주기
+LOG_VIEW_INTERVAL_MS = 300   # 로그 창 갱신 주기
+
+class LogViewerDialog(QDialog):
+    """LogPipeline 링 버퍼의 최근 로그 (새 줄만 주기적으로 추가, 줄 수 상한 = 링 버퍼 크기)"""
+    def __init__(self, pipeline: LogPipeline, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("변환 로그")
+        self.resize(820, 480)
+        self.pipeline = pipeline
+        self._seq = 0
+
+        vbox = QVBoxLayout(self)
+        self.view = QPlainTextEdit(self)
+        self.view.setReadOnly(True)
+        self.view.setMaximumBlockCount(RING_CAPACITY)
+        self.view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.view.setStyleSheet("font-family: Consolas, 'D2Coding', monospace; font-size: 11px;")
+        vbox.addWidget(self.view)
+
+        btn_box = QHBoxLayout()
+        path_label = QLabel(pipeline.log_path or "(로그 파일 없음)")
+        path_label.setStyleSheet(f"color: {Style.TEXT_SECONDARY}; font-size: 11px;")
+        path_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        btn_clear = QPushButton("화면 지우기"); btn_close = QPushButton("닫기")
+        btn_clear.clicked.connect(self.view.clear); btn_close.clicked.connect(self.close)
+        btn_box.addWidget(path_label, 1); btn_box.addWidget(btn_clear); btn_box.addWidget(btn_close)
+        vbox.addLayout(btn_box)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(LOG_VIEW_INTERVAL_MS)
+        self.refresh()
+
+    def refresh(self) -> None:
+        items = self.pipeline.ring.since(self._seq)
+        if not items:
+            return
+        self._seq = items[-1][0]
+        bar = self.view.verticalScrollBar()
+        at_bottom = bar.value() >= bar.maximum() - 2
+        self.view.appendPlainText("\n".join(line for _, _, line in items))
+        if at_bottom:
+            bar.setValue(bar.maximum())
+STAGE_LABELS = {
+    "discovery": "파일 검색", "xml_parse": "XML 분석", "transform": "좌표 변환",
+    "decimation": "메시 감소", "glb_encode": "GLB 변환", "bite": "BITE 생성", "html_write": "HTML 저장",
+    "compress": "사전 압축",
+}
+
+class NoWheelComboBox(QComboBox):
+    """휠 스크롤로 값이 변경되지 않는 ComboBox"""
+    def wheelEvent(self, event):
+        event.ignore()
+
+class STLViewerGUI(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.folder_path: str | None = None
+        self.output_folder: str | None = None
+        self.user_logo_path: str | None = None
+        self.single_glb = False
+        self.precompress = False
+        self.encrypt_models = False
+        self.worker_thread: threading.Thread | None = None
+        self.stop_requested = False
+        self.log_pipeline = LogPipeline()
+        self.log_dialog: LogViewerDialog | None = None
+        self.cancel_event = None   # 실행 중 워커 프로세스의 취소 이벤트 (stop_processing → 워커 전파)
+        self.settings = QSettings("DLAS", "fast_html_viewer_converter")
+
+        # 진행률 채널: 어느 스레드에서든 _post_progress() → GUI 스레드의 타이머가 주기적으로 모아서 반영
+        self._progress_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._batch_progress: BatchProgress | None = None
+        self._progress_override: tuple[int, str | None] | None = None
+        self._last_progress_pump = 0.0
+        self._draining = False
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(PROGRESS_INTERVAL_MS)
+        self.progress_timer.timeout.connect(self._drain_progress)
+
+        # 깜빡임 효과를 위한 타이머
+        self.blink_timer = QTimer()
+        self.blink_timer.timeout.connect(self._blink_status_label)
+        self.blink_state = False
+
+        self.load_config()
+        self.init_ui()
+
+    def load_config(self) -> None:
+        if os.path.exists(CONFIG_PATH):
+            try:
+                cfg = json.load(open(CONFIG_PATH, "r", encoding="utf-8"))
+                self.user_logo_path = cfg.get("user_logo_path")
+                self.single_glb = bool(cfg.get("single_glb", False))
+                self.precompress = bool(cfg.get("precompress", False))
+                self.encrypt_models = bool(cfg.get("encrypt_models", False))
+            except Exception:
+                self.user_logo_path = None
+
+    def save_config(self) -> None:
+        try:
+            json.dump({"user_logo_path": self.user_logo_path or "", "single_glb": self.single_glb,
+                       "precompress": self.precompress, "encrypt_models": self.encrypt_models},
+                      open(CONFIG_PATH, "w", encoding="utf-8"))
+        except Exception:
+            pass
+
+    def create_card(self):
+        """Create card-style frame"""
+        card = QFrame()
+        card.setStyleSheet(Style.card_style())
+        return card
+
+    def init_ui(self) -> None:
+        self.setWindowTitle("DLAS HTML 뷰어 변환기")
+        self.setGeometry(100, 100, 620, 800)
+        if os.path.exists(WINDOW_ICON):
+            self.setWindowIcon(QIcon(WINDOW_ICON))
+
+        self.setStyleSheet(f"""
+            QMainWindow, QWidget {{
+                background: {Style.BG_MAIN};
+                font-family: 'Malgun Gothic', '맑은 고딕', sans-serif;
+            }}
+        """)
+
+        # Scroll area
+        scroll_area = QScrollArea(self)
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setFrameShape(QFrame.NoFrame)
+        scroll_area.setStyleSheet(Style.scrollbar())
+        self.setCentralWidget(scroll_area)
+
+        main_widget = QWidget()
+        scroll_area.setWidget(main_widget)
+
+        main_layout = QVBoxLayout(main_widget)
+        main_layout.setContentsMargins(12, 12, 12, 12)
+        main_layout.setSpacing(8)
+
+        # Header (back button)
+        header_layout = QHBoxLayout()
+        header_layout.setContentsMargins(0, 0, 0, 10)
+        header_layout.addStretch()
+
+        back_btn = QPushButton("← 모듈 선택")
+        back_btn.setFixedSize(120, 36)
+        back_btn.setStyleSheet(Style.secondary_button())
+        back_btn.setCursor(QCursor(Qt.PointingHandCursor))
+        back_btn.clicked.connect(self.return_to_module_selection)
+        header_layout.addWidget(back_btn)
+
+        main_layout.addLayout(header_layout)
+
+        # Title (module image)
+        title_layout = QHBoxLayout()
+        title_layout.setContentsMargins(0, 0, 0, 0)
+
+        if os.path.exists(TITLE_IMAGE):
+            title_layout.addStretch()
+            icon_label = QLabel()
+            pixmap = QPixmap(TITLE_IMAGE)
+            scaled = pixmap.scaledToHeight(45, Qt.SmoothTransformation)
+            icon_label.setPixmap(scaled)
+            title_layout.addWidget(icon_label)
+            title_layout.addStretch()
+        else:
+            title_layout.addStretch()
+
+        main_layout.addLayout(title_layout)
+
+        # Description
+        desc_label = QLabel("HTML변환 모듈")
+        desc_label.setStyleSheet(f"font-size: 13px; color: {Style.TEXT_SECONDARY};")
+        desc_label.setAlignment(Qt.AlignCenter)
+        main_layout.addWidget(desc_label)
+
+        # Mode selection card
+        mode_card = self.create_card()
+        mode_layout = QVBoxLayout(mode_card)
+        mode_layout.setSpacing(8)
+
+        mode_label = QLabel("모드 선택")
+        mode_label.setStyleSheet(f"font-size: 13px; font-weight: bold; color: {Style.TEXT_PRIMARY};")
+        mode_layout.addWidget(mode_label)
+
+        self.mode_combo = NoWheelComboBox()
+        self.mode_combo.addItems(["자동", "수동"])
+        self.mode_combo.setStyleSheet(Style.combobox())
+        mode_layout.addWidget(self.mode_combo)
+
+        main_layout.addWidget(mode_card)
+
+        # Folder selection card
+        folder_card = self.create_card()
+        folder_layout = QVBoxLayout(folder_card)
+        folder_layout.setSpacing(8)
+
+        folder_label = QLabel("작업 폴더")
+        folder_label.setStyleSheet(f"font-size: 13px; font-weight: bold; color: {Style.TEXT_PRIMARY};")
+        folder_layout.addWidget(folder_label)
+
+        folder_row = QHBoxLayout()
+        self.folder_display = QLabel("폴더를 선택하세요")
+        self.folder_display.setMinimumHeight(40)
+        self.folder_display.setStyleSheet(f"""
+            QLabel {{
+                background-color: {Style.BG_CARD};
+                padding: 8px;
+                border-radius: 6px;
+                color: {Style.TEXT_SECONDARY};
+                font-size: 11px;
+            }}
+        """)
+        self.folder_display.setWordWrap(True)
+        folder_row.addWidget(self.folder_display, 1)
+
+        folder_btn = QPushButton("폴더 선택")
+        folder_btn.setFixedSize(100, 32)
+        folder_btn.setStyleSheet(Style.small_button())
+        folder_btn.setCursor(QCursor(Qt.PointingHandCursor))
+        folder_btn.clicked.connect(self.select_folder)
+        folder_row.addWidget(folder_btn)
+
+        folder_layout.addLayout(folder_row)
+
+        main_layout.addWidget(folder_card)
+
+        # Time/Keyword filter card
+        filter_card = self.create_card()
+        filter_layout = QVBoxLayout(filter_card)
+        filter_layout.setSpacing(8)
+
+        filter_label = QLabel("검색 필터")
+        filter_label.setStyleSheet(f"font-size: 13px; font-weight: bold; color: {Style.TEXT_PRIMARY};")
+        filter_layout.addWidget(filter_label)
+
+        # Time Range
+        time_row = QHBoxLayout()
+        time_lbl = QLabel("시간 범위:")
+        time_lbl.setMinimumWidth(100)
+        time_row.addWidget(time_lbl)
+
+        self.time_combo = NoWheelComboBox()
+        self.time_combo.addItems(["제한없음"]+[f"{i}시간 이내" for i in range(1,49)])
+        self.time_combo.setStyleSheet(Style.combobox())
+        time_row.addWidget(self.time_combo, 1)
+
+        filter_layout.addLayout(time_row)
+
+        # Keyword
+        keyword_row = QHBoxLayout()
+        keyword_lbl = QLabel("키워드:")
+        keyword_lbl.setMinimumWidth(100)
+        keyword_row.addWidget(keyword_lbl)
+
+        self.keyword_input = QLineEdit()
+        self.keyword_input.setPlaceholderText("검색 키워드 (선택사항)")
+        self.keyword_input.setStyleSheet(Style.lineedit())
+        keyword_row.addWidget(self.keyword_input, 1)
+
+        filter_layout.addLayout(keyword_row)
+
+        # Skip processed checkbox
+        self.skip_processed_checkbox = QCheckBox("이미 처리된 폴더 건너뛰기")
+        self.skip_processed_checkbox.setStyleSheet(Style.checkbox())
+        self.skip_processed_checkbox.setCursor(QCursor(Qt.PointingHandCursor))
+        filter_layout.addWidget(self.skip_processed_checkbox)
+
+        main_layout.addWidget(filter_card)
+
+        # Output card
+        output_card = self.create_card()
+        output_layout = QVBoxLayout(output_card)
+        output_layout.setSpacing(8)
+
+        output_label = QLabel("저장 위치")
+        output_label.setStyleSheet(f"font-size: 13px; font-weight: bold; color: {Style.TEXT_PRIMARY};")
+        output_layout.addWidget(output_label)
+
+        output_combo_row = QHBoxLayout()
+        self.output_combo = NoWheelComboBox()
+        self.output_combo.addItems(["각 폴더에 저장", "하나의 폴더에 저장"])
+        self.output_combo.setStyleSheet(Style.combobox())
+        self.output_combo.currentTextChanged.connect(self.toggle_output_button)
+        output_combo_row.addWidget(self.output_combo)
+
+        output_layout.addLayout(output_combo_row)
+
+        output_row = QHBoxLayout()
+        self.output_display = QLabel("저장 폴더 선택")
+        self.output_display.setMinimumHeight(40)
+        self.output_display.setStyleSheet(f"""
+            QLabel {{
+                background-color: {Style.BG_CARD};
+                padding: 8px;
+                border-radius: 6px;
+                color: {Style.TEXT_SECONDARY};
+                font-size: 11px;
+            }}
+        """)
+        output_row.addWidget(self.output_display, 1)
+
+        self.output_button = QPushButton("폴더 선택")
+        self.output_button.setFixedSize(100, 32)
+        self.output_button.setStyleSheet(Style.small_button())
+        self.output_button.setCursor(QCursor(Qt.PointingHandCursor))
+        self.output_button.clicked.connect(self.select_output_folder)
+        self.output_button.setEnabled(False)
+        output_row.addWidget(self.output_button)
+
+        output_layout.addLayout(output_row)
+
+        self.single_glb_checkbox = QCheckBox("모델을 GLB 하나로 묶기 (부품이 많은 케이스 로딩 단축)")
+        self.single_glb_checkbox.setStyleSheet(Style.checkbox())
+        self.single_glb_checkbox.setCursor(QCursor(Qt.PointingHandCursor))
+        self.single_glb_checkbox.setChecked(self.single_glb)
+        self.single_glb_checkbox.toggled.connect(self.toggle_single_glb)
+        output_layout.addWidget(self.single_glb_checkbox)
+
+        self.precompress_checkbox = QCheckBox("압축본(.html.gz / .html.br)도 함께 저장 (웹 호스팅·모바일 전송용)")
+        self.precompress_checkbox.setStyleSheet(Style.checkbox())
+        self.precompress_checkbox.setCursor(QCursor(Qt.PointingHandCursor))
+        self.precompress_checkbox.setChecked(self.precompress)
+        self.precompress_checkbox.toggled.connect(self.toggle_precompress)
+        output_layout.addWidget(self.precompress_checkbox)
+
+        main_layout.addWidget(output_card)
+
+        # Logo card
+        logo_card = self.create_card()
+        logo_layout = QVBoxLayout(logo_card)
+        logo_layout.setSpacing(8)
+
+        logo_header = QLabel("로고 추가")
+        logo_header.setStyleSheet(f"font-size: 13px; font-weight: bold; color: {Style.TEXT_PRIMARY};")
+        logo_layout.addWidget(logo_header)
+
+        logo_row = QHBoxLayout()
+        logo_name = os.path.basename(self.user_logo_path) if self.user_logo_path else "선택안함"
+        self.logo_display = QLabel(logo_name)
+        self.logo_display.setMinimumHeight(40)
+        self.logo_display.setStyleSheet(f"""
+            QLabel {{
+                background-color: {Style.BG_CARD};
+                padding: 8px;
+                border-radius: 6px;
+                color: {Style.TEXT_SECONDARY};
+                font-size: 11px;
+            }}
+        """)
+        logo_row.addWidget(self.logo_display, 1)
+
+        logo_btn = QPushButton("로고 선택")
+        logo_btn.setFixedSize(100, 32)
+        logo_btn.setStyleSheet(Style.small_button())
+        logo_btn.setCursor(QCursor(Qt.PointingHandCursor))
+        logo_btn.clicked.connect(self.select_user_logo)
+        logo_row.addWidget(logo_btn)
+
+        logo_layout.addLayout(logo_row)
+
+        main_layout.addWidget(logo_card)
+
+        # Password card
+        password_card = self.create_card()
+        password_layout = QVBoxLayout(password_card)
+        password_layout.setSpacing(8)
+
+        password_header = QLabel("비밀번호 보호")
+        password_header.setStyleSheet(f"font-size: 13px; font-weight: bold; color: {Style.TEXT_PRIMARY};")
+        password_layout.addWidget(password_header)
+
+        # Password checkbox
+        self.password_checkbox = QCheckBox("HTML 파일을 비밀번호로 보호")
+        self.password_checkbox.setStyleSheet(Style.checkbox())
+        self.password_checkbox.setCursor(QCursor(Qt.PointingHandCursor))
+        self.password_checkbox.stateChanged.connect(self.toggle_password_input)
+        password_layout.addWidget(self.password_checkbox)
+
+        # Password input
+        password_input_row = QHBoxLayout()
+        password_label = QLabel("비밀번호:")
+        password_label.setMinimumWidth(100)
+        password_input_row.addWidget(password_label)
+
+        self.password_input = QLineEdit()
+        self.password_input.setPlaceholderText("비밀번호 입력")
+        self.password_input.setEchoMode(QLineEdit.Password)
+        self.password_input.setStyleSheet(Style.lineedit())
+        self.password_input.setEnabled(False)
+        password_input_row.addWidget(self.password_input, 1)
+
+        password_layout.addLayout(password_input_row)
+
+        # 모델 암호화 (AES-GCM) – 비밀번호 보호 시에만
+        self.encrypt_models_checkbox = QCheckBox("모델 데이터까지 암호화 (비밀번호 없이는 형상을 꺼낼 수 없음)")
+        self.encrypt_models_checkbox.setStyleSheet(Style.checkbox())
+        self.encrypt_models_checkbox.setCursor(QCursor(Qt.PointingHandCursor))
+        self.encrypt_models_checkbox.setChecked(self.encrypt_models)
+        self.encrypt_models_checkbox.setEnabled(False)
+        self.encrypt_models_checkbox.toggled.connect(self.toggle_encrypt_models)
+        password_layout.addWidget(self.encrypt_models_checkbox)
+
+        # Password hint
+        password_hint = QLabel("💡 파일을 열 때마다 비밀번호 입력이 필요합니다")
+        password_hint.setStyleSheet(f"font-size: 11px; color: {Style.TEXT_SECONDARY}; padding: 5px;")
+        password_hint.setWordWrap(True)
+        password_layout.addWidget(password_hint)
+
+        main_layout.addWidget(password_card)
+
+        # Progress card
+        progress_card = self.create_card()
+        progress_layout = QVBoxLayout(progress_card)
+        progress_layout.setSpacing(8)
+
+        progress_header = QLabel("진행 상황")
+        progress_header.setStyleSheet(f"font-size: 13px; font-weight: bold; color: {Style.TEXT_PRIMARY};")
+        progress_layout.addWidget(progress_header)
+
+        # Spinner + status
+        spinner_layout = QHBoxLayout()
+        self.spinner_label = QLabel()
+        spinner_path = resource_path("spinner.gif")
+        if os.path.exists(spinner_path):
+            self.spinner_movie = QMovie(spinner_path)
+            self.spinner_movie.setScaledSize(QSize(24, 24))
+            self.spinner_label.setMovie(self.spinner_movie)
+        self.spinner_label.setVisible(False)
+        spinner_layout.addWidget(self.spinner_label)
+
+        self.status_label = QLabel("대기 중")
+        self.status_label.setStyleSheet(f"font-size: 13px; color: {Style.TEXT_PRIMARY};")
+        spinner_layout.addWidget(self.status_label, 1)
+
+        self.percent_label = QLabel("0%")
+        self.percent_label.setStyleSheet(f"font-size: 14px; font-weight: bold; color: {Style.ACCENT};")
+        spinner_layout.addWidget(self.percent_label)
+
+        progress_layout.addLayout(spinner_layout)
+
+        # Progress bar
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximum(100)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setFixedHeight(8)
+        self.progress_bar.setStyleSheet(Style.progress_bar())
+        progress_layout.addWidget(self.progress_bar)
+
+        main_layout.addWidget(progress_card)
+
+        main_layout.addStretch()
+
+        # Button area
+        button_layout = QHBoxLayout()
+
+        self.html_button = QPushButton("▶  변환 시작")
+        self.html_button.setFixedHeight(40)
+        self.html_button.setStyleSheet(Style.success_button())
+        self.html_button.setCursor(QCursor(Qt.PointingHandCursor))
+        self.html_button.clicked.connect(self.start_html_conversion)
+        button_layout.addWidget(self.html_button)
+
+        self.stop_button = QPushButton("■  중지")
+        self.stop_button.setFixedHeight(40)
+        self.stop_button.setStyleSheet(Style.error_button())
+        self.stop_button.setEnabled(False)
+        self.stop_button.setCursor(QCursor(Qt.PointingHandCursor))
+        self.stop_button.clicked.connect(self.stop_processing)
+        button_layout.addWidget(self.stop_button)
+
+        self.log_button = QPushButton("로그")
+        self.log_button.setFixedHeight(40)
+        self.log_button.setStyleSheet(Style.secondary_button())
+        self.log_button.setCursor(QCursor(Qt.PointingHandCursor))
+        self.log_button.clicked.connect(self.show_log_dialog)
+        button_layout.addWidget(self.log_button)
+
+        self.urgent_button = QPushButton("긴급 추가")
+        self.urgent_button.setFixedHeight(40)
+        self.urgent_button.setStyleSheet(Style.secondary_button())
+        self.urgent_button.setCursor(QCursor(Qt.PointingHandCursor))
+        self.urgent_button.setToolTip("케이스 폴더를 대기열 맨 앞에 추가 (변환 중이면 현재 케이스 다음에 처리)")
+        self.urgent_button.clicked.connect(self.add_urgent_case)
+        button_layout.addWidget(self.urgent_button)
+
+        main_layout.addLayout(button_layout)
+
+        # 작업완료 폴더 열기 버튼 (처리 완료 후 표시)
+        self.open_folder_button = QPushButton("📁  작업완료 폴더 열기")
+        self.open_folder_button.setFixedHeight(40)
+        self.open_folder_button.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {Style.SUCCESS};
+                color: white;
+                font-size: 13px;
+                font-weight: bold;
+                border: none;
+                border-radius: 8px;
+            }}
+            QPushButton:hover {{
+                background-color: #27ae60;
+            }}
+        """)
+        self.open_folder_button.setCursor(QCursor(Qt.PointingHandCursor))
+        self.open_folder_button.clicked.connect(self.open_output_folder)
+        self.open_folder_button.setVisible(False)  # 초기에는 숨김
+        self.completed_folder_path = None  # 완료된 폴더 경로 저장
+        main_layout.addWidget(self.open_folder_button)
+
+        # Footer (로고 왼쪽, 버전 정보 오른쪽)
+        footer_layout = QHBoxLayout()
+        footer_layout.setContentsMargins(0, 10, 0, 0)
+
+        # Left: DLAS logo
+        logo_path = resource_path("logo.png")
+        if os.path.exists(logo_path):
+            logo_label = QLabel()
+            logo_pixmap = QPixmap(logo_path)
+            scaled_logo = logo_pixmap.scaledToHeight(25, Qt.SmoothTransformation)
+            logo_label.setPixmap(scaled_logo)
+            footer_layout.addWidget(logo_label, alignment=Qt.AlignLeft | Qt.AlignBottom)
+
+        footer_layout.addStretch()
+
+        # Right: Version info
+        version_label = QLabel("DLAS v2.3.2 © 2025 Dental Lab Automation Solution - All rights reserved.")
+        version_label.setStyleSheet("color: #999999; font-size: 10px;")
+        footer_layout.addWidget(version_label, alignment=Qt.AlignRight | Qt.AlignBottom)
+        main_layout.addLayout(footer_layout)
+
+    def append_debug(self, msg: str) -> None:
+        """어느 스레드에서든 호출 가능 – 큐에 넣기만 하고 기록은 LogPipeline 리스너 스레드가 한다"""
+        self.log_pipeline.log(msg)
+
+    def show_log_dialog(self) -> None:
+        if self.log_dialog is None:
+            self.log_dialog = LogViewerDialog(self.log_pipeline, self)
+        self.log_dialog.show()
+        self.log_dialog.raise_()
+
+    def closeEvent(self, event) -> None:
+        self.log_pipeline.stop()
+        super().closeEvent(event)
+
+    def _blink_status_label(self) -> None:
+        """상태 라벨 깜빡임 효과"""
+        if self.blink_state:
+            self.status_label.setStyleSheet(f"font-size: 13px; color: {Style.ACCENT}; font-weight: bold;")
+        else:
+            self.status_label.setStyleSheet(f"font-size: 13px; color: {Style.TEXT_PRIMARY};")
+        self.blink_state = not self.blink_state
+
+    def _start_blinking(self) -> None:
+        """깜빡임 시작"""
+        self.blink_timer.start(500)  # 500ms마다 깜빡임
+
+    def _stop_blinking(self) -> None:
+        """깜빡임 중지"""
+        self.blink_timer.stop()
+        self.status_label.setStyleSheet(f"font-size: 13px; color: {Style.TEXT_PRIMARY};")
+
+    def _post_progress(self, *event) -> None:
+        """
+        진행 이벤트 전달 (스레드 무관, 락 없는 SimpleQueue)
+          ("batch", total) / ("batch_grow", n) / ("case_start", case) / ("worker", case, 워커 메시지) /
+          ("case_done", case, skipped) / ("status", percent, message) / ("call", fn) / ("end",)
+        GUI 스레드에서 호출되면(수동 모드의 동기 변환 중) 주기 제한을 두고 바로 반영한다.
+        """
+        self._progress_queue.put(event)
+        if threading.current_thread() is threading.main_thread() and not self._draining:
+            now = time.monotonic()
+            if now - self._last_progress_pump >= PROGRESS_INTERVAL_MS / 1000:
+                self._last_progress_pump = now
+                self._drain_progress()
+                QApplication.processEvents()
+
+    def _drain_progress(self) -> None:
+        """GUI 스레드 전용: 쌓인 이벤트를 한 번에 반영하고 위젯은 한 번만 갱신"""
+        if self._draining:
+            return
+        self._draining = True
+        try:
+            self._drain_progress_events()
+        finally:
+            self._draining = False
+
+    def _drain_progress_events(self) -> None:
+        end = False
+        while True:
+            try:
+                ev = self._progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            kind, bp = ev[0], self._batch_progress
+            if kind == "batch":
+                self._batch_progress = BatchProgress(ev[1]); self._progress_override = None
+            elif kind == "batch_grow" and bp:
+                bp.total += ev[1]
+            elif kind == "case_start" and bp:
+                bp.start(ev[1]); self._progress_override = None
+            elif kind == "worker" and bp:
+                bp.apply(ev[1], ev[2])
+            elif kind == "case_done" and bp:
+                bp.finish(ev[1], skipped=ev[2])
+            elif kind == "status":
+                self._progress_override = (ev[1], ev[2])
+            elif kind == "call":
+                ev[1]()
+            elif kind == "end":
+                end = True
+
+        if self._progress_override is not None:
+            percent, message = self._progress_override
+            self._set_progress_widgets(percent, message)
+        elif self._batch_progress is not None:
+            bp = self._batch_progress
+            message = f"HTML 변환 중... ({bp.finished}/{bp.total})"
+            if bp.active:
+                case, st = next(iter(bp.active.items()))
+                stage = STAGE_LABELS.get(st["stage"])
+                message += f" · {os.path.basename(case)}" + (f" {stage}" if stage else "") + f" {int(st['fraction'] * 100)}%"
+            message += f" · 남은 시간 {format_eta(bp.eta_s())}"
+            self._set_progress_widgets(int(bp.fraction * 100), message)
+        if end:
+            self._batch_progress = None
+            self.progress_timer.stop()
+
+    def _set_progress_widgets(self, percent: int, message: str | None) -> None:
+        self.progress_bar.setValue(percent)
+        self.percent_label.setText(f"{percent}%")
+        if message:
+            self.status_label.setText(message)
+
+    def update_progress(self, val: float, message: str = None) -> None:
+        """
+        진행률 업데이트 (배치 집계 대신 값을 직접 지정)
+        Args:
+            val: 진행률 (0-100)
+            message: 상태 메시지 (None이면 기존 메시지 유지)
+        """
+        self._post_progress("status", int(val), message)
+
+    def select_folder(self) -> None:
+        if heartbeat_token:
+            send_heartbeat()
+        last_folder = self.settings.value("last_folder", "")
+        path = QFileDialog.getExistingDirectory(self, "작업 폴더 선택", last_folder)
+        if path:
+            self.folder_path = path
+            self.settings.setValue("last_folder", path)
+            self.folder_display.setText(path)
+            self.folder_display.setStyleSheet(f"""
+                QLabel {{
+                    background-color: {Style.BG_CARD};
+                    padding: 8px;
+                    border-radius: 6px;
+                    color: {Style.TEXT_PRIMARY};
+                    font-size: 11px;
+                }}
+            """)
+
+    def select_output_folder(self) -> None:
+        last_output = self.settings.value("last_output_folder", "")
+        path = QFileDialog.getExistingDirectory(self, "출력 폴더 선택", last_output)
+        if path:
+            self.output_folder = path
+            self.settings.setValue("last_output_folder", path)
+            self.output_display.setText(path)
+            self.output_display.setStyleSheet(f"""
+                QLabel {{
+                    background-color: {Style.BG_CARD};
+                    padding: 8px;
+                    border-radius: 6px;
+                    color: {Style.TEXT_PRIMARY};
+                    font-size: 11px;
+                }}
+            """)
+
+    def select_user_logo(self) -> None:
+        file_filter = "이미지 (*.png *.jpg *.jpeg *.bmp *.gif)"
+        path, _ = QFileDialog.getOpenFileName(self, "로고 선택", filter=file_filter)
+        if path:
+            self.user_logo_path = path
+            self.logo_display.setText(os.path.basename(path))
+            self.logo_display.setStyleSheet(f"""
+                QLabel {{
+                    background-color: {Style.BG_CARD};
+                    padding: 8px;
+                    border-radius: 6px;
+                    color: {Style.TEXT_PRIMARY};
+                    font-size: 11px;
+                }}
+            """)
+        else:
+            self.user_logo_path = None
+            self.logo_display.setText("선택안함")
+        self.save_config()
+
+    def toggle_password_input(self, state: int) -> None:
+        """비밀번호 입력 필드 활성화/비활성화"""
+        self.password_input.setEnabled(state == Qt.Checked)
+        self.encrypt_models_checkbox.setEnabled(state == Qt.Checked)
+        if state != Qt.Checked:
+            self.password_input.clear()
+
+    def _cryptography_available(self) -> bool:
+        """모델 암호화에 필요한 cryptography 패키지 확인 – 없으면 안내 (CLI 의 _check_conversion_args 와 같은 조건)"""
+        if importlib.util.find_spec("cryptography") is not None:
+            return True
+        QMessageBox.warning(self, "오류", "모델 암호화에는 cryptography 패키지가 필요합니다.\n(pip install cryptography)")
+        return False
+
+    def toggle_encrypt_models(self, checked: bool) -> None:
+        if checked and not self._cryptography_available():
+            self.encrypt_models_checkbox.setChecked(False)
+            return
+        self.encrypt_models = checked
+        self.save_config()
+
+    def open_output_folder(self) -> None:
+        """작업완료 폴더 열기"""
+        if self.completed_folder_path and os.path.exists(self.completed_folder_path):
+            try:
+                if sys.platform == "win32":
+                    os.startfile(self.completed_folder_path)
+                elif sys.platform == "darwin":  # macOS
+                    subprocess.Popen(["open", self.completed_folder_path])
+                else:  # Linux
+                    subprocess.Popen(["xdg-open", self.completed_folder_path])
+            except Exception as e:
+                QMessageBox.warning(self, "오류", f"폴더를 열 수 없습니다: {str(e)}")
+
+    def toggle_single_glb(self, checked: bool) -> None:
+        self.single_glb = checked
+        self.save_config()
+
+    def toggle_precompress(self, checked: bool) -> None:
+        self.precompress = checked
+        self.save_config()
+
+    def toggle_output_button(self, text: str) -> None:
+        self.output_button.setEnabled(text == "하나의 폴더에 저장")
+        if text != "하나의 폴더에 저장":
+            self.output_display.setText("저장 폴더 선택")
+            self.output_display.setStyleSheet(f"""
+                QLabel {{
+                    background-color: {Style.BG_CARD};
+                    padding: 8px;
+                    border-radius: 6px;
+                    color: {Style.TEXT_SECONDARY};
+                    font-size: 11px;
+                }}
+            """)
+            self.output_folder = None
+
+    def stop_processing(self) -> None:
+        if self.worker_thread and self.worker_thread.is_alive():
+            self.stop_requested = True
+            if self.cancel_event is not None:
+                self.cancel_event.set()
+            self.status_label.setText("중지 중...")
+            self.stop_button.setEnabled(False)
+            # Stop spinner
+            if hasattr(self, 'spinner_movie') and self.spinner_movie:
+                self.spinner_movie.stop()
+                self.spinner_label.setVisible(False)
+
+    def add_urgent_case(self) -> None:
+        """긴급 케이스를 작업 대기열 맨 앞에 추가 – 변환 중이면 현재 케이스 다음에, 아니면 다음 Auto 실행에서 처리"""
+        path = QFileDialog.getExistingDirectory(self, "긴급 케이스 폴더 선택", self.folder_path or "")
+        if not path:
+            return
+        save_single = self.output_combo.currentText() == "하나의 폴더에 저장"
+        options = {"out": self.output_folder} if save_single and self.output_folder else {}
+        jobs = JobQueue()
+        try:
+            cands = expand_candidates_with_zips(path)
+            for work_folder in cands:
+                jobs.enqueue(work_folder, URGENT_PRIORITY, options)
+        finally:
+            jobs.close()
+        self.append_debug(f"[Queue] 긴급 추가: {path} ({len(cands)}건)")
+        if self.worker_thread is not None and self.worker_thread.is_alive():
+            self._post_progress("batch_grow", len(cands))
+        else:
+            self.status_label.setText(f"긴급 케이스 {len(cands)}건 대기 중 – 변환 시작 시 먼저 처리됩니다.")
+
+    def _finish_auto_batch(self, save_single: bool) -> None:
+        """Auto 모드 종료 처리 (GUI 스레드)"""
+        self._stop_blinking()  # 깜빡임 중지
+        if self.stop_requested:
+            self.update_progress(self.progress_bar.value(), "HTML 변환 중지됨")
+        else:
+            self.update_progress(100, "HTML 변환 완료!")
+
+            # 작업완료 폴더 경로 설정 및 버튼 표시
+            if save_single and self.output_folder:
+                self.completed_folder_path = self.output_folder
+            else:
+                # 각 폴더에 저장했을 때는 첫 번째 폴더 표시
+                self.completed_folder_path = self.folder_path
+            self.open_folder_button.setVisible(True)
+
+        self.html_button.setEnabled(True); self.stop_button.setEnabled(False)
+        # Stop spinner
+        if hasattr(self, 'spinner_movie') and self.spinner_movie:
+            self.spinner_movie.stop()
+            self.spinner_label.setVisible(False)
+
+    def return_to_module_selection(self) -> None:
+        """모듈 셀렉션으로 돌아가기"""
+        try:
+            if getattr(sys, "frozen", False):
+                cmd = [sys.executable]
+            else:
+                main_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "main.py")
+                cmd = [sys.executable, main_path]
+
+            # 토큰과 세션 ID가 있으면 전달
+            if heartbeat_token:
+                cmd.append(f"--token={heartbeat_token}")
+            if heartbeat_session_id:
+                cmd.append(f"--sid={heartbeat_session_id}")
+
+            subprocess.Popen(cmd)
+            self.close()
+        except Exception as e:
+            QMessageBox.warning(self, "오류", f"모듈 선택으로 돌아가는 중 오류가 발생했습니다: {e}")
+
+    def start_html_conversion(self) -> None:
+        if heartbeat_token:
+            send_heartbeat()
+        if not self.folder_path:
+            QMessageBox.warning(self, "경고", "먼저 작업 폴더를 선택해주세요!")
+            return
+
+        manual_mode = self.mode_combo.currentText() == "수동"
+        save_single = self.output_combo.currentText() == "하나의 폴더에 저장"
+
+        if save_single and not self.output_folder:
+            QMessageBox.information(self, "알림", "출력 폴더를 선택해주세요.")
+            self.select_output_folder()
+            if not self.output_folder:
+                return
+
+        time_opt       = self.time_combo.currentText()
+        time_limit_hr  = None if time_opt == "제한없음" else int(time_opt.replace("시간 이내", "").strip())
+        keyword        = self.keyword_input.text().strip() or None
+        skip_processed = self.skip_processed_checkbox.isChecked()
+        single_glb = self.single_glb
+        precompress = self.precompress
+        password_val = self.password_input.text() if self.password_checkbox.isChecked() else ""
+        password_enabled_val = self.password_checkbox.isChecked()
+        encrypt_models = password_enabled_val and self.encrypt_models
+        if encrypt_models and not self._cryptography_available():
+            return
+
+        folders = find_matching_folders(self.folder_path, time_limit_hr, keyword)
+        if not folders:
+            self.status_label.setText("조건에 맞는 폴더가 없습니다.")
+            return
+
+        # Start spinner
+        if hasattr(self, 'spinner_movie') and self.spinner_movie:
+            self.spinner_label.setVisible(True)
+            self.spinner_movie.start()
+
+        # 작업완료 폴더 열기 버튼 숨기기
+        self.open_folder_button.setVisible(False)
+
+        self.status_label.setText("HTML 변환 중...")
+        self._start_blinking()  # 깜빡임 시작
+        self.progress_timer.start()
+        self.update_progress(0, f"HTML 변환 중... (0/{0})")
+        total = 0
+
+        metrics_records: list[dict] = []
+        def record_metrics(rec: dict) -> None:
+            metrics_records.append(rec)
+            append_jsonl(METRICS_LOG_PATH, rec)
+        def log_metrics_summary() -> None:
+            if not metrics_records:
+                return
+            summary = summarize(metrics_records)
+            append_jsonl(METRICS_LOG_PATH, summary)
+            self.append_debug(format_summary_table(summary))
+
+        fold_to_cands: list[Tuple[str, list[str]]] = []
+        for folder in folders:
+            cands = expand_candidates_with_zips(folder)
+            fold_to_cands.append((folder, cands))
+            total += len(cands)
+        self._post_progress("batch", total)
+
+        if manual_mode:
+            for orig_folder, candidates in fold_to_cands:
+                for work_folder in candidates:
+                    self._post_progress("case_start", work_folder)
+                    if skip_processed and is_folder_processed(work_folder):
+                        self.append_debug(f"[Skip] {work_folder} – already processed")
+                        self._post_progress("case_done", work_folder, True); continue
+
+                    mode = detect_mode(work_folder)
+                    stl_paths = find_stl_files(work_folder, log_callback=self.append_debug)
+                    if not stl_paths:
+                        self.append_debug(f"[Skip] {work_folder} – no STL")
+                        self._post_progress("case_done", work_folder, True); continue
+
+                    default_map = parse_3ox_for_groups(work_folder) if mode=="3shape" else parse_exo_for_groups(work_folder)
+                    dlg = ManualGroupDialog([os.path.basename(p) for p in stl_paths], default_map, self)
+                    if dlg.exec() != QDialog.Accepted:
+                        self.append_debug(f"[Cancel] {work_folder} – user skipped")
+                        self._post_progress("case_done", work_folder, True); continue
+                    group_map = dlg.mapping()
+
+                    if self.output_folder:
+                        html_path = os.path.join(self.output_folder, f"{os.path.basename(work_folder)}.html")
+                    else:
+                        html_path = os.path.join(work_folder, f"{os.path.basename(work_folder)}.html")
+
+                    post_worker = lambda msg, wf=work_folder: self._post_progress("worker", wf, msg)
+                    case_metrics = CaseMetrics(work_folder, on_stage=lambda name, ev: post_worker(("stage", name, ev, time.time())))
+                    try:
+                        convert_stls_to_html(
+                            stl_paths, html_path, work_folder, mode,
+                            log_callback=self.append_debug,
+                            user_logo_path=self.user_logo_path,
+                            group_override=group_map,
+                            progress_callback=lambda pct, msg: post_worker(("progress", pct, msg)),
+                            metrics=case_metrics,
+                            bite_timeout=BITE_TIMEOUT,
+                            keep_partial=True,
+                            single_glb=single_glb,
+                            precompress=precompress,
+                            password=password_val,
+                            password_enabled=password_enabled_val,
+                            encrypt_models=encrypt_models
+                        )
+                        self.append_debug(f"[OK] Saved: {os.path.basename(html_path)}")
+                        create_folder_marker(work_folder)
+                        case_metrics.finish("success")
+                    except ConversionCancelled as e:
+                        self.append_debug(f"[Stop] {work_folder}: {e}")
+                        case_metrics.finish("cancelled")
+                    except Exception as e:
+                        self.append_debug(f"[ERROR] {work_folder}: {e}")
+                        case_metrics.finish("error")
+                    record_metrics(case_metrics.to_dict())
+                    self._post_progress("case_done", work_folder, False)
+
+            log_metrics_summary()
+            self._stop_blinking()  # 깜빡임 중지
+            self.update_progress(100, "HTML 변환 완료!")
+            self._post_progress("end")
+            self._drain_progress()
+            # Stop spinner
+            if hasattr(self, 'spinner_movie') and self.spinner_movie:
+                self.spinner_movie.stop()
+                self.spinner_label.setVisible(False)
+
+            # 작업완료 폴더 경로 설정 및 버튼 표시 (수동 모드)
+            if self.output_folder:
+                self.completed_folder_path = self.output_folder
+            else:
+                self.completed_folder_path = self.folder_path
+            self.open_folder_button.setVisible(True)
+            return
+
+        # ----- Auto 모드 -----
+        self.stop_requested = False
+        self.html_button.setEnabled(False); self.stop_button.setEnabled(True)
+
+        def worker():
+            # 작업 대기열(SQLite)을 거쳐 처리 – 앱을 닫아도 남은 케이스가 보존되고, 긴급 추가분이 먼저 처리된다
+            jobs = JobQueue()
+            me = worker_name("gui")
+            recovered = jobs.recover()
+            out_opts = {"out": self.output_folder} if save_single and self.output_folder else {}
+            for _, candidates in fold_to_cands:
+                for work_folder in candidates:
+                    jobs.enqueue(work_folder, 0, out_opts)
+            queued = jobs.pending()
+            if queued > total:
+                self.append_debug(f"[Queue] 이전에 남은 작업 포함 {queued}건 (복구 {recovered}건)")
+            self._post_progress("batch", queued)
+            job = None
+            try:
+                while not self.stop_requested:
+                    job = jobs.claim(me)
+                    if job is None:
+                        break
+                    work_folder = job["folder"]
+                    job_out = job["options"].get("out")
+                    job_status, job_message = "error", ""
+                    case_started = time.time()
+                    try:
+                        self.append_debug(f"----------\n[Folder] {work_folder}")
+                        if skip_processed and is_folder_processed(work_folder):
+                            self.append_debug("  [Skip] already processed")
+                            job_status, job_message = "skipped", "already processed"
+                            self._post_progress("case_done", work_folder, True); continue
+
+                        mode = detect_mode(work_folder)
+                        stl_paths = find_stl_files(work_folder, log_callback=self.append_debug)
+                        if not stl_paths:
+                            self.append_debug("  [Skip] no STL files")
+                            job_status, job_message = "skipped", "no STL files"
+                            self._post_progress("case_done", work_folder, True); continue
+
+                        html_path = os.path.join(job_out or work_folder, f"{os.path.basename(work_folder)}.html")
+
+                        # multiprocessing.Process로 각 폴더 처리
+                        result_queue = multiprocessing.Queue()
+                        cancel_event = multiprocessing.Event()
+                        self.cancel_event = cancel_event
+                        worker_process = multiprocessing.Process(
+                            target=_run_html_worker_process,
+                            name=f"case:{os.path.basename(work_folder)}",
+                            args=(result_queue, work_folder, stl_paths, html_path,
+                                  mode, self.user_logo_path, skip_processed, password_val, password_enabled_val,
+                                  cancel_event, BITE_TIMEOUT, self.log_pipeline.worker_queue(), single_glb,
+                                  precompress, DEFAULT_RUNTIME, "html", encrypt_models)
+                        )
+                        worker_process.start()
+                        case_started = time.time()
+
+                        # 단계별 제한 시간 감시 (크지만 진행 중인 케이스는 계속, 멈춘 단계만 종료)
+                        watchdog = StageWatchdog()
+                        expired = None
+                        cancel_sent = None
+                        post_worker = lambda msg, wf=work_folder: self._post_progress("worker", wf, msg)
+                        while worker_process.is_alive():
+                            worker_process.join(timeout=0.2)
+                            watchdog.drain(result_queue, on_event=post_worker)
+                            jobs.heartbeat(job["id"])
+                            if self.stop_requested and cancel_sent is None:
+                                cancel_sent = time.time()
+                                self.append_debug("  [Stop] 현재 단계 마무리 후 중지합니다...")
+                            expired = watchdog.expired()
+                            if expired or (cancel_sent and time.time() - cancel_sent > CANCEL_GRACE_S):
+                                stop_worker_process(worker_process)
+                                break
+                        self.cancel_event = None
+
+                        result = None if expired else watchdog.wait_result(result_queue)
+                        skipped = result is not None and result[0] == "skipped"
+                        if expired:
+                            self.append_debug(f"  [TIMEOUT] {expired} - 부분 결과 보존, 다음 케이스로 이동")
+                            rec = case_record(work_folder, "timeout", time.time() - case_started)
+                            rec["timeout_stage"] = watchdog.stage
+                            record_metrics(rec)
+                            job_status, job_message = "timeout", expired
+                        elif result is not None:
+                            result_type, result_data = result[0], result[1]
+                            job_status, job_message = result_type, str(result_data)
+                            record_metrics(result[2] if len(result) > 2 else
+                                           case_record(work_folder, result_type, time.time() - case_started))
+                            if result_type == "success":
+                                self.append_debug(f"  [OK] Saved: {result_data}")
+                            elif result_type == "skipped":
+                                self.append_debug(f"  [Skip] {result_data}")
+                            elif result_type == "cancelled":
+                                self.append_debug(f"  [Stop] {result_data} - 부분 결과 보존")
+                            elif result_type == "error":
+                                self.append_debug(f"  [ERROR] {result_data}")
+                        elif cancel_sent:
+                            self.append_debug("  [Stop] 중지 대기 시간 초과 - 강제 종료")
+                            record_metrics(case_record(work_folder, "cancelled", time.time() - case_started))
+                            job_status = "cancelled"
+                        elif worker_process.exitcode != 0:
+                            self.append_debug(f"  [CRASH] Process crashed - 다음 케이스로 이동")
+                            record_metrics(case_record(work_folder, "crash", time.time() - case_started))
+                            job_status, job_message = "crash", f"exitcode={worker_process.exitcode}"
+
+                        self._post_progress("case_done", work_folder, skipped)
+                    finally:
+                        if job_status == "cancelled":
+                            jobs.release(job["id"], "사용자 중지 – 다음 실행에서 이어서")
+                        else:
+                            jobs.finish(job["id"], job_status, job_message, time.time() - case_started)
+                if self.stop_requested:
+                    self.append_debug(f"[Stop] user interrupted – 남은 {jobs.pending()}건은 대기열에 보존")
+            finally:
+                log_metrics_summary()
+                self.append_debug(format_queue_stats(jobs.stats()))
+                jobs.close()
+                # 위젯 변경은 GUI 스레드에서 (진행률 큐로 전달)
+                self._post_progress("call", lambda: self._finish_auto_batch(save_single))
+                self._post_progress("end")
+
+        self.worker_thread = threading.Thread(target=worker, daemon=True)
+        self.worker_thread.start()
+
+# ==============================================================================
+# GUI 실행
+# ==============================================================================
+def run_gui(startup_mark=None, on_shown=None) -> None:
+    """
+    startup_mark: 시작 단계 기록 콜백 (label) – 호출한 쪽 모듈의 시작 시간 리포트에 기록
+    on_shown:     창이 처음 표시된 뒤 호출
+    """
+    startup_mark = startup_mark or (lambda label: None)
+    parse_token_and_sid()
+    app = QApplication(sys.argv)
+    startup_mark("qapplication_created")
+    if heartbeat_token and heartbeat_session_id:
+        start_heartbeat()
+    gui = STLViewerGUI()
+    gui.show()
+
+    def _shown() -> None:
+        startup_mark("window_shown")
+        on_shown and on_shown()
+    QTimer.singleShot(0, _shown)   # 첫 이벤트 루프 진입 = 창 표시 완료
+    sys.exit(app.exec())
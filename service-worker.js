@@ -1,10 +1,53 @@
-const CACHE_NAME = 'html-viewer-v2';
+const CACHE_NAME = 'html-viewer-v5';
 const urlsToCache = [
   '/index.html',
+  '/viewer.html',          // .dlas 케이스 데이터를 렌더링하는 뷰어 런타임 (fast_html_viewer_converter.write_pwa_viewer)
   '/manifest.json',
   '/share-handler.html'
 ];
 
+// 뷰어 런타임(three.js): 파일 이름에 버전이 있어 내용이 바뀌지 않으므로 cache-first, 앱 캐시를 비워도 유지
+// RUNTIME_URL 은 fast_html_viewer_converter.RUNTIME_URL 과 같아야 한다
+const RUNTIME_CACHE = 'dlas-runtime-v1';
+const RUNTIME_URL = '/runtime/dlas-viewer-runtime-0.137.0-1.min.js';
+// 번들이 서버에 없을 때 viewer.html 의 document.write 폴백이 읽는 CDN 스크립트 – fast_html_viewer_converter._CDN_SCRIPTS 와 같아야 한다
+// 설치 때 미리 받아 두어 번들 없이 배포돼도 .dlas 케이스가 오프라인에서 열리게 한다
+const RUNTIME_FALLBACK_URLS = [
+  'https://cdn.jsdelivr.net/npm/three@0.137.0/build/three.min.js',
+  'https://cdn.jsdelivr.net/npm/three@0.137.0/examples/js/loaders/GLTFLoader.js',
+  'https://cdn.jsdelivr.net/npm/three@0.137.0/examples/js/controls/TrackballControls.js'
+];
+const isRuntimeRequest = url =>
+  url.pathname.startsWith('/runtime/') || url.hostname === 'cdn.jsdelivr.net';
+
+// 공유받은 파일: 문자열로 읽지 않고 Blob 그대로 캐시에 넣어 두면 index.html 이 꺼내 Blob URL 로 연다 (?shared=cache)
+// index.html 의 SHARE_CACHE / SHARED_FILE_KEY 와 같아야 한다
+const SHARE_CACHE = 'dlas-share';
+const SHARED_FILE_KEY = '/__shared-file';
+
+// 뷰어 런타임 미리 캐시: 번들(RUNTIME_URL) → 실패하면 오류를 남기고 CDN 폴백 스크립트를 대신 캐시
+// 둘 다 실패하면 설치를 실패시킨다 (오프라인에서 케이스를 못 여는 상태로 설치된 것처럼 보이지 않게 – 다음 방문 때 다시 설치)
+function precacheRuntime() {
+  return caches.open(RUNTIME_CACHE).then(cache =>
+    cache.add(RUNTIME_URL).catch(err => {
+      console.error('[SW] 뷰어 런타임 번들을 캐시하지 못했습니다 (' + RUNTIME_URL + ' – build_viewer_runtime.py 로 만들어 배포):', err);
+      return Promise.all(RUNTIME_FALLBACK_URLS.map(url =>
+        fetch(new Request(url, { mode: 'no-cors' })).then(response => {
+          if (response.type !== 'opaque' && !response.ok) {
+            throw new Error(url + ' → ' + response.status);
+          }
+          return cache.put(url, response);
+        })
+      )).then(() => {
+        console.warn('[SW] CDN three.js 폴백을 캐시했습니다 – 오프라인에서도 이것으로 케이스를 엽니다');
+      }, fallbackErr => {
+        console.error('[SW] CDN 폴백도 캐시하지 못했습니다 – 오프라인에서 케이스를 열 수 없습니다:', fallbackErr);
+        throw fallbackErr;
+      });
+    })
+  );
+}
+
 // 설치 이벤트
 self.addEventListener('install', event => {
   event.waitUntil(
@@ -16,6 +59,7 @@ self.addEventListener('install', event => {
       .catch(err => {
         console.log('Cache failed:', err);
       })
+      .then(() => precacheRuntime())
   );
   self.skipWaiting();
 });
@@ -26,7 +70,7 @@ self.addEventListener('activate', event => {
     caches.keys().then(cacheNames => {
       return Promise.all(
         cacheNames.map(cacheName => {
-          if (cacheName !== CACHE_NAME) {
+          if (cacheName !== CACHE_NAME && cacheName !== RUNTIME_CACHE && cacheName !== SHARE_CACHE) {
             console.log('Deleting old cache:', cacheName);
             return caches.delete(cacheName);
           }
@@ -47,20 +91,15 @@ self.addEventListener('fetch', event => {
         const file = formData.get('file');
 
         if (file) {
-          // 파일을 클라이언트에 전달
-          const cache = await caches.open(CACHE_NAME);
-          const response = await cache.match('/share-handler.html');
-
-          if (response) {
-            const text = await response.text();
-            const modifiedText = text.replace(
-              '</head>',
-              `<script>window.sharedFile = new File([${JSON.stringify(await file.text())}], "${file.name}", {type: "${file.type}"});</script></head>`
-            );
-            return new Response(modifiedText, {
-              headers: { 'Content-Type': 'text/html' }
-            });
-          }
+          // 파일을 클라이언트에 전달 – 내용은 복사하지 않고 Blob 으로 캐시에 보관
+          const cache = await caches.open(SHARE_CACHE);
+          await cache.put(SHARED_FILE_KEY, new Response(file, {
+            headers: {
+              'Content-Type': file.type || 'application/octet-stream',
+              'X-File-Name': encodeURIComponent(file.name || 'unnamed')
+            }
+          }));
+          return Response.redirect('/index.html?shared=cache', 303);
         }
 
         return Response.redirect('/index.html', 303);
@@ -69,6 +108,21 @@ self.addEventListener('fetch', event => {
     return;
   }
 
+  // 뷰어 런타임: cache-first (CDN 폴백 스크립트는 no-cors 라 opaque 응답도 저장 – 두 번째부터 오프라인으로 열림)
+  if (isRuntimeRequest(new URL(event.request.url))) {
+    event.respondWith(
+      caches.open(RUNTIME_CACHE).then(cache =>
+        cache.match(event.request).then(cached => cached || fetch(event.request).then(response => {
+          if (response && (response.status === 200 || response.type === 'opaque')) {
+            cache.put(event.request, response.clone());
+          }
+          return response;
+        }))
+      )
+    );
+    return;
+  }
+
   // GET 요청 처리
   event.respondWith(
     fetch(event.request)
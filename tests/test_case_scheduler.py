@@ -0,0 +1,56 @@
+"""case_scheduler – 워커/BITE 추정 분리와 metrics 로그 기반 계수 보정"""
+import json
+
+import pytest
+
+import case_scheduler as cs
+from case_scheduler import estimate_cost, load_cost_scale
+
+def test_bite_is_budgeted_outside_the_worker():
+    plain = estimate_cost([1_000_000, 200_000])
+    bite = estimate_cost([1_000_000, 200_000], bite_tris=1_200_000)
+    assert plain.bite_mb == 0.0 and plain.mem_mb == plain.worker_mb
+    assert bite.worker_mb == plain.worker_mb
+    assert bite.bite_mb > cs.WORKER_BASE_MB
+    assert bite.mem_mb == round(bite.worker_mb + bite.bite_mb, 1)
+
+def test_scale_applies_to_worker_only():
+    one = estimate_cost([1_000_000], bite_tris=1_000_000)
+    two = estimate_cost([1_000_000], bite_tris=1_000_000, scale=2.0)
+    assert two.worker_mb == one.worker_mb and two.bite_mb == one.bite_mb
+    assert two.mem_mb - one.mem_mb == pytest.approx(one.worker_mb - cs.WORKER_BASE_MB, abs=0.1)
+
+def _log(path, cost, peak_ratio, n=6, **extra):
+    with open(path, "a") as f:
+        for _ in range(n):
+            rec = {"type": "case", "status": "success", "est_mb": cost.mem_mb, "est_worker_mb": cost.worker_mb,
+                   "rss_peak_mb": cs.WORKER_BASE_MB + (cost.worker_mb - cs.WORKER_BASE_MB) * peak_ratio, **extra}
+            f.write(json.dumps(rec) + "\n")
+
+def test_calibration_is_stable_across_runs(tmp_path):
+    """이전 실행의 계수가 기록에 섞이지 않아 같은 실측이면 같은 계수가 나온다"""
+    log = tmp_path / "metrics.jsonl"
+    tris, bite = [800_000], 800_000
+    scale = 1.0
+    for _ in range(4):
+        cost = estimate_cost(tris, bite, scale=scale)
+        _log(log, cost, 1.6)
+        scale = load_cost_scale(str(log))
+        assert scale == 1.6
+
+def test_records_without_worker_estimate_are_ignored(tmp_path):
+    log = tmp_path / "metrics.jsonl"
+    with open(log, "w") as f:
+        for _ in range(10):
+            f.write(json.dumps({"type": "case", "status": "success", "est_mb": 900.0, "rss_peak_mb": 3000.0}) + "\n")
+    assert load_cost_scale(str(log)) == 1.0
+    _log(log, estimate_cost([800_000]), 9.0)                     # 상한으로 자른다
+    assert load_cost_scale(str(log)) == cs.SCALE_LIMITS[1]
+
+def test_too_few_or_failed_records(tmp_path):
+    log = tmp_path / "metrics.jsonl"
+    _log(log, estimate_cost([800_000]), 2.0, n=4)
+    _log(log, estimate_cost([800_000]), 2.0, n=4, status="error")
+    assert load_cost_scale(str(log)) == 1.0
+    assert load_cost_scale(str(tmp_path / "missing.jsonl")) == 1.0
+    assert load_cost_scale(None) == 1.0
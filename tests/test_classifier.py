@@ -0,0 +1,133 @@
+"""컴파일된 분류 엔진 – 이전(키워드/정규식을 따로 훑던) 구현과 결과가 같은지 비교"""
+import os
+import random
+import xml.etree.ElementTree as ET
+
+import pytest
+
+conv = pytest.importorskip("fast_html_viewer_converter")
+
+# ---------------------------------------------------------------------------
+# 이전 구현 – 비교 기준
+# ---------------------------------------------------------------------------
+def old_extract_fdi_teeth(text):
+    if not text:
+        return []
+    s = str(text)
+    teeth = []
+    for m in conv.FDI_RANGE_RE.finditer(s):
+        teeth.extend(conv._expand_range(int(m.group(1)), int(m.group(2))))
+    for m in conv.FDI_SINGLE_RE.finditer(s):
+        teeth.append(int(m.group(1)))
+    return list(dict.fromkeys(teeth))
+
+def old_infer_jaw(s):
+    if not s:
+        return None
+    s = s.lower()
+    if "상악" in s or any(k in s for k in ["upper", "maxilla", "upperjaw", "u_jaw", "u-jaw", "jaw_u", "_u", " uj "]):
+        return "upper"
+    if "하악" in s or any(k in s for k in ["lower", "mandible", "lowerjaw", "l_jaw", "l-jaw", "jaw_l", "_l", " lj "]):
+        return "lower"
+    jaw = conv.determine_jaw(old_extract_fdi_teeth(s))
+    return jaw if jaw in ("upper", "lower") else None
+
+def old_decide_cat(name):
+    l = name.lower()
+    if "occlusion" in l: return "etc"
+    if "upperjaw" in l or "lowerjaw" in l: return "scan"
+    if any(k in l for k in ("modelgingiva", "modelbase", "gingiva", "model", "base")): return "scan"
+    if "marker" in l: return "scan"
+    if any(k in l for k in ("abut", "scanbody", "tibase", "ti-base")): return "abutment"
+    if any(k in l for k in ("crown", "bridge", "pontic", "coping", "framework", "veneer")): return "crownbridge"
+    if "prep" in l or "preparation" in l: return "scan"
+    if "antagonist" in l or "oppos" in l or l.startswith("ant"): return "scan"
+    return "etc"
+
+def old_classify_category(display):
+    dl = display.lower()
+    if "어버트먼트" in display or "abutment" in dl: return "abutment"
+    if ("브릿지" in display or "bridge" in dl) or ("크라운" in display or "crown" in dl): return "crownbridge"
+    return "etc"
+
+def old_build_mi_jaw_map(mi_root):
+    mp = {}
+    for elem in mi_root.iter():
+        fn = elem.find("Filename")
+        if fn is None or not (fn.text and fn.text.strip()):
+            continue
+        name = os.path.basename(fn.text.strip()).lower()
+        texts = []
+        for key in ("Jaw", "JawType", "UpperLower", "JawPosition", "Type", "Category",
+                    "ComponentType", "Label", "Name", "DisplayName", "ModelType", "BaseType", "GingivaType"):
+            v = elem.findtext(key)
+            if v: texts.append(v)
+        for sub in elem.iter():
+            if sub.text: texts.append(sub.text)
+            if sub.tag: texts.append(sub.tag)
+        jaw = old_infer_jaw(" ".join(texts)) or old_infer_jaw(name)
+        if not jaw:
+            continue
+        mp[name] = jaw
+        if name.endswith(".stl"):
+            mp[name[:-4] + "_reduced.stl"] = jaw
+    return mp
+
+# ---------------------------------------------------------------------------
+_TOKENS = [
+    "11", "18", "21", "28", "31", "38", "41", "48", "19", "50", "9", "11-17", "21 - 24", "13-43", "47-41",
+    "2024-11-18", "upper", "Lower", "UpperJaw", "lowerjaw", "maxilla", "mandible", "상악", "하악",
+    "_u", "_l", "u_jaw", "L-Jaw", "jaw_u", "jaw_l", " uj ", " lj ", "uj", "Occlusion", "model", "ModelBase",
+    "gingiva", "modelgingiva", "base", "marker", "abut", "Abutment", "scanbody", "TiBase", "ti-base", "crown",
+    "Bridge", "pontic", "coping", "framework", "veneer", "prep", "Preparation", "antagonist", "oppos", "ant",
+    "Ant", "어버트먼트", "브릿지", "크라운", "tooth", "scan", "_", "-", " ", ".stl", "x", "case",
+]
+
+def _random_strings(n, seed):
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield "".join(rng.choice(_TOKENS) for _ in range(rng.randint(1, 7)))
+
+SAMPLES = [
+    "", "11", "11-17.stl", "Crown_21-24.stl", "UpperJaw.stl", "lowerjaw_reduced.stl", "Antagonist.stl",
+    "ant_scan.stl", "Prep_36.stl", "Abutment 46 TiBase.stl", "modelbase_l.stl", "scan_2024-11-18.stl",
+    "occlusion_upper.stl", "pontic 13-43.stl", "marker.stl", "veneer11.stl", "47-41 bridge",
+]
+
+def test_matches_previous_functions():
+    for s in SAMPLES + list(_random_strings(3000, 35)):
+        assert conv.extract_fdi_teeth(s) == old_extract_fdi_teeth(s), s
+        assert conv._infer_jaw_from_string(s) == old_infer_jaw(s), s
+        assert conv.exo_name_category(s) == old_decide_cat(s), s
+        assert conv.display_category(s) == old_classify_category(s), s
+
+def test_long_strings_bypass_cache():
+    s = " ".join(_random_strings(200, 1)) + " 21-24 upper"
+    assert len(s) > conv._MEMO_MAX_LEN
+    assert conv.extract_fdi_teeth(s) == old_extract_fdi_teeth(s)
+    assert conv._infer_jaw_from_string(s) == old_infer_jaw(s)
+
+def _model_info(rng, n):
+    root = ET.Element("ModelInfo")
+    for i in range(n):
+        parent = root if rng.random() < 0.6 else ET.SubElement(root, "Group", Name=rng.choice(_TOKENS))
+        el = ET.SubElement(parent, rng.choice(("Model", "Item", "UpperModel", "Part")))
+        ET.SubElement(el, "Filename").text = f"C:\\case\\{rng.choice(_TOKENS).strip() or 'x'}_{i}.stl"
+        for key in rng.sample(("Jaw", "Label", "Type", "DisplayName", "Note"), rng.randint(0, 3)):
+            # 맨 앞의 'uj'/'lj' 는 이전 구현이 놓치던 경우라 비교에서 뺀다
+            ET.SubElement(el, key).text = "x " + next(_random_strings(1, rng.random()))
+    return root
+
+@pytest.mark.parametrize("seed", range(20))
+def test_mi_jaw_map_matches_previous(seed):
+    root = _model_info(random.Random(seed), 30)
+    assert conv.build_mi_jaw_map(root) == old_build_mi_jaw_map(root)
+
+def test_classify_exo_names_groups_and_reduced_keys():
+    names = ["UpperJaw.stl", "Crown 36.stl", "Abutment 14.stl", "modelbase.stl", "occlusion.stl"]
+    groups = conv.classify_exo_names(names, {"modelbase.stl": "lower"})
+    assert groups["UpperJaw.stl"] == groups["UpperJaw_reduced.stl"] == "upper_scan"
+    assert groups["Crown 36.stl"] == "lower_crownbridge"
+    assert groups["Abutment 14.stl"] == "upper_abutment"
+    assert groups["modelbase.stl"] == "lower_scan"
+    assert groups["occlusion.stl"] == "etc"
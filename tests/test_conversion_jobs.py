@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+import conversion_jobs
+from conversion_jobs import JobQueue
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    q = JobQueue(str(tmp_path / "jobs.sqlite"))
+    yield q
+    q.close()
+
+
+def _folder(tmp_path, name):
+    d = tmp_path / name
+    d.mkdir()
+    return str(d)
+
+
+def test_claim_marks_running_and_empties(jobs, tmp_path):
+    job_id = jobs.enqueue(_folder(tmp_path, "a"))
+    job = jobs.claim("w1")
+    assert job["id"] == job_id
+    assert job["status"] == "running" and job["worker"] == "w1" and job["attempts"] == 1
+    assert jobs.claim("w2") is None
+    assert jobs.pending() == 0
+
+
+def test_claim_priority_then_fifo(jobs, tmp_path):
+    low = jobs.enqueue(_folder(tmp_path, "low"))
+    first = jobs.enqueue(_folder(tmp_path, "first"), priority=5)
+    second = jobs.enqueue(_folder(tmp_path, "second"), priority=5)
+    urgent = jobs.enqueue(_folder(tmp_path, "urgent"), priority=conversion_jobs.URGENT_PRIORITY)
+    assert [jobs.claim("w")["id"] for _ in range(4)] == [urgent, first, second, low]
+
+
+def test_enqueue_same_folder_raises_priority(jobs, tmp_path):
+    a = _folder(tmp_path, "a")
+    b = jobs.enqueue(_folder(tmp_path, "b"), priority=1)
+    assert jobs.enqueue(a) == jobs.enqueue(a, priority=10)
+    assert jobs.claim("w")["folder"] == a
+    assert jobs.claim("w")["id"] == b
+
+
+def test_recover_requeues_only_stale(jobs, tmp_path):
+    stale = jobs.enqueue(_folder(tmp_path, "stale"))
+    fresh = jobs.enqueue(_folder(tmp_path, "fresh"))
+    jobs.claim("w")
+    jobs.claim("w")
+    old = time.time() - conversion_jobs.STALE_S - 5
+    jobs._db.execute("UPDATE jobs SET heartbeat_at = ?, started_at = ? WHERE id = ?", (old, old, stale))
+    assert jobs.recover() == 1
+    states = {j["id"]: (j["status"], j["worker"]) for j in jobs.list_jobs()}
+    assert states[stale] == ("queued", None)
+    assert states[fresh] == ("running", "w")
+
+
+def test_release_on_stop_requeues_and_keeps_finished(jobs, tmp_path):
+    running = jobs.enqueue(_folder(tmp_path, "running"))
+    done = jobs.enqueue(_folder(tmp_path, "done"))
+    jobs.claim("w")
+    jobs.claim("w")
+    jobs.finish(done, "success", "", 1.0)
+    jobs.release(running, "러너 중지")
+    jobs.release(done, "러너 중지")             # 끝난 작업은 되돌리지 않는다
+    states = {j["id"]: j for j in jobs.list_jobs()}
+    assert states[running]["status"] == "queued" and states[running]["message"] == "러너 중지"
+    assert states[done]["status"] == "success"
+    assert jobs.claim("w2")["id"] == running
+
+
+def test_heartbeat_throttled_per_job(jobs, tmp_path, monkeypatch):
+    now = [time.time()]
+    monkeypatch.setattr(conversion_jobs.time, "time", lambda: now[0])
+    a = jobs.enqueue(_folder(tmp_path, "a"))
+    jobs.claim("w")
+    assert jobs.heartbeat(a) == 0                # claim 이 방금 표시했다
+    now[0] += conversion_jobs.HEARTBEAT_S
+    assert jobs.heartbeat(a) == 1
+    now[0] += conversion_jobs.HEARTBEAT_S / 2
+    b = jobs.enqueue(_folder(tmp_path, "b"))
+    jobs.claim("w")
+    assert jobs.heartbeat([a, b]) == 0
+    now[0] += conversion_jobs.HEARTBEAT_S / 2
+    # a 는 간격이 지났고 b 는 아직 – 한 작업의 표시가 다른 작업을 막거나 대신하지 않는다
+    assert jobs.heartbeat([a, b]) == 1
+    beats = {j["id"]: j["heartbeat_at"] for j in jobs.list_jobs()}
+    assert beats[a] == now[0] and beats[b] < now[0]
+    assert jobs.heartbeat([a, b], force=True) == 2
@@ -0,0 +1,119 @@
+"""EXO 케이스 단위 변환행렬(resolve_exo_transforms)과 메모리 내 일괄 적용(apply_transform_stack)"""
+import xml.etree.ElementTree as ET
+
+import pytest
+
+np = pytest.importorskip("numpy")
+conv = pytest.importorskip("fast_html_viewer_converter")
+
+def _matrix_xml(tag, M):
+    """행 우선 4×4 → EXO 의 열 우선 _ij 요소"""
+    el = ET.Element(tag)
+    for i in range(4):
+        for j in range(4):
+            ET.SubElement(el, f"_{i}{j}").text = repr(float(M.T[i, j]))
+    return el
+
+def _rt(angle_deg=0.0, t=(0.0, 0.0, 0.0), scale=(1.0, 1.0, 1.0)):
+    a = np.radians(angle_deg)
+    M = np.eye(4)
+    M[:3, :3] = np.array([[np.cos(a), -np.sin(a), 0], [np.sin(a), np.cos(a), 0], [0, 0, 1]]) @ np.diag(scale)
+    M[:3, 3] = t
+    return M
+
+def _case_xml():
+    ci = ET.Element("ConstructionInfo")
+    ci.append(_matrix_xml("MatrixToScanDataFiles", _rt(30, (1, 2, 3))))
+    files = ET.SubElement(ci, "ConstructionFileList")
+    for name, M in (("Crown_11.stl", _rt(10, (5, 0, 0))), ("Crown_21.stl", _rt(10, (5, 0, 0))),
+                    ("Abutment_36.stl", _rt(-45)), ("UpperJaw.stl", _rt(90))):
+        cf = ET.SubElement(files, "ConstructionFile")
+        ET.SubElement(cf, "Filename").text = f"C:\\case\\{name}"
+        cf.append(_matrix_xml("ZRotationMatrix", M))
+    mi = ET.Element("ModelInfo")
+    mi.append(_matrix_xml("GlobalMatrix", _rt(0, (0, 0, -7))))
+    for name, M in (("UpperJaw.stl", _rt(0, (0, 1, 0))), ("LowerJaw.stl", _rt(0, (0, 1, 0)))):
+        el = ET.SubElement(mi, "Model")
+        ET.SubElement(el, "Filename").text = name
+        el.append(_matrix_xml("TransformationMatrix", M))
+    return ci, mi
+
+NAMES = ["Crown_11.stl", "Crown_21.stl", "Abutment_36.stl", "UpperJaw.stl", "LowerJaw.stl", "Unknown.stl"]
+
+def _legacy_matrix(ci, mi, name):
+    owner = conv._decide_owner(conv._ci_file_entries(ci), conv._mi_file_entries(mi), name)
+    if owner is None:
+        return np.eye(4)
+    if owner == "mi" or (owner == "both" and conv._looks_model_component(name)):
+        return conv.find_exo_transform_matrix_mi(mi, name)
+    return conv.find_exo_transform_matrix_ci(ci, name)
+
+def test_resolve_matches_per_file_lookup_and_dedups():
+    ci, mi = _case_xml()
+    stack, index = conv.resolve_exo_transforms(ci, mi, NAMES)
+    for name in NAMES:
+        expected = _legacy_matrix(ci, mi, name)
+        got = stack[index[name]] if name in index else np.eye(4)
+        np.testing.assert_allclose(got, expected, atol=1e-12)
+    assert "Unknown.stl" not in index
+    assert index["Crown_11.stl"] == index["Crown_21.stl"]              # 같은 행렬은 한 번만
+    assert index["UpperJaw.stl"] == index["LowerJaw.stl"]              # 양쪽에 있는 모델 부품 → modelInfo
+    assert len(stack) == len(set(index.values())) == 3
+
+def test_identity_files_are_left_out():
+    ci = ET.Element("ConstructionInfo")
+    cf = ET.SubElement(ET.SubElement(ci, "ConstructionFileList"), "ConstructionFile")
+    ET.SubElement(cf, "Filename").text = "plain.stl"
+    cf.append(_matrix_xml("ZRotationMatrix", np.eye(4)))
+    stack, index = conv.resolve_exo_transforms(ci, None, ["plain.stl"])
+    assert index == {} and stack.shape == (0, 4, 4)
+
+def _homogeneous(P, M):
+    return (np.c_[P, np.ones(len(P))] @ M.T)[:, :3]
+
+def test_apply_stack_matches_per_mesh_transform():
+    rng = np.random.default_rng(36)
+    stack = np.stack([_rt(25, (1, -2, 3)), _rt(-70, (0, 4, 0), scale=(2.0, 0.5, 1.0))])
+    pts = [rng.normal(size=(n, 3)) for n in (5, 8, 3)]
+    ids = [0, 1, 0]
+    expected = [_homogeneous(P, stack[k]) for P, k in zip(pts, ids)]
+    views = [P.copy() for P in pts]
+    conv.apply_transform_stack(views, [[] for _ in views], ids, stack)
+    for got, exp in zip(views, expected):
+        np.testing.assert_allclose(got, exp, atol=1e-12)
+
+def _triangle_normals(P):
+    n = np.cross(P[1::3] - P[0::3], P[2::3] - P[0::3])
+    return n / np.linalg.norm(n, axis=1, keepdims=True)
+
+@pytest.mark.parametrize("M", [
+    _rt(40, (3, 1, 2), scale=(3.0, 1.0, 0.25)),          # 비균등 축척 – 법선은 역전치로
+    _rt(15, (0, 0, 5), scale=(-1.0, 1.0, 1.0)),          # 거울
+], ids=["nonuniform", "mirror"])
+def test_normals_follow_inverse_transpose(M):
+    rng = np.random.default_rng(7)
+    P = rng.normal(size=(30, 3))
+    N = _triangle_normals(P)
+    pts, nrm = [P.copy()], [[N.copy()]]
+    conv.apply_transform_stack(pts, nrm, [0], M[None])
+    out = nrm[0][0]
+    np.testing.assert_allclose(np.linalg.norm(out, axis=1), 1.0, atol=1e-12)
+    face = _triangle_normals(pts[0])
+    mirrored = np.linalg.det(M[:3, :3]) < 0
+    # 정점 순서 그대로면 거울 변환에서 면 방향이 반대 – load_transformed_meshes 가 winding 을 뒤집는 이유
+    np.testing.assert_allclose(out, -face if mirrored else face, atol=1e-9)
+
+def test_load_transformed_meshes_flips_winding_for_mirror(tmp_path):
+    pytest.importorskip("vtkmodules")
+    from vtkmodules.util.numpy_support import vtk_to_numpy
+    path = tmp_path / "tooth.stl"
+    path.write_text("solid t\nfacet normal 0 0 1\nouter loop\nvertex 0 0 0\nvertex 1 0 0\nvertex 0 1 0\n"
+                    "endloop\nendfacet\nendsolid t\n")
+    mirror = _rt(0, (2, 0, 0), scale=(-1.0, 1.0, 1.0))
+    polys = conv.load_transformed_meshes([str(path)], [0], mirror[None])
+    poly = polys[str(path)]
+    P = vtk_to_numpy(poly.GetPoints().GetData())
+    cell = poly.GetCell(0)
+    tri = P[[cell.GetPointId(i) for i in range(3)]]
+    np.testing.assert_allclose(sorted(map(tuple, tri)), sorted([(2, 0, 0), (1, 0, 0), (2, 1, 0)]))
+    np.testing.assert_allclose(_triangle_normals(tri)[0], (0, 0, 1), atol=1e-6)   # 바깥쪽(+z) 유지
@@ -0,0 +1,98 @@
+"""--encrypt-models – PBKDF2 + AES-GCM 페이로드 봉인과, 뷰어와 같은 방식의 복호화 왕복"""
+import base64
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+
+import pytest
+
+conv = pytest.importorskip("fast_html_viewer_converter")
+pytest.importorskip("cryptography")
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+@pytest.fixture(autouse=True)
+def fast_kdf(monkeypatch):
+    monkeypatch.setattr(conv, "PBKDF2_ITERATIONS", 1000)     # 실제 값(31만 회)은 테스트마다 수백 ms
+
+def _open(password, info, sealed):
+    """뷰어의 payloadKey/payloadOpen 과 같은 절차"""
+    key = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), base64.b64decode(info["salt"]), info["iter"], 32)
+    raw = base64.b64decode(sealed)
+    return AESGCM(key).decrypt(raw[:12], raw[12:], None)
+
+GLBS = [b"glTF\x02\x00\x00\x00" + os.urandom(n) for n in (0, 17, 4096)]
+PAYLOADS = [base64.b64encode(g).decode("ascii") for g in GLBS]
+
+def test_round_trip():
+    sealed, info = conv._encrypt_payloads(PAYLOADS, "비밀 pw")
+    assert info["cipher"] == "AES-GCM" and info["kdf"] == "PBKDF2-SHA256" and info["iter"] == 1000
+    assert len(base64.b64decode(info["salt"])) == 16
+    assert _open("비밀 pw", info, info["check"]) == conv._PAYLOAD_CHECK
+    assert [_open("비밀 pw", info, s) for s in sealed] == GLBS
+    for s, g in zip(sealed, GLBS):
+        assert len(base64.b64decode(s)) == 12 + len(g) + 16          # IV + 암호문 + 태그
+
+def test_wrong_password_and_tamper_are_rejected():
+    sealed, info = conv._encrypt_payloads(PAYLOADS, "right")
+    with pytest.raises(InvalidTag):
+        _open("wrong", info, info["check"])
+    raw = bytearray(base64.b64decode(sealed[2]))
+    raw[20] ^= 1
+    with pytest.raises(InvalidTag):
+        _open("right", info, base64.b64encode(bytes(raw)).decode("ascii"))
+
+def test_fresh_salt_and_iv_per_call():
+    a, ia = conv._encrypt_payloads(PAYLOADS[:1] * 2, "pw")
+    b, ib = conv._encrypt_payloads(PAYLOADS[:1], "pw")
+    assert ia["salt"] != ib["salt"]
+    assert len({a[0], a[1], b[0]}) == 3
+    assert len({base64.b64decode(s)[:12] for s in a}) == 2
+
+def _models():
+    return [{"name": "A", "group": "upper_scan", "b64": PAYLOADS[1], "geometry": "g1"},
+            {"name": "B", "group": "upper_scan", "b64": PAYLOADS[1], "geometry": "g1"},
+            {"name": "C", "group": "lower_scan", "b64": PAYLOADS[2], "geometry": "g2"}]
+
+def test_case_data_carries_no_hash_or_plaintext():
+    data = json.loads(conv.generate_case_data(_models(), [], [], password="pw", password_enabled=True,
+                                              encrypt_models=True))
+    assert "password_hash" not in data
+    assert all("hash" not in m for m in data["models"])
+    assert PAYLOADS[1] not in data["payloads"] and PAYLOADS[2] not in data["payloads"]
+    info = data["payload_crypto"]
+    assert [_open("pw", info, data["payloads"][m["glb"]]) for m in data["models"]] == [GLBS[1], GLBS[1], GLBS[2]]
+
+def test_encrypt_needs_enabled_password():
+    data = json.loads(conv.generate_case_data(_models(), [], [], password="pw", password_enabled=False,
+                                              encrypt_models=True))
+    assert "payload_crypto" not in data and data["payloads"] == [PAYLOADS[1], PAYLOADS[2]]
+
+_JS_FUNCS = re.compile(r"function b64Bytes\(s\)\{[^\n]*\}\nfunction payloadKey\(.*?\n\}\nfunction payloadOpen\(.*?\n\}", re.S)
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node 없음")
+def test_viewer_decrypts_in_node():
+    """생성된 HTML 의 payloadKey/payloadOpen 을 그대로 node(WebCrypto)에서 실행"""
+    html = conv.generate_html([], "[]", runtime="cdn")
+    js = _JS_FUNCS.search(html)
+    assert js, "뷰어 템플릿에서 payloadKey/payloadOpen 을 찾지 못함"
+    sealed, info = conv._encrypt_payloads(PAYLOADS, "pw")
+    script = js.group(0) + f"""
+const info={json.dumps(info)}, sealed={json.dumps(sealed)};
+(async()=>{{
+  let wrong="opened";
+  await payloadKey("nope",info).catch(()=>{{wrong="rejected";}});
+  const key=await payloadKey("pw",info);
+  const out=[];
+  for(const s of sealed) out.push(Buffer.from(await payloadOpen(key,s)).toString("base64"));
+  console.log(JSON.stringify({{wrong,out}}));
+}})().catch(e=>{{console.error(e);process.exit(1);}});
+"""
+    res = subprocess.run(["node", "-e", script], capture_output=True, text=True, timeout=60)
+    assert res.returncode == 0, res.stderr
+    result = json.loads(res.stdout)
+    assert result["wrong"] == "rejected"
+    assert result["out"] == PAYLOADS
@@ -0,0 +1,88 @@
+"""뷰어 사이드카(<케이스>.dlas.json) – 읽기와 model_infos 반영"""
+import json
+
+import pytest
+
+conv = pytest.importorskip("fast_html_viewer_converter")
+
+def _models():
+    return [
+        {"name": "UpperJaw", "group": "upper_scan", "displayName": "Upper"},
+        {"name": "Crown_11", "group": "upper_crownbridge", "displayName": "11"},
+        {"name": "Abutment_36", "group": "lower_abutment", "displayName": "36"},
+    ]
+
+def _sidecar(**kw):
+    return {"format": conv.SIDECAR_FORMAT, "version": 1, **kw}
+
+def test_model_changes_in_place():
+    models = _models()
+    original = models
+    ann, views = conv.apply_sidecar(models, _sidecar(models={
+        "UpperJaw": {"visible": False, "opacity": 0.4},
+        "Crown_11": {"group": "lower_crownbridge", "displayName": "Crown 11"},
+        "Abutment_36": {"deleted": True},
+    }))
+    assert models is original
+    assert [m["name"] for m in models] == ["UpperJaw", "Crown_11"]
+    assert models[0]["visible"] is False and models[0]["opacity"] == 0.4
+    assert models[1]["group"] == "lower_crownbridge" and models[1]["displayName"] == "Crown 11"
+    assert "visible" not in models[1] and "opacity" not in models[1]
+    assert ann == [] and views == []
+
+def test_invalid_values_are_ignored_and_opacity_clamped():
+    models = _models()
+    conv.apply_sidecar(models, _sidecar(models={
+        "UpperJaw": {"visible": "no", "opacity": 7, "group": 3, "displayName": None},
+        "Crown_11": {"opacity": -1},
+        "Abutment_36": "deleted",                  # dict 가 아니면 무시
+        "Missing": {"deleted": True},              # 없는 모델
+    }))
+    assert [m["name"] for m in models] == ["UpperJaw", "Crown_11", "Abutment_36"]
+    assert models[0] == {"name": "UpperJaw", "group": "upper_scan", "displayName": "Upper", "opacity": 1.0}
+    assert models[1]["opacity"] == 0.0
+    assert models[2] == _models()[2]
+
+def test_annotations_and_views_are_normalized():
+    ann, views = conv.apply_sidecar(_models(), _sidecar(
+        annotations=[
+            {"id": 1, "text": "margin", "pos": [1, "2", 3.5, 9]},
+            {"id": "b", "pos": [0, 0, 0]},
+            {"id": "bad", "text": "x", "pos": [1, 2]},
+            {"id": "nan", "text": "x", "pos": ["a", 0, 0]},
+            "not a dict",
+        ],
+        views=[
+            {"pos": [0, 0, 100], "tgt": [0, 0, 0]},
+            {"pos": [0, 0, 100]},
+            {"pos": None, "tgt": [0, 0, 0]},
+        ],
+    ))
+    assert ann == [{"id": "1", "text": "margin", "pos": [1.0, 2.0, 3.5]},
+                   {"id": "b", "text": "", "pos": [0.0, 0.0, 0.0]}]
+    assert views == [{"pos": [0.0, 0.0, 100.0], "tgt": [0.0, 0.0, 0.0]}]
+
+def test_empty_sidecar_changes_nothing():
+    models = _models()
+    assert conv.apply_sidecar(models, _sidecar()) == ([], [])
+    assert models == _models()
+
+def test_load_sidecar(tmp_path):
+    html = tmp_path / "case.html"
+    path = conv.sidecar_path(str(html))
+    assert path == str(tmp_path / ("case" + conv.SIDECAR_SUFFIX))
+    assert conv.load_sidecar(path) is None                          # 없음
+
+    logs = []
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{broken")
+    assert conv.load_sidecar(path, logs.append) is None
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"format": "other"}, f)
+    assert conv.load_sidecar(path, logs.append) is None
+    assert len(logs) == 2 and all(m.startswith("[WARN]") for m in logs)
+
+    data = _sidecar(annotations=[{"id": "a", "text": "주석", "pos": [1, 2, 3]}])
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    assert conv.load_sidecar(path) == data
@@ -0,0 +1,139 @@
+"""viewer_server – Range 해석, 206/416/304 응답, 루트 밖 경로 차단"""
+import asyncio
+import gzip
+import http.client
+import json
+import os
+
+import pytest
+
+import viewer_server
+from viewer_server import ViewerServer, parse_range
+
+BODY = bytes(range(256)) * 40          # 10240 바이트
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 10239)),
+    ("bytes=10000-20000", (10000, 10239)),     # 끝은 파일 크기로 자른다
+    ("bytes=-500", (9740, 10239)),
+    ("bytes=-99999", (0, 10239)),
+    ("bytes=10240-", None),                    # 시작이 파일 밖
+    ("bytes=50-10", None),
+    ("bytes=-0", None),
+    (" Bytes = 5-6", (5, 6)),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, len(BODY)) == expected
+
+@pytest.mark.parametrize("header", ["items=0-1", "bytes=0-1,5-6", "bytes=a-b", "bytes=-x"])
+def test_parse_range_malformed(header):
+    with pytest.raises(ValueError):
+        parse_range(header, len(BODY))
+
+def test_parse_range_empty_file():
+    assert parse_range("bytes=-10", 0) is None
+    assert parse_range("bytes=0-", 0) is None
+
+@pytest.fixture
+def site(tmp_path):
+    root = tmp_path / "site"
+    (root / "case").mkdir(parents=True)
+    (root / "case" / "model.glb").write_bytes(BODY)
+    (root / "case" / "viewer.html").write_text("<html>" + "x" * 4000 + "</html>")
+    (root / ".hidden").write_text("secret")
+    (tmp_path / "outside.txt").write_text("outside")
+    return root
+
+def _request(server, path, headers=None, method="GET"):
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    try:
+        conn.request(method, path, headers=headers or {})
+        resp = conn.getresponse()
+        return resp.status, {k.lower(): v for k, v in resp.getheaders()}, resp.read()
+    finally:
+        conn.close()
+
+def _run(root, requests):
+    """서버를 임시 포트로 띄우고 (path, headers) 요청들을 차례로 보낸 결과 목록"""
+    async def scenario():
+        server = ViewerServer(str(root), host="127.0.0.1", port=0)
+        await server.start()
+        try:
+            loop = asyncio.get_running_loop()
+            return [await loop.run_in_executor(None, _request, server, *req) for req in requests]
+        finally:
+            await server.stop()
+    return asyncio.run(scenario())
+
+def test_range_206_and_416(site):
+    (ok, h, body), (tail, th, tbody), (bad, bh, _), (ignored, _, ibody) = _run(site, [
+        ("/case/model.glb", {"Range": "bytes=100-199"}),
+        ("/case/model.glb", {"Range": "bytes=-16"}),
+        ("/case/model.glb", {"Range": "bytes=20000-"}),
+        ("/case/model.glb", {"Range": "lines=1-2"}),          # 해석할 수 없는 Range → 전체
+    ])
+    assert ok == 206 and body == BODY[100:200]
+    assert h["content-range"] == f"bytes 100-199/{len(BODY)}" and h["content-length"] == "100"
+    assert tail == 206 and tbody == BODY[-16:]
+    assert bad == 416 and bh["content-range"] == f"bytes */{len(BODY)}"
+    assert ignored == 200 and ibody == BODY
+
+def test_if_range_mismatch_sends_full_body(site):
+    (status, _, body), = _run(site, [("/case/model.glb", {"Range": "bytes=0-9", "If-Range": '"stale"'})])
+    assert status == 200 and body == BODY
+
+def test_conditional_304(site):
+    (status, h, _), = _run(site, [("/case/model.glb", {})])
+    assert status == 200
+    etag, last_mod = h["etag"], h["last-modified"]
+    (by_tag, th, tbody), (by_date, _, dbody), (changed, _, _) = _run(site, [
+        ("/case/model.glb", {"If-None-Match": etag}),
+        ("/case/model.glb", {"If-Modified-Since": last_mod}),
+        ("/case/model.glb", {"If-None-Match": '"other"'}),
+    ])
+    assert by_tag == 304 and tbody == b"" and th["etag"] == etag and "content-length" not in th
+    assert by_date == 304 and dbody == b""
+    assert changed == 200
+
+def test_precompressed_variant_and_its_etag(site):
+    html = site / "case" / "viewer.html"
+    gz = html.with_name("viewer.html.gz")
+    gz.write_bytes(gzip.compress(html.read_bytes()))
+    st = os.stat(html)
+    os.utime(gz, ns=(st.st_atime_ns, st.st_mtime_ns))
+    (status, h, body), = _run(site, [("/case/viewer.html", {"Accept-Encoding": "gzip"})])
+    assert status == 200 and h["content-encoding"] == "gzip" and h["etag"].endswith('-gz"')
+    assert gzip.decompress(body) == html.read_bytes()
+    (again, _, _), = _run(site, [("/case/viewer.html", {"Accept-Encoding": "gzip", "If-None-Match": h["etag"]})])
+    assert again == 304
+
+@pytest.mark.parametrize("url", [
+    "/../outside.txt", "/case/../../outside.txt", "/%2e%2e/outside.txt", "/case/%2E%2E/%2E%2E/outside.txt",
+    "/..%5Coutside.txt", "/.hidden", "/case/missing.glb",
+])
+def test_resolve_rejects_traversal_and_hidden(site, url):
+    assert ViewerServer(str(site))._resolve(url) is None
+
+def test_resolve_rejects_symlink_out_of_root(site, tmp_path):
+    try:
+        os.symlink(tmp_path / "outside.txt", site / "case" / "link.txt")
+    except (OSError, NotImplementedError):
+        pytest.skip("심볼릭 링크를 만들 수 없음")
+    assert ViewerServer(str(site))._resolve("/case/link.txt") is None
+
+def test_resolve_inside_root(site):
+    server = ViewerServer(str(site))
+    assert server._resolve("/case/model.glb") == os.path.realpath(site / "case" / "model.glb")
+    assert server._resolve("/case/./model.glb") == os.path.realpath(site / "case" / "model.glb")
+
+def test_traversal_is_404_over_http(site):
+    (status, _, body), = _run(site, [("/case/%2e%2e/%2e%2e/outside.txt", {})])
+    assert status == 404 and b"outside" not in body
+
+def test_case_listing(site):
+    (status, h, body), = _run(site, [("/api/cases", {})])
+    assert status == 200 and h["content-type"].startswith("application/json")
+    cases = json.loads(body)
+    assert [c["url"] for c in cases] == ["/case/viewer.html"]
+    assert viewer_server.list_cases(str(site))[0]["name"] == "viewer"
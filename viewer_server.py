@@ -0,0 +1,349 @@
+"""
+원격 뷰어 배포 서버 – 변환 결과 폴더를 병원 Wi-Fi 등에서 바로 열 수 있게 서빙 (asyncio, 표준 라이브러리만)
+----------------------------------------------------------------
+· GET/HEAD, HTTP/1.1 keep-alive (유휴 KEEPALIVE_S 초 후 종료)
+· 압축: 같은 폴더의 <파일>.br / <파일>.gz 사전 압축본이 원본보다 새것이면 Accept-Encoding 에 맞춰 그대로 전송,
+  없으면 텍스트류(HTML/JS/JSON…)만 gzip 으로 즉석 압축 (스레드에서, DYNAMIC_GZIP_MAX 이하 파일)
+· 캐시 검증: ETag(크기+mtime, 인코딩별 접미사) / Last-Modified → If-None-Match / If-Modified-Since 에 304
+  Cache-Control: no-cache – PWA의 network-first 서비스 워커가 매번 304 로 싸게 재검증
+· Range: 단일 구간 bytes=a-b / a- / -n → 206 (If-Range 일치 시에만), 범위 요청은 무압축 원본 기준
+· GET /api/cases → 루트 아래 *.html 목록 JSON [{name, url, size, mtime, etag, encodings, notes}]
+  notes: 옆에 있는 주석/뷰 사이드카(<이름>.dlas.json) URL – 뷰어가 열릴 때 자동 적용
+· GET /runtime/<파일> → 루트에 없으면 변환기의 viewer_runtime/ 번들 (--runtime shared 로 만든 HTML 이 공유)
+  파일 이름에 버전이 들어 있으므로 Cache-Control: immutable 로 한 번 받은 뒤에는 재검증하지 않는다
+"""
+import os
+import gzip
+import json
+import time
+import asyncio
+import mimetypes
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+from urllib.parse import unquote, quote, urlsplit
+
+DEFAULT_HOST     = "0.0.0.0"
+DEFAULT_PORT     = 8000
+KEEPALIVE_S      = 15.0
+MAX_HEADER_BYTES = 16 * 1024
+CHUNK_BYTES      = 256 * 1024
+DYNAMIC_GZIP_MAX = 64 * 2**20
+CASE_LIST_DEPTH  = 3
+SIDECAR_SUFFIX   = ".dlas.json"     # fast_html_viewer_converter.SIDECAR_SUFFIX
+RUNTIME_PREFIX   = "/runtime/"      # fast_html_viewer_converter.RUNTIME_URL
+RUNTIME_DIR      = os.path.join(os.path.dirname(os.path.abspath(__file__)), "viewer_runtime")
+IMMUTABLE        = "public, max-age=31536000, immutable"
+
+_COMPRESSIBLE = ("text/", "application/javascript", "application/json", "application/manifest+json",
+                 "image/svg+xml", "model/gltf+json")
+_EXTRA_TYPES = {".glb": "model/gltf-binary", ".gltf": "model/gltf+json", ".webmanifest": "application/manifest+json",
+                ".js": "application/javascript", ".mjs": "application/javascript", ".stl": "model/stl",
+                ".dlas": "application/json"}   # 케이스 데이터 파일 (fast_html_viewer_converter.CASE_SUFFIX)
+_VARIANTS = (("br", ".br"), ("gzip", ".gz"))   # 선호 순서
+_REASONS = {200: "OK", 206: "Partial Content", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 416: "Range Not Satisfiable", 500: "Internal Server Error"}
+
+def content_type(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    ctype = _EXTRA_TYPES.get(ext) or mimetypes.guess_type(path)[0] or "application/octet-stream"
+    return ctype + "; charset=utf-8" if ctype.startswith("text/") else ctype
+
+def make_etag(st: os.stat_result, suffix: str = "") -> str:
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}{suffix}"'
+
+def accepted_encodings(header: str) -> set[str]:
+    """Accept-Encoding → q>0 인 인코딩 집합 (소문자)"""
+    out = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for p in params.split(";"):
+            k, _, v = p.strip().partition("=")
+            if k == "q":
+                try:
+                    q = float(v)
+                except ValueError:
+                    q = 0.0
+        if name and q > 0:
+            out.add(name.strip().lower())
+    return out
+
+def parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """'bytes=a-b' 단일 구간 → (시작, 끝 포함). 만족 불가면 None, 형식이 틀리면 ValueError"""
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        raise ValueError(header)
+    a, _, b = spec.strip().partition("-")
+    if not a:                                   # 마지막 n 바이트
+        n = int(b)
+        if n <= 0 or size == 0:
+            return None
+        return max(0, size - n), size - 1
+    start = int(a)
+    end = int(b) if b else size - 1
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+def _not_modified(headers: dict, etag: str, mtime: float) -> bool:
+    inm = headers.get("if-none-match")
+    if inm is not None:
+        return inm.strip() == "*" or etag in (t.strip() for t in inm.split(","))
+    ims = headers.get("if-modified-since")
+    if ims:
+        try:
+            return int(mtime) <= parsedate_to_datetime(ims).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def list_cases(root: str, max_depth: int = CASE_LIST_DEPTH) -> list[dict]:
+    """루트 아래 *.html (사전 압축본 제외) → 최신순 목록"""
+    root = os.path.abspath(root)
+    cases = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        depth = 0 if dirpath == root else os.path.relpath(dirpath, root).count(os.sep) + 1
+        if depth >= max_depth:
+            dirnames[:] = []
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for fn in filenames:
+            if not fn.lower().endswith(".html"):
+                continue
+            p = os.path.join(dirpath, fn)
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            rel = os.path.relpath(p, root).replace(os.sep, "/")
+            notes = os.path.splitext(fn)[0] + SIDECAR_SUFFIX
+            cases.append({
+                "name": os.path.splitext(fn)[0],
+                "url": "/" + quote(rel),
+                "size": st.st_size,
+                "mtime": st.st_mtime,
+                "etag": make_etag(st),
+                "encodings": [enc for enc, ext in _VARIANTS if os.path.isfile(p + ext)],
+                "notes": "/" + quote(os.path.splitext(rel)[0] + SIDECAR_SUFFIX) if notes in filenames else None,
+            })
+    cases.sort(key=lambda c: c["mtime"], reverse=True)
+    return cases
+
+class ViewerServer:
+    """루트 폴더 하나를 서빙하는 asyncio HTTP/1.1 서버 (serve_forever 또는 start/stop)"""
+    def __init__(self, root: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, log=None):
+        self.root = os.path.abspath(root)
+        self.host, self.port = host, port
+        self.log = log
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]   # port=0 이면 실제 포트
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        self.log and self.log(f"[INFO] 뷰어 서버: http://{self.host}:{self.port}/ (루트 {self.root})")
+        async with self._server:
+            await self._server.serve_forever()
+
+    # ------------------------------------------------------------------
+    def _resolve(self, url_path: str) -> Optional[str]:
+        """URL 경로 → 루트 안의 실제 파일 (밖으로 나가거나 숨김 경로면 None, 폴더는 index.html)"""
+        rel = unquote(url_path).lstrip("/")
+        parts = [p for p in rel.replace("\\", "/").split("/") if p not in ("", ".")]
+        if any(p == ".." or p.startswith(".") for p in parts):
+            return None
+        path = os.path.join(self.root, *parts)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        real = os.path.realpath(path)
+        if os.path.commonpath([real, os.path.realpath(self.root)]) != os.path.realpath(self.root):
+            return None
+        return real if os.path.isfile(real) else None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE_S)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                        ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._send_simple(writer, 400, "GET", close=True)
+                    break
+                headers: dict[str, str] = {}
+                for line in lines[1:]:
+                    k, sep, v = line.partition(":")
+                    if sep:
+                        headers[k.strip().lower()] = v.strip()
+                conn = headers.get("connection", "").lower()
+                keep = (version == "HTTP/1.1" and conn != "close") or conn == "keep-alive"
+                t0 = time.perf_counter()
+                status = await self._respond(writer, method.upper(), urlsplit(target).path, headers, keep)
+                self.log and self.log(f"[DEBUG] {method} {target} {status} {(time.perf_counter() - t0) * 1000:.1f}ms")
+                if not keep:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        except Exception as e:
+            self.log and self.log(f"[WARN] 뷰어 서버 요청 처리 실패: {e}")
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def _respond(self, writer, method: str, path: str, headers: dict, keep: bool) -> int:
+        if method not in ("GET", "HEAD"):
+            return await self._send_simple(writer, 405, method, keep, extra={"Allow": "GET, HEAD"})
+        if path.rstrip("/") == "/api/cases":
+            cases = await asyncio.get_running_loop().run_in_executor(None, list_cases, self.root)
+            body = json.dumps(cases, ensure_ascii=False).encode("utf-8")
+            return await self._send_bytes(writer, 200, method, keep, body, "application/json; charset=utf-8",
+                                          {"Cache-Control": "no-cache"})
+        fs_path = self._resolve(path)
+        if path.startswith(RUNTIME_PREFIX):
+            fs_path = fs_path or _runtime_file(path[len(RUNTIME_PREFIX):])
+            if fs_path is not None:
+                return await self._send_file(writer, method, fs_path, headers, keep, cache_control=IMMUTABLE)
+        if fs_path is None:
+            return await self._send_simple(writer, 404, method, keep)
+        return await self._send_file(writer, method, fs_path, headers, keep)
+
+    async def _send_file(self, writer, method: str, fs_path: str, headers: dict, keep: bool,
+                         cache_control: str = "no-cache") -> int:
+        st = os.stat(fs_path)
+        ctype = content_type(fs_path)
+        etag = make_etag(st)
+        common = {"Last-Modified": formatdate(st.st_mtime, usegmt=True), "Cache-Control": cache_control,
+                  "Accept-Ranges": "bytes", "Vary": "Accept-Encoding"}
+
+        rng = headers.get("range")
+        if rng and headers.get("if-range") not in (None, etag):
+            rng = None                                  # 리소스가 바뀌었으면 전체 전송
+        if rng:
+            try:
+                span = parse_range(rng, st.st_size)
+            except ValueError:
+                rng = None                              # 해석할 수 없는 Range 는 무시 (RFC 9110)
+        if rng:
+            if _not_modified(headers, etag, st.st_mtime):
+                return await self._send_head(writer, 304, keep, {**common, "ETag": etag})
+            if span is None:
+                return await self._send_simple(writer, 416, method, keep,
+                                               extra={"Content-Range": f"bytes */{st.st_size}"})
+            start, end = span
+            await self._send_head(writer, 206, keep, {**common, "ETag": etag, "Content-Type": ctype,
+                                                      "Content-Range": f"bytes {start}-{end}/{st.st_size}",
+                                                      "Content-Length": str(end - start + 1)})
+            if method == "GET":
+                await self._stream(writer, fs_path, start, end - start + 1)
+            return 206
+
+        # 인코딩 선택: 사전 압축본 > 즉석 gzip(텍스트류) > 원본
+        accepted = accepted_encodings(headers.get("accept-encoding", ""))
+        for enc, ext in _VARIANTS:
+            if enc not in accepted:
+                continue
+            try:
+                vst = os.stat(fs_path + ext)
+            except OSError:
+                continue
+            if vst.st_mtime_ns < st.st_mtime_ns:
+                continue                                # 원본보다 오래된 압축본은 무시
+            vtag = make_etag(st, "-" + ext[1:])
+            if _not_modified(headers, vtag, st.st_mtime):
+                return await self._send_head(writer, 304, keep, {**common, "ETag": vtag})
+            await self._send_head(writer, 200, keep, {**common, "ETag": vtag, "Content-Type": ctype,
+                                                      "Content-Encoding": enc, "Content-Length": str(vst.st_size)})
+            if method == "GET":
+                await self._stream(writer, fs_path + ext, 0, vst.st_size)
+            return 200
+
+        if "gzip" in accepted and ctype.startswith(_COMPRESSIBLE) and 1024 < st.st_size <= DYNAMIC_GZIP_MAX:
+            vtag = make_etag(st, "-gz")
+            if _not_modified(headers, vtag, st.st_mtime):
+                return await self._send_head(writer, 304, keep, {**common, "ETag": vtag})
+            body = await asyncio.get_running_loop().run_in_executor(None, _gzip_file, fs_path)
+            return await self._send_bytes(writer, 200, method, keep, body, ctype,
+                                          {**common, "ETag": vtag, "Content-Encoding": "gzip"})
+
+        if _not_modified(headers, etag, st.st_mtime):
+            return await self._send_head(writer, 304, keep, {**common, "ETag": etag})
+        await self._send_head(writer, 200, keep, {**common, "ETag": etag, "Content-Type": ctype,
+                                                  "Content-Length": str(st.st_size)})
+        if method == "GET":
+            await self._stream(writer, fs_path, 0, st.st_size)
+        return 200
+
+    # ------------------------------------------------------------------
+    async def _send_head(self, writer, status: int, keep: bool, headers: dict) -> int:
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+                 f"Date: {formatdate(usegmt=True)}",
+                 "Server: dlas-viewer",
+                 "Access-Control-Allow-Origin: *",
+                 f"Connection: {'keep-alive' if keep else 'close'}"]
+        if keep:
+            lines.append(f"Keep-Alive: timeout={int(KEEPALIVE_S)}")
+        if status == 304:
+            headers = {k: v for k, v in headers.items() if k != "Content-Length"}
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+        return status
+
+    async def _send_bytes(self, writer, status: int, method: str, keep: bool, body: bytes,
+                          ctype: str, extra: dict | None = None) -> int:
+        await self._send_head(writer, status, keep, {**(extra or {}), "Content-Type": ctype,
+                                                     "Content-Length": str(len(body))})
+        if method == "GET":
+            writer.write(body)
+            await writer.drain()
+        return status
+
+    async def _send_simple(self, writer, status: int, method: str, keep: bool = False, close: bool = False,
+                           extra: dict | None = None) -> int:
+        body = f"{status} {_REASONS.get(status, '')}\n".encode("ascii")
+        return await self._send_bytes(writer, status, method, keep and not close, body,
+                                      "text/plain; charset=utf-8", extra)
+
+    async def _stream(self, writer, path: str, offset: int, length: int) -> None:
+        loop = asyncio.get_running_loop()
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while length > 0:
+                chunk = await loop.run_in_executor(None, f.read, min(CHUNK_BYTES, length))
+                if not chunk:
+                    break
+                writer.write(chunk)
+                await writer.drain()
+                length -= len(chunk)
+
+def _runtime_file(name: str) -> Optional[str]:
+    """변환기에 딸린 런타임 번들 (하위 경로/숨김 파일은 거부)"""
+    name = unquote(name)
+    if not name or "/" in name or "\\" in name or name.startswith("."):
+        return None
+    path = os.path.join(RUNTIME_DIR, name)
+    return path if os.path.isfile(path) else None
+
+def _gzip_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return gzip.compress(f.read(), compresslevel=6, mtime=0)
+
+def serve(root: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, log=None) -> None:
+    """블로킹 실행 (Ctrl+C 로 종료)"""
+    try:
+        asyncio.run(ViewerServer(root, host, port, log=log).serve_forever())
+    except KeyboardInterrupt:
+        pass